@@ -1,11 +1,36 @@
 """Algorithm implementations used across the backend."""
 
+from .astar import astar_shortest_path, geo_heuristic
+from .bidirectional import bidirectional_shortest_path
+from .alternatives import alternative_paths
+from .compact_graph import CompactGraph, compact_shortest_path
+from .congestion import BUCKET_SECONDS, PROFILE_BUCKETS, CongestionProfiles, profile_travel_time
+from .contraction import (
+	ContractionHierarchy,
+	build_contraction_hierarchy,
+	contraction_shortest_path,
+)
 from .compression import compress_text, decompress_text
+from .voronoi import GraphVoronoi, build_graph_voronoi
+from .landmarks import LandmarkSelection, LandmarkTable, alt_shortest_path, build_landmark_table
+from .matrix import DistanceMatrix, distance_matrix, shortest_paths_from
+from .multimodal import multimodal_shortest_path
+from .path_tree import ShortestPathTree, build_shortest_path_tree, nearest_targets_tree
+from .isochrone import Isochrone, compute_isochrone
 from .inverted_index import InvertedIndex, Posting
 from .partial_sort import PartialSorter, RankedItem, top_k, top_k_with_scores
-from .shortest_path import Edge, PathResult, PathSegment, WeightStrategy, shortest_path
+from .shortest_path import (
+	Edge,
+	NodeId,
+	PathResult,
+	PathSegment,
+	SearchAlgorithm,
+	WeightStrategy,
+	shortest_path,
+)
 from .spatial_index import BoundingBox, RTree
-from .tsp import TourComputationError, TourLeg, TourResult, compute_tour
+from .time_dependent import time_dependent_shortest_path
+from .tsp import TourComputationError, TourLeg, TourResult, TourSolver, compute_tour
 
 __all__ = [
 	"PartialSorter",
@@ -13,10 +38,41 @@ __all__ = [
 	"top_k",
 	"top_k_with_scores",
 	"Edge",
+	"NodeId",
 	"PathSegment",
 	"PathResult",
 	"WeightStrategy",
+	"SearchAlgorithm",
 	"shortest_path",
+	"CompactGraph",
+	"compact_shortest_path",
+	"BUCKET_SECONDS",
+	"PROFILE_BUCKETS",
+	"CongestionProfiles",
+	"profile_travel_time",
+	"time_dependent_shortest_path",
+	"multimodal_shortest_path",
+	"astar_shortest_path",
+	"geo_heuristic",
+	"bidirectional_shortest_path",
+	"alternative_paths",
+	"ContractionHierarchy",
+	"build_contraction_hierarchy",
+	"contraction_shortest_path",
+	"LandmarkSelection",
+	"LandmarkTable",
+	"build_landmark_table",
+	"GraphVoronoi",
+	"build_graph_voronoi",
+	"alt_shortest_path",
+	"DistanceMatrix",
+	"distance_matrix",
+	"shortest_paths_from",
+	"ShortestPathTree",
+	"build_shortest_path_tree",
+	"nearest_targets_tree",
+	"Isochrone",
+	"compute_isochrone",
 	"BoundingBox",
 	"RTree",
 	"InvertedIndex",
@@ -25,6 +81,7 @@ __all__ = [
 	"decompress_text",
 	"TourLeg",
 	"TourResult",
+	"TourSolver",
 	"TourComputationError",
 	"compute_tour",
 ]
@@ -0,0 +1,185 @@
+"""Alternative routes with the plateau (via-edge) method."""
+
+from __future__ import annotations
+
+from heapq import heappop, heappush
+from math import inf
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .compact_graph import CompactGraph
+from .shortest_path import NodeId, PathResult, WeightStrategy
+
+
+def alternative_paths(
+    graph: CompactGraph,
+    start: NodeId,
+    goal: NodeId,
+    k: int = 3,
+    *,
+    strategy: WeightStrategy | str = WeightStrategy.TIME,
+    allowed_modes: Optional[Sequence[str] | str] = None,
+    max_overlap: float = 0.7,
+    max_stretch: float = 1.4,
+) -> List[PathResult]:
+    """Up to ``k`` loopless paths from ``start`` to ``goal``, the shortest first.
+
+    One forward search from ``start`` and one backward search to ``goal`` are
+    shared by every candidate: each edge ``u -> v`` reached by both defines the
+    path ``start -> u`` (forward tree), ``u -> v``, ``v -> goal`` (backward
+    tree). Edges on a *plateau* (a stretch where both trees use the same edges)
+    yield the same path, so only the first edge of each plateau is considered.
+    Both searches stop at ``max_stretch`` times the optimal cost, which also
+    bounds the cost of any alternative. Candidates are taken in order of cost
+    and kept when they repeat no node and share at most ``max_overlap`` of their
+    cost with every path chosen before.
+    """
+
+    if k < 1:
+        raise ValueError("k must be at least 1")
+    source = graph.index.get(start)
+    target = graph.index.get(goal)
+    if source is None or target is None:
+        raise ValueError(f"No path found from {start!r} to {goal!r}")
+    if source == target:
+        return [PathResult(nodes=[start], segments=[], total_distance=0.0, total_time=0.0)]
+
+    allowed_mask = graph.mode_mask(allowed_modes)
+    weights = graph.weights(strategy)
+    forward_costs, forward_via, forward_expanded = _bounded_tree(
+        graph, source, weights, allowed_mask, goal=target, stretch=max_stretch
+    )
+    optimum = forward_costs[target]
+    if optimum == inf:
+        raise ValueError(f"No path found from {start!r} to {goal!r}")
+    limit = optimum * max_stretch
+    backward_costs, backward_next, backward_expanded = _bounded_tree(
+        graph, target, weights, allowed_mask, bound=limit, reverse=True
+    )
+    expanded = forward_expanded + backward_expanded
+
+    edges = np.arange(len(graph.targets), dtype=np.int64)
+    tails = np.repeat(
+        np.arange(len(graph), dtype=np.int64), np.diff(np.asarray(graph.offsets, dtype=np.int64))
+    )
+    heads = np.asarray(graph.targets, dtype=np.int64)
+    via = np.asarray(forward_via, dtype=np.int64)
+    following = np.asarray(backward_next, dtype=np.int64)
+    totals = (
+        np.asarray(forward_costs)[tails]
+        + np.asarray(weights, dtype=np.float64)
+        + np.asarray(backward_costs)[heads]
+    )
+    allowed = (np.asarray(graph.mode_masks, dtype=np.int64) & allowed_mask) != 0
+    # 同时属于两棵树的边位于平台上；只有平台的第一条边（其前一条树边不在后向树中）代表该路径
+    entering = via[tails]
+    plateau_start = (entering < 0) | (following[tails[np.maximum(entering, 0)]] != entering)
+    on_plateau = (via[heads] == edges) & (following[tails] == edges) & ~plateau_start
+    candidates = np.flatnonzero(
+        allowed & np.isfinite(totals) & (totals <= limit * (1 + 1e-12)) & ~on_plateau
+    )
+    candidates = candidates[np.argsort(totals[candidates], kind="stable")]
+
+    # 已选路线由前向树部分、一条边和后向树部分组成：候选边的起点落在某条已选路线的
+    # 前向部分时，两者至少共享起点到该点的整段代价（终点一侧同理），无需展开即可排除
+    tail_of = tails.tolist()
+    chosen: List[Tuple[List[int], set[int], float, set[int], set[int]]] = []
+    seen: set[Tuple[int, ...]] = set()
+    for edge in candidates.tolist():
+        tail, head = tail_of[edge], graph.targets[edge]
+        cost = float(totals[edge])
+        if any(
+            (forward_costs[tail] if tail in prefix else 0.0)
+            + (backward_costs[head] if head in suffix else 0.0)
+            > max_overlap * cost
+            for _, _, _, prefix, suffix in chosen
+        ):
+            continue
+        prefix_nodes = [tail]
+        while prefix_nodes[-1] != source:
+            prefix_nodes.append(tail_of[forward_via[prefix_nodes[-1]]])
+        chain = [forward_via[node] for node in reversed(prefix_nodes[:-1])]
+        chain.append(edge)
+        suffix_nodes = [head]
+        while suffix_nodes[-1] != target:
+            step = backward_next[suffix_nodes[-1]]
+            chain.append(step)
+            suffix_nodes.append(graph.targets[step])
+        key = tuple(chain)
+        if key in seen:
+            continue
+        seen.add(key)
+        if len(set(prefix_nodes).union(suffix_nodes)) != len(prefix_nodes) + len(suffix_nodes):
+            continue  # 前向与后向路径相交，含有环
+        used = set(chain)
+        if any(
+            sum(weights[step] for step in used & other) > max_overlap * cost
+            for _, other, _, _, _ in chosen
+        ):
+            continue
+        chosen.append((chain, used, cost, set(prefix_nodes), set(suffix_nodes)))
+        if len(chosen) == k:
+            break
+
+    return [graph.build_path(chain, allowed_mask, expanded_nodes=expanded) for chain, *_ in chosen]
+
+
+def _bounded_tree(
+    graph: CompactGraph,
+    origin: int,
+    weights: Sequence[float],
+    allowed_mask: int,
+    *,
+    goal: Optional[int] = None,
+    stretch: float = 1.0,
+    bound: float = inf,
+    reverse: bool = False,
+) -> Tuple[List[float], List[int], int]:
+    """Dijkstra that stops past ``bound`` (or ``stretch`` times the cost of ``goal``).
+
+    Returns ``(costs, via_edge, expanded)`` with unsettled nodes reset to ``inf``
+    and ``-1``. With ``reverse=True`` costs are *to* ``origin`` and ``via_edge``
+    holds the first edge of each node's path there.
+    """
+
+    if reverse:
+        index = graph.reverse
+        offsets, neighbours, edge_ids = index.offsets, index.sources, index.edges
+    else:
+        offsets, neighbours, edge_ids = graph.offsets, graph.targets, None
+    mode_masks = graph.mode_masks
+    size = len(graph)
+    costs = [inf] * size
+    via_edge = [-1] * size
+    settled = bytearray(size)
+    costs[origin] = 0.0
+    queue: List[Tuple[float, int]] = [(0.0, origin)]
+    expanded = 0
+
+    while queue:
+        cost, node = heappop(queue)
+        if settled[node]:
+            continue
+        if cost > bound:
+            break
+        settled[node] = 1
+        expanded += 1
+        if node == goal:
+            bound = cost * stretch
+        for position in range(offsets[node], offsets[node + 1]):
+            edge = position if edge_ids is None else edge_ids[position]
+            if not mode_masks[edge] & allowed_mask:
+                continue
+            neighbour = neighbours[position]
+            new_cost = cost + weights[edge]
+            if new_cost < costs[neighbour]:
+                costs[neighbour] = new_cost
+                via_edge[neighbour] = edge
+                heappush(queue, (new_cost, neighbour))
+
+    for node in range(size):
+        if not settled[node]:
+            costs[node] = inf
+            via_edge[node] = -1
+    return costs, via_edge, expanded
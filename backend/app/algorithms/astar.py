@@ -0,0 +1,94 @@
+"""A* search over :class:`CompactGraph` using great-circle lower bounds."""
+
+from __future__ import annotations
+
+from heapq import heappop, heappush
+from math import inf
+from typing import List, Optional, Sequence, Tuple
+
+from .compact_graph import CompactGraph, trace_edges
+from .geo import haversine_array
+from .shortest_path import NodeId, PathResult, WeightStrategy
+
+
+def geo_heuristic(graph: CompactGraph, target: int, strategy: WeightStrategy | str) -> List[float]:
+    """Return a consistent lower bound on the cost from every node to ``target``.
+
+    Uses the haversine distance scaled by :attr:`CompactGraph.geo_bounds`; for the
+    TIME strategy the bound is further divided by the fastest edge speed. Graphs
+    without usable coordinates get an all-zero heuristic (plain Dijkstra).
+    """
+
+    ratio, max_speed = graph.geo_bounds
+    strategy = WeightStrategy(strategy)
+    if ratio <= 0 or (strategy is WeightStrategy.TIME and max_speed <= 0):
+        return [0.0] * len(graph)
+
+    views = graph.as_numpy()
+    latitudes = views["latitudes"]
+    longitudes = views["longitudes"]
+    bound = haversine_array(latitudes, longitudes, latitudes[target], longitudes[target]) * ratio
+    if strategy is WeightStrategy.TIME:
+        bound /= max_speed
+    return bound.tolist()
+
+
+def astar_shortest_path(
+    graph: CompactGraph,
+    start: NodeId,
+    goal: NodeId,
+    *,
+    allowed_modes: Optional[Sequence[str] | str] = None,
+    strategy: WeightStrategy | str = WeightStrategy.TIME,
+    heuristic: Optional[Sequence[float]] = None,
+) -> PathResult:
+    """Goal-directed shortest path; ``heuristic`` overrides the geometric bound."""
+
+    if start == goal:
+        return PathResult(nodes=[start], segments=[], total_distance=0.0, total_time=0.0)
+
+    source = graph.index.get(start)
+    target = graph.index.get(goal)
+    if source is None or target is None:
+        raise ValueError(f"No path found from {start!r} to {goal!r}")
+
+    strategy = WeightStrategy(strategy)
+    estimate = heuristic if heuristic is not None else geo_heuristic(graph, target, strategy)
+    allowed_mask = graph.mode_mask(allowed_modes)
+    weights = graph.weights(strategy)
+    offsets = graph.offsets
+    targets = graph.targets
+    mode_masks = graph.mode_masks
+
+    best_cost = [inf] * len(graph)
+    via_edge = [-1] * len(graph)
+    settled = bytearray(len(graph))
+    best_cost[source] = 0.0
+    queue: List[Tuple[float, int]] = [(estimate[source], source)]
+    expanded = 0
+
+    while queue:
+        _, node = heappop(queue)
+        if settled[node]:
+            continue
+        settled[node] = 1
+        expanded += 1
+        if node == target:
+            break
+        cost = best_cost[node]
+        for edge in range(offsets[node], offsets[node + 1]):
+            if not mode_masks[edge] & allowed_mask:
+                continue
+            neighbour = targets[edge]
+            new_cost = cost + weights[edge]
+            if new_cost < best_cost[neighbour]:
+                best_cost[neighbour] = new_cost
+                via_edge[neighbour] = edge
+                heappush(queue, (new_cost + estimate[neighbour], neighbour))
+
+    if best_cost[target] == inf:
+        raise ValueError(f"No path found from {start!r} to {goal!r}")
+
+    return graph.build_path(
+        trace_edges(graph, via_edge, source, target), allowed_mask, expanded_nodes=expanded
+    )
@@ -0,0 +1,117 @@
+"""Bidirectional Dijkstra search for point-to-point queries on :class:`CompactGraph`."""
+
+from __future__ import annotations
+
+from heapq import heappop, heappush
+from math import inf
+from typing import List, Optional, Sequence, Tuple
+
+from .compact_graph import CompactGraph, trace_edges
+from .shortest_path import NodeId, PathResult, WeightStrategy
+
+
+def bidirectional_shortest_path(
+    graph: CompactGraph,
+    start: NodeId,
+    goal: NodeId,
+    *,
+    allowed_modes: Optional[Sequence[str] | str] = None,
+    strategy: WeightStrategy | str = WeightStrategy.TIME,
+) -> PathResult:
+    """Search forward from ``start`` and backward from ``goal`` until the frontiers meet.
+
+    The search stops once the smallest keys of both queues sum to at least the best
+    meeting cost ``mu`` seen so far, which guarantees that ``mu`` is optimal.
+    """
+
+    if start == goal:
+        return PathResult(nodes=[start], segments=[], total_distance=0.0, total_time=0.0)
+
+    source = graph.index.get(start)
+    target = graph.index.get(goal)
+    if source is None or target is None:
+        raise ValueError(f"No path found from {start!r} to {goal!r}")
+
+    allowed_mask = graph.mode_mask(allowed_modes)
+    weights = graph.weights(strategy)
+    offsets = graph.offsets
+    targets = graph.targets
+    mode_masks = graph.mode_masks
+    reverse = graph.reverse
+    in_offsets = reverse.offsets
+    in_sources = reverse.sources
+    in_edges = reverse.edges
+
+    size = len(graph)
+    forward_cost = [inf] * size
+    backward_cost = [inf] * size
+    forward_via = [-1] * size
+    backward_via = [-1] * size
+    forward_settled = bytearray(size)
+    backward_settled = bytearray(size)
+    forward_cost[source] = 0.0
+    backward_cost[target] = 0.0
+    forward_queue: List[Tuple[float, int]] = [(0.0, source)]
+    backward_queue: List[Tuple[float, int]] = [(0.0, target)]
+
+    best = inf
+    meeting_edge = -1
+    expanded = 0
+
+    while forward_queue and backward_queue:
+        if forward_queue[0][0] + backward_queue[0][0] >= best:
+            break
+
+        if forward_queue[0][0] <= backward_queue[0][0]:
+            cost, node = heappop(forward_queue)
+            if forward_settled[node]:
+                continue
+            forward_settled[node] = 1
+            expanded += 1
+            for edge in range(offsets[node], offsets[node + 1]):
+                if not mode_masks[edge] & allowed_mask:
+                    continue
+                neighbour = targets[edge]
+                new_cost = cost + weights[edge]
+                if new_cost < forward_cost[neighbour]:
+                    forward_cost[neighbour] = new_cost
+                    forward_via[neighbour] = edge
+                    heappush(forward_queue, (new_cost, neighbour))
+                through = new_cost + backward_cost[neighbour]
+                if through < best:
+                    best = through
+                    meeting_edge = edge
+        else:
+            cost, node = heappop(backward_queue)
+            if backward_settled[node]:
+                continue
+            backward_settled[node] = 1
+            expanded += 1
+            for position in range(in_offsets[node], in_offsets[node + 1]):
+                edge = in_edges[position]
+                if not mode_masks[edge] & allowed_mask:
+                    continue
+                neighbour = in_sources[position]
+                new_cost = cost + weights[edge]
+                if new_cost < backward_cost[neighbour]:
+                    backward_cost[neighbour] = new_cost
+                    backward_via[neighbour] = edge
+                    heappush(backward_queue, (new_cost, neighbour))
+                through = new_cost + forward_cost[neighbour]
+                if through < best:
+                    best = through
+                    meeting_edge = edge
+
+    if meeting_edge < 0:
+        raise ValueError(f"No path found from {start!r} to {goal!r}")
+
+    head = graph.edge_source(meeting_edge)
+    chain = trace_edges(graph, forward_via, source, head)
+    chain.append(meeting_edge)
+    cursor = targets[meeting_edge]
+    while cursor != target:
+        edge = backward_via[cursor]
+        chain.append(edge)
+        cursor = targets[edge]
+
+    return graph.build_path(chain, allowed_mask, expanded_nodes=expanded)
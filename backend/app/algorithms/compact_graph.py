@@ -0,0 +1,510 @@
+"""Compressed sparse row (CSR) graph representation for routing queries."""
+
+from __future__ import annotations
+
+import hashlib
+from array import array
+from bisect import bisect_right
+from dataclasses import dataclass, replace
+from functools import cached_property
+from heapq import heappop, heappush
+from itertools import accumulate
+from math import inf
+from typing import Dict, Iterable, List, Mapping, Optional, Protocol, Sequence, Tuple, cast
+
+import numpy as np
+
+from .congestion import CongestionProfiles
+from .geo import haversine_array
+from .shortest_path import Edge, NodeId, PathResult, PathSegment, WeightStrategy, _normalise_modes
+
+MAX_TRANSPORT_MODES = 16
+
+
+class NodeIndex(Protocol):
+    """Read-only ``node id -> dense id`` lookup of a :class:`CompactGraph`.
+
+    A plain dict for compiled graphs; loaded snapshots use a bisecting index
+    over their mapped buffers instead.
+    """
+
+    def get(self, node: NodeId, /) -> Optional[int]: ...
+
+    def __getitem__(self, node: NodeId, /) -> int: ...
+
+    def __contains__(self, node: object, /) -> bool: ...
+
+    def __len__(self) -> int: ...
+
+
+@dataclass(frozen=True, eq=False)
+class CompactGraph:
+    """Directed graph stored as CSR buffers indexed by dense integer node ids.
+
+    Outgoing edges of node ``i`` occupy ``offsets[i]:offsets[i + 1]`` in the
+    parallel ``targets``/``distances``/``times``/``mode_masks`` buffers. Each
+    transport mode is one bit of ``mode_masks``; bit ``b`` names ``mode_names[b]``.
+    Buffers are typed :mod:`array` instances (or memoryviews) so they can be
+    viewed as NumPy arrays without copying. Optional ``latitudes``/``longitudes``
+    hold node coordinates (NaN when unknown) for geometric heuristics.
+    ``node_ids`` maps dense ids back to the caller's node ids; when every id is
+    an ``int`` it is an ``array("q")`` (8 bytes per node, no per-node objects),
+    otherwise a tuple. ``profiles`` carries the time-of-day congestion of edges that have one; the
+    static ``times`` (used by every other search) are unaffected by it.
+    """
+
+    node_ids: Sequence[NodeId]
+    index: NodeIndex
+    offsets: Sequence[int]
+    targets: Sequence[int]
+    distances: Sequence[float]
+    times: Sequence[float]
+    mode_masks: Sequence[int]
+    mode_names: Tuple[str, ...]
+    latitudes: Optional[Sequence[float]] = None
+    longitudes: Optional[Sequence[float]] = None
+    profiles: Optional[CongestionProfiles] = None
+
+    @classmethod
+    def from_edges(
+        cls,
+        edges: Iterable[Edge],
+        nodes: Iterable[NodeId] = (),
+        *,
+        coordinates: Optional[Mapping[NodeId, Tuple[float, float]]] = None,
+    ) -> "CompactGraph":
+        """Compile edges into CSR form; ``nodes`` adds isolated nodes up front."""
+
+        index: Dict[NodeId, int] = {}
+        node_ids: List[NodeId] = []
+        mode_bits: Dict[str, int] = {}
+
+        def intern(node: NodeId) -> int:
+            position = index.get(node)
+            if position is None:
+                position = index[node] = len(node_ids)
+                node_ids.append(node)
+            return position
+
+        for node in nodes:
+            intern(node)
+
+        edge_list = list(edges)
+        sources: List[int] = []
+        for edge in edge_list:
+            sources.append(intern(edge.source))
+            intern(edge.target)
+            for mode in edge.transport_modes:
+                if mode not in mode_bits:
+                    if len(mode_bits) >= MAX_TRANSPORT_MODES:
+                        raise ValueError(
+                            f"at most {MAX_TRANSPORT_MODES} transport modes are supported"
+                        )
+                    mode_bits[mode] = len(mode_bits)
+
+        degree = [0] * (len(node_ids) + 1)
+        for source in sources:
+            degree[source + 1] += 1
+        offsets = array("q", accumulate(degree))
+
+        edge_count = len(edge_list)
+        targets = array("i", [0]) * edge_count
+        distances = array("d", [0.0]) * edge_count
+        times = array("d", [0.0]) * edge_count
+        mode_masks = array("H", [0]) * edge_count
+        cursor = list(offsets[:-1])
+        profiled: List[Tuple[int, Sequence[float], float]] = []
+        for source, edge in zip(sources, edge_list):
+            slot = cursor[source]
+            cursor[source] += 1
+            if edge.congestion_profile is not None:
+                profiled.append((slot, edge.congestion_profile, edge.ideal_speed))
+            targets[slot] = index[edge.target]
+            distances[slot] = edge.distance
+            times[slot] = edge.travel_time
+            mask = 0
+            for mode in edge.transport_modes:
+                mask |= 1 << mode_bits[mode]
+            mode_masks[slot] = mask
+
+        latitudes: Optional[array] = None
+        longitudes: Optional[array] = None
+        if coordinates is not None:
+            missing = (float("nan"), float("nan"))
+            points = [coordinates.get(node, missing) for node in node_ids]
+            latitudes = array("d", (point[0] for point in points))
+            longitudes = array("d", (point[1] for point in points))
+
+        return cls(
+            node_ids=_pack_node_ids(node_ids),
+            index=index,
+            offsets=offsets,
+            targets=targets,
+            distances=distances,
+            times=times,
+            mode_masks=mode_masks,
+            mode_names=tuple(mode_bits),
+            latitudes=latitudes,
+            longitudes=longitudes,
+            profiles=CongestionProfiles.from_slots(edge_count, sorted(profiled)),
+        )
+
+    def __len__(self) -> int:
+        return len(self.node_ids)
+
+    def __getstate__(self) -> Dict[str, object]:
+        # memoryview 缓冲区（如内存映射的快照）无法 pickle，进程池传参前复制为 array
+        return _portable_state(self.__dict__)
+
+    def with_times(self, times: Sequence[float]) -> "CompactGraph":
+        """Copy of the graph with new edge ``times``, sharing every other buffer.
+
+        The incoming-edge index and the topology fingerprint do not depend on the
+        times and are carried over when already computed; weight-dependent caches
+        are recomputed lazily.
+        """
+
+        if len(times) != self.edge_count:
+            raise ValueError("times must hold one value per edge")
+        graph = replace(self, times=times)
+        for name in ("reverse", "topology_fingerprint"):
+            if name in self.__dict__:
+                graph.__dict__[name] = self.__dict__[name]
+        return graph
+
+    @property
+    def edge_count(self) -> int:
+        return len(self.targets)
+
+    @property
+    def nbytes(self) -> int:
+        """Size of the CSR buffers in bytes (excluding the node id mapping)."""
+
+        return sum(buffer.nbytes for buffer in self.as_numpy().values())
+
+    def as_numpy(self) -> Dict[str, np.ndarray]:
+        """Return zero-copy NumPy views of the CSR buffers."""
+
+        views = {
+            "offsets": np.frombuffer(self.offsets, dtype=np.int64),
+            "targets": np.frombuffer(self.targets, dtype=np.int32),
+            "distances": np.frombuffer(self.distances, dtype=np.float64),
+            "times": np.frombuffer(self.times, dtype=np.float64),
+            "mode_masks": np.frombuffer(self.mode_masks, dtype=np.uint16),
+        }
+        if self.latitudes is not None and self.longitudes is not None:
+            views["latitudes"] = np.frombuffer(self.latitudes, dtype=np.float64)
+            views["longitudes"] = np.frombuffer(self.longitudes, dtype=np.float64)
+        return views
+
+    @cached_property
+    def fingerprint(self) -> str:
+        """Content hash of topology, weights and node ids; identifies derived indexes."""
+
+        return self._digest(("offsets", "targets", "distances", "times", "mode_masks"))
+
+    @cached_property
+    def topology_fingerprint(self) -> str:
+        """Content hash of everything but the edge ``times``.
+
+        Indexes over distances stay valid when only the times change (e.g. live
+        congestion updates), so they are keyed by this hash instead.
+        """
+
+        return self._digest(("offsets", "targets", "distances", "mode_masks"))
+
+    def fingerprint_for(self, strategy: WeightStrategy | str) -> str:
+        """Fingerprint of the data an index built for ``strategy`` depends on."""
+
+        if WeightStrategy(strategy) is WeightStrategy.DISTANCE:
+            return self.topology_fingerprint
+        return self.fingerprint
+
+    def _digest(self, buffers: Tuple[str, ...]) -> str:
+        digest = hashlib.blake2b(digest_size=16)
+        for name in buffers:
+            digest.update(memoryview(getattr(self, name)).cast("B"))
+        digest.update("\x1f".join(self.mode_names).encode("utf-8"))
+        if isinstance(self.node_ids, (array, memoryview)):
+            digest.update(memoryview(self.node_ids).cast("B"))
+        else:
+            digest.update("\x1f".join(map(str, self.node_ids)).encode("utf-8"))
+        return digest.hexdigest()
+
+    @cached_property
+    def reverse(self) -> "ReverseIndex":
+        """Incoming-edge CSR index, built on first use and cached."""
+
+        return ReverseIndex.from_graph(self)
+
+    @cached_property
+    def geo_bounds(self) -> Tuple[float, float]:
+        """Calibration for great-circle lower bounds as ``(distance_ratio, max_speed)``.
+
+        ``distance_ratio`` is the largest factor ``k <= 1`` such that every edge is at
+        least ``k`` times the great-circle distance between its endpoints, and
+        ``max_speed`` is the fastest effective edge speed. ``k * haversine`` (divided
+        by ``max_speed`` for time) is then a consistent A* heuristic. A ratio of
+        ``0`` means coordinates are unavailable and no geometric bound applies.
+        """
+
+        views = self.as_numpy()
+        if "latitudes" not in views or self.edge_count == 0:
+            return 0.0, 0.0
+        latitudes = views["latitudes"]
+        longitudes = views["longitudes"]
+        if np.isnan(latitudes).any() or np.isnan(longitudes).any():
+            return 0.0, 0.0
+
+        sources = np.repeat(np.arange(len(self), dtype=np.int64), np.diff(views["offsets"]))
+        targets = views["targets"]
+        straight = haversine_array(
+            latitudes[sources], longitudes[sources], latitudes[targets], longitudes[targets]
+        )
+        distances = views["distances"]
+        positive = straight > 0
+        ratio = 1.0
+        if positive.any():
+            ratio = min(1.0, float(np.min(distances[positive] / straight[positive])))
+        times = views["times"]
+        moving = times > 0
+        max_speed = float(np.max(distances[moving] / times[moving])) if moving.any() else 0.0
+        return ratio, max_speed
+
+    def weights(self, strategy: WeightStrategy | str) -> Sequence[float]:
+        """Return the edge weight buffer matching ``strategy``."""
+
+        if WeightStrategy(strategy) is WeightStrategy.DISTANCE:
+            return self.distances
+        return self.times
+
+    def mode_mask(self, modes: Optional[Sequence[str] | str]) -> int:
+        """Encode allowed modes as a bitmask; ``None`` allows every mode."""
+
+        allowed = _normalise_modes(modes)
+        if allowed is None:
+            return (1 << len(self.mode_names)) - 1
+        mask = 0
+        for bit, name in enumerate(self.mode_names):
+            if name in allowed:
+                mask |= 1 << bit
+        return mask
+
+    def edge_source(self, edge: int) -> int:
+        """Return the dense index of the node an edge leaves from."""
+
+        return bisect_right(self.offsets, edge) - 1
+
+    def select_mode(self, edge: int, allowed_mask: int) -> str:
+        """Return the lowest-bit transport mode of ``edge`` permitted by ``allowed_mask``."""
+
+        usable = self.mode_masks[edge] & allowed_mask
+        return self.mode_names[(usable & -usable).bit_length() - 1]
+
+    def build_path(
+        self, edge_chain: Sequence[int], allowed_mask: int, *, expanded_nodes: int = 0
+    ) -> PathResult:
+        """Materialise a :class:`PathResult` from consecutive CSR edge indices."""
+
+        if not edge_chain:
+            raise ValueError("edge_chain must not be empty")
+        node_ids = self.node_ids
+        nodes = [node_ids[self.edge_source(edge_chain[0])]]
+        segments: List[PathSegment] = []
+        total_distance = 0.0
+        total_time = 0.0
+        for edge in edge_chain:
+            source = nodes[-1]
+            target = node_ids[self.targets[edge]]
+            distance = self.distances[edge]
+            time = self.times[edge]
+            segments.append(
+                PathSegment(
+                    source=source,
+                    target=target,
+                    transport_mode=self.select_mode(edge, allowed_mask),
+                    distance=distance,
+                    time=time,
+                )
+            )
+            nodes.append(target)
+            total_distance += distance
+            total_time += time
+        return PathResult(
+            nodes=nodes,
+            segments=segments,
+            total_distance=total_distance,
+            total_time=total_time,
+            expanded_nodes=expanded_nodes,
+        )
+
+
+@dataclass(frozen=True, eq=False)
+class ReverseIndex:
+    """Incoming edges of a :class:`CompactGraph` in CSR form.
+
+    Incoming edges of node ``i`` occupy ``offsets[i]:offsets[i + 1]``; ``sources``
+    holds the tail node of each and ``edges`` its index in the forward buffers, so
+    weights and mode masks are shared with the forward graph.
+    """
+
+    offsets: Sequence[int]
+    sources: Sequence[int]
+    edges: Sequence[int]
+
+    def __getstate__(self) -> Dict[str, object]:
+        return _portable_state(self.__dict__)
+
+    @classmethod
+    def from_graph(cls, graph: CompactGraph) -> "ReverseIndex":
+        views = graph.as_numpy()
+        tails = np.repeat(np.arange(len(graph), dtype=np.int32), np.diff(views["offsets"]))
+        order = np.argsort(views["targets"], kind="stable")
+        counts = np.bincount(views["targets"], minlength=len(graph))
+        offsets = np.zeros(len(graph) + 1, dtype=np.int64)
+        np.cumsum(counts, out=offsets[1:])
+        return cls(
+            offsets=array("q", offsets.tobytes()),
+            sources=array("i", tails[order].astype(np.int32).tobytes()),
+            edges=array("q", order.astype(np.int64).tobytes()),
+        )
+
+
+def compact_shortest_path(
+    graph: CompactGraph,
+    start: NodeId,
+    goal: NodeId,
+    *,
+    allowed_modes: Optional[Sequence[str] | str] = None,
+    strategy: WeightStrategy | str = WeightStrategy.TIME,
+) -> PathResult:
+    """Dijkstra's algorithm running directly over :class:`CompactGraph` buffers."""
+
+    if start == goal:
+        return PathResult(nodes=[start], segments=[], total_distance=0.0, total_time=0.0)
+
+    source = graph.index.get(start)
+    target = graph.index.get(goal)
+    if source is None or target is None:
+        raise ValueError(f"No path found from {start!r} to {goal!r}")
+
+    allowed_mask = graph.mode_mask(allowed_modes)
+    weights = graph.weights(strategy)
+    offsets = graph.offsets
+    targets = graph.targets
+    mode_masks = graph.mode_masks
+
+    best_cost = [inf] * len(graph)
+    via_edge = [-1] * len(graph)
+    settled = bytearray(len(graph))
+    best_cost[source] = 0.0
+    queue: List[Tuple[float, int]] = [(0.0, source)]
+    expanded = 0
+
+    while queue:
+        cost, node = heappop(queue)
+        if settled[node]:
+            continue
+        settled[node] = 1
+        expanded += 1
+        if node == target:
+            break
+        for edge in range(offsets[node], offsets[node + 1]):
+            if not mode_masks[edge] & allowed_mask:
+                continue
+            neighbour = targets[edge]
+            new_cost = cost + weights[edge]
+            if new_cost < best_cost[neighbour]:
+                best_cost[neighbour] = new_cost
+                via_edge[neighbour] = edge
+                heappush(queue, (new_cost, neighbour))
+
+    if best_cost[target] == inf:
+        raise ValueError(f"No path found from {start!r} to {goal!r}")
+
+    return graph.build_path(
+        trace_edges(graph, via_edge, source, target), allowed_mask, expanded_nodes=expanded
+    )
+
+
+def trace_edges(
+    graph: CompactGraph, via_edge: Sequence[int], source: int, target: int
+) -> List[int]:
+    """Follow predecessor edges back from ``target`` and return them in path order."""
+
+    chain: List[int] = []
+    cursor = target
+    while cursor != source:
+        edge = via_edge[cursor]
+        chain.append(edge)
+        cursor = graph.edge_source(edge)
+    chain.reverse()
+    return chain
+
+
+def shortest_path_tree(
+    graph: CompactGraph,
+    source: int,
+    *,
+    allowed_modes: Optional[Sequence[str] | str] = None,
+    strategy: WeightStrategy | str = WeightStrategy.TIME,
+    reverse: bool = False,
+) -> Tuple[List[float], List[int]]:
+    """One-to-all Dijkstra from the dense node ``source``.
+
+    Returns ``(costs, via_edge)`` indexed by dense node id; unreachable nodes keep
+    ``inf`` and ``-1``. With ``reverse=True`` the search follows incoming edges, so
+    ``costs[v]`` is the cost from ``v`` *to* ``source`` and ``via_edge[v]`` is the
+    first edge on that path.
+    """
+
+    allowed_mask = graph.mode_mask(allowed_modes)
+    weights = graph.weights(strategy)
+    mode_masks = graph.mode_masks
+    if reverse:
+        index = graph.reverse
+        offsets, neighbours, edge_ids = index.offsets, index.sources, index.edges
+    else:
+        offsets, neighbours, edge_ids = graph.offsets, graph.targets, None
+
+    costs = [inf] * len(graph)
+    via_edge = [-1] * len(graph)
+    settled = bytearray(len(graph))
+    costs[source] = 0.0
+    queue: List[Tuple[float, int]] = [(0.0, source)]
+
+    while queue:
+        cost, node = heappop(queue)
+        if settled[node]:
+            continue
+        settled[node] = 1
+        for position in range(offsets[node], offsets[node + 1]):
+            edge = position if edge_ids is None else edge_ids[position]
+            if not mode_masks[edge] & allowed_mask:
+                continue
+            neighbour = neighbours[position]
+            new_cost = cost + weights[edge]
+            if new_cost < costs[neighbour]:
+                costs[neighbour] = new_cost
+                via_edge[neighbour] = edge
+                heappush(queue, (new_cost, neighbour))
+
+    return costs, via_edge
+
+
+def _portable_state(state: Dict[str, object]) -> Dict[str, object]:
+    return {
+        name: array(value.format, value.tobytes()) if isinstance(value, memoryview) else value
+        for name, value in state.items()
+    }
+
+
+def _pack_node_ids(node_ids: List[NodeId]) -> Sequence[NodeId]:
+    """Store integer node ids in a flat ``array("q")``; any other ids in a tuple."""
+
+    if node_ids and all(type(node) is int for node in node_ids):
+        try:
+            return array("q", cast(List[int], node_ids))
+        except OverflowError:
+            pass  # 超出 64 位的整数 ID 仍按元组保存
+    return tuple(node_ids)
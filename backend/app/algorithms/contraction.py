@@ -0,0 +1,382 @@
+"""Contraction Hierarchies (CH) preprocessing and query engine for :class:`CompactGraph`."""
+
+from __future__ import annotations
+
+from array import array
+from dataclasses import dataclass
+from heapq import heapify, heappop, heappush
+from math import inf
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .compact_graph import CompactGraph, compact_shortest_path
+from .shortest_path import NodeId, PathResult, WeightStrategy
+
+_INT_FIELDS = (
+    "rank",
+    "tails",
+    "heads",
+    "first_child",
+    "second_child",
+    "original",
+    "up_edges",
+    "down_edges",
+)
+_OFFSET_FIELDS = ("up_offsets", "down_offsets")
+
+
+@dataclass(frozen=True, eq=False)
+class ContractionHierarchy:
+    """Preprocessed hierarchy for one graph, weight strategy and transport-mode set.
+
+    Every hierarchy edge ``e`` runs from ``tails[e]`` to ``heads[e]`` with cost
+    ``weights[e]``. Original edges reference their CSR index via ``original[e]``;
+    shortcuts instead point to the two hierarchy edges they bypass
+    (``first_child``/``second_child``). ``up_edges`` lists, per node, the edges
+    leading to higher-ranked nodes and ``down_edges`` the edges arriving from
+    higher-ranked nodes, both in CSR layout.
+    """
+
+    strategy: WeightStrategy
+    mode_mask: int
+    fingerprint: str
+    rank: Sequence[int]
+    tails: Sequence[int]
+    heads: Sequence[int]
+    weights: Sequence[float]
+    first_child: Sequence[int]
+    second_child: Sequence[int]
+    original: Sequence[int]
+    up_offsets: Sequence[int]
+    up_edges: Sequence[int]
+    down_offsets: Sequence[int]
+    down_edges: Sequence[int]
+
+    @property
+    def shortcut_count(self) -> int:
+        return sum(1 for edge in self.original if edge < 0)
+
+    def matches(self, graph: CompactGraph, strategy: WeightStrategy | str, mode_mask: int) -> bool:
+        """Whether this hierarchy was built for ``graph`` with the given weights and modes."""
+
+        return (
+            self.fingerprint == graph.fingerprint_for(strategy)
+            and self.strategy is WeightStrategy(strategy)
+            and self.mode_mask == mode_mask
+        )
+
+    def unpack(self, edge: int) -> List[int]:
+        """Expand a hierarchy edge into the original CSR edge indices it represents."""
+
+        chain: List[int] = []
+        stack = [edge]
+        while stack:
+            current = stack.pop()
+            original = self.original[current]
+            if original >= 0:
+                chain.append(original)
+            else:
+                stack.append(self.second_child[current])
+                stack.append(self.first_child[current])
+        return chain
+
+    def save(self, path: Path | str) -> None:
+        """Serialise the hierarchy as an uncompressed ``.npz`` archive."""
+
+        payload: Dict[str, np.ndarray] = {
+            name: np.asarray(getattr(self, name), dtype=np.int32) for name in _INT_FIELDS
+        }
+        payload.update(
+            {name: np.asarray(getattr(self, name), dtype=np.int64) for name in _OFFSET_FIELDS}
+        )
+        payload["weights"] = np.asarray(self.weights, dtype=np.float64)
+        payload["strategy"] = np.array(self.strategy.value)
+        payload["mode_mask"] = np.array(self.mode_mask, dtype=np.int64)
+        payload["fingerprint"] = np.array(self.fingerprint)
+        target = Path(path)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        with target.open("wb") as handle:
+            np.savez(handle, **payload)
+
+    @classmethod
+    def load(cls, path: Path | str) -> "ContractionHierarchy":
+        """Load a hierarchy previously written by :meth:`save`."""
+
+        with np.load(Path(path), allow_pickle=False) as archive:
+            fields = {
+                name: array("i", archive[name].astype(np.int32).tobytes()) for name in _INT_FIELDS
+            }
+            fields.update(
+                {
+                    name: array("q", archive[name].astype(np.int64).tobytes())
+                    for name in _OFFSET_FIELDS
+                }
+            )
+            return cls(
+                strategy=WeightStrategy(str(archive["strategy"])),
+                mode_mask=int(archive["mode_mask"]),
+                fingerprint=str(archive["fingerprint"]),
+                weights=array("d", archive["weights"].astype(np.float64).tobytes()),
+                **fields,
+            )
+
+
+def build_contraction_hierarchy(
+    graph: CompactGraph,
+    *,
+    strategy: WeightStrategy | str = WeightStrategy.TIME,
+    allowed_modes: Optional[Sequence[str] | str] = None,
+    witness_settle_limit: int = 64,
+) -> ContractionHierarchy:
+    """Contract ``graph`` node by node (edge-difference ordering, lazy updates).
+
+    Witness searches are capped at ``witness_settle_limit`` settled nodes; hitting
+    the cap only adds redundant shortcuts and never affects query correctness.
+    """
+
+    strategy = WeightStrategy(strategy)
+    mode_mask = graph.mode_mask(allowed_modes)
+    weights = graph.weights(strategy)
+    size = len(graph)
+
+    tails: List[int] = []
+    heads: List[int] = []
+    costs: List[float] = []
+    first_child: List[int] = []
+    second_child: List[int] = []
+    original: List[int] = []
+    outgoing: List[Dict[int, int]] = [{} for _ in range(size)]
+    incoming: List[Dict[int, int]] = [{} for _ in range(size)]
+
+    def add_edge(
+        tail: int, head: int, cost: float, first: int, second: int, source_edge: int
+    ) -> None:
+        existing = outgoing[tail].get(head)
+        if existing is not None and costs[existing] <= cost:
+            return
+        identifier = len(tails)
+        tails.append(tail)
+        heads.append(head)
+        costs.append(cost)
+        first_child.append(first)
+        second_child.append(second)
+        original.append(source_edge)
+        outgoing[tail][head] = identifier
+        incoming[head][tail] = identifier
+
+    for node in range(size):
+        for edge in range(graph.offsets[node], graph.offsets[node + 1]):
+            head = graph.targets[edge]
+            if head != node and graph.mode_masks[edge] & mode_mask:
+                add_edge(node, head, weights[edge], -1, -1, edge)
+
+    def witness_costs(origin: int, skipped: int, limit: float) -> Dict[int, float]:
+        best: Dict[int, float] = {origin: 0.0}
+        queue: List[Tuple[float, int]] = [(0.0, origin)]
+        settled = 0
+        while queue and settled < witness_settle_limit:
+            cost, node = heappop(queue)
+            if cost > best.get(node, inf):
+                continue
+            if cost > limit:
+                break
+            settled += 1
+            for neighbour, identifier in outgoing[node].items():
+                if neighbour == skipped:
+                    continue
+                new_cost = cost + costs[identifier]
+                if new_cost < best.get(neighbour, inf):
+                    best[neighbour] = new_cost
+                    heappush(queue, (new_cost, neighbour))
+        return best
+
+    def contract(node: int, apply: bool) -> int:
+        shortcuts = 0
+        if not outgoing[node]:
+            return 0
+        longest_out = max(costs[identifier] for identifier in outgoing[node].values())
+        for tail, in_identifier in list(incoming[node].items()):
+            in_cost = costs[in_identifier]
+            reached = witness_costs(tail, node, in_cost + longest_out)
+            for head, out_identifier in list(outgoing[node].items()):
+                if head == tail:
+                    continue
+                via = in_cost + costs[out_identifier]
+                if reached.get(head, inf) > via:
+                    shortcuts += 1
+                    if apply:
+                        add_edge(tail, head, via, in_identifier, out_identifier, -1)
+        return shortcuts
+
+    contracted_neighbours = [0] * size
+    depth = [0] * size
+
+    def priority(node: int) -> int:
+        degree = len(incoming[node]) + len(outgoing[node])
+        return (
+            2 * (contract(node, apply=False) - degree) + contracted_neighbours[node] + depth[node]
+        )
+
+    queue = [(priority(node), node) for node in range(size)]
+    heapify(queue)
+    rank = [0] * size
+    up_lists: List[List[int]] = [[] for _ in range(size)]
+    down_lists: List[List[int]] = [[] for _ in range(size)]
+    level = 0
+
+    while queue:
+        _, node = heappop(queue)
+        current = priority(node)
+        if queue and current > queue[0][0]:
+            heappush(queue, (current, node))
+            continue
+
+        contract(node, apply=True)
+        rank[node] = level
+        level += 1
+        up_lists[node] = list(outgoing[node].values())
+        down_lists[node] = list(incoming[node].values())
+        for head in outgoing[node]:
+            del incoming[head][node]
+            contracted_neighbours[head] += 1
+            depth[head] = max(depth[head], depth[node] + 1)
+        for tail in incoming[node]:
+            del outgoing[tail][node]
+            contracted_neighbours[tail] += 1
+            depth[tail] = max(depth[tail], depth[node] + 1)
+        outgoing[node] = {}
+        incoming[node] = {}
+
+    up_offsets, up_edges = _flatten(up_lists)
+    down_offsets, down_edges = _flatten(down_lists)
+    return ContractionHierarchy(
+        strategy=strategy,
+        mode_mask=mode_mask,
+        fingerprint=graph.fingerprint_for(strategy),
+        rank=array("i", rank),
+        tails=array("i", tails),
+        heads=array("i", heads),
+        weights=array("d", costs),
+        first_child=array("i", first_child),
+        second_child=array("i", second_child),
+        original=array("i", original),
+        up_offsets=up_offsets,
+        up_edges=up_edges,
+        down_offsets=down_offsets,
+        down_edges=down_edges,
+    )
+
+
+def contraction_shortest_path(
+    graph: CompactGraph,
+    start: NodeId,
+    goal: NodeId,
+    *,
+    hierarchy: Optional[ContractionHierarchy] = None,
+    allowed_modes: Optional[Sequence[str] | str] = None,
+    strategy: WeightStrategy | str = WeightStrategy.TIME,
+) -> PathResult:
+    """Answer a query with an upward bidirectional search over ``hierarchy``.
+
+    Falls back to :func:`compact_shortest_path` when no hierarchy is given or it was
+    built for a different graph, strategy or mode set.
+    """
+
+    strategy = WeightStrategy(strategy)
+    mode_mask = graph.mode_mask(allowed_modes)
+    if hierarchy is None or not hierarchy.matches(graph, strategy, mode_mask):
+        return compact_shortest_path(
+            graph, start, goal, allowed_modes=allowed_modes, strategy=strategy
+        )
+
+    if start == goal:
+        return PathResult(nodes=[start], segments=[], total_distance=0.0, total_time=0.0)
+
+    source = graph.index.get(start)
+    target = graph.index.get(goal)
+    if source is None or target is None:
+        raise ValueError(f"No path found from {start!r} to {goal!r}")
+
+    costs = hierarchy.weights
+    tails = hierarchy.tails
+    heads = hierarchy.heads
+    forward_cost: Dict[int, float] = {source: 0.0}
+    backward_cost: Dict[int, float] = {target: 0.0}
+    forward_via: Dict[int, int] = {}
+    backward_via: Dict[int, int] = {}
+    forward_queue: List[Tuple[float, int]] = [(0.0, source)]
+    backward_queue: List[Tuple[float, int]] = [(0.0, target)]
+    best = inf
+    meeting = -1
+    expanded = 0
+
+    while forward_queue or backward_queue:
+        if forward_queue and forward_queue[0][0] >= best:
+            forward_queue = []
+        if backward_queue and backward_queue[0][0] >= best:
+            backward_queue = []
+
+        if forward_queue and (not backward_queue or forward_queue[0][0] <= backward_queue[0][0]):
+            cost, node = heappop(forward_queue)
+            if cost > forward_cost[node]:
+                continue
+            expanded += 1
+            through = cost + backward_cost.get(node, inf)
+            if through < best:
+                best, meeting = through, node
+            for position in range(hierarchy.up_offsets[node], hierarchy.up_offsets[node + 1]):
+                edge = hierarchy.up_edges[position]
+                neighbour = heads[edge]
+                new_cost = cost + costs[edge]
+                if new_cost < forward_cost.get(neighbour, inf):
+                    forward_cost[neighbour] = new_cost
+                    forward_via[neighbour] = edge
+                    heappush(forward_queue, (new_cost, neighbour))
+        elif backward_queue:
+            cost, node = heappop(backward_queue)
+            if cost > backward_cost[node]:
+                continue
+            expanded += 1
+            through = cost + forward_cost.get(node, inf)
+            if through < best:
+                best, meeting = through, node
+            for position in range(hierarchy.down_offsets[node], hierarchy.down_offsets[node + 1]):
+                edge = hierarchy.down_edges[position]
+                neighbour = tails[edge]
+                new_cost = cost + costs[edge]
+                if new_cost < backward_cost.get(neighbour, inf):
+                    backward_cost[neighbour] = new_cost
+                    backward_via[neighbour] = edge
+                    heappush(backward_queue, (new_cost, neighbour))
+
+    if meeting < 0:
+        raise ValueError(f"No path found from {start!r} to {goal!r}")
+
+    upward: List[int] = []
+    cursor = meeting
+    while cursor != source:
+        edge = forward_via[cursor]
+        upward.append(edge)
+        cursor = tails[edge]
+    upward.reverse()
+    cursor = meeting
+    while cursor != target:
+        edge = backward_via[cursor]
+        upward.append(edge)
+        cursor = heads[edge]
+
+    chain: List[int] = []
+    for edge in upward:
+        chain.extend(hierarchy.unpack(edge))
+    return graph.build_path(chain, mode_mask, expanded_nodes=expanded)
+
+
+def _flatten(lists: Sequence[Sequence[int]]) -> Tuple[array, array]:
+    offsets = array("q", [0])
+    flat = array("i")
+    for items in lists:
+        flat.extend(items)
+        offsets.append(len(flat))
+    return offsets, flat
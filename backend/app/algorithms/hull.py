@@ -0,0 +1,157 @@
+"""Convex and concave hulls of planar point sets (for isochrone polygons)."""
+
+from __future__ import annotations
+
+import math
+from typing import List, Sequence, Tuple
+
+import numpy as np
+
+Point = Tuple[float, float]
+
+
+def convex_hull(points: Sequence[Point]) -> List[Point]:
+    """Counter-clockwise convex hull (Andrew's monotone chain) without a repeated first point."""
+
+    unique = sorted(set(points))
+    if len(unique) < 3:
+        return unique
+
+    def build(sequence: Sequence[Point]) -> List[Point]:
+        chain: List[Point] = []
+        for point in sequence:
+            while len(chain) >= 2 and _cross(chain[-2], chain[-1], point) <= 0:
+                chain.pop()
+            chain.append(point)
+        return chain
+
+    lower = build(unique)
+    upper = build(list(reversed(unique)))
+    return lower[:-1] + upper[:-1]
+
+
+def concave_hull(points: Sequence[Point], k: int = 3) -> List[Point]:
+    """Counter-clockwise concave hull using the k-nearest-neighbours method.
+
+    Follows Moreira and Santos (2007): starting at the lowest point, the hull is
+    wrapped by repeatedly moving to the neighbour (among the ``k`` nearest
+    unvisited points) that makes the sharpest right-hand turn without crossing
+    the hull built so far. When wrapping fails or leaves points outside, ``k``
+    grows; if it reaches the number of points the convex hull is returned.
+    Smaller ``k`` gives a tighter, more concave outline.
+    """
+
+    unique = sorted(set(points))
+    if len(unique) < 4:
+        return convex_hull(unique)
+    coordinates = np.asarray(unique, dtype=np.float64)
+    for neighbours in range(max(3, k), len(unique)):
+        indices = _wrap(coordinates, neighbours)
+        if indices is None or len(indices) < 3:
+            continue
+        if _covers(coordinates[indices], coordinates):
+            return [unique[index] for index in indices]
+    return convex_hull(unique)
+
+
+def _wrap(coordinates: np.ndarray, k: int) -> List[int] | None:
+    size = len(coordinates)
+    first = int(np.lexsort((coordinates[:, 0], coordinates[:, 1]))[0])
+    available = np.ones(size, dtype=bool)
+    available[first] = False
+    hull = [first]
+    current = first
+    back_angle = math.pi  # 首个点之前视为从正西方向到达
+
+    while True:
+        if len(hull) == 4:
+            # 走出几步后才允许回到起点，避免立即闭合
+            available[first] = True
+        candidates = np.flatnonzero(available)
+        if not len(candidates):
+            return None
+        offsets = coordinates[candidates] - coordinates[current]
+        nearest = candidates[np.argsort(np.hypot(offsets[:, 0], offsets[:, 1]), kind="stable")[:k]]
+        # 从“指向上一个点”的方向起按逆时针角度排序：角度越小，右转越急
+        turns = []
+        for candidate in nearest:
+            dx, dy = coordinates[candidate] - coordinates[current]
+            angle = (math.atan2(dy, dx) - back_angle) % (2 * math.pi)
+            turns.append((angle if angle > 0 else 2 * math.pi, int(candidate)))
+        turns.sort()
+
+        chosen = None
+        for _, candidate in turns:
+            closing = candidate == first
+            if not _crosses_hull(coordinates, hull, current, candidate, closing):
+                chosen = candidate
+                break
+        if chosen is None:
+            return None
+        if chosen == first:
+            return hull
+        dx, dy = coordinates[current] - coordinates[chosen]
+        back_angle = math.atan2(dy, dx)
+        hull.append(chosen)
+        available[chosen] = False
+        current = chosen
+
+
+def _crosses_hull(
+    coordinates: np.ndarray, hull: List[int], current: int, candidate: int, closing: bool
+) -> bool:
+    start = tuple(coordinates[current])
+    end = tuple(coordinates[candidate])
+    # 跳过与当前点相邻的最后一条边；闭合时还要跳过从起点出发的第一条边
+    first_edge = 1 if closing else 0
+    for position in range(first_edge, len(hull) - 2):
+        a = tuple(coordinates[hull[position]])
+        b = tuple(coordinates[hull[position + 1]])
+        if _segments_intersect(start, end, a, b):
+            return True
+    return False
+
+
+def _cross(origin: Point, a: Point, b: Point) -> float:
+    return (a[0] - origin[0]) * (b[1] - origin[1]) - (a[1] - origin[1]) * (b[0] - origin[0])
+
+
+def _segments_intersect(p1: Point, p2: Point, q1: Point, q2: Point) -> bool:
+    d1 = _cross(q1, q2, p1)
+    d2 = _cross(q1, q2, p2)
+    d3 = _cross(p1, p2, q1)
+    d4 = _cross(p1, p2, q2)
+    if ((d1 > 0 > d2) or (d1 < 0 < d2)) and ((d3 > 0 > d4) or (d3 < 0 < d4)):
+        return True
+    return (
+        (d1 == 0 and _on_segment(q1, q2, p1))
+        or (d2 == 0 and _on_segment(q1, q2, p2))
+        or (d3 == 0 and _on_segment(p1, p2, q1))
+        or (d4 == 0 and _on_segment(p1, p2, q2))
+    )
+
+
+def _on_segment(a: Point, b: Point, point: Point) -> bool:
+    within_x = min(a[0], b[0]) <= point[0] <= max(a[0], b[0])
+    return within_x and min(a[1], b[1]) <= point[1] <= max(a[1], b[1])
+
+
+def _covers(polygon: np.ndarray, points: np.ndarray, tolerance: float = 1e-12) -> bool:
+    """Whether every point lies inside ``polygon`` or on its boundary (vectorised ray casting)."""
+
+    x, y = points[:, 0], points[:, 1]
+    inside = np.zeros(len(points), dtype=bool)
+    boundary = np.zeros(len(points), dtype=bool)
+    previous = polygon[-1]
+    for vertex in polygon:
+        (ax, ay), (bx, by) = vertex, previous
+        cross = (bx - ax) * (y - ay) - (by - ay) * (x - ax)
+        within = (np.minimum(ax, bx) - tolerance <= x) & (x <= np.maximum(ax, bx) + tolerance)
+        within &= (np.minimum(ay, by) - tolerance <= y) & (y <= np.maximum(ay, by) + tolerance)
+        boundary |= within & (np.abs(cross) <= tolerance * max(1.0, abs(bx - ax) + abs(by - ay)))
+        straddles = (ay > y) != (by > y)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            crossing = ax + (y - ay) * (bx - ax) / (by - ay)
+        inside ^= straddles & (x < crossing)
+        previous = vertex
+    return bool(np.all(inside | boundary))
@@ -0,0 +1,115 @@
+"""Isochrones: nodes reachable within cost budgets, optionally outlined by polygons."""
+
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .compact_graph import CompactGraph
+from .hull import concave_hull
+from .path_tree import ShortestPathTree, build_shortest_path_tree
+from .shortest_path import NodeId, WeightStrategy
+
+Ring = List[Tuple[float, float]]
+
+
+@dataclass(frozen=True, eq=False)
+class Isochrone:
+    """Nodes reached from ``source`` within the largest of ``budgets``.
+
+    ``node_ids``/``costs`` list every reached node with its optimised cost, and
+    ``bands[i]`` is the index of the smallest budget that contains node ``i``.
+    ``polygons[b]`` is the outline of all nodes within ``budgets[b]`` as a
+    counter-clockwise ring of ``(longitude, latitude)`` pairs (closed, first
+    point repeated), or ``None`` when fewer than three located nodes are in the
+    band. ``polygons`` is empty when outlines were not requested.
+    """
+
+    source: NodeId
+    strategy: WeightStrategy
+    budgets: Tuple[float, ...]
+    node_ids: Tuple[NodeId, ...]
+    costs: np.ndarray
+    bands: np.ndarray
+    polygons: Tuple[Optional[Ring], ...]
+    expanded_nodes: int
+
+
+def compute_isochrone(
+    graph: CompactGraph,
+    source: NodeId,
+    budgets: Sequence[float],
+    *,
+    strategy: WeightStrategy | str = WeightStrategy.TIME,
+    allowed_modes: Optional[Sequence[str] | str] = None,
+    include_polygons: bool = False,
+    concavity: int = 3,
+    tree: Optional[ShortestPathTree] = None,
+) -> Isochrone:
+    """Bounded Dijkstra from ``source`` that stops once the largest budget is exceeded.
+
+    ``budgets`` are in the unit of ``strategy`` (metres or seconds). A complete
+    ``tree`` for the same source, strategy and modes may be passed to skip the
+    search. ``concavity`` is the neighbour count of :func:`concave_hull`.
+    """
+
+    strategy = WeightStrategy(strategy)
+    limits = tuple(sorted({float(budget) for budget in budgets}))
+    if not limits or limits[0] <= 0:
+        raise ValueError("budgets must be positive")
+    if source not in graph.index:
+        raise ValueError(f"Unknown source node {source!r}")
+    if tree is None:
+        tree = build_shortest_path_tree(
+            graph, source, strategy=strategy, allowed_modes=allowed_modes, max_cost=limits[-1]
+        )
+
+    reached = np.flatnonzero(tree.costs <= limits[-1])
+    costs = tree.costs[reached]
+    order = np.argsort(costs, kind="stable")
+    reached, costs = reached[order], costs[order]
+    bands = np.searchsorted(np.asarray(limits), costs, side="left")
+
+    polygons: Tuple[Optional[Ring], ...] = ()
+    if include_polygons:
+        polygons = tuple(
+            _outline(graph, reached[bands <= band], concavity) for band in range(len(limits))
+        )
+
+    return Isochrone(
+        source=source,
+        strategy=strategy,
+        budgets=limits,
+        node_ids=tuple(graph.node_ids[node] for node in reached.tolist()),
+        costs=costs,
+        bands=bands,
+        polygons=polygons,
+        expanded_nodes=tree.expanded_nodes,
+    )
+
+
+def _outline(graph: CompactGraph, nodes: np.ndarray, concavity: int) -> Optional[Ring]:
+    if graph.latitudes is None or graph.longitudes is None:
+        return None
+    latitudes = np.asarray(graph.latitudes, dtype=np.float64)[nodes]
+    longitudes = np.asarray(graph.longitudes, dtype=np.float64)[nodes]
+    located = np.isfinite(latitudes) & np.isfinite(longitudes)
+    latitudes, longitudes = latitudes[located], longitudes[located]
+    if len(latitudes) < 3:
+        return None
+
+    # 在局部等距投影平面上求凹包，使经度方向的距离与纬度方向可比
+    scale = math.cos(math.radians(float(latitudes.mean()))) or 1.0
+    projected = {
+        (longitude * scale, latitude): (longitude, latitude)
+        for longitude, latitude in zip(longitudes.tolist(), latitudes.tolist())
+    }
+    hull = concave_hull(list(projected), concavity)
+    if len(hull) < 3:
+        return None
+    ring = [projected[point] for point in hull]
+    ring.append(ring[0])
+    return ring
@@ -0,0 +1,287 @@
+"""ALT search: A* with landmark-based triangle-inequality lower bounds."""
+
+from __future__ import annotations
+
+import random
+from dataclasses import dataclass
+from enum import Enum
+from pathlib import Path
+from typing import List, Optional, Sequence
+
+import numpy as np
+
+from .astar import astar_shortest_path, geo_heuristic
+from .compact_graph import CompactGraph, shortest_path_tree
+from .shortest_path import NodeId, PathResult, WeightStrategy
+
+
+class LandmarkSelection(str, Enum):
+    """How landmarks are placed on the graph."""
+
+    FARTHEST = "farthest"
+    AVOID = "avoid"
+
+
+@dataclass(frozen=True, eq=False)
+class LandmarkTable:
+    """Distances between a few landmarks and every node of one graph.
+
+    ``from_landmark[i, v]`` is the cost from ``landmarks[i]`` to node ``v`` and
+    ``to_landmark[i, v]`` the cost from ``v`` back to the landmark (``inf`` when
+    unreachable). Tables are computed over the edges allowed by ``mode_mask``;
+    since removing edges never shortens a path, the bounds stay valid for any
+    subset of those modes. Memory is ``2 * len(landmarks) * len(graph)`` floats.
+    """
+
+    strategy: WeightStrategy
+    mode_mask: int
+    fingerprint: str
+    landmarks: np.ndarray
+    from_landmark: np.ndarray
+    to_landmark: np.ndarray
+
+    @property
+    def nbytes(self) -> int:
+        return int(self.landmarks.nbytes + self.from_landmark.nbytes + self.to_landmark.nbytes)
+
+    def matches(self, graph: CompactGraph, strategy: WeightStrategy | str, mode_mask: int) -> bool:
+        """Whether the table gives admissible bounds for ``graph`` with these weights and modes."""
+
+        return (
+            self.fingerprint == graph.fingerprint_for(strategy)
+            and self.strategy is WeightStrategy(strategy)
+            and mode_mask & ~self.mode_mask == 0
+        )
+
+    def lower_bounds(self, target: int) -> np.ndarray:
+        """Lower bound on the cost from every node to ``target``.
+
+        For each landmark ``L`` both ``d(L, t) - d(L, v)`` and ``d(v, L) - d(t, L)``
+        bound ``d(v, t)`` from below; the maximum over all landmarks is used.
+        """
+
+        with np.errstate(invalid="ignore"):
+            forward = self.from_landmark[:, target, None] - self.from_landmark
+            backward = self.to_landmark - self.to_landmark[:, target, None]
+            bound = np.fmax(forward, backward).max(axis=0, initial=0.0)
+        # inf - inf 无意义（节点与地标互不可达），此时不提供任何下界
+        return np.nan_to_num(bound, nan=0.0, posinf=np.inf)
+
+    def save(self, path: Path | str) -> None:
+        """Serialise the table as an uncompressed ``.npz`` archive."""
+
+        target = Path(path)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        with target.open("wb") as handle:
+            np.savez(
+                handle,
+                strategy=np.array(self.strategy.value),
+                mode_mask=np.array(self.mode_mask, dtype=np.int64),
+                fingerprint=np.array(self.fingerprint),
+                landmarks=self.landmarks,
+                from_landmark=self.from_landmark,
+                to_landmark=self.to_landmark,
+            )
+
+    @classmethod
+    def load(cls, path: Path | str) -> "LandmarkTable":
+        """Load a table previously written by :meth:`save`."""
+
+        with np.load(Path(path), allow_pickle=False) as archive:
+            return cls(
+                strategy=WeightStrategy(str(archive["strategy"])),
+                mode_mask=int(archive["mode_mask"]),
+                fingerprint=str(archive["fingerprint"]),
+                landmarks=archive["landmarks"].astype(np.int32),
+                from_landmark=archive["from_landmark"].astype(np.float64),
+                to_landmark=archive["to_landmark"].astype(np.float64),
+            )
+
+
+def build_landmark_table(
+    graph: CompactGraph,
+    count: int = 8,
+    *,
+    strategy: WeightStrategy | str = WeightStrategy.TIME,
+    allowed_modes: Optional[Sequence[str] | str] = None,
+    selection: LandmarkSelection | str = LandmarkSelection.AVOID,
+    seed: int = 0,
+) -> LandmarkTable:
+    """Select ``count`` landmarks and compute their forward and backward distance tables.
+
+    Each landmark costs two one-to-all Dijkstra runs. ``FARTHEST`` repeatedly picks
+    the node farthest from the landmarks chosen so far; ``AVOID`` (Goldberg and
+    Werneck) grows a shortest-path tree from a random root and places the next
+    landmark below the subtree whose distances are worst covered by the current
+    bounds, which usually gives tighter bounds for the same memory.
+    """
+
+    strategy = WeightStrategy(strategy)
+    selection = LandmarkSelection(selection)
+    size = len(graph)
+    count = max(0, min(count, size))
+    rng = random.Random(seed)
+    tails = np.repeat(np.arange(size, dtype=np.int64), np.diff(graph.as_numpy()["offsets"]))
+
+    landmarks: List[int] = []
+    from_rows: List[np.ndarray] = []
+    to_rows: List[np.ndarray] = []
+
+    def add(landmark: int) -> None:
+        forward, _ = shortest_path_tree(
+            graph, landmark, allowed_modes=allowed_modes, strategy=strategy
+        )
+        backward, _ = shortest_path_tree(
+            graph, landmark, allowed_modes=allowed_modes, strategy=strategy, reverse=True
+        )
+        landmarks.append(landmark)
+        from_rows.append(np.asarray(forward, dtype=np.float64))
+        to_rows.append(np.asarray(backward, dtype=np.float64))
+
+    while len(landmarks) < count:
+        if selection is LandmarkSelection.FARTHEST:
+            candidate = _farthest_node(
+                graph, landmarks, from_rows, to_rows, rng, allowed_modes, strategy
+            )
+        else:
+            candidate = _avoid_node(
+                graph, tails, landmarks, from_rows, to_rows, rng, allowed_modes, strategy
+            )
+        if candidate is None:
+            break
+        add(candidate)
+
+    shape = (len(landmarks), size)
+    return LandmarkTable(
+        strategy=strategy,
+        mode_mask=graph.mode_mask(allowed_modes),
+        fingerprint=graph.fingerprint_for(strategy),
+        landmarks=np.asarray(landmarks, dtype=np.int32),
+        from_landmark=np.vstack(from_rows) if from_rows else np.empty(shape),
+        to_landmark=np.vstack(to_rows) if to_rows else np.empty(shape),
+    )
+
+
+def alt_shortest_path(
+    graph: CompactGraph,
+    start: NodeId,
+    goal: NodeId,
+    *,
+    table: Optional[LandmarkTable] = None,
+    allowed_modes: Optional[Sequence[str] | str] = None,
+    strategy: WeightStrategy | str = WeightStrategy.TIME,
+) -> PathResult:
+    """A* guided by the larger of the landmark and great-circle lower bounds.
+
+    A table that does not match the graph, strategy or modes is ignored, which
+    degrades gracefully to :func:`~app.algorithms.astar.astar_shortest_path`.
+    """
+
+    strategy = WeightStrategy(strategy)
+    target = graph.index.get(goal)
+    heuristic = None
+    if (
+        target is not None
+        and table is not None
+        and len(table.landmarks)
+        and table.matches(graph, strategy, graph.mode_mask(allowed_modes))
+    ):
+        bound = table.lower_bounds(target)
+        np.maximum(bound, geo_heuristic(graph, target, strategy), out=bound)
+        heuristic = bound.tolist()
+    return astar_shortest_path(
+        graph, start, goal, allowed_modes=allowed_modes, strategy=strategy, heuristic=heuristic
+    )
+
+
+def _farthest_node(
+    graph: CompactGraph,
+    landmarks: List[int],
+    from_rows: List[np.ndarray],
+    to_rows: List[np.ndarray],
+    rng: random.Random,
+    allowed_modes: Optional[Sequence[str] | str],
+    strategy: WeightStrategy,
+) -> Optional[int]:
+    if not landmarks:
+        # 从随机节点出发，取其最远可达节点作为第一个地标
+        root = rng.randrange(len(graph))
+        costs = np.asarray(
+            shortest_path_tree(graph, root, allowed_modes=allowed_modes, strategy=strategy)[0]
+        )
+        costs[np.isinf(costs)] = -1.0
+    else:
+        # 到已有地标的往返距离取最小值；与所有地标都不连通的节点优先
+        costs = np.minimum.reduce(
+            [forward + backward for forward, backward in zip(from_rows, to_rows)]
+        )
+        costs[np.isinf(costs)] = np.finfo(np.float64).max
+        costs[landmarks] = -1.0
+    candidate = int(np.argmax(costs))
+    if costs[candidate] <= 0:
+        return None
+    return candidate
+
+
+def _avoid_node(
+    graph: CompactGraph,
+    tails: np.ndarray,
+    landmarks: List[int],
+    from_rows: List[np.ndarray],
+    to_rows: List[np.ndarray],
+    rng: random.Random,
+    allowed_modes: Optional[Sequence[str] | str],
+    strategy: WeightStrategy,
+) -> Optional[int]:
+    size = len(graph)
+    remaining = [node for node in range(size) if node not in landmarks]
+    if not remaining:
+        return None
+    root = rng.choice(remaining)
+    costs_list, via_edge = shortest_path_tree(
+        graph, root, allowed_modes=allowed_modes, strategy=strategy
+    )
+    costs = np.asarray(costs_list)
+
+    reachable = np.flatnonzero(np.isfinite(costs))
+    weight = costs.copy()
+    if landmarks:
+        with np.errstate(invalid="ignore"):
+            forward = np.vstack(from_rows)
+            backward = np.vstack(to_rows)
+            bound = np.fmax(
+                forward - forward[:, root, None], backward[:, root, None] - backward
+            ).max(axis=0)
+        weight -= np.nan_to_num(np.clip(bound, 0.0, None), nan=0.0, posinf=0.0)
+
+    # 自底向上累积子树“覆盖不足”的权重；含地标的子树视为已覆盖
+    subtree = np.zeros(size)
+    covered = np.zeros(size, dtype=bool)
+    covered[landmarks] = True
+    best_child = np.full(size, -1, dtype=np.int64)
+    parent = np.full(size, -1, dtype=np.int64)
+    has_via = np.asarray(via_edge, dtype=np.int64) >= 0
+    parent[has_via] = tails[np.asarray(via_edge, dtype=np.int64)[has_via]]
+
+    for node in reachable[np.argsort(-costs[reachable], kind="stable")]:
+        subtree[node] += weight[node]
+        if covered[node]:
+            subtree[node] = 0.0
+        up = parent[node]
+        if up < 0:
+            continue
+        if covered[node]:
+            covered[up] = True
+        subtree[up] += subtree[node]
+        if not covered[node] and (best_child[up] < 0 or subtree[node] > subtree[best_child[up]]):
+            best_child[up] = node
+
+    scores = np.where(covered, -np.inf, subtree)
+    if not np.isfinite(scores).any():
+        # 随机根所在的整棵树都已被覆盖，直接以根作为新地标
+        return root
+    # 从“覆盖不足”权重最大的子树出发，沿权重最大的孩子走到叶子
+    node = int(np.argmax(scores))
+    while best_child[node] >= 0:
+        node = int(best_child[node])
+    return node
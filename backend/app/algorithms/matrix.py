@@ -0,0 +1,192 @@
+"""Many-to-many cost matrices built from one bounded Dijkstra search per source."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, replace
+from heapq import heappop, heappush
+from math import inf
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .compact_graph import CompactGraph, trace_edges
+from .shortest_path import NodeId, PathResult, WeightStrategy
+
+
+@dataclass(frozen=True, eq=False)
+class DistanceMatrix:
+    """Shortest-path costs between every source and target.
+
+    ``costs[i, j]`` is the optimised cost (metres or seconds, depending on
+    ``strategy``) from ``sources[i]`` to ``targets[j]``; ``distances`` and
+    ``times`` hold both totals along that same path. Unreachable pairs are
+    ``inf``. Only the predecessor edges of each search are kept, so a concrete
+    :class:`PathResult` is rebuilt on demand by :meth:`path`.
+    """
+
+    graph: CompactGraph
+    sources: Tuple[NodeId, ...]
+    targets: Tuple[NodeId, ...]
+    strategy: WeightStrategy
+    allowed_mask: int
+    costs: np.ndarray
+    distances: np.ndarray
+    times: np.ndarray
+    expanded_nodes: int
+    _via_edges: Tuple[Optional[Sequence[int]], ...]
+
+    def path(self, row: int, column: int) -> PathResult:
+        """Reconstruct the path from ``sources[row]`` to ``targets[column]``."""
+
+        start, goal = self.sources[row], self.targets[column]
+        via_edge = self._via_edges[row]
+        if via_edge is None or not np.isfinite(self.costs[row, column]):
+            raise ValueError(f"No path found from {start!r} to {goal!r}")
+        if start == goal:
+            return PathResult(nodes=[start], segments=[], total_distance=0.0, total_time=0.0)
+        index = self.graph.index
+        chain = trace_edges(self.graph, via_edge, index[start], index[goal])
+        return self.graph.build_path(chain, self.allowed_mask)
+
+    def path_between(self, start: NodeId, goal: NodeId) -> PathResult:
+        """Like :meth:`path`, addressed by node id instead of matrix position."""
+
+        return self.path(self.sources.index(start), self.targets.index(goal))
+
+
+def distance_matrix(
+    graph: CompactGraph,
+    sources: Sequence[NodeId],
+    targets: Sequence[NodeId],
+    *,
+    strategy: WeightStrategy | str = WeightStrategy.TIME,
+    allowed_modes: Optional[Sequence[str] | str] = None,
+) -> DistanceMatrix:
+    """Compute the ``len(sources) x len(targets)`` cost matrix.
+
+    Runs one Dijkstra search per distinct source and stops it as soon as every
+    reachable target has been settled, instead of one full search per pair.
+    Node ids missing from the graph are treated as unreachable.
+    """
+
+    strategy = WeightStrategy(strategy)
+    sources = tuple(sources)
+    targets = tuple(targets)
+    allowed_mask = graph.mode_mask(allowed_modes)
+    weights = graph.weights(strategy)
+    offsets = graph.offsets
+    heads = graph.targets
+    edge_distances = graph.distances
+    edge_times = graph.times
+    mode_masks = graph.mode_masks
+    size = len(graph)
+
+    shape = (len(sources), len(targets))
+    costs = np.full(shape, inf)
+    distances = np.full(shape, inf)
+    times = np.full(shape, inf)
+    target_columns: Dict[int, List[int]] = {}
+    for column, node in enumerate(targets):
+        position = graph.index.get(node)
+        if position is not None:
+            target_columns.setdefault(position, []).append(column)
+
+    searches: Dict[NodeId, Tuple[int, Optional[List[int]]]] = {}
+    via_edges: List[Optional[Sequence[int]]] = []
+    expanded = 0
+
+    for row, start in enumerate(sources):
+        if start in searches:
+            # 重复的起点直接复用已有搜索结果
+            first_row, via_edge = searches[start]
+            costs[row] = costs[first_row]
+            distances[row] = distances[first_row]
+            times[row] = times[first_row]
+            via_edges.append(via_edge)
+            continue
+
+        source = graph.index.get(start)
+        if source is None:
+            searches[start] = (row, None)
+            via_edges.append(None)
+            continue
+
+        best_cost = [inf] * size
+        best_distance = [0.0] * size
+        best_time = [0.0] * size
+        via_edge = [-1] * size
+        settled = bytearray(size)
+        best_cost[source] = 0.0
+        queue: List[Tuple[float, int]] = [(0.0, source)]
+        pending = len(target_columns)
+
+        while queue and pending:
+            cost, node = heappop(queue)
+            if settled[node]:
+                continue
+            settled[node] = 1
+            expanded += 1
+            columns = target_columns.get(node)
+            if columns is not None:
+                pending -= 1
+                costs[row, columns] = cost
+                distances[row, columns] = best_distance[node]
+                times[row, columns] = best_time[node]
+                if not pending:
+                    break
+            for edge in range(offsets[node], offsets[node + 1]):
+                if not mode_masks[edge] & allowed_mask:
+                    continue
+                neighbour = heads[edge]
+                new_cost = cost + weights[edge]
+                if new_cost < best_cost[neighbour]:
+                    best_cost[neighbour] = new_cost
+                    best_distance[neighbour] = best_distance[node] + edge_distances[edge]
+                    best_time[neighbour] = best_time[node] + edge_times[edge]
+                    via_edge[neighbour] = edge
+                    heappush(queue, (new_cost, neighbour))
+
+        searches[start] = (row, via_edge)
+        via_edges.append(via_edge)
+
+    return DistanceMatrix(
+        graph=graph,
+        sources=sources,
+        targets=targets,
+        strategy=strategy,
+        allowed_mask=allowed_mask,
+        costs=costs,
+        distances=distances,
+        times=times,
+        expanded_nodes=expanded,
+        _via_edges=tuple(via_edges),
+    )
+
+
+def shortest_paths_from(
+    graph: CompactGraph,
+    source: NodeId,
+    targets: Sequence[NodeId],
+    *,
+    strategy: WeightStrategy | str = WeightStrategy.TIME,
+    allowed_modes: Optional[Sequence[str] | str] = None,
+) -> List[Optional[PathResult]]:
+    """Shortest paths from one source to several targets with a single search.
+
+    Entry ``i`` is the path to ``targets[i]`` or ``None`` when it is unreachable
+    (or unknown). Every path reports the nodes settled by the shared search as
+    ``expanded_nodes``.
+    """
+
+    matrix = distance_matrix(
+        graph, [source], targets, strategy=strategy, allowed_modes=allowed_modes
+    )
+    paths: List[Optional[PathResult]] = []
+    for column in range(len(matrix.targets)):
+        try:
+            path = matrix.path(0, column)
+        except ValueError:
+            paths.append(None)
+            continue
+        paths.append(replace(path, expanded_nodes=matrix.expanded_nodes))
+    return paths
@@ -0,0 +1,187 @@
+"""Multi-modal shortest paths over (node, transport mode) states of a :class:`CompactGraph`."""
+
+from __future__ import annotations
+
+from heapq import heappop, heappush
+from math import inf
+from typing import List, Mapping, Optional, Sequence, Tuple
+
+from .astar import geo_heuristic
+from .compact_graph import CompactGraph
+from .shortest_path import NodeId, PathResult, PathSegment, WeightStrategy
+
+
+def multimodal_shortest_path(
+    graph: CompactGraph,
+    start: NodeId,
+    goal: NodeId,
+    *,
+    allowed_modes: Optional[Sequence[str] | str] = None,
+    strategy: WeightStrategy | str = WeightStrategy.TIME,
+    speed_factors: Optional[Mapping[str, float]] = None,
+    transfer_penalties: Optional[Mapping[Tuple[str, str], float]] = None,
+    goal_directed: bool = True,
+) -> PathResult:
+    """Best path choosing the transport mode of every edge, with a cost for switching.
+
+    The search runs over states ``node * len(mode_names) + mode``: leaving a
+    node in the mode it was reached with costs the edge alone, leaving it in
+    another mode the edge can carry adds ``transfer_penalties[(from, to)]``
+    seconds (e.g. parking a bike, waiting at a cart station; missing pairs are
+    free). A mode covers an edge ``speed_factors[mode]`` times faster than its
+    stored time (missing modes keep the stored time). The trip may start in any
+    allowed mode and ends at ``goal`` in whichever mode is cheapest.
+
+    With the TIME strategy the path minimises travel plus transfer time; with
+    DISTANCE it is a shortest path and modes are chosen to minimise the time
+    along it. Segment times include the transfer penalty paid to enter them.
+    """
+
+    source = graph.index.get(start)
+    target = graph.index.get(goal)
+    if source is None or target is None:
+        raise ValueError(f"No path found from {start!r} to {goal!r}")
+    if source == target:
+        return PathResult(nodes=[start], segments=[], total_distance=0.0, total_time=0.0)
+
+    strategy = WeightStrategy(strategy)
+    by_time = strategy is WeightStrategy.TIME
+    allowed_mask = graph.mode_mask(allowed_modes)
+    mode_names = graph.mode_names
+    mode_count = len(mode_names)
+    factors = [_speed_factor(speed_factors, name) for name in mode_names]
+    inverse = [1.0 / factor for factor in factors]
+    penalties = _penalty_matrix(mode_names, transfer_penalties)
+    modes = [(bit, 1 << bit) for bit in range(mode_count) if allowed_mask >> bit & 1]
+    if not modes:
+        raise ValueError(f"No path found from {start!r} to {goal!r}")
+
+    if goal_directed:
+        # 几何时间下界按最快交通方式缩放后仍是下界
+        scale = 1.0 / max(factors[bit] for bit, _ in modes) if by_time else 1.0
+        estimate = [bound * scale for bound in geo_heuristic(graph, target, strategy)]
+    else:
+        estimate = [0.0] * len(graph)
+
+    offsets = graph.offsets
+    targets = graph.targets
+    distances = graph.distances
+    times = graph.times
+    mode_masks = graph.mode_masks
+
+    size = len(graph) * mode_count
+    primary = [inf] * size
+    secondary = [inf] * size
+    via_state = [-1] * size
+    via_edge = [-1] * size
+    settled = bytearray(size)
+    queue: List[Tuple[float, float, int]] = []
+    for bit, _ in modes:
+        state = source * mode_count + bit
+        primary[state] = secondary[state] = 0.0
+        heappush(queue, (estimate[source], 0.0, state))
+    expanded = 0
+    reached = -1
+
+    while queue:
+        _, _, state = heappop(queue)
+        if settled[state]:
+            continue
+        settled[state] = 1
+        expanded += 1
+        node, mode = divmod(state, mode_count)
+        if node == target:
+            reached = state
+            break
+        cost = primary[state]
+        tie = secondary[state]
+        switch = penalties[mode]
+        for edge in range(offsets[node], offsets[node + 1]):
+            usable = mode_masks[edge] & allowed_mask
+            if not usable:
+                continue
+            neighbour = targets[edge]
+            base = neighbour * mode_count
+            distance = distances[edge]
+            time = times[edge]
+            for bit, flag in modes:
+                if not usable & flag:
+                    continue
+                following = base + bit
+                if settled[following]:
+                    continue
+                seconds = time * inverse[bit]
+                if bit != mode:
+                    seconds += switch[bit]
+                if by_time:
+                    new_cost, new_tie = cost + seconds, tie + distance
+                else:
+                    new_cost, new_tie = cost + distance, tie + seconds
+                known = primary[following]
+                if new_cost < known or (new_cost == known and new_tie < secondary[following]):
+                    primary[following] = new_cost
+                    secondary[following] = new_tie
+                    via_state[following] = state
+                    via_edge[following] = edge
+                    heappush(queue, (new_cost + estimate[neighbour], new_tie, following))
+
+    if reached < 0:
+        raise ValueError(f"No path found from {start!r} to {goal!r}")
+
+    # 逐状态回溯；各段时间取相邻状态累计时间之差，自然包含换乘代价
+    elapsed = primary if by_time else secondary
+    chain: List[int] = []
+    state = reached
+    while via_state[state] >= 0:
+        chain.append(state)
+        state = via_state[state]
+    chain.reverse()
+
+    node_ids = graph.node_ids
+    nodes = [start]
+    segments: List[PathSegment] = []
+    total_distance = 0.0
+    previous = state
+    for state in chain:
+        edge = via_edge[state]
+        target_id = node_ids[targets[edge]]
+        segments.append(
+            PathSegment(
+                source=nodes[-1],
+                target=target_id,
+                transport_mode=mode_names[state % mode_count],
+                distance=distances[edge],
+                time=elapsed[state] - elapsed[previous],
+            )
+        )
+        nodes.append(target_id)
+        total_distance += distances[edge]
+        previous = state
+    return PathResult(
+        nodes=nodes,
+        segments=segments,
+        total_distance=total_distance,
+        total_time=elapsed[reached],
+        expanded_nodes=expanded,
+    )
+
+
+def _speed_factor(speed_factors: Optional[Mapping[str, float]], mode: str) -> float:
+    factor = float((speed_factors or {}).get(mode, 1.0))
+    if factor <= 0:
+        raise ValueError(f"speed factor of {mode!r} must be positive")
+    return factor
+
+
+def _penalty_matrix(
+    mode_names: Sequence[str],
+    transfer_penalties: Optional[Mapping[Tuple[str, str], float]],
+) -> List[List[float]]:
+    position = {name: bit for bit, name in enumerate(mode_names)}
+    matrix = [[0.0] * len(mode_names) for _ in mode_names]
+    for (origin, destination), seconds in (transfer_penalties or {}).items():
+        if seconds < 0:
+            raise ValueError("transfer penalties must not be negative")
+        if origin in position and destination in position and origin != destination:
+            matrix[position[origin]][position[destination]] = float(seconds)
+    return matrix
@@ -0,0 +1,238 @@
+"""One-to-all shortest-path trees that keep predecessors for on-demand paths."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from heapq import heappop, heappush
+from math import inf
+from typing import Iterable, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+from .compact_graph import CompactGraph, trace_edges
+from .geo import haversine_array
+from .shortest_path import NodeId, PathResult, WeightStrategy
+
+
+@dataclass(frozen=True, eq=False)
+class ShortestPathTree:
+    """Result of a Dijkstra search from ``source`` over a :class:`CompactGraph`.
+
+    ``costs``, ``distances`` and ``times`` are indexed by dense node id and hold
+    the optimised cost and both totals along the tree path (``inf`` when the node
+    was not reached). ``via_edge`` is the CSR edge entering each node on its tree
+    path (``-1`` for the source and unreached nodes). Paths are only materialised
+    by :meth:`path`, so a tree costs ``28`` bytes per node regardless of depth.
+    """
+
+    graph: CompactGraph
+    source: NodeId
+    strategy: WeightStrategy
+    allowed_mask: int
+    costs: np.ndarray
+    distances: np.ndarray
+    times: np.ndarray
+    via_edge: np.ndarray
+    expanded_nodes: int = 0
+
+    @property
+    def nbytes(self) -> int:
+        return int(
+            self.costs.nbytes + self.distances.nbytes + self.times.nbytes + self.via_edge.nbytes
+        )
+
+    def reached(self) -> np.ndarray:
+        """Dense ids of every node the search reached, the source included."""
+
+        return np.flatnonzero(np.isfinite(self.costs))
+
+    def cost_to(self, node: NodeId) -> float:
+        """Optimised cost from the source to ``node`` (``inf`` when unreachable or unknown)."""
+
+        position = self.graph.index.get(node)
+        return inf if position is None else float(self.costs[position])
+
+    def path(self, node: NodeId) -> PathResult:
+        """Reconstruct the tree path from the source to ``node``."""
+
+        position = self.graph.index.get(node)
+        if position is None or not np.isfinite(self.costs[position]):
+            raise ValueError(f"No path found from {self.source!r} to {node!r}")
+        if node == self.source:
+            return PathResult(nodes=[node], segments=[], total_distance=0.0, total_time=0.0)
+        chain = trace_edges(self.graph, self.via_edge, self.graph.index[self.source], position)
+        return self.graph.build_path(chain, self.allowed_mask, expanded_nodes=self.expanded_nodes)
+
+    def node_path(self, position: int) -> List[int]:
+        """Dense node ids along the tree path to dense node ``position``."""
+
+        nodes = [position]
+        via_edge = self.via_edge
+        while via_edge[nodes[-1]] >= 0:
+            nodes.append(self.graph.edge_source(int(via_edge[nodes[-1]])))
+        nodes.reverse()
+        return nodes
+
+
+def build_shortest_path_tree(
+    graph: CompactGraph,
+    source: NodeId,
+    *,
+    strategy: WeightStrategy | str = WeightStrategy.TIME,
+    allowed_modes: Optional[Sequence[str] | str] = None,
+    max_cost: float = inf,
+) -> ShortestPathTree:
+    """Grow the shortest-path tree of ``source``.
+
+    With a finite ``max_cost`` the search stops as soon as the next settled node
+    would exceed it; nodes beyond the bound stay unreached.
+    """
+
+    return _grow_tree(graph, source, WeightStrategy(strategy), allowed_modes, max_cost)
+
+
+def nearest_targets_tree(
+    graph: CompactGraph,
+    source: NodeId,
+    targets: Iterable[NodeId],
+    limit: int,
+    *,
+    strategy: WeightStrategy | str = WeightStrategy.TIME,
+    allowed_modes: Optional[Sequence[str] | str] = None,
+    max_distance: float = inf,
+) -> ShortestPathTree:
+    """Grow the tree of ``source`` only until the ``limit`` cheapest targets are settled.
+
+    A target counts once it is settled with a tree distance of at most
+    ``max_distance``. Targets whose great-circle distance (scaled by
+    :attr:`CompactGraph.geo_bounds`) already exceeds ``max_distance`` are
+    discarded before searching, and the search also ends once every remaining
+    target is settled. The returned tree is exact for every settled node, so
+    ``costs``/``distances`` of the nearest targets match a full search.
+    """
+
+    strategy = WeightStrategy(strategy)
+    candidates = _plausible_targets(graph, source, targets, max_distance)
+    max_cost = max_distance if strategy is WeightStrategy.DISTANCE else inf
+    return _grow_tree(
+        graph,
+        source,
+        strategy,
+        allowed_modes,
+        max_cost,
+        targets=candidates,
+        limit=limit if limit > 0 else len(candidates),
+        max_distance=max_distance,
+    )
+
+
+def _grow_tree(
+    graph: CompactGraph,
+    source: NodeId,
+    strategy: WeightStrategy,
+    allowed_modes: Optional[Sequence[str] | str],
+    max_cost: float,
+    *,
+    targets: Optional[Set[int]] = None,
+    limit: int = 0,
+    max_distance: float = inf,
+) -> ShortestPathTree:
+    allowed_mask = graph.mode_mask(allowed_modes)
+    size = len(graph)
+    costs = [inf] * size
+    distances = [inf] * size
+    times = [inf] * size
+    via_edge = [-1] * size
+    origin = graph.index.get(source)
+    expanded = 0
+    truncated = max_cost < inf
+    settled = bytearray(size)
+
+    if origin is not None:
+        weights = graph.weights(strategy)
+        offsets = graph.offsets
+        heads = graph.targets
+        edge_distances = graph.distances
+        edge_times = graph.times
+        mode_masks = graph.mode_masks
+        costs[origin] = distances[origin] = times[origin] = 0.0
+        queue: List[Tuple[float, int]] = [(0.0, origin)]
+        remaining = len(targets) if targets is not None else -1
+        found = 0
+        if remaining == 0:
+            # 没有可能命中的目标时无需搜索，只保留起点
+            queue = []
+            settled[origin] = 1
+            truncated = True
+
+        while queue:
+            cost, node = heappop(queue)
+            if settled[node]:
+                continue
+            if cost > max_cost:
+                break
+            settled[node] = 1
+            expanded += 1
+            if targets is not None and node in targets:
+                remaining -= 1
+                if distances[node] <= max_distance:
+                    found += 1
+                if found >= limit or remaining == 0:
+                    # 已找到足够多的目标，剩余节点不再展开
+                    truncated = True
+                    break
+            for edge in range(offsets[node], offsets[node + 1]):
+                if not mode_masks[edge] & allowed_mask:
+                    continue
+                neighbour = heads[edge]
+                new_cost = cost + weights[edge]
+                if new_cost < costs[neighbour]:
+                    costs[neighbour] = new_cost
+                    distances[neighbour] = distances[node] + edge_distances[edge]
+                    times[neighbour] = times[node] + edge_times[edge]
+                    via_edge[neighbour] = edge
+                    heappush(queue, (new_cost, neighbour))
+
+    cost_array = np.asarray(costs, dtype=np.float64)
+    distance_array = np.asarray(distances, dtype=np.float64)
+    time_array = np.asarray(times, dtype=np.float64)
+    via_array = np.asarray(via_edge, dtype=np.int32)
+    if origin is not None and truncated:
+        # 超出预算或提前结束时，未确定的节点可能已被松弛过，统一标记为不可达
+        pending = np.frombuffer(settled, dtype=np.uint8) == 0
+        cost_array[pending] = distance_array[pending] = time_array[pending] = inf
+        via_array[pending] = -1
+
+    return ShortestPathTree(
+        graph=graph,
+        source=source,
+        strategy=strategy,
+        allowed_mask=allowed_mask,
+        costs=cost_array,
+        distances=distance_array,
+        times=time_array,
+        via_edge=via_array,
+        expanded_nodes=expanded,
+    )
+
+
+def _plausible_targets(
+    graph: CompactGraph, source: NodeId, targets: Iterable[NodeId], max_distance: float
+) -> Set[int]:
+    """Dense ids of the targets whose straight-line lower bound fits within ``max_distance``."""
+
+    dense = np.asarray(
+        sorted({graph.index[target] for target in targets if target in graph.index}), dtype=np.int64
+    )
+    origin = graph.index.get(source)
+    ratio, _ = graph.geo_bounds
+    if origin is None or not len(dense) or max_distance == inf or ratio <= 0:
+        return set(dense.tolist())
+    views = graph.as_numpy()
+    latitudes, longitudes = views["latitudes"], views["longitudes"]
+    bound = (
+        haversine_array(latitudes[origin], longitudes[origin], latitudes[dense], longitudes[dense])
+        * ratio
+    )
+    # 留出浮点误差余量，避免误删恰好在半径上的目标
+    return set(dense[bound <= max_distance * (1 + 1e-9)].tolist())
@@ -7,7 +7,12 @@ from enum import Enum
 from heapq import heappop, heappush
 from itertools import count
 from math import inf
-from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+from typing import Dict, Hashable, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+from .congestion import profile_travel_time, validate_profile
+
+# 节点标识可以是任意可哈希值；全部为整数时 CompactGraph 以紧凑数组保存
+NodeId = Hashable
 
 
 class WeightStrategy(str, Enum):
@@ -17,16 +22,28 @@ class WeightStrategy(str, Enum):
     TIME = "time"
 
 
+class SearchAlgorithm(str, Enum):
+    """Point-to-point search engines available over compiled graphs."""
+
+    DIJKSTRA = "dijkstra"
+    ASTAR = "astar"
+    BIDIRECTIONAL = "bidirectional"
+    CONTRACTION_HIERARCHY = "ch"
+    ALT = "alt"
+    MULTIMODAL = "multimodal"
+
+
 @dataclass(frozen=True)
 class Edge:
     """Directed edge in the transport graph."""
 
-    source: str
-    target: str
+    source: NodeId
+    target: NodeId
     distance: float
     ideal_speed: float
     congestion: float
     transport_modes: Tuple[str, ...] = ("walk",)
+    congestion_profile: Optional[Tuple[float, ...]] = None
 
     def __post_init__(self) -> None:
         modes = tuple(mode.lower() for mode in self.transport_modes if mode)
@@ -39,6 +56,10 @@ class Edge:
         if self.congestion <= 0:
             raise ValueError("congestion must be positive")
         object.__setattr__(self, "transport_modes", modes)
+        if self.congestion_profile is not None:
+            object.__setattr__(
+                self, "congestion_profile", validate_profile(self.congestion_profile)
+            )
 
     @property
     def travel_time(self) -> float:
@@ -46,13 +67,27 @@ class Edge:
 
         return self.distance / (self.ideal_speed * self.congestion)
 
+    def travel_time_at(self, departure: float) -> float:
+        """Travel time when entering the edge ``departure`` seconds after midnight.
+
+        Uses :attr:`congestion_profile` when set (see
+        :func:`~app.algorithms.congestion.profile_travel_time`), otherwise the
+        constant :attr:`travel_time`.
+        """
+
+        if self.congestion_profile is None:
+            return self.travel_time
+        return profile_travel_time(
+            self.distance, self.ideal_speed, self.congestion_profile, departure
+        )
+
 
 @dataclass(frozen=True)
 class PathSegment:
     """Single hop within a computed route."""
 
-    source: str
-    target: str
+    source: NodeId
+    target: NodeId
     transport_mode: str
     distance: float
     time: float
@@ -62,40 +97,55 @@ class PathSegment:
 class PathResult:
     """Aggregate result of a shortest path computation."""
 
-    nodes: List[str]
+    nodes: List[NodeId]
     segments: List[PathSegment]
     total_distance: float
     total_time: float
+    expanded_nodes: int = 0
+
+
+Adjacency = Mapping[NodeId, Sequence[Edge]]
+
+
+def build_adjacency(edges: Iterable[Edge]) -> Dict[NodeId, Tuple[Edge, ...]]:
+    """Group edges by source node so the adjacency can be reused across queries."""
+
+    grouped: Dict[NodeId, List[Edge]] = {}
+    for edge in edges:
+        grouped.setdefault(edge.source, []).append(edge)
+    return {node: tuple(node_edges) for node, node_edges in grouped.items()}
 
 
 def shortest_path(
-    edges: Iterable[Edge],
-    start: str,
-    goal: str,
+    edges: Iterable[Edge] | Adjacency,
+    start: NodeId,
+    goal: NodeId,
     *,
     allowed_modes: Optional[Sequence[str] | str] = None,
     strategy: WeightStrategy | str = WeightStrategy.TIME,
 ) -> PathResult:
-    """Compute the optimal route between two nodes using Dijkstra's algorithm."""
+    """Compute the optimal route between two nodes using Dijkstra's algorithm.
+
+    ``edges`` may either be a flat edge iterable or a prebuilt adjacency mapping
+    (see :func:`build_adjacency`), which avoids regrouping the graph per query.
+    """
 
     if start == goal:
         return PathResult(nodes=[start], segments=[], total_distance=0.0, total_time=0.0)
 
     strategy = WeightStrategy(strategy)
     allowed = _normalise_modes(allowed_modes)
-    adjacency: Dict[str, List[Edge]] = {}
-    for edge in edges:
-        adjacency.setdefault(edge.source, []).append(edge)
+    adjacency: Adjacency = edges if isinstance(edges, Mapping) else build_adjacency(edges)
 
-    queue: List[Tuple[float, int, str]] = []
+    queue: List[Tuple[float, int, NodeId]] = []
     order = count()
     heappush(queue, (0.0, next(order), start))
 
-    best_cost: Dict[str, float] = {start: 0.0}
-    best_distance: Dict[str, float] = {start: 0.0}
-    best_time: Dict[str, float] = {start: 0.0}
-    previous: Dict[str, Tuple[str, Edge, str]] = {}
-    visited: set[str] = set()
+    best_cost: Dict[NodeId, float] = {start: 0.0}
+    best_distance: Dict[NodeId, float] = {start: 0.0}
+    best_time: Dict[NodeId, float] = {start: 0.0}
+    previous: Dict[NodeId, Tuple[NodeId, Edge, str]] = {}
+    visited: set[NodeId] = set()
 
     while queue:
         cost, _, node = heappop(queue)
@@ -130,7 +180,7 @@ def shortest_path(
     if goal not in best_cost:
         raise ValueError(f"No path found from {start!r} to {goal!r}")
 
-    nodes: List[str] = []
+    nodes: List[NodeId] = []
     segments: List[PathSegment] = []
     cursor = goal
     while cursor != start:
@@ -157,6 +207,7 @@ def shortest_path(
         segments=segments,
         total_distance=best_distance[goal],
         total_time=best_time[goal],
+        expanded_nodes=len(visited),
     )
 
 
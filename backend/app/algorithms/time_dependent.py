@@ -0,0 +1,113 @@
+"""Time-dependent shortest paths over :class:`CompactGraph` congestion profiles."""
+
+from __future__ import annotations
+
+from dataclasses import replace
+from heapq import heappop, heappush
+from math import inf
+from typing import List, Optional, Sequence, Tuple
+
+from .astar import geo_heuristic
+from .compact_graph import CompactGraph, trace_edges
+from .shortest_path import NodeId, PathResult, WeightStrategy
+
+
+def time_dependent_shortest_path(
+    graph: CompactGraph,
+    start: NodeId,
+    goal: NodeId,
+    departure: float,
+    *,
+    allowed_modes: Optional[Sequence[str] | str] = None,
+    strategy: WeightStrategy | str = WeightStrategy.TIME,
+    goal_directed: bool = True,
+) -> PathResult:
+    """Best path when leaving ``start`` at ``departure`` seconds after midnight.
+
+    Edge times follow :attr:`CompactGraph.profiles` at the moment each edge is
+    entered; edges without a profile keep their static time. Profile travel
+    times are FIFO, so settling nodes in order of arrival (Dijkstra, or A* with
+    ``goal_directed``) is exact. With the DISTANCE strategy the path is the
+    static shortest one and only the reported times depend on ``departure``.
+    Segment times are the actual times at which each edge is traversed.
+    """
+
+    source = graph.index.get(start)
+    target = graph.index.get(goal)
+    if source is None or target is None:
+        raise ValueError(f"No path found from {start!r} to {goal!r}")
+    if source == target:
+        return PathResult(nodes=[start], segments=[], total_distance=0.0, total_time=0.0)
+
+    strategy = WeightStrategy(strategy)
+    by_time = strategy is WeightStrategy.TIME
+    estimate = _lower_bounds(graph, target, strategy) if goal_directed else [0.0] * len(graph)
+    allowed_mask = graph.mode_mask(allowed_modes)
+    offsets = graph.offsets
+    targets = graph.targets
+    distances = graph.distances
+    times = graph.times
+    mode_masks = graph.mode_masks
+    profiles = graph.profiles
+    travel_time = profiles.travel_time if profiles is not None else None
+
+    best_cost = [inf] * len(graph)
+    arrival = [inf] * len(graph)
+    via_edge = [-1] * len(graph)
+    settled = bytearray(len(graph))
+    best_cost[source] = 0.0
+    arrival[source] = departure
+    queue: List[Tuple[float, int]] = [(estimate[source], source)]
+    expanded = 0
+
+    while queue:
+        _, node = heappop(queue)
+        if settled[node]:
+            continue
+        settled[node] = 1
+        expanded += 1
+        if node == target:
+            break
+        cost = best_cost[node]
+        clock = arrival[node]
+        for edge in range(offsets[node], offsets[node + 1]):
+            if not mode_masks[edge] & allowed_mask:
+                continue
+            neighbour = targets[edge]
+            if settled[neighbour]:
+                continue
+            if travel_time is None:
+                duration = times[edge]
+            else:
+                duration = travel_time(edge, distances[edge], clock, times[edge])
+            new_cost = cost + (duration if by_time else distances[edge])
+            if new_cost < best_cost[neighbour]:
+                best_cost[neighbour] = new_cost
+                arrival[neighbour] = clock + duration
+                via_edge[neighbour] = edge
+                heappush(queue, (new_cost + estimate[neighbour], neighbour))
+
+    if best_cost[target] == inf:
+        raise ValueError(f"No path found from {start!r} to {goal!r}")
+
+    chain = trace_edges(graph, via_edge, source, target)
+    result = graph.build_path(chain, allowed_mask, expanded_nodes=expanded)
+    segments = [
+        replace(segment, time=arrival[targets[edge]] - arrival[graph.edge_source(edge)])
+        for segment, edge in zip(result.segments, chain)
+    ]
+    return replace(result, segments=segments, total_time=arrival[target] - departure)
+
+
+def _lower_bounds(graph: CompactGraph, target: int, strategy: WeightStrategy) -> Sequence[float]:
+    """Geometric lower bounds valid at every time of day."""
+
+    profiles = graph.profiles
+    if strategy is WeightStrategy.DISTANCE or profiles is None:
+        return geo_heuristic(graph, target, strategy)
+    ratio, max_speed = graph.geo_bounds
+    fastest = max(max_speed, profiles.max_speed)
+    if ratio <= 0 or fastest <= 0:
+        return [0.0] * len(graph)
+    # 距离下界除以全天最快速度即为时间下界；静态最快速度可能低于高峰过后的速度
+    return [bound * max_speed / fastest for bound in geo_heuristic(graph, target, strategy)]
@@ -1,21 +1,48 @@
-"""Heuristic travelling salesman solver with multi-modal support."""
+"""Travelling salesman solver with multi-modal support.
+
+Small tours are solved exactly with the Held-Karp bitmask DP. Larger tours are
+built greedily and improved with 2-opt and Or-opt moves evaluated as edge-cost deltas on
+a dense cost matrix. Costs may be asymmetric (one-way streets), so reversing a
+stretch of the tour accounts for the cost of traversing it backwards.
+"""
 
 from __future__ import annotations
 
+import random
+import time
+from concurrent.futures import Executor, Future, wait
 from dataclasses import dataclass
-from itertools import count
+from enum import Enum
 from math import inf
-from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+from multiprocessing import shared_memory
+from time import perf_counter
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .compact_graph import CompactGraph
+from .matrix import DistanceMatrix, distance_matrix
+from .shortest_path import Edge, NodeId, PathResult, WeightStrategy
+
+
+DEFAULT_EXACT_THRESHOLD = 12
+MAX_EXACT_STOPS = 16
 
-from .shortest_path import Edge, PathResult, WeightStrategy, shortest_path
+
+class TourSolver(str, Enum):
+    """Which solver produced a tour."""
+
+    HELD_KARP = "held_karp"
+    LOCAL_SEARCH = "local_search"
+    MULTI_START = "multi_start"
 
 
 @dataclass(frozen=True)
 class TourLeg:
     """Single leg of the computed tour."""
 
-    start: str
-    end: str
+    start: NodeId
+    end: NodeId
     path: PathResult
 
 
@@ -23,10 +50,12 @@ class TourLeg:
 class TourResult:
     """Aggregate outcome of a tour computation."""
 
-    route: List[str]
+    route: List[NodeId]
     legs: List[TourLeg]
     total_distance: float
     total_time: float
+    solver: TourSolver = TourSolver.LOCAL_SEARCH
+    solver_seconds: float = 0.0
 
 
 class TourComputationError(RuntimeError):
@@ -34,140 +63,471 @@ class TourComputationError(RuntimeError):
 
 
 def compute_tour(
-    edges: Iterable[Edge],
-    start: str,
-    targets: Sequence[str],
+    edges: Iterable[Edge] | CompactGraph,
+    start: NodeId,
+    targets: Sequence[NodeId],
     *,
     allowed_modes: Optional[Sequence[str] | str] = None,
     strategy: WeightStrategy | str = WeightStrategy.TIME,
     max_iterations: int = 50,
+    time_budget: Optional[float] = None,
+    neighbour_count: int = 8,
+    exact_threshold: int = DEFAULT_EXACT_THRESHOLD,
+    starts: int = 1,
+    executor: Optional[Executor] = None,
+    seed: int = 0,
 ) -> TourResult:
-    """Compute a round-trip visiting each target using a nearest-neighbour + 2-opt heuristic."""
-
-    if not targets:
+    """Compute a round-trip visiting each target.
+
+    Tours with at most ``exact_threshold`` distinct stops (capped at
+    ``MAX_EXACT_STOPS``) are solved optimally with Held-Karp; larger ones use
+    nearest-neighbour construction followed by 2-opt and Or-opt local search.
+    :attr:`TourResult.solver` and :attr:`TourResult.solver_seconds` report which
+    tier ran and how long it took, excluding the distance matrix.
+
+    ``edges`` may be a pre-compiled :class:`CompactGraph` to avoid rebuilding it per call.
+    ``max_iterations`` bounds the number of local-search passes and ``time_budget``
+    the wall-clock seconds spent improving the tour; the best route found when
+    either runs out is returned. Only the ``neighbour_count`` cheapest successors
+    and predecessors of each stop are considered when generating moves.
+
+    With ``starts > 1`` the heuristic tier runs in anytime mode: besides the greedy
+    start, ``starts - 1`` randomised constructions are improved independently and
+    the cheapest tour found before ``time_budget`` expires wins. When ``executor``
+    is a :class:`~concurrent.futures.ProcessPoolExecutor` the starts run in worker
+    processes that read the cost matrix from shared memory; otherwise they run
+    one after another in the calling thread.
+    """
+
+    stops = [target for target in dict.fromkeys(targets) if target != start]
+    if not stops:
         return TourResult(route=[start, start], legs=[], total_distance=0.0, total_time=0.0)
 
+    deadline = perf_counter() + time_budget if time_budget is not None else inf
+    wall_deadline = time.time() + time_budget if time_budget is not None else inf
     strategy = WeightStrategy(strategy)
-    nodes = [start] + list(dict.fromkeys(targets))  # ensure determinism and remove duplicates
-    pair_paths = _precompute_pair_paths(edges, nodes, allowed_modes, strategy)
-
-    initial_route = _nearest_neighbour_route(start, targets, pair_paths, strategy)
-    optimised_route = _two_opt(initial_route, pair_paths, strategy, max_iterations)
+    nodes = [start] + stops  # ensure determinism and remove duplicates
+    graph = edges if isinstance(edges, CompactGraph) else CompactGraph.from_edges(edges)
+    matrix = _precompute_matrix(graph, nodes, allowed_modes, strategy)
+    costs = matrix.costs.tolist()
+
+    started = perf_counter()
+    if len(stops) <= min(exact_threshold, MAX_EXACT_STOPS):
+        solver = TourSolver.HELD_KARP
+        tour = _held_karp(matrix.costs)
+        greedy = _nearest_neighbour_tour(costs)
+        if _tour_cost(greedy, costs) <= _tour_cost(tour, costs) + 1e-9:
+            # 贪心路线已是最优时保留它，使并列最优解的结果与启发式求解一致
+            tour = greedy
+    elif starts > 1:
+        solver = TourSolver.MULTI_START
+        tour = _multi_start(
+            matrix.costs,
+            starts=starts,
+            executor=executor,
+            wall_deadline=wall_deadline,
+            seed=seed,
+            max_iterations=max_iterations,
+            neighbour_count=neighbour_count,
+        )
+    else:
+        solver = TourSolver.LOCAL_SEARCH
+        tour = _nearest_neighbour_tour(costs)
+        tour = _local_search(tour, costs, max_iterations, deadline, neighbour_count)
+    solver_seconds = perf_counter() - started
+    route = [nodes[index] for index in tour]
 
     legs: List[TourLeg] = []
     total_distance = 0.0
     total_time = 0.0
-    for origin, destination in zip(optimised_route, optimised_route[1:]):
-        path = pair_paths[(origin, destination)]
-        legs.append(TourLeg(start=origin, end=destination, path=path))
+    for origin, destination in zip(tour, tour[1:]):
+        path = matrix.path(origin, destination)
+        legs.append(TourLeg(start=nodes[origin], end=nodes[destination], path=path))
         total_distance += path.total_distance
         total_time += path.total_time
 
     return TourResult(
-        route=optimised_route,
+        route=route,
         legs=legs,
         total_distance=total_distance,
         total_time=total_time,
+        solver=solver,
+        solver_seconds=solver_seconds,
     )
 
 
-PairKey = Tuple[str, str]
-PairMap = Dict[PairKey, PathResult]
+CostMatrix = Sequence[Sequence[float]]
 
 
-def _precompute_pair_paths(
-    edges: Iterable[Edge],
-    nodes: Sequence[str],
+def _precompute_matrix(
+    graph: CompactGraph,
+    nodes: Sequence[NodeId],
     allowed_modes: Optional[Sequence[str] | str],
     strategy: WeightStrategy,
-) -> PairMap:
-    pair_paths: PairMap = {}
-    edge_list = list(edges)
-    for origin in nodes:
-        for destination in nodes:
-            if origin == destination:
-                continue
-            key = (origin, destination)
-            if key in pair_paths:
-                continue
-            try:
-                pair_paths[key] = shortest_path(
-                    edge_list,
-                    start=origin,
-                    goal=destination,
-                    allowed_modes=allowed_modes,
-                    strategy=strategy,
-                )
-            except ValueError as exc:  # propagate with extra context
+) -> DistanceMatrix:
+    # 每个起点只做一次在所有目标点确定后即停止的 Dijkstra，而不是逐对搜索
+    matrix = distance_matrix(graph, nodes, nodes, strategy=strategy, allowed_modes=allowed_modes)
+    for row, origin in enumerate(nodes):
+        for column, destination in enumerate(nodes):
+            if row != column and matrix.costs[row, column] == inf:
                 raise TourComputationError(
-                    f"No feasible path between {origin!r} and {destination!r}: {exc}"
-                ) from exc
-    return pair_paths
+                    f"No feasible path between {origin!r} and {destination!r}"
+                )
+    return matrix
+
+
+def _held_karp(costs: np.ndarray) -> List[int]:
+    """Optimal closed tour over matrix indices, starting and ending at index 0.
+
+    ``best[mask, k]`` is the cheapest path leaving index 0, visiting the stops in
+    ``mask`` (bit ``k`` stands for index ``k + 1``) and ending at stop ``k``. Masks
+    are processed one popcount layer at a time so every layer is a single
+    vectorised min-plus product. Time is O(2^n n^2) and memory O(2^n n).
+    """
+
+    stops = len(costs) - 1
+    if stops <= 0:
+        return [0, 0]
+    inner = np.asarray(costs, dtype=np.float64)[1:, 1:]
+    full = 1 << stops
+    bits = 1 << np.arange(stops, dtype=np.int64)
+    columns = np.arange(stops)
+
+    best = np.full((full, stops), inf)
+    parent = np.full((full, stops), -1, dtype=np.int8)
+    best[bits, columns] = costs[0][1:]
+
+    masks = np.arange(full, dtype=np.int64)
+    popcount = ((masks[:, None] & bits[None, :]) != 0).sum(axis=1)
+    for size in range(1, stops):
+        layer = masks[popcount == size]
+        candidates = best[layer][:, :, None] + inner[None, :, :]
+        via = candidates.argmin(axis=1)
+        cheapest = np.take_along_axis(candidates, via[:, None, :], axis=1)[:, 0, :]
+        rows, nexts = np.nonzero((layer[:, None] & bits[None, :]) == 0)
+        extended = layer[rows] | bits[nexts]
+        # 每个 (extended, next) 只对应唯一的前驱集合 layer[row]，无需取最小
+        best[extended, nexts] = cheapest[rows, nexts]
+        parent[extended, nexts] = via[rows, nexts]
+
+    closing = best[full - 1] + np.asarray(costs, dtype=np.float64)[1:, 0]
+    last = int(np.argmin(closing))
+    order: List[int] = []
+    mask = full - 1
+    while last >= 0:
+        order.append(last + 1)
+        previous = int(parent[mask, last])
+        mask ^= 1 << last
+        last = previous
+    order.reverse()
+    return [0, *order, 0]
+
+
+def _nearest_neighbour_tour(costs: CostMatrix) -> List[int]:
+    """Greedy closed tour over matrix indices, starting and ending at index 0."""
+
+    remaining = list(range(1, len(costs)))
+    tour = [0]
+    current = 0
+    while remaining:
+        row = costs[current]
+        next_node = min(remaining, key=row.__getitem__)
+        tour.append(next_node)
+        remaining.remove(next_node)
+        current = next_node
+    tour.append(0)
+    return tour
 
 
-def _nearest_neighbour_route(
-    start: str,
-    targets: Sequence[str],
-    pair_paths: PairMap,
-    strategy: WeightStrategy,
-) -> List[str]:
-    remaining = list(dict.fromkeys(targets))
-    route: List[str] = [start]
-    current = start
+def _randomised_tour(costs: CostMatrix, rng: random.Random, candidates: int = 3) -> List[int]:
+    """Nearest-neighbour construction that picks among the ``candidates`` cheapest next stops."""
+
+    remaining = list(range(1, len(costs)))
+    tour = [0]
+    current = 0
     while remaining:
-        next_node = min(
-            remaining,
-            key=lambda node: _path_cost(pair_paths[(current, node)], strategy),
-        )
-        route.append(next_node)
+        row = costs[current]
+        nearest = sorted(remaining, key=row.__getitem__)[:candidates]
+        next_node = rng.choice(nearest)
+        tour.append(next_node)
         remaining.remove(next_node)
         current = next_node
-    route.append(start)
-    return route
+    tour.append(0)
+    return tour
 
 
-def _two_opt(
-    route: List[str],
-    pair_paths: PairMap,
-    strategy: WeightStrategy,
+def _multi_start(
+    costs: np.ndarray,
+    *,
+    starts: int,
+    executor: Optional[Executor],
+    wall_deadline: float,
+    seed: int,
     max_iterations: int,
-) -> List[str]:
-    if len(route) <= 3:
-        return route
+    neighbour_count: int,
+) -> List[int]:
+    """Best tour over one greedy and ``starts - 1`` randomised local searches.
 
-    best_route = route
-    best_cost = _route_cost(best_route, pair_paths, strategy)
-    iteration = 0
-    improved = True
+    ``wall_deadline`` is a :func:`time.time` timestamp because ``perf_counter``
+    values are not comparable across processes.
+    """
 
-    while improved and iteration < max_iterations:
-        improved = False
-        iteration += 1
-        for i in range(1, len(best_route) - 2):
-            for j in range(i + 1, len(best_route) - 1):
-                if j - i == 1:
-                    continue  # skip adjacent edges
-                candidate = best_route[:i] + best_route[i:j][::-1] + best_route[j:]
-                cost = _route_cost(candidate, pair_paths, strategy)
-                if cost + 1e-9 < best_cost:
-                    best_route = candidate
-                    best_cost = cost
-                    improved = True
-                    break
-            if improved:
+    seeds = [seed + offset for offset in range(1, starts)]
+    matrix = costs.tolist()
+
+    if executor is None:
+        best = _improve_start(matrix, None, wall_deadline, max_iterations, neighbour_count)
+        for start_seed in seeds:
+            if time.time() >= wall_deadline:
                 break
-    return best_route
+            improved = _improve_start(
+                matrix, start_seed, wall_deadline, max_iterations, neighbour_count
+            )
+            best = min(best, improved)
+        return best[1]
+
+    buffer = np.ascontiguousarray(costs, dtype=np.float64)
+    block = shared_memory.SharedMemory(create=True, size=max(buffer.nbytes, 1))
+    try:
+        np.ndarray(buffer.shape, dtype=np.float64, buffer=block.buf)[:] = buffer
+        futures: List[Future] = [
+            executor.submit(
+                _shared_matrix_start,
+                block.name,
+                buffer.shape[0],
+                start_seed,
+                wall_deadline,
+                max_iterations,
+                neighbour_count,
+            )
+            for start_seed in seeds
+        ]
+        # 工作进程运行期间，在本进程完成确定性的贪心起点作为兜底结果
+        best = _improve_start(matrix, None, wall_deadline, max_iterations, neighbour_count)
+        timeout = None if wall_deadline == inf else max(0.0, wall_deadline - time.time()) + 0.05
+        done, pending = wait(futures, timeout=timeout)
+        for future in pending:
+            future.cancel()
+        for future in done:
+            if not future.cancelled() and future.exception() is None:
+                best = min(best, future.result())
+        if pending:
+            # 仍在运行的任务会在截止时间后自行结束；等待它们以便安全释放共享内存
+            wait(pending)
+        return best[1]
+    finally:
+        block.close()
+        block.unlink()
+
+
+def _improve_start(
+    costs: CostMatrix,
+    start_seed: Optional[int],
+    wall_deadline: float,
+    max_iterations: int,
+    neighbour_count: int,
+) -> Tuple[float, List[int]]:
+    """Construct one tour (greedy when ``start_seed`` is None) and improve it."""
+
+    if start_seed is None:
+        tour = _nearest_neighbour_tour(costs)
+    else:
+        tour = _randomised_tour(costs, random.Random(start_seed))
+    deadline = perf_counter() + (wall_deadline - time.time()) if wall_deadline != inf else inf
+    tour = _local_search(tour, costs, max_iterations, deadline, neighbour_count)
+    return _tour_cost(tour, costs), tour
+
+
+def _shared_matrix_start(
+    block_name: str,
+    size: int,
+    start_seed: int,
+    wall_deadline: float,
+    max_iterations: int,
+    neighbour_count: int,
+) -> Tuple[float, List[int]]:
+    """Process-pool entry point: read the cost matrix from shared memory and run one start."""
+
+    block = shared_memory.SharedMemory(name=block_name)
+    try:
+        costs = np.ndarray((size, size), dtype=np.float64, buffer=block.buf).tolist()
+    finally:
+        block.close()
+    return _improve_start(costs, start_seed, wall_deadline, max_iterations, neighbour_count)
 
 
-def _route_cost(route: List[str], pair_paths: PairMap, strategy: WeightStrategy) -> float:
-    total = 0.0
-    for origin, destination in zip(route, route[1:]):
-        path = pair_paths.get((origin, destination))
-        if path is None:
-            return inf
-        total += _path_cost(path, strategy)
-    return total
+def _tour_cost(tour: Sequence[int], costs: CostMatrix) -> float:
+    return sum(costs[origin][destination] for origin, destination in zip(tour, tour[1:]))
 
 
-def _path_cost(path: PathResult, strategy: WeightStrategy) -> float:
-    return path.total_distance if strategy is WeightStrategy.DISTANCE else path.total_time
+def _local_search(
+    tour: List[int],
+    costs: CostMatrix,
+    max_iterations: int,
+    deadline: float,
+    neighbour_count: int,
+) -> List[int]:
+    """Apply improving 2-opt and Or-opt moves until a local optimum or a limit is hit."""
+
+    size = len(costs)
+    if size < 3:
+        return tour
+
+    others = [[other for other in range(size) if other != node] for node in range(size)]
+    successors = [
+        sorted(others[node], key=costs[node].__getitem__)[:neighbour_count] for node in range(size)
+    ]
+    predecessors = [
+        sorted(others[node], key=lambda other, node=node: costs[other][node])[:neighbour_count]
+        for node in range(size)
+    ]
+
+    search = _TourState(tour, costs)
+    for _ in range(max_iterations):
+        improved = search.two_opt_pass(successors, deadline)
+        improved = search.or_opt_pass(successors, predecessors, deadline) or improved
+        if not improved or perf_counter() >= deadline:
+            break
+    return search.tour
+
+
+class _TourState:
+    """Closed tour ``tour[0] == tour[-1] == 0`` with prefix sums for O(1) move deltas.
+
+    ``forward[k]`` is the cost of the first ``k`` tour edges as travelled and
+    ``backward[k]`` the cost of the same edges travelled in the opposite direction,
+    so the cost of any stretch and of its reversal are both two lookups.
+    """
+
+    _EPSILON = 1e-9
+
+    def __init__(self, tour: List[int], costs: CostMatrix) -> None:
+        self.tour = tour
+        self.costs = costs
+        self.forward: List[float] = []
+        self.backward: List[float] = []
+        self.position: List[int] = []
+        self._refresh()
+
+    def _refresh(self) -> None:
+        tour = self.tour
+        costs = self.costs
+        forward = [0.0]
+        backward = [0.0]
+        for origin, destination in zip(tour, tour[1:]):
+            forward.append(forward[-1] + costs[origin][destination])
+            backward.append(backward[-1] + costs[destination][origin])
+        position = [0] * len(costs)
+        for index, node in enumerate(tour[:-1]):
+            position[node] = index
+        self.forward = forward
+        self.backward = backward
+        self.position = position
+
+    def two_opt_pass(self, successors: Sequence[Sequence[int]], deadline: float) -> bool:
+        """Reverse ``tour[i..j]`` when the new edge ``tour[i-1] -> tour[j]`` pays off."""
+
+        costs = self.costs
+        last = len(self.tour) - 2
+        improved = False
+        i = 1
+        while i < last:
+            if perf_counter() >= deadline:
+                break
+            tour = self.tour
+            before = tour[i - 1]
+            first = tour[i]
+            applied = False
+            for candidate in successors[before]:
+                j = self.position[candidate]
+                if j <= i:
+                    continue
+                after = tour[j + 1]
+                delta = (
+                    costs[before][candidate]
+                    + costs[first][after]
+                    - costs[before][first]
+                    - costs[candidate][after]
+                    + (self.backward[j] - self.backward[i])
+                    - (self.forward[j] - self.forward[i])
+                )
+                if delta < -self._EPSILON:
+                    tour[i : j + 1] = tour[i : j + 1][::-1]
+                    self._refresh()
+                    improved = applied = True
+                    break
+            if not applied:
+                i += 1
+        return improved
+
+    def or_opt_pass(
+        self,
+        successors: Sequence[Sequence[int]],
+        predecessors: Sequence[Sequence[int]],
+        deadline: float,
+        max_segment: int = 3,
+    ) -> bool:
+        """Move a stretch of up to ``max_segment`` stops elsewhere, optionally reversed."""
+
+        improved = False
+        for length in range(1, max_segment + 1):
+            i = 1
+            while i + length <= len(self.tour) - 1:
+                if perf_counter() >= deadline:
+                    return improved
+                if self._relocate(i, length, successors, predecessors):
+                    improved = True
+                else:
+                    i += 1
+        return improved
+
+    def _relocate(
+        self,
+        i: int,
+        length: int,
+        successors: Sequence[Sequence[int]],
+        predecessors: Sequence[Sequence[int]],
+    ) -> bool:
+        tour = self.tour
+        costs = self.costs
+        end = i + length - 1
+        first, last = tour[i], tour[end]
+        before, after = tour[i - 1], tour[end + 1]
+        removal = costs[before][first] + costs[last][after] - costs[before][after]
+        reversal = (self.backward[end] - self.backward[i]) - (self.forward[end] - self.forward[i])
+        closing = len(tour) - 2  # 回到起点的最后一条边 tour[-2] -> tour[-1]
+
+        # 插入位置 p 表示放到 tour[p] 与 tour[p + 1] 之间；候选来自两端的近邻
+        slots = set()
+        for node in (first, last):
+            slots.update(self.position[other] for other in predecessors[node])
+            slots.update(
+                closing if other == 0 else self.position[other] - 1 for other in successors[node]
+            )
+
+        best_delta = -self._EPSILON
+        best_move: Tuple[int, bool] | None = None
+        for p in slots:
+            if p < 0 or i - 1 <= p <= end:
+                continue
+            left, right = tour[p], tour[p + 1]
+            gap = costs[left][right]
+            forward_delta = costs[left][first] + costs[last][right] - gap - removal
+            if forward_delta < best_delta:
+                best_delta, best_move = forward_delta, (p, False)
+            reversed_delta = costs[left][last] + costs[first][right] - gap - removal + reversal
+            if reversed_delta < best_delta:
+                best_delta, best_move = reversed_delta, (p, True)
+
+        if best_move is None:
+            return False
+        p, reverse = best_move
+        segment = tour[i : end + 1]
+        if reverse:
+            segment.reverse()
+        rest = tour[:i] + tour[end + 1 :]
+        insert_at = p + 1 if p < i else p - length + 1
+        rest[insert_at:insert_at] = segment
+        self.tour = rest
+        self._refresh()
+        return True
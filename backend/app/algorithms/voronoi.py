@@ -0,0 +1,202 @@
+"""Graph Voronoi partitions: the nearest of several source nodes for every node."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from heapq import heappop, heappush
+from math import inf
+from pathlib import Path
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .compact_graph import CompactGraph
+from .shortest_path import NodeId, WeightStrategy
+
+
+@dataclass(frozen=True, eq=False)
+class GraphVoronoi:
+    """For every node, the source it reaches most cheaply along directed edges.
+
+    ``sources`` holds the dense ids of the sources in ascending order and
+    ``owner[v]`` indexes the nearest one from node ``v`` (``-1`` when no source is
+    reachable). ``costs``, ``distances`` and ``times`` describe the path from
+    ``v`` to that source and ``next_edge[v]`` is the first CSR edge on it (``-1``
+    at sources and unreached nodes), so the path is recovered hop by hop.
+    Distance partitions stay valid while only edge times change, so their
+    ``times`` may be outdated; :meth:`path_time` reads the current ones.
+    Memory is ``32`` bytes per node.
+    """
+
+    strategy: WeightStrategy
+    mode_mask: int
+    fingerprint: str
+    sources: np.ndarray
+    owner: np.ndarray
+    costs: np.ndarray
+    distances: np.ndarray
+    times: np.ndarray
+    next_edge: np.ndarray
+
+    @property
+    def nbytes(self) -> int:
+        arrays = (self.sources, self.owner, self.costs, self.distances, self.times, self.next_edge)
+        return int(sum(values.nbytes for values in arrays))
+
+    def matches(
+        self,
+        graph: CompactGraph,
+        strategy: WeightStrategy | str,
+        mode_mask: int,
+        sources: Sequence[NodeId],
+    ) -> bool:
+        """Whether the partition was built for exactly this graph, weights, modes and source set."""
+
+        if self.strategy is not WeightStrategy(strategy):
+            return False
+        if self.fingerprint != graph.fingerprint_for(strategy):
+            return False
+        return self.mode_mask == mode_mask and np.array_equal(
+            self.sources, _dense_sources(graph, sources)
+        )
+
+    def nearest(self, node: int) -> Optional[int]:
+        """Dense id of the source nearest to dense node ``node``, or ``None``."""
+
+        owner = int(self.owner[node])
+        return None if owner < 0 else int(self.sources[owner])
+
+    def node_path(self, graph: CompactGraph, node: int) -> List[int]:
+        """Dense node ids from ``node`` to its nearest source (``[]`` when none is reachable)."""
+
+        if self.owner[node] < 0:
+            return []
+        nodes = [node]
+        next_edge = self.next_edge
+        while next_edge[nodes[-1]] >= 0:
+            nodes.append(graph.targets[int(next_edge[nodes[-1]])])
+        return nodes
+
+    def path_time(self, graph: CompactGraph, node: int) -> float:
+        """Travel time from ``node`` to its nearest source at the current times of ``graph``."""
+
+        if self.owner[node] < 0:
+            return inf
+        if self.strategy is WeightStrategy.TIME:
+            return float(self.times[node])
+        total = 0.0
+        edge = int(self.next_edge[node])
+        while edge >= 0:
+            total += graph.times[edge]
+            edge = int(self.next_edge[graph.targets[edge]])
+        return total
+
+    def save(self, path: Path | str) -> None:
+        """Serialise the partition as an uncompressed ``.npz`` archive."""
+
+        target = Path(path)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        with target.open("wb") as handle:
+            np.savez(
+                handle,
+                strategy=np.array(self.strategy.value),
+                mode_mask=np.array(self.mode_mask, dtype=np.int64),
+                fingerprint=np.array(self.fingerprint),
+                sources=self.sources,
+                owner=self.owner,
+                costs=self.costs,
+                distances=self.distances,
+                times=self.times,
+                next_edge=self.next_edge,
+            )
+
+    @classmethod
+    def load(cls, path: Path | str) -> "GraphVoronoi":
+        """Load a partition previously written by :meth:`save`."""
+
+        with np.load(Path(path), allow_pickle=False) as archive:
+            return cls(
+                strategy=WeightStrategy(str(archive["strategy"])),
+                mode_mask=int(archive["mode_mask"]),
+                fingerprint=str(archive["fingerprint"]),
+                sources=archive["sources"].astype(np.int32),
+                owner=archive["owner"].astype(np.int32),
+                costs=archive["costs"].astype(np.float64),
+                distances=archive["distances"].astype(np.float64),
+                times=archive["times"].astype(np.float64),
+                next_edge=archive["next_edge"].astype(np.int32),
+            )
+
+
+def build_graph_voronoi(
+    graph: CompactGraph,
+    sources: Sequence[NodeId],
+    *,
+    strategy: WeightStrategy | str = WeightStrategy.TIME,
+    allowed_modes: Optional[Sequence[str] | str] = None,
+) -> GraphVoronoi:
+    """Partition ``graph`` by nearest source with one multi-source Dijkstra.
+
+    The search starts from every source at cost zero and follows incoming edges,
+    so each settled node learns the cost of its own path *to* the closest source.
+    Sources missing from the graph are ignored.
+    """
+
+    strategy = WeightStrategy(strategy)
+    allowed_mask = graph.mode_mask(allowed_modes)
+    dense_sources = _dense_sources(graph, sources)
+    size = len(graph)
+    costs = [inf] * size
+    distances = [inf] * size
+    times = [inf] * size
+    owner = [-1] * size
+    next_edge = [-1] * size
+
+    weights = graph.weights(strategy)
+    edge_distances = graph.distances
+    edge_times = graph.times
+    mode_masks = graph.mode_masks
+    reverse = graph.reverse
+    offsets, tails, edge_ids = reverse.offsets, reverse.sources, reverse.edges
+    settled = bytearray(size)
+    queue: List[Tuple[float, int]] = []
+    for label, source in enumerate(dense_sources.tolist()):
+        costs[source] = distances[source] = times[source] = 0.0
+        owner[source] = label
+        queue.append((0.0, source))
+
+    while queue:
+        cost, node = heappop(queue)
+        if settled[node]:
+            continue
+        settled[node] = 1
+        for position in range(offsets[node], offsets[node + 1]):
+            edge = edge_ids[position]
+            if not mode_masks[edge] & allowed_mask:
+                continue
+            tail = tails[position]
+            new_cost = cost + weights[edge]
+            if new_cost < costs[tail]:
+                costs[tail] = new_cost
+                distances[tail] = distances[node] + edge_distances[edge]
+                times[tail] = times[node] + edge_times[edge]
+                owner[tail] = owner[node]
+                next_edge[tail] = edge
+                heappush(queue, (new_cost, tail))
+
+    return GraphVoronoi(
+        strategy=strategy,
+        mode_mask=allowed_mask,
+        fingerprint=graph.fingerprint_for(strategy),
+        sources=dense_sources,
+        owner=np.asarray(owner, dtype=np.int32),
+        costs=np.asarray(costs, dtype=np.float64),
+        distances=np.asarray(distances, dtype=np.float64),
+        times=np.asarray(times, dtype=np.float64),
+        next_edge=np.asarray(next_edge, dtype=np.int32),
+    )
+
+
+def _dense_sources(graph: CompactGraph, sources: Sequence[NodeId]) -> np.ndarray:
+    dense = {graph.index[source] for source in sources if source in graph.index}
+    return np.asarray(sorted(dense), dtype=np.int32)
@@ -14,8 +14,24 @@ from app.repositories import FacilityRepository, GraphRepository, RegionReposito
 from app.repositories.diaries import DiaryRepository
 from app.repositories.session import get_session
 from app.repositories.users import UserRepository
-from app.services import FacilityService, RecommendationService, RoutingService, SearchService
+from app.services import (
+    FacilityIndexStore,
+    FacilityService,
+    LiveCongestionIngestor,
+    RecommendationService,
+    RegionGraphStore,
+    RouteCache,
+    RoutingService,
+    SearchService,
+    ShortestPathTreeCache,
+    get_facility_index_store,
+    get_live_congestion_ingestor,
+    get_region_graph_store,
+    get_route_cache,
+    get_tree_cache,
+)
 from app.services.diary import DiaryService
+from app.services.executors import ComputeExecutor, get_compute_executor, get_tour_process_pool
 from app.services.map_data import MapDataService
 
 
@@ -45,25 +61,85 @@ async def get_recommendation_service(
     return RecommendationService(repository)
 
 
+def get_graph_store() -> RegionGraphStore:
+    """Provide the process-wide :class:`~app.services.graph_store.RegionGraphStore`."""
+
+    return get_region_graph_store()
+
+
+def get_route_plan_cache() -> RouteCache:
+    """Provide the process-wide :class:`~app.services.route_cache.RouteCache`."""
+
+    return get_route_cache()
+
+
+def get_path_tree_cache() -> ShortestPathTreeCache:
+    """Provide the process-wide :class:`~app.services.tree_cache.ShortestPathTreeCache`."""
+
+    return get_tree_cache()
+
+
+def get_facility_indexes() -> FacilityIndexStore:
+    """Provide the process-wide :class:`~app.services.facility_index.FacilityIndexStore`."""
+
+    return get_facility_index_store()
+
+
+def get_congestion_ingestor() -> LiveCongestionIngestor:
+    """Provide the process-wide :class:`~app.services.live_congestion.LiveCongestionIngestor`."""
+
+    return get_live_congestion_ingestor()
+
+
+def get_executor() -> ComputeExecutor:
+    """Provide the process-wide :class:`~app.services.executors.ComputeExecutor`."""
+
+    return get_compute_executor()
+
+
 async def get_routing_service(
     session: AsyncSession = Depends(get_db_session),
+    graph_store: RegionGraphStore = Depends(get_graph_store),
+    executor: ComputeExecutor = Depends(get_executor),
+    route_cache: RouteCache = Depends(get_route_plan_cache),
+    tree_cache: ShortestPathTreeCache = Depends(get_path_tree_cache),
 ) -> RoutingService:
     """Provide a :class:`~app.services.routing.RoutingService` instance."""
 
     graph_repository = GraphRepository(session)
     region_repository = RegionRepository(session)
-    return RoutingService(graph_repository, region_repository)
+    return RoutingService(
+        graph_repository,
+        region_repository,
+        graph_store,
+        get_tour_process_pool(),
+        compute_executor=executor,
+        route_cache=route_cache,
+        tree_cache=tree_cache,
+    )
 
 
 async def get_facility_service(
     session: AsyncSession = Depends(get_db_session),
+    graph_store: RegionGraphStore = Depends(get_graph_store),
+    executor: ComputeExecutor = Depends(get_executor),
+    tree_cache: ShortestPathTreeCache = Depends(get_path_tree_cache),
+    facility_index: FacilityIndexStore = Depends(get_facility_indexes),
 ) -> FacilityService:
     """Provide a :class:`~app.services.facility.FacilityService` instance."""
 
     facility_repository = FacilityRepository(session)
     graph_repository = GraphRepository(session)
     region_repository = RegionRepository(session)
-    return FacilityService(facility_repository, graph_repository, region_repository)
+    return FacilityService(
+        facility_repository,
+        graph_repository,
+        region_repository,
+        graph_store,
+        compute_executor=executor,
+        tree_cache=tree_cache,
+        facility_index=facility_index,
+    )
 
 
 async def get_map_data_service(
@@ -107,6 +183,7 @@ __all__ = [
     "get_db_session",
     "get_user_repository",
     "get_recommendation_service",
+    "get_graph_store",
     "get_routing_service",
     "get_facility_service",
     "get_map_data_service",
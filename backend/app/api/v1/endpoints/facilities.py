@@ -10,7 +10,13 @@ from app.api import deps
 from app.algorithms import WeightStrategy
 from app.models.enums import FacilityCategory, TransportMode
 from app.schemas import FacilityRouteItem, FacilityRouteResponse
-from app.services import FacilityRoute, FacilityService, NodeValidationError, RegionNotFoundError
+from app.services import (
+    ExecutorSaturatedError,
+    FacilityRoute,
+    FacilityService,
+    NodeValidationError,
+    RegionNotFoundError,
+)
 
 router = APIRouter(prefix="/facilities", tags=["facilities"])
 
@@ -46,6 +52,8 @@ async def list_nearby_facilities(
         raise HTTPException(status_code=404, detail=str(exc)) from exc
     except NodeValidationError as exc:
         raise HTTPException(status_code=400, detail=str(exc)) from exc
+    except ExecutorSaturatedError as exc:
+        raise HTTPException(status_code=503, detail=str(exc), headers={"Retry-After": "1"}) from exc
 
     return FacilityRouteResponse(
         region_id=region_id,
@@ -3,14 +3,50 @@
 from __future__ import annotations
 
 from datetime import datetime, timezone
+from math import isfinite
 from typing import List
 
+import numpy as np
 from fastapi import APIRouter, Depends, HTTPException, Query
 
 from app.api import deps
-from app.algorithms import WeightStrategy
-from app.services import NodeValidationError, RegionNotFoundError, RouteNotFoundError, RoutingService
-from app.schemas import RoutePlanResponse, RouteSegment, RouteNode
+from app.models.users import User
+from app.algorithms import SearchAlgorithm, WeightStrategy
+from app.services import (
+    ComputeExecutor,
+    ExecutorSaturatedError,
+    FacilityIndexStore,
+    LiveCongestionIngestor,
+    NodeValidationError,
+    RegionGraphStore,
+    RegionNotFoundError,
+    RouteNotFoundError,
+    RoutePlan,
+    RouteCache,
+    RouteQuery,
+    RoutingService,
+    ShortestPathTreeCache,
+)
+from app.schemas import (
+    AlternativeRoutesResponse,
+    CongestionUpdateRequest,
+    CongestionUpdateResponse,
+    DistanceMatrixRequest,
+    DistanceMatrixResponse,
+    GeoJSONPolygon,
+    IsochroneBand,
+    IsochroneNode,
+    IsochroneResponse,
+    RouteBatchItem,
+    RouteBatchRequest,
+    RouteBatchResponse,
+    RoutePlanResponse,
+    RouteSegment,
+    RouteNode,
+    TourPlanRequest,
+    TourPlanResponse,
+)
+from app.schemas.routing import MAX_ALTERNATIVE_ROUTES, MAX_ISOCHRONE_BANDS
 
 router = APIRouter(prefix="/routing", tags=["routing"])
 
@@ -26,6 +62,14 @@ async def compute_route(
         None,
         description="Optional list of desired transport modes (walk, bike, electric_cart)",
     ),
+    algorithm: SearchAlgorithm = Query(SearchAlgorithm.ASTAR, description="Search algorithm"),
+    departure_time: datetime | None = Query(
+        None,
+        description=(
+            "Departure time; with congestion profiles the route follows the congestion "
+            "at that time of day"
+        ),
+    ),
     service: RoutingService = Depends(deps.get_routing_service),
 ) -> RoutePlanResponse:
     try:
@@ -35,6 +79,8 @@ async def compute_route(
             end_node_id=end_node_id,
             strategy=strategy,
             transport_modes=transport_modes,
+            algorithm=algorithm,
+            departure_time=departure_time,
         )
     except RegionNotFoundError as exc:
         raise HTTPException(status_code=404, detail=str(exc)) from exc
@@ -42,15 +88,331 @@ async def compute_route(
         raise HTTPException(status_code=400, detail=str(exc)) from exc
     except RouteNotFoundError as exc:
         raise HTTPException(status_code=404, detail=str(exc)) from exc
+    except ExecutorSaturatedError as exc:
+        raise HTTPException(status_code=503, detail=str(exc), headers={"Retry-After": "1"}) from exc
+
+    return _to_route_plan_response(plan, datetime.now(timezone.utc))
+
+
+@router.get("/routes/alternatives", response_model=AlternativeRoutesResponse)
+async def compute_alternative_routes(
+    *,
+    region_id: int = Query(..., description="Region identifier containing the graph"),
+    start_node_id: int = Query(..., description="Starting graph node identifier"),
+    end_node_id: int = Query(..., description="Destination graph node identifier"),
+    strategy: WeightStrategy = Query(WeightStrategy.TIME, description="Optimisation strategy"),
+    transport_modes: List[str] | None = Query(
+        None,
+        description="Optional list of desired transport modes (walk, bike, electric_cart)",
+    ),
+    k: int = Query(3, ge=1, le=MAX_ALTERNATIVE_ROUTES, description="Maximum number of routes"),
+    max_overlap: float = Query(
+        0.7,
+        ge=0.0,
+        le=1.0,
+        description="Largest share of a route's cost it may have in common with a shorter one",
+    ),
+    service: RoutingService = Depends(deps.get_routing_service),
+) -> AlternativeRoutesResponse:
+    """The shortest route plus up to ``k - 1`` sufficiently different alternatives."""
+
+    try:
+        plans = await service.compute_alternative_routes(
+            region_id=region_id,
+            start_node_id=start_node_id,
+            end_node_id=end_node_id,
+            strategy=strategy,
+            transport_modes=transport_modes,
+            k=k,
+            max_overlap=max_overlap,
+        )
+    except RegionNotFoundError as exc:
+        raise HTTPException(status_code=404, detail=str(exc)) from exc
+    except NodeValidationError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    except RouteNotFoundError as exc:
+        raise HTTPException(status_code=404, detail=str(exc)) from exc
+    except ExecutorSaturatedError as exc:
+        raise HTTPException(status_code=503, detail=str(exc), headers={"Retry-After": "1"}) from exc
 
     generated_at = datetime.now(timezone.utc)
+    return AlternativeRoutesResponse(
+        region_id=region_id,
+        routes=[_to_route_plan_response(plan, generated_at) for plan in plans],
+        generated_at=generated_at,
+    )
+
+
+@router.post("/routes:batch", response_model=RouteBatchResponse)
+async def compute_routes_batch(
+    payload: RouteBatchRequest,
+    service: RoutingService = Depends(deps.get_routing_service),
+) -> RouteBatchResponse:
+    """Several routes of one region at once; queries sharing a start node share one search."""
+
+    try:
+        outcomes = await service.compute_routes_batch(
+            region_id=payload.region_id,
+            queries=[
+                RouteQuery(
+                    start_node_id=query.start_node_id,
+                    end_node_id=query.end_node_id,
+                    strategy=query.strategy,
+                    transport_modes=query.transport_modes,
+                )
+                for query in payload.queries
+            ],
+        )
+    except RegionNotFoundError as exc:
+        raise HTTPException(status_code=404, detail=str(exc)) from exc
+    except ExecutorSaturatedError as exc:
+        raise HTTPException(status_code=503, detail=str(exc), headers={"Retry-After": "1"}) from exc
+
+    generated_at = datetime.now(timezone.utc)
+    results: list[RouteBatchItem] = []
+    for index, outcome in enumerate(outcomes):
+        if isinstance(outcome, RoutePlan):
+            results.append(
+                RouteBatchItem(
+                    index=index, status=200, route=_to_route_plan_response(outcome, generated_at)
+                )
+            )
+        else:
+            status = 400 if isinstance(outcome, NodeValidationError) else 404
+            results.append(RouteBatchItem(index=index, status=status, error=str(outcome)))
+    return RouteBatchResponse(
+        region_id=payload.region_id, results=results, generated_at=generated_at
+    )
+
+
+@router.post("/tours", response_model=TourPlanResponse)
+async def compute_tour_plan(
+    payload: TourPlanRequest,
+    service: RoutingService = Depends(deps.get_routing_service),
+) -> TourPlanResponse:
+    """Round trip from the start node visiting every target node once."""
+
+    try:
+        plan = await service.compute_tour_plan(
+            region_id=payload.region_id,
+            start_node_id=payload.start_node_id,
+            target_node_ids=payload.target_node_ids,
+            strategy=payload.strategy,
+            transport_modes=payload.transport_modes,
+            time_budget=(
+                payload.time_budget_ms / 1000 if payload.time_budget_ms is not None else None
+            ),
+        )
+    except RegionNotFoundError as exc:
+        raise HTTPException(status_code=404, detail=str(exc)) from exc
+    except NodeValidationError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    except RouteNotFoundError as exc:
+        raise HTTPException(status_code=404, detail=str(exc)) from exc
+    except ExecutorSaturatedError as exc:
+        raise HTTPException(status_code=503, detail=str(exc), headers={"Retry-After": "1"}) from exc
+
+    generated_at = datetime.now(timezone.utc)
+    return TourPlanResponse(
+        region_id=plan.region_id,
+        strategy=plan.strategy,
+        total_distance=plan.total_distance,
+        total_time=plan.total_time,
+        route=plan.route,
+        legs=[_to_route_plan_response(leg, generated_at) for leg in plan.legs],
+        allowed_transport_modes=list(plan.allowed_modes),
+        solver=plan.solver,
+        solver_seconds=plan.solver_seconds,
+        generated_at=generated_at,
+    )
+
+
+@router.post("/matrix", response_model=DistanceMatrixResponse)
+async def compute_distance_matrix(
+    payload: DistanceMatrixRequest,
+    service: RoutingService = Depends(deps.get_routing_service),
+) -> DistanceMatrixResponse:
+    """Shortest-path costs between every source and target node of a region."""
+
+    try:
+        plan = await service.compute_distance_matrix(
+            region_id=payload.region_id,
+            source_node_ids=payload.sources,
+            target_node_ids=payload.targets,
+            strategy=payload.strategy,
+            transport_modes=payload.transport_modes,
+        )
+    except RegionNotFoundError as exc:
+        raise HTTPException(status_code=404, detail=str(exc)) from exc
+    except NodeValidationError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    except ExecutorSaturatedError as exc:
+        raise HTTPException(status_code=503, detail=str(exc), headers={"Retry-After": "1"}) from exc
+
+    matrix = plan.matrix
+    paths = None
+    if payload.include_paths:
+        paths = [
+            [plan.path_node_ids(row, column) for column in range(len(plan.target_ids))]
+            for row in range(len(plan.source_ids))
+        ]
+    return DistanceMatrixResponse(
+        region_id=plan.region_id,
+        strategy=plan.strategy,
+        sources=plan.source_ids,
+        targets=plan.target_ids,
+        costs=_matrix_rows(matrix.costs),
+        distances=_matrix_rows(matrix.distances),
+        times=_matrix_rows(matrix.times),
+        paths=paths,
+        allowed_transport_modes=list(plan.allowed_modes),
+        expanded_nodes=matrix.expanded_nodes,
+        generated_at=datetime.now(timezone.utc),
+    )
+
+
+@router.get("/isochrones", response_model=IsochroneResponse)
+async def compute_isochrone(
+    *,
+    region_id: int = Query(..., description="Region identifier containing the graph"),
+    origin_node_id: int = Query(..., description="Origin graph node identifier"),
+    budgets: List[float] = Query(
+        ...,
+        description=(
+            "Budgets in minutes (time strategy) or meters (distance strategy), e.g. 5, 10, 15"
+        ),
+    ),
+    strategy: WeightStrategy = Query(WeightStrategy.TIME, description="Optimisation strategy"),
+    transport_modes: List[str] | None = Query(
+        None,
+        description="Optional list of desired transport modes (walk, bike, electric_cart)",
+    ),
+    include_polygons: bool = Query(
+        False, description="Outline every budget band with a GeoJSON polygon"
+    ),
+    service: RoutingService = Depends(deps.get_routing_service),
+) -> IsochroneResponse:
+    """Nodes reachable from the origin within each budget, without paths."""
+
+    if not budgets or len(budgets) > MAX_ISOCHRONE_BANDS or min(budgets) <= 0:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Provide between 1 and {MAX_ISOCHRONE_BANDS} positive budgets",
+        )
+    # 时间策略下预算以分钟传入，图中的边时间单位为秒
+    scale = 60.0 if strategy is WeightStrategy.TIME else 1.0
+    try:
+        plan = await service.compute_isochrone(
+            region_id=region_id,
+            origin_node_id=origin_node_id,
+            budgets=[budget * scale for budget in budgets],
+            strategy=strategy,
+            transport_modes=transport_modes,
+            include_polygons=include_polygons,
+        )
+    except RegionNotFoundError as exc:
+        raise HTTPException(status_code=404, detail=str(exc)) from exc
+    except NodeValidationError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    except RouteNotFoundError as exc:
+        raise HTTPException(status_code=404, detail=str(exc)) from exc
+    except ExecutorSaturatedError as exc:
+        raise HTTPException(status_code=503, detail=str(exc), headers={"Retry-After": "1"}) from exc
+
+    isochrone = plan.isochrone
+    counts = np.bincount(isochrone.bands, minlength=len(isochrone.budgets)).cumsum().tolist()
+    bands = []
+    for band, budget in enumerate(isochrone.budgets):
+        ring = isochrone.polygons[band] if isochrone.polygons else None
+        polygon = GeoJSONPolygon(coordinates=[[list(point) for point in ring]]) if ring else None
+        bands.append(IsochroneBand(budget=budget / scale, node_count=counts[band], polygon=polygon))
+    return IsochroneResponse(
+        region_id=plan.region_id,
+        origin_node_id=plan.origin_node_id,
+        strategy=plan.strategy,
+        unit="minutes" if strategy is WeightStrategy.TIME else "meters",
+        bands=bands,
+        nodes=[
+            IsochroneNode(node_id=node_id, cost=cost / scale, band=band)
+            for node_id, cost, band in zip(
+                plan.node_ids, isochrone.costs.tolist(), isochrone.bands.tolist()
+            )
+        ],
+        allowed_transport_modes=list(plan.allowed_modes),
+        expanded_nodes=isochrone.expanded_nodes,
+        generated_at=datetime.now(timezone.utc),
+    )
+
+
+@router.post("/congestion", response_model=CongestionUpdateResponse)
+async def update_congestion(
+    payload: CongestionUpdateRequest,
+    ingestor: LiveCongestionIngestor = Depends(deps.get_congestion_ingestor),
+    current_user: User = Depends(deps.get_current_user),
+) -> CongestionUpdateResponse:
+    """Apply live congestion factors to a region graph without reloading it.
+
+    Later updates of an edge win. Restricted to superusers (e.g. the account of
+    the traffic feed). The factors live in the memory of the worker process that
+    handles the request; with several uvicorn workers the other workers do not
+    see them, so feeds should publish to every worker (or run
+    ``LiveCongestionIngestor.consume`` in each).
+    """
+
+    if not current_user.is_superuser:
+        raise HTTPException(status_code=403, detail="Only superusers may update live congestion")
+    result = ingestor.apply(
+        payload.region_id, {item.edge_id: item.congestion for item in payload.updates}
+    )
+    return CongestionUpdateResponse(
+        region_id=result.region_id,
+        version=result.version,
+        loaded=result.loaded,
+        applied=result.applied,
+        ignored_edge_ids=result.ignored_edge_ids,
+        routes_invalidated=result.routes_invalidated,
+        trees_invalidated=result.trees_invalidated,
+    )
+
+
+@router.get("/stats", summary="Routing cache statistics", response_model=dict)
+async def read_routing_stats(
+    graph_store: RegionGraphStore = Depends(deps.get_graph_store),
+    executor: ComputeExecutor = Depends(deps.get_executor),
+    route_cache: RouteCache = Depends(deps.get_route_plan_cache),
+    tree_cache: ShortestPathTreeCache = Depends(deps.get_path_tree_cache),
+    facility_index: FacilityIndexStore = Depends(deps.get_facility_indexes),
+    congestion: LiveCongestionIngestor = Depends(deps.get_congestion_ingestor),
+) -> dict[str, dict[str, float | str]]:
+    """Counters of the graph store, route/tree/facility caches, live congestion and executor."""
+
+    return {
+        "graph_store": graph_store.stats().as_dict(),
+        "route_cache": route_cache.stats().as_dict(),
+        "tree_cache": tree_cache.stats().as_dict(),
+        "facility_index": facility_index.stats().as_dict(),
+        "live_congestion": congestion.stats().as_dict(),
+        "executor": executor.stats().as_dict(),
+    }
+
+
+def _to_route_plan_response(plan: RoutePlan, generated_at: datetime) -> RoutePlanResponse:
     return RoutePlanResponse(
         region_id=plan.region_id,
         strategy=plan.strategy,
         total_distance=plan.total_distance,
         total_time=plan.total_time,
-    nodes=[RouteNode.model_validate(node) for node in plan.nodes],
-    segments=[RouteSegment.model_validate(segment) for segment in plan.segments],
+        nodes=[RouteNode.model_validate(node) for node in plan.nodes],
+        segments=[RouteSegment.model_validate(segment) for segment in plan.segments],
         generated_at=generated_at,
         allowed_transport_modes=list(plan.allowed_modes),
+        expanded_nodes=plan.expanded_nodes,
+        algorithm=plan.algorithm,
+        departure_time=plan.departure_time,
+        cached=plan.cached,
     )
+
+
+def _matrix_rows(values: np.ndarray) -> list[list[float | None]]:
+    # JSON 无法表示 inf，不可达的单元格以 null 返回
+    return [[value if isfinite(value) else None for value in row] for row in values.tolist()]
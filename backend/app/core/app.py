@@ -36,6 +36,12 @@ def create_app() -> FastAPI:
         # Start scheduled task service in background
         asyncio.create_task(scheduled_service.start())
 
+    @app.on_event("shutdown")
+    async def _stop_executors() -> None:
+        from ..services.executors import shutdown_executors
+
+        shutdown_executors()
+
     app.include_router(get_api_router(), prefix=settings.api_prefix)
 
     return app
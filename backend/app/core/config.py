@@ -22,6 +22,35 @@ class Settings(BaseSettings):
         "http://localhost:5173",
         "http://127.0.0.1:5173",
     ]
+    routing_landmark_count: int = 8  # ALT 地标数量，内存约为 2 × 地标数 × 节点数 × 8 字节
+    routing_tour_time_budget: float = 0.5  # 多点游览路线优化的时间预算（秒）
+    routing_tour_exact_threshold: int = 12  # 目标点不超过该数量时使用 Held-Karp 精确求解
+    routing_tour_starts: int = 8  # 启发式求解时的多起点数量（1 表示只用贪心起点）
+    # 多起点优化的进程数；None 按 CPU 核数自动选择，0 不启用进程池
+    routing_tour_workers: int | None = None
+    # 路径搜索的执行方式：thread / process / inline；
+    # process 模式每次调用都要 pickle 整张区域图传给子进程，只适合小图上的长时间搜索
+    routing_executor: str = "thread"
+    routing_executor_workers: int = 4  # 同时执行的路径搜索数量
+    routing_executor_queue: int = 32  # 排队上限，超出后直接返回 503，避免拖慢其他接口
+    routing_route_cache_size: int = 1024  # 进程内路线结果 LRU 缓存条数，0 表示关闭
+    routing_route_cache_redis: bool = False  # 是否通过 Redis 在多个 worker 间共享路线结果
+    routing_route_cache_ttl: int = 600  # Redis 中路线结果的过期时间（秒）
+    routing_tree_cache_bytes: int = 64 * 1024 * 1024  # 最短路树缓存的内存上限（字节），0 表示关闭
+    # 同一起点请求达到该次数后，点到点查询也改为构建并缓存整棵最短路树
+    routing_tree_hot_threshold: int = 3
+    routing_isochrone_concavity: int = 3  # 等时圈凹包的近邻数，越小轮廓越贴合
+    routing_alternative_max_stretch: float = 1.4  # 备选路线的代价最多为最优路线的倍数
+    # 多交通方式路线：各方式相对路段理想速度的倍数，以及换乘代价（秒，键为 "原方式>新方式"）
+    routing_mode_speed_factors: dict[str, float] = {"walk": 1.0, "bike": 2.5, "electric_cart": 3.0}
+    routing_mode_transfer_penalties: dict[str, float] = {
+        "walk>bike": 60.0,
+        "bike>walk": 60.0,
+        "walk>electric_cart": 180.0,
+        "electric_cart>walk": 30.0,
+        "bike>electric_cart": 240.0,
+        "electric_cart>bike": 90.0,
+    }
     jwt_secret_key: str = "change-me"
     jwt_algorithm: str = "HS256"
     access_token_expire_minutes: int = 30
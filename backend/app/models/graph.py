@@ -58,6 +58,11 @@ class GraphEdge(TimestampMixin, BaseModel, table=True):
         default_factory=list,
         sa_column=Column(JSON, nullable=False, default=list),
     )
+    # 96 个 15 分钟时段的拥挤系数（含义同 congestion）；为空时全天使用 congestion
+    congestion_profile: Optional[List[float]] = Field(
+        default=None,
+        sa_column=Column(JSON, nullable=True),
+    )
 
     start_node: GraphNode = Relationship(
         sa_relationship=relationship(
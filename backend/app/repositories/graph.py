@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+import hashlib
 from collections.abc import Iterable, Sequence
 
 from sqlalchemy import func, or_
@@ -56,6 +57,39 @@ class GraphRepository:
         result = await self._session.execute(statement)
         return list(result.scalars().all())
 
+    async def graph_signature(self, region_id: int) -> str:
+        """Digest of the region's node and edge rows, computed by two aggregate queries.
+
+        It covers row counts, ids, endpoints, coordinates, weights (each weighted
+        by the row id so swapped values still change the sums) and the latest
+        ``updated_at``. Graph snapshots record it to detect that the database
+        changed since they were written, without loading any rows.
+        """
+
+        nodes = await self._session.execute(
+            select(
+                func.count(GraphNode.id),
+                func.sum(GraphNode.id),
+                func.sum(GraphNode.id * GraphNode.latitude),
+                func.sum(GraphNode.id * GraphNode.longitude),
+                func.max(GraphNode.updated_at),
+            ).where(GraphNode.region_id == region_id)
+        )
+        edges = await self._session.execute(
+            select(
+                func.count(GraphEdge.id),
+                func.sum(GraphEdge.id),
+                func.sum(GraphEdge.id * GraphEdge.start_node_id),
+                func.sum(GraphEdge.id * GraphEdge.end_node_id),
+                func.sum(GraphEdge.id * GraphEdge.distance),
+                func.sum(GraphEdge.id * GraphEdge.ideal_speed),
+                func.sum(GraphEdge.id * GraphEdge.congestion),
+                func.max(GraphEdge.updated_at),
+            ).where(GraphEdge.region_id == region_id)
+        )
+        values = (tuple(nodes.one()), tuple(edges.one()))
+        return hashlib.blake2b(repr(values).encode("utf-8"), digest_size=16).hexdigest()
+
     async def search_nodes(
         self,
         region_id: int,
@@ -92,11 +126,33 @@ class GraphRepository:
         return [(node, building, facility) for node, building, facility in result.all()]
 
     async def upsert_nodes(self, nodes: Iterable[GraphNode]) -> None:
+        region_ids: set[int] = set()
         for node in nodes:
             self._session.add(node)
+            region_ids.add(node.region_id)
         await self._session.commit()
+        _invalidate_region_graphs(region_ids)
 
     async def upsert_edges(self, edges: Iterable[GraphEdge]) -> None:
+        region_ids: set[int] = set()
         for edge in edges:
             self._session.add(edge)
+            region_ids.add(edge.region_id)
         await self._session.commit()
+        _invalidate_region_graphs(region_ids)
+
+
+def _invalidate_region_graphs(region_ids: Iterable[int]) -> None:
+    """Drop compiled graphs, cached routes, trees and facility partitions of changed regions."""
+
+    # 延迟导入，避免 services -> repositories 的循环依赖
+    from app.services.facility_index import facility_index_store
+    from app.services.graph_store import region_graph_store
+    from app.services.route_cache import route_cache
+    from app.services.tree_cache import tree_cache
+
+    for region_id in region_ids:
+        region_graph_store.invalidate(region_id)
+        route_cache.invalidate(region_id)
+        tree_cache.invalidate(region_id)
+        facility_index_store.invalidate(region_id)
@@ -1,7 +1,27 @@
 """Schema definitions for external communication."""
 
 from .recommendation import RegionRecommendationItem, RegionRecommendationResponse, RegionSummary
-from .routing import RouteNode, RoutePlanResponse, RouteSegment
+from .routing import (
+	AlternativeRoutesResponse,
+	CongestionUpdateItem,
+	CongestionUpdateRequest,
+	CongestionUpdateResponse,
+	DistanceMatrixRequest,
+	DistanceMatrixResponse,
+	GeoJSONPolygon,
+	IsochroneBand,
+	IsochroneNode,
+	IsochroneResponse,
+	RouteBatchItem,
+	RouteBatchRequest,
+	RouteBatchResponse,
+	RouteNode,
+	RoutePlanResponse,
+	RouteQueryItem,
+	RouteSegment,
+	TourPlanRequest,
+	TourPlanResponse,
+)
 from .facility import FacilityRouteItem, FacilityRouteResponse
 from .search import (
 	RegionNodeSearchResponse,
@@ -39,6 +59,22 @@ __all__ = [
 	"FacilityRouteItem",
 	"FacilityRouteResponse",
 	"RoutePlanResponse",
+	"AlternativeRoutesResponse",
+	"CongestionUpdateItem",
+	"CongestionUpdateRequest",
+	"CongestionUpdateResponse",
+	"DistanceMatrixRequest",
+	"DistanceMatrixResponse",
+	"RouteBatchItem",
+	"RouteBatchRequest",
+	"RouteBatchResponse",
+	"RouteQueryItem",
+	"GeoJSONPolygon",
+	"IsochroneBand",
+	"IsochroneNode",
+	"IsochroneResponse",
+	"TourPlanRequest",
+	"TourPlanResponse",
 	"RouteNode",
 	"RouteSegment",
 	"RegionSearchResult",
@@ -3,11 +3,11 @@
 from __future__ import annotations
 
 from datetime import datetime
-from typing import List
+from typing import List, Literal
 
 from pydantic import BaseModel, ConfigDict, Field, field_serializer
 
-from app.algorithms import WeightStrategy
+from app.algorithms import SearchAlgorithm, TourSolver, WeightStrategy
 
 
 class RouteNode(BaseModel):
@@ -38,9 +38,204 @@ class RoutePlanResponse(BaseModel):
     segments: List[RouteSegment]
     generated_at: datetime
     allowed_transport_modes: List[str]
+    expanded_nodes: int = Field(default=0, ge=0, description="Nodes settled by the search")
+    algorithm: SearchAlgorithm = SearchAlgorithm.ASTAR
+    departure_time: datetime | None = Field(
+        default=None,
+        description="Departure the segment times were evaluated for, when time-dependent",
+    )
+    cached: bool = Field(
+        default=False,
+        description=(
+            "Served from the route cache; algorithm then names the original search "
+            "and no nodes were expanded"
+        ),
+    )
 
     model_config = ConfigDict(from_attributes=True)
 
     @field_serializer("strategy")
     def _serialise_strategy(self, strategy: WeightStrategy) -> str:
         return strategy.value
+
+    @field_serializer("algorithm")
+    def _serialise_algorithm(self, algorithm: SearchAlgorithm) -> str:
+        return algorithm.value
+
+
+MAX_BATCH_ROUTES = 100
+
+
+class RouteQueryItem(BaseModel):
+    start_node_id: int
+    end_node_id: int
+    strategy: WeightStrategy = WeightStrategy.TIME
+    transport_modes: List[str] | None = None
+
+
+class RouteBatchRequest(BaseModel):
+    region_id: int
+    queries: List[RouteQueryItem] = Field(min_length=1, max_length=MAX_BATCH_ROUTES)
+
+
+class RouteBatchItem(BaseModel):
+    index: int = Field(ge=0, description="Position of the query in the request")
+    status: int = Field(description="HTTP-style status of this item (200, 400 or 404)")
+    route: RoutePlanResponse | None = None
+    error: str | None = None
+
+
+class RouteBatchResponse(BaseModel):
+    region_id: int
+    results: List[RouteBatchItem]
+    generated_at: datetime
+
+
+MAX_CONGESTION_UPDATES = 10000
+
+
+class CongestionUpdateItem(BaseModel):
+    edge_id: int
+    congestion: float = Field(gt=0, le=1, description="Congestion factor, 1 meaning free flow")
+
+
+class CongestionUpdateRequest(BaseModel):
+    region_id: int
+    updates: List[CongestionUpdateItem] = Field(min_length=1, max_length=MAX_CONGESTION_UPDATES)
+
+
+class CongestionUpdateResponse(BaseModel):
+    region_id: int
+    version: int = Field(description="Graph version after the update")
+    loaded: bool = Field(
+        description="Whether the region graph is loaded; otherwise updates apply on load"
+    )
+    applied: int = Field(ge=0, description="Edges whose travel time changed")
+    ignored_edge_ids: List[int] = Field(
+        default_factory=list, description="Edges not found in the region"
+    )
+    routes_invalidated: int = Field(ge=0)
+    trees_invalidated: int = Field(ge=0)
+
+
+MAX_ALTERNATIVE_ROUTES = 5
+
+
+class AlternativeRoutesResponse(BaseModel):
+    region_id: int
+    routes: List[RoutePlanResponse] = Field(description="Distinct routes, the shortest first")
+    generated_at: datetime
+
+
+MAX_TOUR_TARGETS = 30
+
+
+class TourPlanRequest(BaseModel):
+    region_id: int
+    start_node_id: int
+    target_node_ids: List[int] = Field(min_length=1, max_length=MAX_TOUR_TARGETS)
+    strategy: WeightStrategy = WeightStrategy.TIME
+    transport_modes: List[str] | None = None
+    time_budget_ms: int | None = Field(
+        default=None,
+        ge=10,
+        le=5000,
+        description="Upper bound on optimisation time; defaults to the server setting",
+    )
+
+
+class TourPlanResponse(BaseModel):
+    region_id: int
+    strategy: WeightStrategy
+    total_distance: float = Field(ge=0)
+    total_time: float = Field(ge=0)
+    route: List[int] = Field(description="Visiting order, starting and ending at the start node")
+    legs: List[RoutePlanResponse]
+    allowed_transport_modes: List[str]
+    solver: TourSolver = Field(description="held_karp (exact) or local_search (heuristic)")
+    solver_seconds: float = Field(ge=0, description="Time spent ordering the stops")
+    generated_at: datetime
+
+    @field_serializer("strategy")
+    def _serialise_strategy(self, strategy: WeightStrategy) -> str:
+        return strategy.value
+
+    @field_serializer("solver")
+    def _serialise_solver(self, solver: TourSolver) -> str:
+        return solver.value
+
+
+MAX_MATRIX_NODES = 100
+
+
+class DistanceMatrixRequest(BaseModel):
+    region_id: int
+    sources: List[int] = Field(min_length=1, max_length=MAX_MATRIX_NODES)
+    targets: List[int] | None = Field(
+        default=None,
+        max_length=MAX_MATRIX_NODES,
+        description="Destination node ids; defaults to the sources (square matrix)",
+    )
+    strategy: WeightStrategy = WeightStrategy.TIME
+    transport_modes: List[str] | None = None
+    include_paths: bool = Field(
+        default=False, description="Also return the node sequence of every cell"
+    )
+
+
+class DistanceMatrixResponse(BaseModel):
+    region_id: int
+    strategy: WeightStrategy
+    sources: List[int]
+    targets: List[int]
+    costs: List[List[float | None]] = Field(
+        description="Optimised cost per cell; null when unreachable"
+    )
+    distances: List[List[float | None]]
+    times: List[List[float | None]]
+    paths: List[List[List[int] | None]] | None = None
+    allowed_transport_modes: List[str]
+    expanded_nodes: int = Field(default=0, ge=0)
+    generated_at: datetime
+
+    @field_serializer("strategy")
+    def _serialise_strategy(self, strategy: WeightStrategy) -> str:
+        return strategy.value
+
+
+MAX_ISOCHRONE_BANDS = 10
+
+
+class IsochroneNode(BaseModel):
+    node_id: int
+    cost: float = Field(description="Cost from the origin, in the unit of the budgets")
+    band: int = Field(ge=0, description="Index of the smallest budget containing the node")
+
+
+class GeoJSONPolygon(BaseModel):
+    type: Literal["Polygon"] = "Polygon"
+    coordinates: List[List[List[float]]] = Field(
+        description="Rings of [longitude, latitude] positions"
+    )
+
+
+class IsochroneBand(BaseModel):
+    budget: float
+    node_count: int = Field(ge=0, description="Nodes reachable within this budget")
+    polygon: GeoJSONPolygon | None = None
+
+
+class IsochroneResponse(BaseModel):
+    region_id: int
+    origin_node_id: int
+    strategy: WeightStrategy
+    unit: Literal["minutes", "meters"]
+    bands: List[IsochroneBand]
+    nodes: List[IsochroneNode]
+    allowed_transport_modes: List[str]
+    expanded_nodes: int = Field(default=0, ge=0)
+    generated_at: datetime
+
+    @field_serializer("strategy")
+    def _serialise_strategy(self, strategy: WeightStrategy) -> str:
+        return strategy.value
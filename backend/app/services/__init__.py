@@ -7,16 +7,53 @@ from .recommendation import (
     RecommendationSort,
     RegionRecommendation,
 )
+from .executors import (
+    ComputeExecutor,
+    ExecutorKind,
+    ExecutorSaturatedError,
+    ExecutorStats,
+    get_compute_executor,
+)
 from .facility import FacilityRoute, FacilityService
+from .facility_index import (
+    FacilityIndexStats,
+    FacilityIndexStore,
+    facility_index_store,
+    get_facility_index_store,
+)
+from .graph_store import (
+    CompiledRegionGraph,
+    CongestionPatch,
+    GraphStoreStats,
+    RegionGraphStore,
+    get_region_graph_store,
+    region_graph_store,
+)
+from .live_congestion import (
+    CongestionDelta,
+    CongestionUpdateResult,
+    LiveCongestionIngestor,
+    LiveCongestionStats,
+    get_live_congestion_ingestor,
+    live_congestion_ingestor,
+)
+from .route_cache import RouteCache, RouteCacheStats, get_route_cache, route_cache
 from .routing import (
+    DistanceMatrixPlan,
+    IsochronePlan,
     NodeValidationError,
+    ReachableNodes,
     RegionNotFoundError,
     RouteNotFoundError,
+    RoutingError,
     RoutePlan,
+    RouteQuery,
     RouteSegment,
     RouteNode,
     RoutingService,
+    TourPlan,
 )
+from .tree_cache import ShortestPathTreeCache, TreeCacheStats, get_tree_cache, tree_cache
 from .map_data import MapDataService
 from .search import SearchService
 
@@ -26,15 +63,50 @@ __all__ = [
     "RecommendationSort",
     "RecommendationResult",
     "RegionRecommendation",
+    "ComputeExecutor",
+    "ExecutorKind",
+    "ExecutorSaturatedError",
+    "ExecutorStats",
+    "get_compute_executor",
     "FacilityService",
     "FacilityRoute",
+    "FacilityIndexStore",
+    "FacilityIndexStats",
+    "facility_index_store",
+    "get_facility_index_store",
+    "RegionGraphStore",
+    "CompiledRegionGraph",
+    "CongestionPatch",
+    "GraphStoreStats",
+    "region_graph_store",
+    "get_region_graph_store",
+    "LiveCongestionIngestor",
+    "LiveCongestionStats",
+    "CongestionDelta",
+    "CongestionUpdateResult",
+    "live_congestion_ingestor",
+    "get_live_congestion_ingestor",
+    "RouteCache",
+    "RouteCacheStats",
+    "route_cache",
+    "get_route_cache",
+    "ShortestPathTreeCache",
+    "TreeCacheStats",
+    "tree_cache",
+    "get_tree_cache",
     "RoutingService",
     "RoutePlan",
+    "RouteQuery",
+    "DistanceMatrixPlan",
+    "IsochronePlan",
+    "ReachableNodes",
+    "TourPlan",
     "RouteNode",
     "RouteSegment",
     "RegionNotFoundError",
     "NodeValidationError",
     "RouteNotFoundError",
+    "RoutingError",
     "MapDataService",
     "SearchService",
 ]
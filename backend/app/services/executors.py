@@ -0,0 +1,184 @@
+"""Executors for CPU-bound work that must stay off the event loop."""
+
+from __future__ import annotations
+
+import asyncio
+import functools
+import logging
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from enum import Enum
+from multiprocessing import resource_tracker
+from typing import Any, Callable, TypeVar
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class ExecutorKind(str, Enum):
+    """Where :class:`ComputeExecutor` runs submitted work."""
+
+    INLINE = "inline"  # 直接在事件循环中执行（测试或调试用）
+    THREAD = "thread"  # 线程池：适合 NumPy 等释放 GIL 的计算
+    PROCESS = "process"  # 进程池：适合纯 Python 计算，参数需可 pickle
+
+
+class ExecutorSaturatedError(RuntimeError):
+    """Raised when the executor queue is full and new work is rejected."""
+
+
+@dataclass(slots=True)
+class ExecutorStats:
+    """Counters describing executor load."""
+
+    kind: str
+    max_workers: int
+    max_queue: int
+    in_flight: int = 0
+    peak_in_flight: int = 0
+    submitted: int = 0
+    completed: int = 0
+    failed: int = 0
+    rejected: int = 0
+
+    def as_dict(self) -> dict[str, int | str]:
+        return asdict(self)
+
+
+class ComputeExecutor:
+    """Dispatch CPU-bound callables to a thread or process pool with bounded queueing.
+
+    At most ``max_workers`` calls run at once and ``max_queue`` more may wait; any
+    call beyond that fails fast with :class:`ExecutorSaturatedError` instead of
+    piling up, so a burst of expensive routing queries cannot grow latency for
+    every other request served by the same event loop.
+    """
+
+    def __init__(
+        self,
+        kind: ExecutorKind | str = ExecutorKind.THREAD,
+        max_workers: int = 4,
+        max_queue: int = 32,
+    ) -> None:
+        self.kind = ExecutorKind(kind)
+        self._max_workers = max(1, max_workers)
+        self._capacity = self._max_workers + max(0, max_queue)
+        self._executor: Executor | None = None
+        self._stats = ExecutorStats(
+            kind=self.kind.value, max_workers=self._max_workers, max_queue=max(0, max_queue)
+        )
+
+    @property
+    def saturated(self) -> bool:
+        return self._stats.in_flight >= self._capacity
+
+    async def run(self, func: Callable[..., T], /, *args: Any, **kwargs: Any) -> T:
+        """Run ``func(*args, **kwargs)`` off the event loop and await its result."""
+
+        stats = self._stats
+        if self.saturated:
+            stats.rejected += 1
+            raise ExecutorSaturatedError("Routing workers are busy, please retry shortly")
+
+        stats.submitted += 1
+        stats.in_flight += 1
+        stats.peak_in_flight = max(stats.peak_in_flight, stats.in_flight)
+        try:
+            if self.kind is ExecutorKind.INLINE:
+                result = func(*args, **kwargs)
+            else:
+                loop = asyncio.get_running_loop()
+                result = await loop.run_in_executor(
+                    self._get_executor(), functools.partial(func, *args, **kwargs)
+                )
+        except BaseException:
+            stats.failed += 1
+            raise
+        finally:
+            stats.in_flight -= 1
+        stats.completed += 1
+        return result
+
+    def stats(self) -> ExecutorStats:
+        """Return a snapshot of the executor counters."""
+
+        snapshot = ExecutorStats(**asdict(self._stats))
+        return snapshot
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.kind is ExecutorKind.PROCESS:
+                resource_tracker.ensure_running()
+                self._executor = ProcessPoolExecutor(max_workers=self._max_workers)
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self._max_workers, thread_name_prefix="routing"
+                )
+            logger.info(
+                "Started %s routing executor with %d workers", self.kind.value, self._max_workers
+            )
+        return self._executor
+
+
+_compute_executor: ComputeExecutor | None = None
+_tour_pool: ProcessPoolExecutor | None = None
+
+
+def get_compute_executor() -> ComputeExecutor:
+    """Return the application-wide executor for routing searches."""
+
+    global _compute_executor
+    if _compute_executor is None:
+        _compute_executor = ComputeExecutor(
+            settings.routing_executor,
+            max_workers=settings.routing_executor_workers,
+            max_queue=settings.routing_executor_queue,
+        )
+    return _compute_executor
+
+
+def tour_worker_count() -> int:
+    """Number of tour optimisation worker processes (0 disables the pool)."""
+
+    configured = settings.routing_tour_workers
+    if configured is not None:
+        return max(0, configured)
+    # 自动模式保留一个核心给事件循环；单核机器上进程池只会增加开销
+    return max(0, min(4, (os.cpu_count() or 1) - 1))
+
+
+def get_tour_process_pool() -> ProcessPoolExecutor | None:
+    """Return the shared tour optimisation pool, creating it on first use."""
+
+    global _tour_pool
+    if _tour_pool is not None:
+        return _tour_pool
+    workers = tour_worker_count()
+    if workers <= 0:
+        return None
+    # 先启动 resource tracker，使工作进程与主进程共用，避免共享内存被重复追踪
+    resource_tracker.ensure_running()
+    _tour_pool = ProcessPoolExecutor(max_workers=workers)
+    logger.info("Started tour optimisation pool with %d workers", workers)
+    return _tour_pool
+
+
+def shutdown_executors() -> None:
+    """Stop worker threads and processes; called on application shutdown."""
+
+    global _compute_executor, _tour_pool
+    if _compute_executor is not None:
+        _compute_executor.shutdown()
+        _compute_executor = None
+    if _tour_pool is not None:
+        _tour_pool.shutdown(wait=False, cancel_futures=True)
+        _tour_pool = None
@@ -5,9 +5,15 @@ from __future__ import annotations
 from dataclasses import dataclass
 from typing import Sequence
 
-from app.algorithms import WeightStrategy
+from app.algorithms import WeightStrategy, build_graph_voronoi
 from app.models.enums import FacilityCategory, TransportMode
+from app.models.graph import GraphNode
+from app.models.locations import Facility, Region
 from app.repositories import FacilityRepository, GraphRepository, RegionRepository
+from app.services.executors import ComputeExecutor, ExecutorKind
+from app.services.facility_index import FacilityIndexStore
+from app.services.graph_store import RegionGraphStore
+from app.services.tree_cache import ShortestPathTreeCache
 from app.services.routing import (
     NodeValidationError,
     RegionNotFoundError,
@@ -40,11 +46,28 @@ class FacilityService:
         facility_repository: FacilityRepository,
         graph_repository: GraphRepository,
         region_repository: RegionRepository,
+        graph_store: RegionGraphStore | None = None,
+        compute_executor: ComputeExecutor | None = None,
+        tree_cache: ShortestPathTreeCache | None = None,
+        facility_index: FacilityIndexStore | None = None,
     ) -> None:
         self._facility_repository = facility_repository
         self._graph_repository = graph_repository
         self._region_repository = region_repository
-        self._routing_service = RoutingService(graph_repository, region_repository)
+        self._routing_service = RoutingService(
+            graph_repository,
+            region_repository,
+            graph_store,
+            compute_executor=compute_executor,
+            tree_cache=tree_cache,
+        )
+        self._compute_executor = (
+            compute_executor
+            if compute_executor is not None
+            else ComputeExecutor(ExecutorKind.INLINE)
+        )
+        # 各类别的最近设施分区；为 None 时 limit=1 也走一般搜索
+        self._facility_index = facility_index
 
     async def find_nearby_facilities(
         self,
@@ -80,26 +103,60 @@ class FacilityService:
 
         weight_strategy = WeightStrategy(strategy)
 
-        # 使用 BFS 一次性计算从起点到所有可达节点的距离和路径
-        # 这比为每个设施单独计算路径高效得多
-        reachable_paths = await self._routing_service.compute_reachable_nodes(
-            region_id=region_id,
-            origin_node_id=origin_node_id,
-            max_distance=radius_meters,
-            strategy=weight_strategy,
-            transport_modes=transport_modes,
-        )
+        # 只要最近的一个设施时直接查预计算的分区，无需在区域内搜索
+        if limit == 1 and self._facility_index is not None:
+            nearest = await self._nearest_facility(
+                region,
+                origin_node_id,
+                facility_nodes,
+                radius_meters,
+                weight_strategy,
+                transport_modes,
+            )
+            if nearest is not None:
+                return nearest
 
         # 构建设施节点ID到设施的映射
         facility_by_node_id = {node.id: facility for facility, node in facility_nodes}
 
-        # 提取在可达范围内的设施
-        results: list[FacilityRoute] = []
-        for node_id, path_info in reachable_paths.items():
-            facility = facility_by_node_id.get(node_id)
-            if facility is None:
-                continue
+        if limit > 0:
+            # 只需前 limit 个设施时，搜索在找够设施后立即停止，不展开整个半径范围
+            reachable = await self._routing_service.compute_nearest_nodes(
+                region_id=region_id,
+                origin_node_id=origin_node_id,
+                target_node_ids=facility_by_node_id,
+                limit=limit,
+                max_distance=radius_meters,
+                strategy=weight_strategy,
+                transport_modes=transport_modes,
+            )
+        else:
+            # 基于起点的最短路树一次性得到所有可达节点的距离，
+            # 这比为每个设施单独计算路径高效得多；树会缓存并供后续路线查询复用
+            reachable = await self._routing_service.compute_reachable_nodes(
+                region_id=region_id,
+                origin_node_id=origin_node_id,
+                max_distance=radius_meters,
+                strategy=weight_strategy,
+                transport_modes=transport_modes,
+            )
+
+        # 只保留在可达范围内的设施
+        candidates = [node_id for node_id in facility_by_node_id if node_id in reachable]
+
+        # 排序
+        metric = (
+            reachable.distance if weight_strategy is WeightStrategy.DISTANCE else reachable.time
+        )
+        candidates.sort(key=metric)
+
+        # 限制返回数量，路径只为最终返回的设施重建
+        if limit > 0:
+            candidates = candidates[:limit]
 
+        results: list[FacilityRoute] = []
+        for node_id in candidates:
+            facility = facility_by_node_id[node_id]
             results.append(
                 FacilityRoute(
                     facility_id=facility.id,
@@ -107,21 +164,79 @@ class FacilityService:
                     category=facility.category,
                     latitude=facility.latitude,
                     longitude=facility.longitude,
-                    distance=path_info["distance"],
-                    travel_time=path_info["time"],
-                    node_sequence=tuple(path_info["path"]),
+                    distance=reachable.distance(node_id),
+                    travel_time=reachable.time(node_id),
+                    node_sequence=tuple(reachable.path(node_id)),
                     strategy=weight_strategy,
                 )
             )
+        return results
 
-        # 排序
-        if weight_strategy is WeightStrategy.DISTANCE:
-            results.sort(key=lambda item: item.distance)
-        else:
-            results.sort(key=lambda item: item.travel_time)
-
-        # 限制返回数量
-        if limit > 0:
-            results = results[:limit]
+    async def _nearest_facility(
+        self,
+        region: Region,
+        origin_node_id: int,
+        facility_nodes: Sequence[tuple[Facility, GraphNode]],
+        radius_meters: float | None,
+        strategy: WeightStrategy,
+        transport_modes: Sequence[TransportMode | str] | None,
+    ) -> list[FacilityRoute] | None:
+        """Answer a ``limit=1`` query from the per-category partitions.
+
+        Returns ``None`` when the partitions cannot decide, i.e. the nearest
+        facility by time lies outside the radius while a slower one might not.
+        """
+
+        store = self._facility_index
+        if store is None:
+            return None
+        graph, modes = await self._routing_service.search_context(region, transport_modes)
+        origin = graph.compact.index.get(origin_node_id)
+        if origin is None:
+            return []
 
-        return results
+        by_category: dict[FacilityCategory, dict[int, Facility]] = {}
+        for facility, node in facility_nodes:
+            by_category.setdefault(facility.category, {})[node.id] = facility
+
+        best: tuple[float, Facility, list[int], float, float] | None = None
+        for category, facilities in by_category.items():
+            index = store.get(graph, category, strategy, modes, list(facilities))
+            if index is None:
+                index = await self._compute_executor.run(
+                    build_graph_voronoi,
+                    graph.compact,
+                    list(facilities),
+                    strategy=strategy,
+                    allowed_modes=modes,
+                )
+                store.put(graph, category, modes, index)
+            nearest = index.nearest(origin)
+            if nearest is None:
+                continue
+            cost = float(index.costs[origin])
+            if best is None or cost < best[0]:
+                path = [graph.node_ids[node] for node in index.node_path(graph.compact, origin)]
+                facility = facilities[path[-1]]
+                distance = float(index.distances[origin])
+                best = (cost, facility, path, distance, index.path_time(graph.compact, origin))
+
+        if best is None:
+            return []
+        _, facility, path, distance, time = best
+        if radius_meters is not None and distance > radius_meters:
+            # 按距离最近的设施都超出半径时必然没有结果；按时间排序时交给一般搜索
+            return [] if strategy is WeightStrategy.DISTANCE else None
+        return [
+            FacilityRoute(
+                facility_id=facility.id,
+                name=facility.name,
+                category=facility.category,
+                latitude=facility.latitude,
+                longitude=facility.longitude,
+                distance=distance,
+                travel_time=time / 60,  # 秒转换为分钟
+                node_sequence=tuple(path),
+                strategy=strategy,
+            )
+        ]
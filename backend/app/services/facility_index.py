@@ -0,0 +1,179 @@
+"""Per-category nearest-facility partitions of region graphs."""
+
+from __future__ import annotations
+
+import logging
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Sequence
+
+from app.algorithms import GraphVoronoi, WeightStrategy
+from app.models.enums import FacilityCategory
+from app.services.graph_store import CompiledRegionGraph
+
+logger = logging.getLogger(__name__)
+
+FACILITY_INDEX_DIR = Path("indexes/facilities")
+
+FacilityIndexKey = tuple[int, int, FacilityCategory, WeightStrategy, tuple[str, ...]]
+
+
+@dataclass(slots=True)
+class FacilityIndexStats:
+    """Counters describing how often partitions are reused."""
+
+    hits: int = 0
+    loads: int = 0
+    misses: int = 0
+    stores: int = 0
+    stale: int = 0
+    entries: int = 0
+    bytes: int = 0
+
+    def as_dict(self) -> dict[str, float]:
+        return asdict(self)
+
+
+class FacilityIndexStore:
+    """Keep one :class:`~app.algorithms.GraphVoronoi` per region, category, strategy and mode set.
+
+    Partitions are cached in memory per graph version and, with a ``directory``,
+    written to disk so that restarts reuse them; when the version changes, the
+    partitions that still match the new graph move to it. A partition (in memory
+    or on disk) is only returned while it still matches the graph fingerprint and
+    the current facility nodes of its category; otherwise the caller rebuilds it
+    and :meth:`put` replaces the stale copy.
+    """
+
+    def __init__(self, directory: Path | None = None) -> None:
+        self._directory = directory
+        self._indexes: dict[FacilityIndexKey, GraphVoronoi] = {}
+        self._versions: dict[int, int] = {}
+        self._stats = FacilityIndexStats()
+
+    def get(
+        self,
+        graph: CompiledRegionGraph,
+        category: FacilityCategory,
+        strategy: WeightStrategy,
+        modes: Sequence[str],
+        facility_node_ids: Sequence[int],
+    ) -> GraphVoronoi | None:
+        """Return a partition matching the current facilities of ``category``, or ``None``."""
+
+        self._observe_version(graph)
+        key = self._key(graph, category, strategy, modes)
+        sources = list(facility_node_ids)
+        mode_mask = graph.compact.mode_mask(key[4])
+        index = self._indexes.get(key)
+        if index is not None:
+            if index.matches(graph.compact, strategy, mode_mask, sources):
+                self._stats.hits += 1
+                return index
+            # 设施增删后旧分区失效
+            del self._indexes[key]
+            self._stats.stale += 1
+
+        if self._directory is not None:
+            path = facility_index_path(self._directory, graph.region_id, category, strategy, key[4])
+            if path.exists():
+                try:
+                    index = GraphVoronoi.load(path)
+                except (OSError, ValueError, KeyError) as exc:
+                    logger.warning("Failed to load facility index %s: %s", path, exc)
+                    index = None
+                if index is not None and index.matches(graph.compact, strategy, mode_mask, sources):
+                    self._indexes[key] = index
+                    self._stats.loads += 1
+                    return index
+                self._stats.stale += 1
+
+        self._stats.misses += 1
+        return None
+
+    def put(
+        self,
+        graph: CompiledRegionGraph,
+        category: FacilityCategory,
+        modes: Sequence[str],
+        index: GraphVoronoi,
+    ) -> None:
+        """Register a freshly built partition and persist it when a directory is configured."""
+
+        self._observe_version(graph)
+        key = self._key(graph, category, index.strategy, modes)
+        self._indexes[key] = index
+        self._stats.stores += 1
+        if self._directory is None:
+            return
+        path = facility_index_path(
+            self._directory, graph.region_id, category, index.strategy, key[4]
+        )
+        try:
+            index.save(path)
+        except OSError as exc:
+            logger.warning("Failed to persist facility index %s: %s", path, exc)
+
+    def invalidate(self, region_id: int | None = None) -> None:
+        """Drop in-memory partitions of one region (or all regions)."""
+
+        for key in [key for key in self._indexes if region_id is None or key[0] == region_id]:
+            del self._indexes[key]
+
+    def stats(self) -> FacilityIndexStats:
+        """Return a snapshot of the store counters."""
+
+        return FacilityIndexStats(
+            **{
+                **asdict(self._stats),
+                "entries": len(self._indexes),
+                "bytes": sum(index.nbytes for index in self._indexes.values()),
+            }
+        )
+
+    def _observe_version(self, graph: CompiledRegionGraph) -> None:
+        known = self._versions.get(graph.region_id)
+        if known is None or graph.version > known:
+            self._versions[graph.region_id] = graph.version
+            if known is None:
+                return
+            # 区域图版本更新后，仍与新图匹配的分区（如实时拥挤度变化后的按距离分区）移到新版本
+            for key in [
+                key for key in self._indexes if key[0] == graph.region_id and key[1] < graph.version
+            ]:
+                index = self._indexes.pop(key)
+                if index.fingerprint == graph.compact.fingerprint_for(index.strategy):
+                    self._indexes[(key[0], graph.version) + key[2:]] = index
+
+    @staticmethod
+    def _key(
+        graph: CompiledRegionGraph,
+        category: FacilityCategory,
+        strategy: WeightStrategy,
+        modes: Sequence[str],
+    ) -> FacilityIndexKey:
+        return (graph.region_id, graph.version, category, strategy, tuple(sorted(modes)))
+
+
+def facility_index_path(
+    directory: Path,
+    region_id: int,
+    category: FacilityCategory | str,
+    strategy: WeightStrategy | str,
+    modes: Sequence[str],
+) -> Path:
+    """Location of the serialised partition for a region, category, strategy and mode set."""
+
+    mode_key = "+".join(sorted(modes))
+    category_key = FacilityCategory(category).value
+    strategy_key = WeightStrategy(strategy).value
+    return directory / f"region_{region_id}_{category_key}_{strategy_key}_{mode_key}.npz"
+
+
+facility_index_store = FacilityIndexStore(FACILITY_INDEX_DIR)
+
+
+def get_facility_index_store() -> FacilityIndexStore:
+    """Return the application-wide facility index store."""
+
+    return facility_index_store
@@ -0,0 +1,417 @@
+"""Versioned binary snapshots of compiled region graphs, loaded with ``mmap``.
+
+A snapshot is a small JSON header followed by the raw arrays of one compiled
+region graph (CSR buffers, incoming-edge index, node attributes, edge slots,
+congestion profiles)::
+
+    magic (8 bytes) | format version (uint32) | header length (uint32) | JSON header
+    | padding | array data, each array aligned to 64 bytes
+
+Loading maps the file read-only and views the arrays in place, so opening a
+region costs a few milliseconds instead of hydrating every ORM row, and all
+worker processes of one host share the same page-cache pages. The header
+records the database ``signature`` the graph was compiled from (see
+:meth:`GraphRepository.graph_signature`); readers compare it with the current
+one and ignore snapshots of data that has changed since.
+"""
+
+from __future__ import annotations
+
+import json
+import mmap
+import operator
+import os
+import struct
+from array import array
+from bisect import bisect_left
+from collections.abc import Iterator, Mapping, Sequence
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Literal, SupportsIndex, TypeVar, overload
+
+import numpy as np
+
+from app.algorithms import CompactGraph
+from app.algorithms.compact_graph import ReverseIndex
+from app.algorithms.congestion import CongestionProfiles
+from app.models.graph import GraphNode
+
+if TYPE_CHECKING:
+    from app.services.graph_store import CompiledRegionGraph
+
+SNAPSHOT_MAGIC = b"TRVGRAPH"
+SNAPSHOT_FORMAT_VERSION = 2
+
+_PREAMBLE = struct.Struct("<8sII")
+_ALIGNMENT = 64
+
+# 节点标志位
+_HAS_ROW = 1  # 区域内存在对应的 GraphNode
+_HAS_NAME = 2
+_IS_VIRTUAL = 4
+
+# memoryview 格式需与 CompactGraph 原有 array 的类型码一致
+_INT_FORMATS: dict[np.dtype, Literal["q", "i", "H", "B"]] = {
+    np.dtype(np.int64): "q",
+    np.dtype(np.int32): "i",
+    np.dtype(np.uint16): "H",
+    np.dtype(np.uint8): "B",
+}
+
+_T = TypeVar("_T")
+
+
+@dataclass(frozen=True, slots=True)
+class GraphSnapshot:
+    """Contents of a loaded snapshot, ready to become a ``CompiledRegionGraph``."""
+
+    region_id: int
+    fingerprint: str
+    signature: str
+    compact: CompactGraph
+    nodes: Mapping[int, GraphNode]
+    edge_slots: Mapping[int, int]
+    free_flow_times: np.ndarray
+
+
+class SortedIdIndex(Mapping[int, int]):
+    """Read-only ``id -> position`` mapping backed by two parallel sorted buffers.
+
+    Used for the node index and the edge slots of a loaded snapshot: lookups
+    bisect the mapped ``keys`` instead of building a dict with one entry per
+    node, so nothing proportional to the graph is allocated at load time.
+    """
+
+    __slots__ = ("_keys", "_values")
+
+    def __init__(self, keys: Sequence[int], values: Sequence[int]) -> None:
+        if len(keys) != len(values):
+            raise ValueError("keys and values must have the same length")
+        self._keys = keys
+        self._values = values
+
+    def __getitem__(self, key: object) -> int:
+        if not isinstance(key, SupportsIndex):
+            raise KeyError(key)
+        value = operator.index(key)
+        position = bisect_left(self._keys, value)
+        if position == len(self._keys) or self._keys[position] != value:
+            raise KeyError(key)
+        return self._values[position]
+
+    # 与 dict 一样接受任意可哈希的 id，使节点索引满足 CompactGraph.index 的 NodeIndex 协议
+    @overload
+    def get(self, key: object, /) -> int | None: ...
+
+    @overload
+    def get(self, key: object, default: int | _T, /) -> int | _T: ...
+
+    def get(self, key: object, default: object = None, /) -> object:
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self._keys)
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __reduce__(self) -> tuple[type[SortedIdIndex], tuple[Sequence[int], Sequence[int]]]:
+        return (type(self), (_to_array(self._keys), _to_array(self._values)))
+
+
+class SnapshotNodes(Mapping[int, GraphNode]):
+    """Node rows of a snapshot, materialised as :class:`GraphNode` on first access."""
+
+    def __init__(
+        self,
+        region_id: int,
+        index: Mapping[int, int],
+        columns: Mapping[str, Sequence[int]],
+        latitudes: Sequence[float],
+        longitudes: Sequence[float],
+    ) -> None:
+        self._region_id = region_id
+        self._index = index
+        self._columns = columns
+        self._latitudes = latitudes
+        self._longitudes = longitudes
+        self._rows: dict[int, GraphNode] = {}
+        self._count = sum(1 for flags in columns["node_flags"] if flags & _HAS_ROW)
+
+    def __getitem__(self, node_id: object) -> GraphNode:
+        if not isinstance(node_id, SupportsIndex):
+            raise KeyError(node_id)
+        key = operator.index(node_id)
+        node = self._rows.get(key)
+        if node is not None:
+            return node
+        position = self._index[key]
+        columns = self._columns
+        flags = columns["node_flags"][position]
+        if not flags & _HAS_ROW:
+            raise KeyError(node_id)
+        name = None
+        if flags & _HAS_NAME:
+            start, end = columns["name_offsets"][position], columns["name_offsets"][position + 1]
+            name = bytes(columns["names"][start:end]).decode("utf-8")
+        building_id = columns["building_ids"][position]
+        facility_id = columns["facility_ids"][position]
+        node = GraphNode(
+            id=columns["node_ids"][position],
+            region_id=self._region_id,
+            name=name,
+            latitude=self._latitudes[position],
+            longitude=self._longitudes[position],
+            building_id=None if building_id < 0 else building_id,
+            facility_id=None if facility_id < 0 else facility_id,
+            is_virtual=bool(flags & _IS_VIRTUAL),
+        )
+        self._rows[key] = node
+        return node
+
+    def __iter__(self) -> Iterator[int]:
+        flags = self._columns["node_flags"]
+        node_ids = self._columns["node_ids"]
+        return (
+            node_ids[position] for position in range(len(node_ids)) if flags[position] & _HAS_ROW
+        )
+
+    def __len__(self) -> int:
+        return self._count
+
+
+def snapshot_path(directory: Path, region_id: int) -> Path:
+    """Location of the graph snapshot of a region."""
+
+    return directory / f"region_{region_id}.graph"
+
+
+def remove_graph_snapshots(directory: Path, region_id: int | None = None) -> int:
+    """Delete the snapshot of one region (or all snapshots) and return how many were removed."""
+
+    pattern = "region_*.graph" if region_id is None else snapshot_path(directory, region_id).name
+    removed = 0
+    for path in directory.glob(pattern):
+        path.unlink(missing_ok=True)
+        removed += 1
+    return removed
+
+
+def write_graph_snapshot(graph: CompiledRegionGraph, path: Path, *, signature: str) -> int:
+    """Serialise a compiled region graph to ``path`` and return the file size in bytes.
+
+    ``signature`` identifies the database rows ``graph`` was compiled from.
+    Only graphs with integer node ids can be written. The file is written next
+    to ``path`` and moved into place, so readers never observe a partial file.
+    """
+
+    compact = graph.compact
+    if not isinstance(compact.node_ids, (array, memoryview)):
+        raise ValueError("graph snapshots require integer node ids")
+    node_count = len(compact)
+    views = compact.as_numpy()
+    node_ids = np.frombuffer(compact.node_ids, dtype=np.int64)
+    node_order = np.argsort(node_ids, kind="stable")
+    if compact.latitudes is None or compact.longitudes is None:
+        views["latitudes"] = views["longitudes"] = np.full(node_count, np.nan)
+
+    flags = np.zeros(node_count, dtype=np.uint8)
+    building_ids = np.full(node_count, -1, dtype=np.int64)
+    facility_ids = np.full(node_count, -1, dtype=np.int64)
+    name_offsets = np.zeros(node_count + 1, dtype=np.int64)
+    names = bytearray()
+    for position, node_id in enumerate(node_ids.tolist()):
+        node = graph.nodes.get(node_id)
+        if node is not None:
+            flags[position] = _HAS_ROW | (_IS_VIRTUAL if node.is_virtual else 0)
+            if node.name is not None:
+                flags[position] |= _HAS_NAME
+                names += node.name.encode("utf-8")
+            if node.building_id is not None:
+                building_ids[position] = node.building_id
+            if node.facility_id is not None:
+                facility_ids[position] = node.facility_id
+        name_offsets[position + 1] = len(names)
+
+    edge_ids = np.fromiter(graph.edge_slots.keys(), dtype=np.int64, count=len(graph.edge_slots))
+    edge_slots = np.fromiter(graph.edge_slots.values(), dtype=np.int64, count=len(graph.edge_slots))
+    edge_order = np.argsort(edge_ids, kind="stable")
+    reverse = compact.reverse
+    free_flow_times = graph.free_flow_times
+    if free_flow_times is None:
+        free_flow_times = views["times"]
+
+    arrays: dict[str, np.ndarray] = {
+        "node_ids": node_ids,
+        "offsets": views["offsets"],
+        "targets": views["targets"],
+        "distances": views["distances"],
+        "times": views["times"],
+        "mode_masks": views["mode_masks"],
+        "latitudes": views["latitudes"],
+        "longitudes": views["longitudes"],
+        "reverse_offsets": np.asarray(reverse.offsets, dtype=np.int64),
+        "reverse_sources": np.asarray(reverse.sources, dtype=np.int32),
+        "reverse_edges": np.asarray(reverse.edges, dtype=np.int64),
+        "node_keys": node_ids[node_order],
+        "node_positions": node_order.astype(np.int64),
+        "node_flags": flags,
+        "building_ids": building_ids,
+        "facility_ids": facility_ids,
+        "name_offsets": name_offsets,
+        "names": np.frombuffer(bytes(names), dtype=np.uint8),
+        "edge_keys": edge_ids[edge_order],
+        "edge_slots": edge_slots[edge_order],
+        "free_flow_times": np.asarray(free_flow_times, dtype=np.float64),
+    }
+    if compact.profiles is not None:
+        arrays["profile_rows"] = compact.profiles.rows
+        arrays["profile_factors"] = compact.profiles.factors
+        arrays["profile_speeds"] = compact.profiles.ideal_speeds
+
+    layout: dict[str, tuple[str, int, list[int]]] = {}
+    offset = 0
+    for name, values in arrays.items():
+        values = np.ascontiguousarray(values)
+        arrays[name] = values
+        layout[name] = (values.dtype.str, offset, list(values.shape))
+        offset = _align(offset + values.nbytes)
+    header = json.dumps(
+        {
+            "region_id": graph.region_id,
+            "fingerprint": compact.fingerprint,
+            "signature": signature,
+            "mode_names": list(compact.mode_names),
+            "node_count": node_count,
+            "edge_count": compact.edge_count,
+            "arrays": layout,
+        },
+        separators=(",", ":"),
+    ).encode("utf-8")
+    data_start = _align(_PREAMBLE.size + len(header))
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    partial = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    with open(partial, "wb") as handle:
+        handle.write(_PREAMBLE.pack(SNAPSHOT_MAGIC, SNAPSHOT_FORMAT_VERSION, len(header)))
+        handle.write(header)
+        for name, values in arrays.items():
+            handle.write(b"\0" * (data_start + layout[name][1] - handle.tell()))
+            handle.write(_byte_view(values))
+        size = handle.tell()
+    os.replace(partial, path)
+    return size
+
+
+def load_graph_snapshot(path: Path) -> GraphSnapshot:
+    """Map a snapshot file read-only and view its arrays without copying.
+
+    Raises :class:`ValueError` for files that are not snapshots, were written
+    with another format version or on a machine with a different byte order.
+    """
+
+    with open(path, "rb") as handle:
+        mapped = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+    if len(mapped) < _PREAMBLE.size:
+        raise ValueError(f"{path} is not a graph snapshot")
+    magic, format_version, header_length = _PREAMBLE.unpack_from(mapped, 0)
+    if magic != SNAPSHOT_MAGIC:
+        raise ValueError(f"{path} is not a graph snapshot")
+    if format_version != SNAPSHOT_FORMAT_VERSION:
+        raise ValueError(
+            f"{path} has snapshot format {format_version}, expected {SNAPSHOT_FORMAT_VERSION}"
+        )
+    header = json.loads(bytes(mapped[_PREAMBLE.size : _PREAMBLE.size + header_length]))
+    data_start = _align(_PREAMBLE.size + header_length)
+    layout: dict[str, tuple[str, int, list[int]]] = header["arrays"]
+
+    def numpy_view(name: str) -> np.ndarray:
+        dtype_str, offset, shape = layout[name]
+        dtype = np.dtype(dtype_str)
+        if not dtype.isnative:
+            raise ValueError(f"{path} was written with a different byte order")
+        count = int(np.prod(shape, dtype=np.int64))
+        start = data_start + offset
+        if start + count * dtype.itemsize > len(mapped):
+            raise ValueError(f"{path} is truncated")
+        values: np.ndarray = np.frombuffer(mapped, dtype=dtype, count=count, offset=start)
+        return values.reshape(shape)
+
+    # 搜索逐个读取元素，memoryview 下标访问远快于 NumPy 标量
+    def buffer(name: str) -> memoryview[int]:
+        values = numpy_view(name)
+        return _byte_view(values).cast(_INT_FORMATS[values.dtype])
+
+    def float_buffer(name: str) -> memoryview[float]:
+        values = numpy_view(name)
+        if values.dtype != np.float64:
+            raise ValueError(f"{path} stores {name} as {values.dtype}, expected float64")
+        return _byte_view(values).cast("d")
+
+    node_ids = buffer("node_ids")
+    index = SortedIdIndex(buffer("node_keys"), buffer("node_positions"))
+    latitudes, longitudes = float_buffer("latitudes"), float_buffer("longitudes")
+    profiles = None
+    if "profile_rows" in layout:
+        profiles = CongestionProfiles(
+            rows=numpy_view("profile_rows"),
+            factors=numpy_view("profile_factors"),
+            ideal_speeds=numpy_view("profile_speeds"),
+        )
+    compact = CompactGraph(
+        node_ids=node_ids,
+        index=index,
+        offsets=buffer("offsets"),
+        targets=buffer("targets"),
+        distances=float_buffer("distances"),
+        times=float_buffer("times"),
+        mode_masks=buffer("mode_masks"),
+        mode_names=tuple(header["mode_names"]),
+        latitudes=latitudes,
+        longitudes=longitudes,
+        profiles=profiles,
+    )
+    # 指纹与反向索引随快照保存，避免加载时重新计算
+    compact.__dict__["fingerprint"] = header["fingerprint"]
+    compact.__dict__["reverse"] = ReverseIndex(
+        offsets=buffer("reverse_offsets"),
+        sources=buffer("reverse_sources"),
+        edges=buffer("reverse_edges"),
+    )
+    columns = {
+        name: buffer(name)
+        for name in (
+            "node_ids",
+            "node_flags",
+            "building_ids",
+            "facility_ids",
+            "name_offsets",
+            "names",
+        )
+    }
+    return GraphSnapshot(
+        region_id=header["region_id"],
+        fingerprint=header["fingerprint"],
+        signature=header["signature"],
+        compact=compact,
+        nodes=SnapshotNodes(header["region_id"], index, columns, latitudes, longitudes),
+        edge_slots=SortedIdIndex(buffer("edge_keys"), buffer("edge_slots")),
+        free_flow_times=numpy_view("free_flow_times"),
+    )
+
+
+def _align(offset: int) -> int:
+    return -(-offset // _ALIGNMENT) * _ALIGNMENT
+
+
+def _byte_view(values: np.ndarray) -> memoryview[int]:
+    return values.data.cast("B")
+
+
+def _to_array(values: Sequence[int]) -> Sequence[int]:
+    if isinstance(values, memoryview):
+        return array(values.format, values.tobytes())
+    return values
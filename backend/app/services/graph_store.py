@@ -0,0 +1,581 @@
+"""Process-wide store of compiled regional routing graphs."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from array import array
+from dataclasses import asdict, dataclass, field, replace
+from pathlib import Path
+from time import perf_counter
+from types import MappingProxyType
+from typing import Iterable, Mapping, Protocol, Sequence, cast
+
+import numpy as np
+
+from app.algorithms import CompactGraph, Edge as AlgoEdge, NodeId, WeightStrategy
+from app.algorithms.contraction import ContractionHierarchy
+from app.algorithms.landmarks import LandmarkTable, build_landmark_table
+from app.core.config import settings
+from app.models.enums import TransportMode
+from app.models.graph import GraphEdge, GraphNode
+from app.services.executors import ComputeExecutor
+from app.services.graph_snapshot import load_graph_snapshot, remove_graph_snapshots, snapshot_path
+
+logger = logging.getLogger(__name__)
+
+CONTRACTION_DIR = Path("indexes/contraction")
+LANDMARK_DIR = Path("indexes/landmarks")
+SNAPSHOT_DIR = Path("indexes/graphs")
+
+
+class GraphSource(Protocol):
+    """Minimal repository interface needed to (re)build a region graph."""
+
+    async def list_nodes_by_region(self, region_id: int) -> list[GraphNode]: ...
+
+    async def list_edges_by_region(self, region_id: int) -> list[GraphEdge]: ...
+
+    async def graph_signature(self, region_id: int) -> str: ...
+
+
+@dataclass(frozen=True, slots=True)
+class CompiledRegionGraph:
+    """Immutable routing snapshot of one region at a given store version.
+
+    ``edges`` and ``algorithm_edges`` are the rows as loaded (both empty when
+    the graph comes from a snapshot); live congestion applied later (see
+    :meth:`RegionGraphStore.apply_congestion`) only changes ``compact``.
+    ``edge_slots`` maps edge ids to CSR edges of ``compact`` and
+    ``free_flow_times`` holds ``distance / ideal_speed`` per CSR edge.
+    """
+
+    region_id: int
+    version: int
+    nodes: Mapping[int, GraphNode]
+    edges: tuple[GraphEdge, ...]
+    algorithm_edges: tuple[AlgoEdge, ...]
+    compact: CompactGraph
+    edge_slots: Mapping[int, int] = field(default_factory=dict)
+    free_flow_times: np.ndarray | None = None
+
+    @property
+    def is_empty(self) -> bool:
+        return self.compact.edge_count == 0
+
+    @property
+    def node_ids(self) -> Sequence[int]:
+        """Database ids of the dense nodes of ``compact`` (see :func:`region_node_id`)."""
+
+        return cast("Sequence[int]", self.compact.node_ids)
+
+
+@dataclass(frozen=True, slots=True)
+class CongestionPatch:
+    """Outcome of applying live congestion to a loaded region graph."""
+
+    previous: CompiledRegionGraph
+    current: CompiledRegionGraph
+    changed_edges: np.ndarray
+    faster: bool
+    ignored: tuple[int, ...] = ()
+
+    @property
+    def region_id(self) -> int:
+        return self.current.region_id
+
+    def node_pairs(self) -> set[tuple[int, int]]:
+        """``(start_node_id, end_node_id)`` of every changed edge."""
+
+        node_ids = self.current.node_ids
+        compact = self.current.compact
+        return {
+            (node_ids[compact.edge_source(edge)], node_ids[compact.targets[edge]])
+            for edge in self.changed_edges.tolist()
+        }
+
+
+@dataclass(slots=True)
+class GraphStoreStats:
+    """Counters describing how effective the graph store is."""
+
+    hits: int = 0
+    misses: int = 0
+    builds: int = 0
+    snapshot_loads: int = 0
+    invalidations: int = 0
+    congestion_updates: int = 0
+    build_seconds: float = 0.0
+    last_build_seconds: float = 0.0
+
+    def as_dict(self) -> dict[str, float]:
+        return asdict(self)
+
+
+class RegionGraphStore:
+    """Load each region graph once and share the compiled result across requests.
+
+    Graphs are keyed by region and tagged with a monotonically increasing version.
+    :meth:`invalidate` bumps the version and drops the compiled graph so that the
+    next :meth:`get` rebuilds it from the repository. With a ``snapshot_dir``
+    a region is first loaded from its memory-mapped snapshot (see
+    :mod:`app.services.graph_snapshot`) when the snapshot's signature still
+    matches the repository's; invalidation deletes the snapshot.
+    """
+
+    def __init__(
+        self,
+        hierarchy_dir: Path | None = None,
+        *,
+        landmark_dir: Path | None = None,
+        landmark_count: int = 8,
+        snapshot_dir: Path | None = None,
+    ) -> None:
+        self._graphs: dict[int, CompiledRegionGraph] = {}
+        self._versions: dict[int, int] = {}
+        self._locks: dict[int, asyncio.Lock] = {}
+        self._hierarchy_dir = hierarchy_dir
+        self._hierarchies: dict[
+            tuple[int, int, WeightStrategy, tuple[str, ...]], ContractionHierarchy | None
+        ] = {}
+        self._landmark_dir = landmark_dir
+        self._landmark_count = landmark_count
+        self._landmarks: dict[tuple[int, int, WeightStrategy], LandmarkTable | None] = {}
+        self._landmark_locks: dict[tuple[int, int, WeightStrategy], asyncio.Lock] = {}
+        self._snapshot_dir = snapshot_dir
+        # 实时拥挤系数（边 ID -> 系数），区域图构建时生效，数据库变更（invalidate）时清除
+        self._live: dict[int, dict[int, float]] = {}
+        self._stats = GraphStoreStats()
+
+    def version(self, region_id: int) -> int:
+        """Return the current graph version of a region."""
+
+        return self._versions.get(region_id, 0)
+
+    def peek(self, region_id: int) -> CompiledRegionGraph | None:
+        """Return the compiled graph if it is already loaded, without building it."""
+
+        return self._graphs.get(region_id)
+
+    async def get(self, region_id: int, source: GraphSource) -> CompiledRegionGraph:
+        """Return the compiled graph for ``region_id``, building it on first use."""
+
+        graph = self._graphs.get(region_id)
+        if graph is not None:
+            self._stats.hits += 1
+            return graph
+
+        lock = self._locks.setdefault(region_id, asyncio.Lock())
+        async with lock:
+            # 另一个请求可能已经在等待锁期间完成了构建
+            graph = self._graphs.get(region_id)
+            if graph is not None:
+                self._stats.hits += 1
+                return graph
+
+            self._stats.misses += 1
+            version = self.version(region_id)
+            started = perf_counter()
+            graph = await self._load_snapshot(region_id, version, source)
+            if graph is None:
+                nodes = await source.list_nodes_by_region(region_id)
+                edges = await source.list_edges_by_region(region_id)
+                graph = compile_region_graph(
+                    region_id, version, nodes, edges, congestion=self._live.get(region_id)
+                )
+                self._stats.builds += 1
+            else:
+                self._stats.snapshot_loads += 1
+            elapsed = perf_counter() - started
+            self._stats.build_seconds += elapsed
+            self._stats.last_build_seconds = elapsed
+
+            # 构建期间若发生失效，则不缓存过期结果
+            if self.version(region_id) == version:
+                self._graphs[region_id] = graph
+            return graph
+
+    def hierarchy(
+        self,
+        graph: CompiledRegionGraph,
+        strategy: WeightStrategy | str,
+        modes: Sequence[str],
+    ) -> ContractionHierarchy | None:
+        """Return the contraction hierarchy for a compiled graph, loading it from disk once.
+
+        Hierarchies whose fingerprint no longer matches the graph (e.g. after a data
+        import without a rebuild) are ignored so callers fall back to plain search.
+        """
+
+        strategy = WeightStrategy(strategy)
+        key = (graph.region_id, graph.version, strategy, tuple(sorted(modes)))
+        if key in self._hierarchies:
+            return self._hierarchies[key]
+
+        hierarchy: ContractionHierarchy | None = None
+        if self._hierarchy_dir is not None:
+            path = hierarchy_path(self._hierarchy_dir, graph.region_id, strategy, key[3])
+            if path.exists():
+                try:
+                    hierarchy = ContractionHierarchy.load(path)
+                except (OSError, ValueError, KeyError) as exc:
+                    logger.warning("Failed to load contraction hierarchy %s: %s", path, exc)
+                if hierarchy is not None and not hierarchy.matches(
+                    graph.compact, strategy, graph.compact.mode_mask(key[3])
+                ):
+                    logger.warning("Ignoring stale contraction hierarchy %s", path)
+                    hierarchy = None
+        self._hierarchies[key] = hierarchy
+        return hierarchy
+
+    def install_hierarchy(
+        self,
+        graph: CompiledRegionGraph,
+        modes: Sequence[str],
+        hierarchy: ContractionHierarchy,
+    ) -> None:
+        """Register an in-memory hierarchy for ``graph`` (e.g. freshly built)."""
+
+        key = (graph.region_id, graph.version, hierarchy.strategy, tuple(sorted(modes)))
+        self._hierarchies[key] = hierarchy
+
+    async def landmarks(
+        self,
+        graph: CompiledRegionGraph,
+        strategy: WeightStrategy | str,
+        executor: ComputeExecutor | None = None,
+    ) -> LandmarkTable | None:
+        """Return the ALT landmark table for a compiled graph.
+
+        A precomputed table is loaded from disk when present and still matching the
+        graph; otherwise ``landmark_count`` landmarks are selected in memory. The
+        selection runs many full searches, so it is submitted to ``executor``
+        (inline without one) while the event loop keeps serving requests;
+        concurrent callers wait for the same build. Tables cover every transport
+        mode, so one per strategy serves all mode filters. Returns ``None`` when
+        landmarks are disabled (``landmark_count == 0``).
+        """
+
+        strategy = WeightStrategy(strategy)
+        key = (graph.region_id, graph.version, strategy)
+        if key in self._landmarks:
+            return self._landmarks[key]
+
+        lock = self._landmark_locks.setdefault(key, asyncio.Lock())
+        async with lock:
+            # 另一个请求可能已经在等待锁期间完成了构建
+            if key in self._landmarks:
+                return self._landmarks[key]
+            table = self._load_landmarks(graph, strategy)
+            if table is None and self._landmark_count > 0 and not graph.is_empty:
+                started = perf_counter()
+                if executor is None:
+                    table = build_landmark_table(
+                        graph.compact, self._landmark_count, strategy=strategy
+                    )
+                else:
+                    table = await executor.run(
+                        build_landmark_table, graph.compact, self._landmark_count, strategy=strategy
+                    )
+                logger.info(
+                    "Selected %d landmarks for region %s (%s) in %.2fs, %d bytes",
+                    len(table.landmarks),
+                    graph.region_id,
+                    strategy.value,
+                    perf_counter() - started,
+                    table.nbytes,
+                )
+            # 构建期间区域图若已更新（失效或实时拥挤度），不缓存旧版本的表
+            if self.version(graph.region_id) == graph.version:
+                self._landmarks[key] = table
+        self._landmark_locks.pop(key, None)
+        return table
+
+    def _load_landmarks(
+        self, graph: CompiledRegionGraph, strategy: WeightStrategy
+    ) -> LandmarkTable | None:
+        if self._landmark_dir is None:
+            return None
+        path = landmark_path(self._landmark_dir, graph.region_id, strategy)
+        if not path.exists():
+            return None
+        try:
+            table = LandmarkTable.load(path)
+        except (OSError, ValueError, KeyError) as exc:
+            logger.warning("Failed to load landmark table %s: %s", path, exc)
+            return None
+        if not table.matches(graph.compact, strategy, graph.compact.mode_mask(None)):
+            logger.warning("Ignoring stale landmark table %s", path)
+            return None
+        return table
+
+    def invalidate(self, region_id: int | None = None) -> None:
+        """Drop the compiled graph of one region (or all regions) and bump its version.
+
+        Live congestion overrides of the region are dropped as well: invalidation
+        means the stored edges changed, and their congestion takes precedence.
+        """
+
+        region_ids: Iterable[int]
+        if region_id is None:
+            region_ids = set(self._graphs) | set(self._versions) | set(self._live)
+        else:
+            region_ids = (region_id,)
+        for identifier in list(region_ids):
+            self._versions[identifier] = self.version(identifier) + 1
+            self._graphs.pop(identifier, None)
+            self._live.pop(identifier, None)
+            self._stats.invalidations += 1
+        if self._snapshot_dir is not None:
+            # 数据已变更，快照不再可信；删除后下次从数据库重建
+            try:
+                remove_graph_snapshots(self._snapshot_dir, region_id)
+            except OSError as exc:
+                logger.warning(
+                    "Failed to remove stale graph snapshots in %s: %s", self._snapshot_dir, exc
+                )
+        stale = [key for key in self._hierarchies if region_id is None or key[0] == region_id]
+        for key in stale:
+            del self._hierarchies[key]
+        tables = [key for key in self._landmarks if region_id is None or key[0] == region_id]
+        for table_key in tables:
+            del self._landmarks[table_key]
+
+    def apply_congestion(
+        self, region_id: int, updates: Mapping[int, float]
+    ) -> CongestionPatch | None:
+        """Apply live congestion factors (edge id -> factor) to the loaded graph of a region.
+
+        The edge time buffer is copied once per batch and the patched graph is
+        published under a new version in a single step, so searches already
+        running keep their snapshot. Indexes unaffected by the change are moved
+        to the new version: distance-based hierarchies and landmarks always (they
+        are keyed by the topology fingerprint), time-based landmarks when no edge
+        became faster (their bounds stay admissible, so they are re-bound to the
+        new graph). Updates are also remembered until the next :meth:`invalidate`,
+        so they apply when the region is (re)built; ``None`` is returned when the
+        region is not loaded.
+        """
+
+        if not updates:
+            return None
+        self._live.setdefault(region_id, {}).update(updates)
+        graph = self._graphs.get(region_id)
+        if graph is None or graph.free_flow_times is None:
+            return None
+
+        times, changed, previous_times, ignored = _patch_times(graph, updates)
+        view = np.frombuffer(times, dtype=np.float64)
+        moved = view[changed] != previous_times
+        changed = changed[moved]
+        if not len(changed):
+            return CongestionPatch(graph, graph, changed, False, tuple(ignored))
+        faster = bool(np.any(view[changed] < previous_times[moved]))
+
+        version = self.version(region_id) + 1
+        current = replace(graph, version=version, compact=graph.compact.with_times(times))
+        self._versions[region_id] = version
+        self._graphs[region_id] = current
+
+        for key in [key for key in self._hierarchies if key[0] == region_id]:
+            hierarchy = self._hierarchies.pop(key)
+            if key[1] == graph.version and key[2] is WeightStrategy.DISTANCE:
+                self._hierarchies[(region_id, version) + key[2:]] = hierarchy
+        for landmark_key in [key for key in self._landmarks if key[0] == region_id]:
+            table = self._landmarks.pop(landmark_key)
+            _, table_version, strategy = landmark_key
+            if table_version != graph.version or (strategy is WeightStrategy.TIME and faster):
+                continue
+            if table is not None and strategy is WeightStrategy.TIME:
+                # 只有边变慢时旧表的下界仍然成立，改为绑定到新图
+                table = replace(table, fingerprint=current.compact.fingerprint)
+            self._landmarks[(region_id, version, strategy)] = table
+        self._stats.congestion_updates += len(changed)
+        return CongestionPatch(graph, current, changed, faster, tuple(ignored))
+
+    def stats(self) -> GraphStoreStats:
+        """Return a snapshot of the store counters."""
+
+        return replace(self._stats)
+
+    async def _load_snapshot(
+        self,
+        region_id: int,
+        version: int,
+        source: GraphSource,
+    ) -> CompiledRegionGraph | None:
+        if self._snapshot_dir is None:
+            return None
+        path = snapshot_path(self._snapshot_dir, region_id)
+        if not path.exists():
+            return None
+        try:
+            snapshot = load_graph_snapshot(path)
+        except (OSError, ValueError, KeyError) as exc:
+            logger.warning("Failed to load graph snapshot %s: %s", path, exc)
+            return None
+        if snapshot.region_id != region_id:
+            logger.warning("Ignoring graph snapshot %s of region %s", path, snapshot.region_id)
+            return None
+        # 数据库可能在快照生成后被重新导入，签名不一致时回退为从数据库构建
+        if snapshot.signature != await source.graph_signature(region_id):
+            logger.warning(
+                "Ignoring stale graph snapshot %s; rerun scripts/build_routing_indexes.py", path
+            )
+            return None
+        graph = CompiledRegionGraph(
+            region_id=region_id,
+            version=version,
+            nodes=snapshot.nodes,
+            edges=(),
+            algorithm_edges=(),
+            compact=snapshot.compact,
+            edge_slots=snapshot.edge_slots,
+            free_flow_times=snapshot.free_flow_times,
+        )
+        live = self._live.get(region_id)
+        if live:
+            # 快照保存的是导入时的拥挤度，叠加加载前收到的实时更新
+            times, changed, _, _ = _patch_times(graph, live)
+            if len(changed):
+                graph = replace(graph, compact=graph.compact.with_times(times))
+        return graph
+
+
+def compile_region_graph(
+    region_id: int,
+    version: int,
+    nodes: Sequence[GraphNode],
+    edges: Sequence[GraphEdge],
+    *,
+    congestion: Mapping[int, float] | None = None,
+) -> CompiledRegionGraph:
+    """Convert repository rows into an immutable routing structure.
+
+    ``congestion`` overrides the stored congestion of individual edges by id.
+    """
+
+    live = congestion or {}
+    algorithm_edges = tuple(to_algorithm_edge(edge, live.get(edge.id)) for edge in edges)
+    compact = CompactGraph.from_edges(
+        algorithm_edges,
+        nodes=(node.id for node in nodes),
+        coordinates={node.id: (node.latitude, node.longitude) for node in nodes},
+    )
+    # 按 from_edges 的填充顺序还原每条边在 CSR 中的位置
+    cursor = list(compact.offsets[:-1])
+    edge_slots: dict[int, int] = {}
+    free_flow_times = np.empty(len(algorithm_edges), dtype=np.float64)
+    for edge, algorithm_edge in zip(edges, algorithm_edges):
+        source = compact.index[algorithm_edge.source]
+        slot = cursor[source]
+        cursor[source] += 1
+        if edge.id is not None:
+            edge_slots[edge.id] = slot
+        free_flow_times[slot] = algorithm_edge.distance / algorithm_edge.ideal_speed
+    return CompiledRegionGraph(
+        region_id=region_id,
+        version=version,
+        nodes=MappingProxyType({node.id: node for node in nodes}),
+        edges=tuple(edges),
+        algorithm_edges=algorithm_edges,
+        compact=compact,
+        edge_slots=MappingProxyType(edge_slots),
+        free_flow_times=free_flow_times,
+    )
+
+
+def _patch_times(
+    graph: CompiledRegionGraph,
+    updates: Mapping[int, float],
+) -> tuple[array, np.ndarray, np.ndarray, list[int]]:
+    """Copy the edge times of ``graph`` with congestion ``updates`` applied.
+
+    Returns the new times, the CSR edges that were set, their previous times
+    and the ids of edges the graph does not have.
+    """
+
+    slots: list[int] = []
+    factors: list[float] = []
+    ignored: list[int] = []
+    for edge_id, congestion in updates.items():
+        slot = graph.edge_slots.get(edge_id)
+        if slot is None:
+            ignored.append(edge_id)
+            continue
+        slots.append(slot)
+        factors.append(congestion)
+
+    changed = np.asarray(slots, dtype=np.int64)
+    times = array("d")
+    times.frombytes(memoryview(graph.compact.times).cast("B"))
+    view = np.frombuffer(times, dtype=np.float64)
+    previous_times = view[changed].copy()
+    view[changed] = graph.free_flow_times[changed] / np.asarray(factors, dtype=np.float64)
+    return times, changed, previous_times, ignored
+
+
+def hierarchy_path(
+    directory: Path,
+    region_id: int,
+    strategy: WeightStrategy | str,
+    modes: Sequence[str],
+) -> Path:
+    """Location of the serialised hierarchy for a region, strategy and mode set."""
+
+    mode_key = "+".join(sorted(modes))
+    return directory / f"region_{region_id}_{WeightStrategy(strategy).value}_{mode_key}.npz"
+
+
+def landmark_path(directory: Path, region_id: int, strategy: WeightStrategy | str) -> Path:
+    """Location of the serialised landmark table for a region and strategy."""
+
+    return directory / f"region_{region_id}_{WeightStrategy(strategy).value}.npz"
+
+
+def region_node_id(node_id: NodeId) -> int:
+    """Narrow a node id handed back by the algorithms to the database id it was compiled from.
+
+    Region graphs are compiled from integer database ids only, so every
+    :data:`~app.algorithms.NodeId` of a :class:`CompiledRegionGraph` is an ``int``.
+    """
+
+    return cast(int, node_id)
+
+
+def region_node_ids(node_ids: Iterable[NodeId]) -> list[int]:
+    """:func:`region_node_id` for a sequence of ids (e.g. the nodes of a path)."""
+
+    return cast("list[int]", list(node_ids))
+
+
+def to_algorithm_edge(edge: GraphEdge, congestion: float | None = None) -> AlgoEdge:
+    return AlgoEdge(
+        source=edge.start_node_id,
+        target=edge.end_node_id,
+        distance=edge.distance,
+        ideal_speed=edge.ideal_speed,
+        congestion=edge.congestion if congestion is None else congestion,
+        transport_modes=tuple(_mode_value(mode) for mode in edge.transport_modes),
+        congestion_profile=tuple(edge.congestion_profile) if edge.congestion_profile else None,
+    )
+
+
+def _mode_value(mode: TransportMode | str) -> str:
+    if isinstance(mode, TransportMode):
+        return mode.value
+    return str(mode).lower()
+
+
+region_graph_store = RegionGraphStore(
+    hierarchy_dir=CONTRACTION_DIR,
+    landmark_dir=LANDMARK_DIR,
+    landmark_count=settings.routing_landmark_count,
+    snapshot_dir=SNAPSHOT_DIR,
+)
+
+
+def get_region_graph_store() -> RegionGraphStore:
+    """Return the application-wide graph store."""
+
+    return region_graph_store
@@ -0,0 +1,184 @@
+"""Apply live congestion updates to loaded region graphs without reloading them."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections.abc import AsyncIterable, Mapping
+from dataclasses import asdict, dataclass, field
+from time import perf_counter
+
+from app.services.facility_index import FacilityIndexStore, facility_index_store
+from app.services.graph_store import RegionGraphStore, region_graph_store
+from app.services.route_cache import RouteCache, route_cache
+from app.services.tree_cache import ShortestPathTreeCache, tree_cache
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True, slots=True)
+class CongestionDelta:
+    """New congestion factor of one edge, as received from a feed."""
+
+    region_id: int
+    edge_id: int
+    congestion: float
+
+
+@dataclass(slots=True)
+class CongestionUpdateResult:
+    """What a batch of updates did to one region."""
+
+    region_id: int
+    version: int
+    loaded: bool
+    applied: int = 0
+    ignored_edge_ids: list[int] = field(default_factory=list)
+    routes_invalidated: int = 0
+    trees_invalidated: int = 0
+
+
+@dataclass(slots=True)
+class LiveCongestionStats:
+    """Counters describing the live congestion feed."""
+
+    batches: int = 0
+    updates: int = 0
+    applied: int = 0
+    rejected: int = 0
+    routes_invalidated: int = 0
+    trees_invalidated: int = 0
+    apply_seconds: float = 0.0
+
+    def as_dict(self) -> dict[str, float]:
+        return asdict(self)
+
+
+class LiveCongestionIngestor:
+    """Apply batched congestion deltas to the shared graph store and its caches.
+
+    Each batch patches the compiled graph copy-on-write and publishes it under a
+    new version (:meth:`RegionGraphStore.apply_congestion`); route plans and
+    shortest-path trees the change cannot affect move to the new version, the
+    rest are dropped. Applying is synchronous and never awaits, so on the event
+    loop a batch is atomic with respect to route queries.
+    """
+
+    def __init__(
+        self,
+        graph_store: RegionGraphStore,
+        route_cache: RouteCache | None = None,
+        tree_cache: ShortestPathTreeCache | None = None,
+        facility_index: FacilityIndexStore | None = None,
+    ) -> None:
+        self._graph_store = graph_store
+        self._route_cache = route_cache
+        self._tree_cache = tree_cache
+        self._facility_index = facility_index
+        self._stats = LiveCongestionStats()
+
+    def apply(self, region_id: int, updates: Mapping[int, float]) -> CongestionUpdateResult:
+        """Apply ``edge id -> congestion`` factors of one region.
+
+        Factors outside ``(0, 1]`` are rejected and reported as ignored, like
+        edges the region does not have. Updates for regions that are not loaded
+        are kept by the store and take effect when the region is built.
+        """
+
+        started = perf_counter()
+        valid: dict[int, float] = {}
+        rejected: list[int] = []
+        for edge_id, congestion in updates.items():
+            if 0 < congestion <= 1:
+                valid[edge_id] = float(congestion)
+            else:
+                rejected.append(edge_id)
+        self._stats.batches += 1
+        self._stats.updates += len(updates)
+        self._stats.rejected += len(rejected)
+
+        patch = self._graph_store.apply_congestion(region_id, valid)
+        result = CongestionUpdateResult(
+            region_id=region_id,
+            version=self._graph_store.version(region_id),
+            loaded=self._graph_store.peek(region_id) is not None,
+            ignored_edge_ids=rejected,
+        )
+        if patch is not None:
+            result.applied = len(patch.changed_edges)
+            result.ignored_edge_ids.extend(patch.ignored)
+            if patch.current is not patch.previous:
+                if self._route_cache is not None:
+                    result.routes_invalidated = self._route_cache.carry_over(patch)
+                if self._tree_cache is not None:
+                    result.trees_invalidated = self._tree_cache.carry_over(patch)
+                if self._facility_index is not None:
+                    # 分区记录了各节点到设施的时间，直接丢弃，按需重建
+                    self._facility_index.invalidate(region_id)
+        self._stats.applied += result.applied
+        self._stats.routes_invalidated += result.routes_invalidated
+        self._stats.trees_invalidated += result.trees_invalidated
+        self._stats.apply_seconds += perf_counter() - started
+        return result
+
+    async def consume(
+        self,
+        deltas: AsyncIterable[CongestionDelta],
+        *,
+        batch_size: int = 1000,
+        max_delay: float = 0.05,
+    ) -> int:
+        """Apply a stream of deltas in batches and return how many deltas were read.
+
+        Deltas are coalesced per region (the latest factor of an edge wins) and
+        flushed once ``batch_size`` have accumulated or ``max_delay`` seconds
+        have passed since the first pending one, and when the stream ends.
+        """
+
+        pending: dict[int, dict[int, float]] = {}
+        pending_count = 0
+        first_pending = 0.0
+        received = 0
+        async for delta in deltas:
+            received += 1
+            if not pending_count:
+                first_pending = perf_counter()
+            pending.setdefault(delta.region_id, {})[delta.edge_id] = delta.congestion
+            pending_count += 1
+            if pending_count >= batch_size or perf_counter() - first_pending >= max_delay:
+                self._flush(pending)
+                pending_count = 0
+                # 每批之后让出事件循环，路线查询不会被持续的更新流饿死
+                await asyncio.sleep(0)
+        self._flush(pending)
+        return received
+
+    def stats(self) -> LiveCongestionStats:
+        """Return a snapshot of the feed counters."""
+
+        return LiveCongestionStats(**asdict(self._stats))
+
+    def _flush(self, pending: dict[int, dict[int, float]]) -> None:
+        for region_id, updates in pending.items():
+            result = self.apply(region_id, updates)
+            if result.ignored_edge_ids:
+                logger.debug(
+                    "Ignored %d congestion updates for region %s",
+                    len(result.ignored_edge_ids),
+                    region_id,
+                )
+        pending.clear()
+
+
+live_congestion_ingestor = LiveCongestionIngestor(
+    region_graph_store,
+    route_cache,
+    tree_cache,
+    facility_index_store,
+)
+
+
+def get_live_congestion_ingestor() -> LiveCongestionIngestor:
+    """Return the application-wide live congestion ingestor."""
+
+    return live_congestion_ingestor
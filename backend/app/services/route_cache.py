@@ -0,0 +1,256 @@
+"""Bounded LRU cache of computed route plans."""
+
+from __future__ import annotations
+
+import logging
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from typing import TYPE_CHECKING, Any, Protocol, Sequence
+
+from app.algorithms import SearchAlgorithm, WeightStrategy
+from app.core.config import settings
+from app.services.graph_store import CompiledRegionGraph, CongestionPatch
+
+if TYPE_CHECKING:
+    from app.services.routing import RoutePlan
+
+logger = logging.getLogger(__name__)
+
+RouteCacheKey = tuple[int, int, int, int, WeightStrategy, tuple[str, ...]]
+
+
+class SharedCache(Protocol):
+    """Subset of :class:`~app.services.cache_service.DiaryCacheService` used for sharing plans."""
+
+    async def get(self, key: str) -> Any | None: ...
+
+    async def set(self, key: str, value: Any, ttl: int | None = None) -> None: ...
+
+
+@dataclass(slots=True)
+class RouteCacheStats:
+    """Counters describing how effective the route cache is."""
+
+    hits: int = 0
+    shared_hits: int = 0
+    misses: int = 0
+    stores: int = 0
+    evictions: int = 0
+    invalidations: int = 0
+    size: int = 0
+
+    @property
+    def hit_ratio(self) -> float:
+        lookups = self.hits + self.shared_hits + self.misses
+        return (self.hits + self.shared_hits) / lookups if lookups else 0.0
+
+    def as_dict(self) -> dict[str, float]:
+        return {**asdict(self), "hit_ratio": self.hit_ratio}
+
+
+class RouteCache:
+    """Keep recently computed :class:`~app.services.routing.RoutePlan` objects in memory.
+
+    Entries are keyed by region, graph version, endpoints, strategy and the
+    normalised mode set. Once a newer graph version of a region is seen, every
+    entry of older versions is dropped. With a ``shared`` backend (the Redis
+    diary cache) plans are also shared between workers; those keys use the
+    graph fingerprint because versions are only meaningful within one process.
+    """
+
+    def __init__(
+        self, max_entries: int = 1024, *, shared: SharedCache | None = None, shared_ttl: int = 600
+    ) -> None:
+        self._max_entries = max(0, max_entries)
+        self._entries: OrderedDict[RouteCacheKey, RoutePlan] = OrderedDict()
+        self._versions: dict[int, int] = {}
+        self._shared = shared
+        self._shared_ttl = shared_ttl
+        self._stats = RouteCacheStats()
+
+    @property
+    def enabled(self) -> bool:
+        return self._max_entries > 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    async def get(
+        self,
+        graph: CompiledRegionGraph,
+        start_node_id: int,
+        end_node_id: int,
+        strategy: WeightStrategy,
+        modes: Sequence[str],
+    ) -> RoutePlan | None:
+        """Return the cached plan, or ``None`` on a miss."""
+
+        if not self.enabled:
+            return None
+        self._observe_version(graph)
+        key = self._key(graph, start_node_id, end_node_id, strategy, modes)
+        plan = self._entries.get(key)
+        if plan is not None:
+            self._entries.move_to_end(key)
+            self._stats.hits += 1
+            return plan
+
+        if self._shared is not None:
+            payload = await self._shared.get(self._shared_key(graph, key))
+            if payload is not None:
+                plan = _plan_from_dict(payload)
+                self._insert(key, plan)
+                self._stats.shared_hits += 1
+                return plan
+
+        self._stats.misses += 1
+        return None
+
+    async def put(
+        self,
+        graph: CompiledRegionGraph,
+        start_node_id: int,
+        end_node_id: int,
+        strategy: WeightStrategy,
+        modes: Sequence[str],
+        plan: RoutePlan,
+    ) -> None:
+        """Store a freshly computed plan."""
+
+        if not self.enabled:
+            return
+        self._observe_version(graph)
+        key = self._key(graph, start_node_id, end_node_id, strategy, modes)
+        self._insert(key, plan)
+        self._stats.stores += 1
+        if self._shared is not None:
+            await self._shared.set(self._shared_key(graph, key), asdict(plan), self._shared_ttl)
+
+    def invalidate(self, region_id: int | None = None) -> None:
+        """Drop cached plans of one region (or all regions)."""
+
+        stale = [key for key in self._entries if region_id is None or key[0] == region_id]
+        for key in stale:
+            del self._entries[key]
+        self._stats.invalidations += len(stale)
+
+    def carry_over(self, patch: CongestionPatch) -> int:
+        """Move plans a congestion patch cannot affect to the patched version.
+
+        Returns how many plans were dropped. A plan is dropped when it uses a
+        changed edge, or when it was optimised for time and some edge became
+        faster (a cheaper route may now exist).
+        """
+
+        previous, current = patch.previous, patch.current
+        if current.version == previous.version:
+            return 0
+        self._versions[patch.region_id] = max(
+            self._versions.get(patch.region_id, 0), current.version
+        )
+        pairs = patch.node_pairs()
+        dropped = 0
+        for key in [
+            key for key in self._entries if key[0] == patch.region_id and key[1] <= previous.version
+        ]:
+            plan = self._entries.pop(key)
+            affected = key[1] < previous.version or (patch.faster and key[4] is WeightStrategy.TIME)
+            if not affected:
+                affected = any(
+                    (segment.source_id, segment.target_id) in pairs for segment in plan.segments
+                )
+            if affected:
+                dropped += 1
+            else:
+                # 重新插入到末尾，同一区域内的 LRU 相对顺序不变
+                self._entries[(key[0], current.version) + key[2:]] = plan
+        self._stats.invalidations += dropped
+        return dropped
+
+    def stats(self) -> RouteCacheStats:
+        """Return a snapshot of the cache counters."""
+
+        return RouteCacheStats(**{**asdict(self._stats), "size": len(self._entries)})
+
+    def _observe_version(self, graph: CompiledRegionGraph) -> None:
+        known = self._versions.get(graph.region_id)
+        if known is None or graph.version > known:
+            self._versions[graph.region_id] = graph.version
+            if known is not None:
+                # 区域图版本更新，旧版本上的路线全部失效
+                stale = [
+                    key
+                    for key in self._entries
+                    if key[0] == graph.region_id and key[1] < graph.version
+                ]
+                for key in stale:
+                    del self._entries[key]
+                self._stats.invalidations += len(stale)
+
+    def _insert(self, key: RouteCacheKey, plan: RoutePlan) -> None:
+        self._entries[key] = plan
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+            self._stats.evictions += 1
+
+    @staticmethod
+    def _key(
+        graph: CompiledRegionGraph,
+        start_node_id: int,
+        end_node_id: int,
+        strategy: WeightStrategy,
+        modes: Sequence[str],
+    ) -> RouteCacheKey:
+        return (
+            graph.region_id,
+            graph.version,
+            start_node_id,
+            end_node_id,
+            strategy,
+            tuple(sorted(modes)),
+        )
+
+    @staticmethod
+    def _shared_key(graph: CompiledRegionGraph, key: RouteCacheKey) -> str:
+        region_id, _, start, end, strategy, modes = key
+        fingerprint = graph.compact.fingerprint
+        return f"route:{region_id}:{fingerprint}:{start}:{end}:{strategy.value}:{'+'.join(modes)}"
+
+
+def _plan_from_dict(payload: dict[str, Any]) -> RoutePlan:
+    from app.services.routing import RouteNode, RoutePlan, RouteSegment
+
+    return RoutePlan(
+        region_id=payload["region_id"],
+        strategy=WeightStrategy(payload["strategy"]),
+        total_distance=payload["total_distance"],
+        total_time=payload["total_time"],
+        allowed_modes=tuple(payload["allowed_modes"]),
+        nodes=[RouteNode(**node) for node in payload["nodes"]],
+        segments=[RouteSegment(**segment) for segment in payload["segments"]],
+        expanded_nodes=payload["expanded_nodes"],
+        algorithm=SearchAlgorithm(payload["algorithm"]),
+    )
+
+
+def _build_route_cache() -> RouteCache:
+    shared = None
+    if settings.routing_route_cache_redis:
+        from app.services.cache_service import diary_cache_service
+
+        shared = diary_cache_service
+    return RouteCache(
+        settings.routing_route_cache_size,
+        shared=shared,
+        shared_ttl=settings.routing_route_cache_ttl,
+    )
+
+
+route_cache = _build_route_cache()
+
+
+def get_route_cache() -> RouteCache:
+    """Return the application-wide route cache."""
+
+    return route_cache
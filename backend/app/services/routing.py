@@ -2,17 +2,53 @@
 
 from __future__ import annotations
 
-from dataclasses import dataclass
-from functools import lru_cache
-from typing import Iterable, Sequence
-from collections import deque
-import heapq
-
-from app.algorithms import Edge as AlgoEdge
-from app.algorithms import PathResult, PathSegment as AlgoPathSegment, WeightStrategy, shortest_path
+from concurrent.futures import Executor
+from dataclasses import dataclass, replace
+from datetime import datetime
+from math import inf
+from typing import Any, Callable, Iterable, Iterator, Sequence
+
+import numpy as np
+
+from app.algorithms import (
+    CompactGraph,
+    NodeId,
+    PathResult,
+    PathSegment as AlgoPathSegment,
+    SearchAlgorithm,
+    ShortestPathTree,
+    WeightStrategy,
+    alternative_paths,
+    astar_shortest_path,
+    TourComputationError,
+    TourSolver,
+    bidirectional_shortest_path,
+    build_shortest_path_tree,
+    compute_isochrone,
+    multimodal_shortest_path,
+    nearest_targets_tree,
+    time_dependent_shortest_path,
+    Isochrone,
+    compact_shortest_path,
+    compute_tour,
+)
+from app.algorithms.contraction import contraction_shortest_path
+from app.algorithms.landmarks import alt_shortest_path
+from app.algorithms.matrix import DistanceMatrix, distance_matrix, shortest_paths_from
+from app.core.config import settings
 from app.models.enums import RegionType, TransportMode
-from app.models.graph import GraphEdge, GraphNode
+from app.models.graph import GraphNode
+from app.models.locations import Region
 from app.repositories import GraphRepository, RegionRepository
+from app.services.executors import ComputeExecutor, ExecutorKind
+from app.services.graph_store import (
+    CompiledRegionGraph,
+    RegionGraphStore,
+    region_node_id,
+    region_node_ids,
+)
+from app.services.route_cache import RouteCache
+from app.services.tree_cache import ShortestPathTreeCache
 
 
 @dataclass(slots=True)
@@ -41,6 +77,143 @@ class RoutePlan:
     allowed_modes: tuple[str, ...]
     nodes: list[RouteNode]
     segments: list[RouteSegment]
+    expanded_nodes: int = 0
+    algorithm: SearchAlgorithm = SearchAlgorithm.ASTAR
+    departure_time: datetime | None = None
+    # 命中路线缓存时为 True：此时 algorithm 指最初计算所用的算法，expanded_nodes 为 0
+    cached: bool = False
+
+
+@dataclass(slots=True)
+class RouteQuery:
+    """One origin/destination pair of a batch route request."""
+
+    start_node_id: int
+    end_node_id: int
+    strategy: WeightStrategy | str = WeightStrategy.TIME
+    transport_modes: Sequence[TransportMode | str] | None = None
+
+
+@dataclass(slots=True)
+class TourPlan:
+    region_id: int
+    strategy: WeightStrategy
+    total_distance: float
+    total_time: float
+    allowed_modes: tuple[str, ...]
+    route: list[int]
+    legs: list[RoutePlan]
+    solver: TourSolver = TourSolver.LOCAL_SEARCH
+    solver_seconds: float = 0.0
+
+
+@dataclass(slots=True)
+class DistanceMatrixPlan:
+    region_id: int
+    strategy: WeightStrategy
+    allowed_modes: tuple[str, ...]
+    source_ids: list[int]
+    target_ids: list[int]
+    matrix: DistanceMatrix
+
+    def path_node_ids(self, row: int, column: int) -> list[int] | None:
+        """Node ids along the path from ``source_ids[row]`` to ``target_ids[column]``, if any."""
+        try:
+            return region_node_ids(self.matrix.path(row, column).nodes)
+        except ValueError:
+            return None
+
+
+@dataclass(slots=True)
+class IsochronePlan:
+    region_id: int
+    origin_node_id: int
+    strategy: WeightStrategy
+    allowed_modes: tuple[str, ...]
+    isochrone: Isochrone
+
+    @property
+    def node_ids(self) -> list[int]:
+        return region_node_ids(self.isochrone.node_ids)
+
+
+@dataclass(frozen=True, slots=True)
+class ReachableNodes:
+    """起点最短路树上在距离限制内的全部节点。
+
+    只保存树的代价与前驱数组，路径在调用 :meth:`path` 时才沿前驱回溯，
+    因此调用方只为最终返回的少数节点付出重建路径的开销。
+    """
+
+    tree: ShortestPathTree
+    within: np.ndarray  # 按稠密节点编号标记是否在限制内
+
+    def __len__(self) -> int:
+        return int(np.count_nonzero(self.within))
+
+    def __contains__(self, node_id: object) -> bool:
+        return self._position(node_id) is not None
+
+    def __iter__(self) -> Iterator[int]:
+        node_ids = self.tree.graph.node_ids
+        positions = np.flatnonzero(self.within).tolist()
+        return (region_node_id(node_ids[position]) for position in positions)
+
+    def distance(self, node_id: int) -> float:
+        """路径距离（米）。"""
+        return float(self.tree.distances[self._require(node_id)])
+
+    def time(self, node_id: int) -> float:
+        """旅行时间（分钟）。"""
+        return float(self.tree.times[self._require(node_id)]) / 60
+
+    def path(self, node_id: int) -> list[int]:
+        """从起点到该节点的节点ID序列。"""
+        node_ids = self.tree.graph.node_ids
+        return region_node_ids(
+            node_ids[node] for node in self.tree.node_path(self._require(node_id))
+        )
+
+    def _position(self, node_id: object) -> int | None:
+        position = self.tree.graph.index.get(node_id)
+        if position is None or not self.within[position]:
+            return None
+        return position
+
+    def _require(self, node_id: int) -> int:
+        position = self._position(node_id)
+        if position is None:
+            raise KeyError(node_id)
+        return position
+
+
+def _reachable_within(tree: ShortestPathTree, max_distance: float | None) -> ReachableNodes:
+    # 超出距离限制的节点不作为可达节点返回
+    within = np.isfinite(tree.costs)
+    if max_distance is not None:
+        within &= tree.distances <= max_distance
+    return ReachableNodes(tree=tree, within=within)
+
+
+def default_transport_modes(region_type: RegionType) -> set[str]:
+    """Transport modes permitted in a region when the caller does not restrict them."""
+
+    if region_type is RegionType.CAMPUS:
+        return {TransportMode.WALK.value, TransportMode.BIKE.value}
+    if region_type is RegionType.SCENIC:
+        return {TransportMode.WALK.value, TransportMode.ELECTRIC_CART.value}
+    return {TransportMode.WALK.value}
+
+
+def grouped_shortest_paths(
+    graph: CompactGraph,
+    groups: Sequence[tuple[int, Sequence[int], WeightStrategy, Sequence[str] | None]],
+) -> list[list[PathResult | None]]:
+    """每组 (起点, 终点列表, 策略, 交通方式) 只执行一次单源搜索，返回各终点的路径。"""
+    return [
+        shortest_paths_from(graph, source, targets, strategy=strategy, allowed_modes=allowed_modes)
+        for source, targets, strategy, allowed_modes in groups
+    ]
 
 
 class RoutingError(Exception):
@@ -62,27 +235,56 @@ class RouteNotFoundError(RoutingError):
 class RoutingService:
     """High-level service combining repositories and shortest-path algorithm."""
 
-    def __init__(self, graph_repository: GraphRepository, region_repository: RegionRepository) -> None:
+    def __init__(
+        self,
+        graph_repository: GraphRepository,
+        region_repository: RegionRepository,
+        graph_store: RegionGraphStore | None = None,
+        tour_executor: Executor | None = None,
+        compute_executor: ComputeExecutor | None = None,
+        route_cache: RouteCache | None = None,
+        tree_cache: ShortestPathTreeCache | None = None,
+    ) -> None:
         self._graph_repository = graph_repository
         self._region_repository = region_repository
-        # 缓存边数据和节点数据，避免重复加载
-        self._edges_cache: dict[int, list] = {}
-        self._nodes_cache: dict[int, GraphNode] = {}
-
-    async def _get_edges_cached(self, region_id: int) -> list:
-        """获取边数据（带缓存）。"""
-        if region_id not in self._edges_cache:
-            edges = await self._graph_repository.list_edges_by_region(region_id)
-            self._edges_cache[region_id] = edges
-        return self._edges_cache[region_id]
-    
-    async def _get_node_cached(self, node_id: int) -> GraphNode | None:
-        """获取节点数据（带缓存）。"""
-        if node_id not in self._nodes_cache:
-            node = await self._graph_repository.get_node(node_id)
-            if node:
-                self._nodes_cache[node_id] = node
-        return self._nodes_cache.get(node_id)
+        # 编译后的区域图在进程内共享；未注入时使用独立的存储（便于测试隔离）
+        self._graph_store = graph_store if graph_store is not None else RegionGraphStore()
+        # 多起点路线优化的进程池；为 None 时在线程内依次执行
+        self._tour_executor = tour_executor
+        # 搜索等 CPU 密集型计算的执行器；未注入时在事件循环内直接执行
+        self._compute_executor = (
+            compute_executor
+            if compute_executor is not None
+            else ComputeExecutor(ExecutorKind.INLINE)
+        )
+        # 路线结果缓存；为 None 时每次重新计算
+        self._route_cache = route_cache
+        # 热门起点的最短路树缓存，设施查询与路线查询共用
+        self._tree_cache = tree_cache
+
+    async def _get_region_graph(self, region_id: int) -> CompiledRegionGraph:
+        """获取编译后的区域图（进程级共享缓存）。"""
+        return await self._graph_store.get(region_id, self._graph_repository)
+
+    async def search_context(
+        self,
+        region: Region,
+        transport_modes: Sequence[TransportMode | str] | None = None,
+    ) -> tuple[CompiledRegionGraph, tuple[str, ...]]:
+        """返回区域路网快照及解析后的交通方式，供设施索引等在同一份图上运行专用搜索。"""
+        graph = await self._get_region_graph(region.id)
+        return graph, tuple(self._resolve_transport_modes(region.type, transport_modes))
+
+    async def _get_node_cached(
+        self, node_id: int, region_id: int | None = None
+    ) -> GraphNode | None:
+        """获取节点数据，优先从区域图快照中读取。"""
+        if region_id is not None:
+            graph = await self._get_region_graph(region_id)
+            node = graph.nodes.get(node_id)
+            if node is not None:
+                return node
+        return await self._graph_repository.get_node(node_id)
 
     async def compute_route(
         self,
@@ -92,46 +294,437 @@ class RoutingService:
         end_node_id: int,
         strategy: WeightStrategy | str = WeightStrategy.TIME,
         transport_modes: Sequence[TransportMode | str] | None = None,
+        algorithm: SearchAlgorithm | str = SearchAlgorithm.ASTAR,
+        departure_time: datetime | None = None,
     ) -> RoutePlan:
+        """计算两节点间的最优路线。
+
+        给出 ``departure_time`` 且区域路网含时段拥挤曲线时，按出发时刻进行时间依赖搜索
+        （不读写路线缓存）；否则使用静态拥挤系数。``algorithm`` 为 ``multimodal`` 时
+        逐段选择最快的交通方式并计入换乘代价，见 :meth:`_multimodal_route`。
+        """
         region = await self._region_repository.get_region(region_id)
         if region is None:
             raise RegionNotFoundError(f"Region {region_id} does not exist")
 
-        start_node, end_node = await self._fetch_and_validate_nodes(region_id, start_node_id, end_node_id)
+        start_node, end_node = await self._fetch_and_validate_nodes(
+            region_id, start_node_id, end_node_id
+        )
 
-        # 使用缓存的边数据
-        edges = await self._get_edges_cached(region_id)
-        if not edges:
+        graph = await self._get_region_graph(region_id)
+        if graph.is_empty:
             raise RouteNotFoundError(f"Region {region_id} has no routing edges")
 
-        algorithm_edges = self._to_algorithm_edges(edges)
         allowed_modes = self._resolve_transport_modes(region.type, transport_modes)
+        weight_strategy = WeightStrategy(strategy)
+        search_algorithm = SearchAlgorithm(algorithm)
+
+        if departure_time is not None and graph.compact.profiles is not None:
+            return await self._time_dependent_route(
+                graph,
+                region_id,
+                start_node_id,
+                end_node_id,
+                weight_strategy,
+                allowed_modes,
+                departure_time,
+            )
+
+        if search_algorithm is SearchAlgorithm.MULTIMODAL:
+            return await self._multimodal_route(
+                graph, region_id, start_node_id, end_node_id, weight_strategy, allowed_modes
+            )
+
+        # 各算法都返回最短路，缓存结果与所选算法无关
+        cache = self._route_cache
+        if cache is not None:
+            cached = await cache.get(
+                graph, start_node_id, end_node_id, weight_strategy, allowed_modes
+            )
+            if cached is not None:
+                return replace(cached, expanded_nodes=0, cached=True)
+
+        # 同一起点已有（或值得构建）最短路树时，直接沿树回溯路径
+        tree = None
+        trees = self._tree_cache
+        if trees is not None:
+            tree = trees.get(graph, start_node_id, weight_strategy, allowed_modes)
+            if tree is None and trees.is_hot(graph, start_node_id, weight_strategy, allowed_modes):
+                tree = await self._shortest_path_tree(
+                    graph, start_node_id, weight_strategy, allowed_modes
+                )
+
+        try:
+            if tree is not None:
+                result, search_algorithm = tree.path(end_node_id), SearchAlgorithm.DIJKSTRA
+            else:
+                result, search_algorithm = await self._run_search(
+                    graph,
+                    start_node_id,
+                    end_node_id,
+                    allowed_modes=allowed_modes,
+                    strategy=weight_strategy,
+                    algorithm=search_algorithm,
+                )
+        except ValueError as exc:  # from algorithm when no path or invalid graph
+            raise RouteNotFoundError(str(exc)) from exc
 
+        node_map = await self._build_node_map(graph, result.nodes)
+        plan = self._to_route_plan(
+            region_id, weight_strategy, allowed_modes, node_map, result, search_algorithm
+        )
+        if cache is not None:
+            await cache.put(graph, start_node_id, end_node_id, weight_strategy, allowed_modes, plan)
+        return plan
+
+    async def _time_dependent_route(
+        self,
+        graph: CompiledRegionGraph,
+        region_id: int,
+        start_node_id: int,
+        end_node_id: int,
+        strategy: WeightStrategy,
+        allowed_modes: Sequence[str],
+        departure_time: datetime,
+    ) -> RoutePlan:
+        # 拥挤曲线按当地钟点划分时段，忽略时区
+        departure = (
+            departure_time.hour * 3600
+            + departure_time.minute * 60
+            + departure_time.second
+            + departure_time.microsecond / 1_000_000
+        )
         try:
-            result = shortest_path(
-                algorithm_edges,
-                start=str(start_node_id),
-                goal=str(end_node_id),
+            result = await self._compute_executor.run(
+                time_dependent_shortest_path,
+                graph.compact,
+                start_node_id,
+                end_node_id,
+                departure,
                 allowed_modes=allowed_modes,
                 strategy=strategy,
             )
-        except ValueError as exc:  # from algorithm when no path or invalid graph
+        except ValueError as exc:
+            raise RouteNotFoundError(str(exc)) from exc
+        node_map = await self._build_node_map(graph, result.nodes)
+        plan = self._to_route_plan(
+            region_id, strategy, allowed_modes, node_map, result, SearchAlgorithm.ASTAR
+        )
+        plan.departure_time = departure_time
+        return plan
+
+    async def _multimodal_route(
+        self,
+        graph: CompiledRegionGraph,
+        region_id: int,
+        start_node_id: int,
+        end_node_id: int,
+        strategy: WeightStrategy,
+        allowed_modes: Sequence[str],
+    ) -> RoutePlan:
+        # 逐段选择交通方式，耗时与单一方式的最短路不同，因此不读写路线缓存
+        transfer_penalties = {
+            tuple(key.split(">", 1)): seconds
+            for key, seconds in settings.routing_mode_transfer_penalties.items()
+            if ">" in key
+        }
+        try:
+            result = await self._compute_executor.run(
+                multimodal_shortest_path,
+                graph.compact,
+                start_node_id,
+                end_node_id,
+                allowed_modes=allowed_modes,
+                strategy=strategy,
+                speed_factors=settings.routing_mode_speed_factors,
+                transfer_penalties=transfer_penalties,
+            )
+        except ValueError as exc:
             raise RouteNotFoundError(str(exc)) from exc
+        node_map = await self._build_node_map(graph, result.nodes)
+        return self._to_route_plan(
+            region_id, strategy, allowed_modes, node_map, result, SearchAlgorithm.MULTIMODAL
+        )
 
-        node_map = await self._build_node_map(region_id, result.nodes)
-        route_nodes = [self._to_route_node(node_map, node_id) for node_id in result.nodes]
-        route_segments = [self._to_route_segment(node_map, segment) for segment in result.segments]
+    async def compute_routes_batch(
+        self,
+        *,
+        region_id: int,
+        queries: Sequence[RouteQuery],
+    ) -> list[RoutePlan | RoutingError]:
+        """批量计算同一区域内的多条路线，结果与 ``queries`` 一一对应。
 
-        return RoutePlan(
+        起点、策略和交通方式相同的查询合并为一次单源搜索；单条查询的节点或
+        交通方式无效、或不可达时，对应位置返回异常对象而不影响其他查询。
+        """
+        region = await self._region_repository.get_region(region_id)
+        if region is None:
+            raise RegionNotFoundError(f"Region {region_id} does not exist")
+
+        graph = await self._get_region_graph(region_id)
+        results: list[RoutePlan | RoutingError | None] = [None] * len(queries)
+        groups: dict[tuple[int, WeightStrategy, tuple[str, ...]], list[tuple[int, int]]] = {}
+        for index, query in enumerate(queries):
+            try:
+                await self._fetch_and_validate_nodes(
+                    region_id, query.start_node_id, query.end_node_id
+                )
+                allowed_modes = self._resolve_transport_modes(region.type, query.transport_modes)
+            except NodeValidationError as exc:
+                results[index] = exc
+                continue
+            if graph.is_empty:
+                results[index] = RouteNotFoundError(f"Region {region_id} has no routing edges")
+                continue
+            key = (query.start_node_id, WeightStrategy(query.strategy), tuple(allowed_modes))
+            groups.setdefault(key, []).append((index, query.end_node_id))
+
+        if groups:
+            # 整批搜索作为一个任务提交给计算执行器
+            paths = await self._compute_executor.run(
+                grouped_shortest_paths,
+                graph.compact,
+                [
+                    (start, [end for _, end in members], strategy, modes)
+                    for (start, strategy, modes), members in groups.items()
+                ],
+            )
+            found = [path for group in paths for path in group if path is not None]
+            node_map = await self._build_node_map(
+                graph, (node_id for path in found for node_id in path.nodes)
+            )
+            for ((start, strategy, modes), members), group_paths in zip(groups.items(), paths):
+                for (index, end), path in zip(members, group_paths):
+                    if path is None:
+                        results[index] = RouteNotFoundError(f"No path found from {start} to {end}")
+                    else:
+                        results[index] = self._to_route_plan(
+                            region_id, strategy, modes, node_map, path, SearchAlgorithm.DIJKSTRA
+                        )
+        return results
+
+    async def compute_alternative_routes(
+        self,
+        *,
+        region_id: int,
+        start_node_id: int,
+        end_node_id: int,
+        strategy: WeightStrategy | str = WeightStrategy.TIME,
+        transport_modes: Sequence[TransportMode | str] | None = None,
+        k: int = 3,
+        max_overlap: float = 0.7,
+    ) -> list[RoutePlan]:
+        """返回至多 ``k`` 条互不相同的路线，第一条为最短路线，其余按代价递增。
+
+        所有候选共用一次前向和一次后向搜索（平台法），因此 ``k=3`` 的开销接近
+        两次单次查询；与已选路线重合部分超过 ``max_overlap`` 的候选被舍弃。
+        """
+        if k < 1:
+            raise NodeValidationError("k must be at least 1")
+        if not 0.0 <= max_overlap <= 1.0:
+            raise NodeValidationError("max_overlap must be between 0 and 1")
+        region = await self._region_repository.get_region(region_id)
+        if region is None:
+            raise RegionNotFoundError(f"Region {region_id} does not exist")
+
+        await self._fetch_and_validate_nodes(region_id, start_node_id, end_node_id)
+
+        graph = await self._get_region_graph(region_id)
+        if graph.is_empty:
+            raise RouteNotFoundError(f"Region {region_id} has no routing edges")
+
+        allowed_modes = self._resolve_transport_modes(region.type, transport_modes)
+        weight_strategy = WeightStrategy(strategy)
+        try:
+            results = await self._compute_executor.run(
+                alternative_paths,
+                graph.compact,
+                start_node_id,
+                end_node_id,
+                k,
+                strategy=weight_strategy,
+                allowed_modes=allowed_modes,
+                max_overlap=max_overlap,
+                max_stretch=settings.routing_alternative_max_stretch,
+            )
+        except ValueError as exc:
+            raise RouteNotFoundError(str(exc)) from exc
+
+        node_map = await self._build_node_map(
+            graph, (node_id for result in results for node_id in result.nodes)
+        )
+        return [
+            self._to_route_plan(
+                region_id,
+                weight_strategy,
+                allowed_modes,
+                node_map,
+                result,
+                SearchAlgorithm.DIJKSTRA,
+            )
+            for result in results
+        ]
+
+    async def compute_tour_plan(
+        self,
+        *,
+        region_id: int,
+        start_node_id: int,
+        target_node_ids: Sequence[int],
+        strategy: WeightStrategy | str = WeightStrategy.TIME,
+        transport_modes: Sequence[TransportMode | str] | None = None,
+        time_budget: float | None = None,
+    ) -> TourPlan:
+        """规划从起点出发、依次游览所有目标点并返回起点的路线。
+
+        ``time_budget`` 限制路线优化耗时（秒），默认取 ``settings.routing_tour_time_budget``；
+        目标点数量不超过 ``settings.routing_tour_exact_threshold`` 时返回精确最优解。
+        """
+        region = await self._region_repository.get_region(region_id)
+        if region is None:
+            raise RegionNotFoundError(f"Region {region_id} does not exist")
+
+        targets = [
+            node_id for node_id in dict.fromkeys(target_node_ids) if node_id != start_node_id
+        ]
+        await self._validate_region_nodes(region_id, [start_node_id, *targets])
+
+        graph = await self._get_region_graph(region_id)
+        allowed_modes = self._resolve_transport_modes(region.type, transport_modes)
+        weight_strategy = WeightStrategy(strategy)
+        budget = settings.routing_tour_time_budget if time_budget is None else time_budget
+
+        try:
+            # 路线优化是 CPU 密集型计算，交给计算执行器，避免阻塞事件循环
+            tour = await self._compute_executor.run(
+                compute_tour,
+                graph.compact,
+                start_node_id,
+                targets,
+                allowed_modes=allowed_modes,
+                strategy=weight_strategy,
+                time_budget=budget,
+                exact_threshold=settings.routing_tour_exact_threshold,
+                starts=settings.routing_tour_starts,
+                # 已在工作进程中时不再嵌套使用进程池
+                executor=(
+                    None
+                    if self._compute_executor.kind is ExecutorKind.PROCESS
+                    else self._tour_executor
+                ),
+            )
+        except TourComputationError as exc:
+            raise RouteNotFoundError(str(exc)) from exc
+
+        node_map = await self._build_node_map(graph, tour.route)
+        legs = [
+            self._to_route_plan(
+                region_id,
+                weight_strategy,
+                allowed_modes,
+                node_map,
+                leg.path,
+                SearchAlgorithm.DIJKSTRA,
+            )
+            for leg in tour.legs
+        ]
+        return TourPlan(
             region_id=region_id,
-            strategy=WeightStrategy(strategy),
-            total_distance=result.total_distance,
-            total_time=result.total_time,
+            strategy=weight_strategy,
+            total_distance=tour.total_distance,
+            total_time=tour.total_time,
             allowed_modes=tuple(allowed_modes),
-            nodes=route_nodes,
-            segments=route_segments,
+            route=region_node_ids(tour.route),
+            legs=legs,
+            solver=tour.solver,
+            solver_seconds=tour.solver_seconds,
         )
 
+    async def compute_distance_matrix(
+        self,
+        *,
+        region_id: int,
+        source_node_ids: Sequence[int],
+        target_node_ids: Sequence[int] | None = None,
+        strategy: WeightStrategy | str = WeightStrategy.TIME,
+        transport_modes: Sequence[TransportMode | str] | None = None,
+    ) -> DistanceMatrixPlan:
+        """计算多起点到多终点的代价矩阵（每个起点一次有界 Dijkstra）。"""
+        region = await self._region_repository.get_region(region_id)
+        if region is None:
+            raise RegionNotFoundError(f"Region {region_id} does not exist")
+
+        source_ids = list(source_node_ids)
+        target_ids = list(target_node_ids) if target_node_ids is not None else list(source_ids)
+        await self._validate_region_nodes(region_id, [*source_ids, *target_ids])
+
+        graph = await self._get_region_graph(region_id)
+        allowed_modes = self._resolve_transport_modes(region.type, transport_modes)
+        weight_strategy = WeightStrategy(strategy)
+        matrix = await self._compute_executor.run(
+            distance_matrix,
+            graph.compact,
+            source_ids,
+            target_ids,
+            strategy=weight_strategy,
+            allowed_modes=allowed_modes,
+        )
+        return DistanceMatrixPlan(
+            region_id=region_id,
+            strategy=weight_strategy,
+            allowed_modes=tuple(allowed_modes),
+            source_ids=source_ids,
+            target_ids=target_ids,
+            matrix=matrix,
+        )
+
+    async def _run_search(
+        self,
+        graph: CompiledRegionGraph,
+        start: int,
+        goal: int,
+        *,
+        allowed_modes: Sequence[str] | None,
+        strategy: WeightStrategy,
+        algorithm: SearchAlgorithm,
+    ) -> tuple[PathResult, SearchAlgorithm]:
+        """按所选算法执行点到点最短路搜索，返回结果及实际使用的算法。
+
+        预处理索引在当前进程中查找，搜索本身交给计算执行器。
+        """
+        compact = graph.compact
+        mode_mask = compact.mode_mask(allowed_modes)
+        options: dict[str, Any] = {"allowed_modes": allowed_modes, "strategy": strategy}
+        search: Callable[..., PathResult]
+        if algorithm is SearchAlgorithm.CONTRACTION_HIERARCHY:
+            hierarchy = self._graph_store.hierarchy(
+                graph, strategy, allowed_modes or compact.mode_names
+            )
+            if hierarchy is None or not hierarchy.matches(compact, strategy, mode_mask):
+                # 未预处理该区域/交通方式组合（或层次与当前图不符）时回退到 Dijkstra
+                algorithm = SearchAlgorithm.DIJKSTRA
+            else:
+                search = contraction_shortest_path
+                options["hierarchy"] = hierarchy
+
+        if algorithm is SearchAlgorithm.ALT:
+            table = await self._graph_store.landmarks(graph, strategy, self._compute_executor)
+            if table is None or not table.matches(compact, strategy, mode_mask):
+                # 未启用地标（或地标表与当前图不符）时退化为几何启发式 A*
+                algorithm = SearchAlgorithm.ASTAR
+            else:
+                search = alt_shortest_path
+                options["table"] = table
+
+        if algorithm is SearchAlgorithm.BIDIRECTIONAL:
+            search = bidirectional_shortest_path
+        elif algorithm is SearchAlgorithm.DIJKSTRA:
+            search = compact_shortest_path
+        elif algorithm is SearchAlgorithm.ASTAR:
+            search = astar_shortest_path
+        result = await self._compute_executor.run(search, compact, start, goal, **options)
+        return result, algorithm
+
     async def compute_reachable_nodes(
         self,
         *,
@@ -140,132 +733,156 @@ class RoutingService:
         max_distance: float | None = None,
         strategy: WeightStrategy | str = WeightStrategy.DISTANCE,
         transport_modes: Sequence[TransportMode | str] | None = None,
-    ) -> dict[int, dict[str, any]]:
+    ) -> ReachableNodes:
         """
-        使用 BFS 从起点计算所有可达节点的距离和路径。
-        
-        返回格式: {
-            node_id: {
-                "distance": float,  # 路径距离（米）
-                "time": float,      # 旅行时间（分钟）
-                "path": [node_ids], # 节点ID序列
-            }
-        }
+        基于起点的最短路树计算所有可达节点（沿边的方向），距离超过 ``max_distance`` 的节点除外。
+
+        返回的 :class:`ReachableNodes` 按节点ID提供距离（米）与时间（分钟），
+        路径只在调用 ``path`` 时重建。
         """
         region = await self._region_repository.get_region(region_id)
         if region is None:
             raise RegionNotFoundError(f"Region {region_id} does not exist")
 
-        origin_node = await self._get_node_cached(origin_node_id)
+        origin_node = await self._get_node_cached(origin_node_id, region_id)
         if origin_node is None or origin_node.region_id != region_id:
             raise NodeValidationError("Origin node must exist within the specified region")
 
         # 加载图数据
-        edges = await self._get_edges_cached(region_id)
-        if not edges:
-            return {}
+        graph = await self._get_region_graph(region_id)
+        allowed_modes = self._resolve_transport_modes(region.type, transport_modes)
+        weight_strategy = WeightStrategy(strategy)
+        tree = await self._shortest_path_tree(graph, origin_node_id, weight_strategy, allowed_modes)
+
+        return _reachable_within(tree, max_distance)
+
+    async def compute_nearest_nodes(
+        self,
+        *,
+        region_id: int,
+        origin_node_id: int,
+        target_node_ids: Iterable[int],
+        limit: int,
+        max_distance: float | None = None,
+        strategy: WeightStrategy | str = WeightStrategy.DISTANCE,
+        transport_modes: Sequence[TransportMode | str] | None = None,
+    ) -> ReachableNodes:
+        """
+        查找距起点最近的 ``limit`` 个目标节点：搜索在找够目标后立即停止，
+        直线距离已超出 ``max_distance`` 的目标在搜索前即被排除。
+
+        返回的 :class:`ReachableNodes` 只包含搜索中已确定的节点；起点已有缓存的
+        完整最短路树时直接复用。
+        """
+        region = await self._region_repository.get_region(region_id)
+        if region is None:
+            raise RegionNotFoundError(f"Region {region_id} does not exist")
 
+        origin_node = await self._get_node_cached(origin_node_id, region_id)
+        if origin_node is None or origin_node.region_id != region_id:
+            raise NodeValidationError("Origin node must exist within the specified region")
+
+        graph = await self._get_region_graph(region_id)
         allowed_modes = self._resolve_transport_modes(region.type, transport_modes)
         weight_strategy = WeightStrategy(strategy)
+        tree = None
+        if self._tree_cache is not None:
+            tree = self._tree_cache.get(graph, origin_node_id, weight_strategy, allowed_modes)
+        if tree is None:
+            tree = await self._compute_executor.run(
+                nearest_targets_tree,
+                graph.compact,
+                origin_node_id,
+                list(target_node_ids),
+                limit,
+                strategy=weight_strategy,
+                allowed_modes=allowed_modes,
+                max_distance=inf if max_distance is None else max_distance,
+            )
+        return _reachable_within(tree, max_distance)
 
-        # 构建邻接表
-        graph: dict[int, list[tuple[int, float, float]]] = {}  # node_id -> [(neighbor_id, distance, time)]
-        for edge in edges:
-            # 检查交通方式是否允许
-            edge_modes = set(edge.transport_modes or [])
-            if not edge_modes.intersection(allowed_modes):
-                continue
+    async def compute_isochrone(
+        self,
+        *,
+        region_id: int,
+        origin_node_id: int,
+        budgets: Sequence[float],
+        strategy: WeightStrategy | str = WeightStrategy.TIME,
+        transport_modes: Sequence[TransportMode | str] | None = None,
+        include_polygons: bool = False,
+    ) -> IsochronePlan:
+        """计算起点在各预算（秒或米，取决于策略）内可达的节点及其代价，可选返回各预算的轮廓多边形。
 
-            distance = edge.distance
-            time = distance / (edge.ideal_speed * edge.congestion / 60)  # 转换为分钟
-
-            # 双向边
-            if edge.start_node_id not in graph:
-                graph[edge.start_node_id] = []
-            if edge.end_node_id not in graph:
-                graph[edge.end_node_id] = []
-            
-            graph[edge.start_node_id].append((edge.end_node_id, distance, time))
-            graph[edge.end_node_id].append((edge.start_node_id, distance, time))
-
-        # 使用 Dijkstra 算法进行遍历（优先队列确保最短路径）
-        visited: dict[int, dict] = {}  # node_id -> {distance, time, path, parent}
-        distances: dict[int, float] = {origin_node_id: 0.0}
-        times: dict[int, float] = {origin_node_id: 0.0}
-        parents: dict[int, int | None] = {origin_node_id: None}
-        
-        # 优先队列: (priority, node_id, distance, time)
-        # priority 根据策略选择（距离或时间）
-        if weight_strategy == WeightStrategy.DISTANCE:
-            heap = [(0.0, origin_node_id, 0.0, 0.0)]
-        else:
-            heap = [(0.0, origin_node_id, 0.0, 0.0)]
-        
-        processed = set()
-
-        while heap:
-            priority, current_id, current_distance, current_time = heapq.heappop(heap)
-
-            # 如果已处理过，跳过
-            if current_id in processed:
-                continue
-            
-            processed.add(current_id)
+        搜索在超出最大预算时立即停止；起点已有缓存的完整最短路树时直接复用。
+        """
+        region = await self._region_repository.get_region(region_id)
+        if region is None:
+            raise RegionNotFoundError(f"Region {region_id} does not exist")
 
-            # 检查距离限制
-            if max_distance is not None and current_distance > max_distance:
-                continue
+        origin_node = await self._get_node_cached(origin_node_id, region_id)
+        if origin_node is None or origin_node.region_id != region_id:
+            raise NodeValidationError("Origin node must exist within the specified region")
+        if not budgets or min(budgets) <= 0:
+            raise NodeValidationError("Budgets must be positive")
 
-            # 遍历邻居节点
-            neighbors = graph.get(current_id, [])
-            for neighbor_id, edge_distance, edge_time in neighbors:
-                if neighbor_id in processed:
-                    continue
-
-                new_distance = current_distance + edge_distance
-                new_time = current_time + edge_time
-
-                # 检查是否找到更短路径
-                if neighbor_id not in distances or new_distance < distances[neighbor_id]:
-                    distances[neighbor_id] = new_distance
-                    times[neighbor_id] = new_time
-                    parents[neighbor_id] = current_id
-                    
-                    # 根据策略选择优先级
-                    priority = new_distance if weight_strategy == WeightStrategy.DISTANCE else new_time
-                    heapq.heappush(heap, (priority, neighbor_id, new_distance, new_time))
-
-        # 重建路径
-        for node_id in distances:
-            if node_id == origin_node_id:
-                visited[node_id] = {
-                    "distance": 0.0,
-                    "time": 0.0,
-                    "path": [origin_node_id],
-                }
-            else:
-                # 从父节点回溯构建路径
-                path = []
-                current = node_id
-                while current is not None:
-                    path.append(current)
-                    current = parents.get(current)
-                path.reverse()
-                
-                visited[node_id] = {
-                    "distance": distances[node_id],
-                    "time": times[node_id],
-                    "path": path,
-                }
-
-        return visited
+        graph = await self._get_region_graph(region_id)
+        if origin_node_id not in graph.compact.index:
+            raise RouteNotFoundError("Origin node is not connected to the region graph")
+        allowed_modes = self._resolve_transport_modes(region.type, transport_modes)
+        weight_strategy = WeightStrategy(strategy)
+        tree = None
+        if self._tree_cache is not None:
+            tree = self._tree_cache.get(graph, origin_node_id, weight_strategy, allowed_modes)
+
+        isochrone = await self._compute_executor.run(
+            compute_isochrone,
+            graph.compact,
+            origin_node_id,
+            list(budgets),
+            strategy=weight_strategy,
+            allowed_modes=allowed_modes,
+            include_polygons=include_polygons,
+            concavity=settings.routing_isochrone_concavity,
+            tree=tree,
+        )
+        return IsochronePlan(
+            region_id=region_id,
+            origin_node_id=origin_node_id,
+            strategy=weight_strategy,
+            allowed_modes=tuple(allowed_modes),
+            isochrone=isochrone,
+        )
+
+    async def _shortest_path_tree(
+        self,
+        graph: CompiledRegionGraph,
+        origin_node_id: int,
+        strategy: WeightStrategy,
+        allowed_modes: Sequence[str],
+    ) -> ShortestPathTree:
+        """获取起点的最短路树：优先读缓存，否则在计算执行器中构建并写入缓存。"""
+        trees = self._tree_cache
+        if trees is not None:
+            tree = trees.get(graph, origin_node_id, strategy, allowed_modes)
+            if tree is not None:
+                return tree
+        tree = await self._compute_executor.run(
+            build_shortest_path_tree,
+            graph.compact,
+            origin_node_id,
+            strategy=strategy,
+            allowed_modes=allowed_modes,
+        )
+        if trees is not None:
+            trees.put(graph, origin_node_id, strategy, allowed_modes, tree)
+        return tree
 
     async def _fetch_and_validate_nodes(
         self, region_id: int, start_node_id: int, end_node_id: int
     ) -> tuple[GraphNode, GraphNode]:
-        # 使用缓存获取节点
-        start_node = await self._get_node_cached(start_node_id)
-        end_node = await self._get_node_cached(end_node_id)
+        # 使用区域图快照获取节点
+        start_node = await self._get_node_cached(start_node_id, region_id)
+        end_node = await self._get_node_cached(end_node_id, region_id)
 
         if start_node is None or end_node is None:
             missing = []
@@ -280,46 +897,86 @@ class RoutingService:
 
         return start_node, end_node
 
-    async def _build_node_map(self, region_id: int, node_ids: Iterable[str]) -> dict[int, GraphNode]:
-        unique_ids = {int(node_id) for node_id in node_ids}
-        
-        # 先从缓存中获取
+    async def _validate_region_nodes(self, region_id: int, node_ids: Iterable[int]) -> None:
+        missing: list[int] = []
+        for node_id in dict.fromkeys(node_ids):
+            node = await self._get_node_cached(node_id, region_id)
+            if node is None:
+                missing.append(node_id)
+            elif node.region_id != region_id:
+                raise NodeValidationError("Nodes must belong to the specified region")
+        if missing:
+            raise NodeValidationError(
+                f"Nodes not found: {', '.join(str(node_id) for node_id in missing)}"
+            )
+
+    async def _build_node_map(
+        self, graph: CompiledRegionGraph, node_ids: Iterable[NodeId]
+    ) -> dict[int, GraphNode]:
+        unique_ids = set(region_node_ids(node_ids))
+
+        # 先从区域图快照中获取
         mapping = {}
         uncached_ids = []
         for node_id in unique_ids:
-            cached_node = self._nodes_cache.get(node_id)
+            cached_node = graph.nodes.get(node_id)
             if cached_node:
                 mapping[node_id] = cached_node
             else:
                 uncached_ids.append(node_id)
-        
-        # 批量获取未缓存的节点
+
+        # 批量获取快照中缺失的节点
         if uncached_ids:
             nodes = await self._graph_repository.get_nodes(sorted(uncached_ids))
             for node in nodes:
                 mapping[node.id] = node
-                self._nodes_cache[node.id] = node  # 缓存新获取的节点
-        
+
         if len(mapping) != len(unique_ids):
             missing = unique_ids - mapping.keys()
-            raise NodeValidationError(f"Missing nodes in region {region_id}: {sorted(missing)}")
+            raise NodeValidationError(
+                f"Missing nodes in region {graph.region_id}: {sorted(missing)}"
+            )
         return mapping
 
-    def _to_route_node(self, node_map: dict[int, GraphNode], node_id: str) -> RouteNode:
-        identifier = int(node_id)
-        node = node_map.get(identifier)
+    def _to_route_plan(
+        self,
+        region_id: int,
+        strategy: WeightStrategy,
+        allowed_modes: Sequence[str],
+        node_map: dict[int, GraphNode],
+        result: PathResult,
+        algorithm: SearchAlgorithm,
+    ) -> RoutePlan:
+        return RoutePlan(
+            region_id=region_id,
+            strategy=strategy,
+            total_distance=result.total_distance,
+            total_time=result.total_time,
+            allowed_modes=tuple(allowed_modes),
+            nodes=[
+                self._to_route_node(node_map, node_id) for node_id in region_node_ids(result.nodes)
+            ],
+            segments=[self._to_route_segment(node_map, segment) for segment in result.segments],
+            expanded_nodes=result.expanded_nodes,
+            algorithm=algorithm,
+        )
+
+    def _to_route_node(self, node_map: dict[int, GraphNode], node_id: int) -> RouteNode:
+        node = node_map.get(node_id)
         if node is None:
-            raise NodeValidationError(f"Node {identifier} not found in node map")
+            raise NodeValidationError(f"Node {node_id} not found in node map")
         return RouteNode(
-            id=identifier,
+            id=node_id,
             name=node.name,
             latitude=node.latitude,
             longitude=node.longitude,
         )
 
-    def _to_route_segment(self, node_map: dict[int, GraphNode], segment: AlgoPathSegment) -> RouteSegment:
-        source_id = int(segment.source)
-        target_id = int(segment.target)
+    def _to_route_segment(
+        self, node_map: dict[int, GraphNode], segment: AlgoPathSegment
+    ) -> RouteSegment:
+        source_id = segment.source
+        target_id = segment.target
         if source_id not in node_map or target_id not in node_map:
             raise NodeValidationError("Segment references unknown nodes")
         return RouteSegment(
@@ -330,19 +987,6 @@ class RoutingService:
             time=segment.time,
         )
 
-    def _to_algorithm_edges(self, edges: Sequence[GraphEdge]) -> list[AlgoEdge]:
-        return [
-            AlgoEdge(
-                source=str(edge.start_node_id),
-                target=str(edge.end_node_id),
-                distance=edge.distance,
-                ideal_speed=edge.ideal_speed,
-                congestion=edge.congestion,
-                transport_modes=self._normalise_modes(edge.transport_modes),
-            )
-            for edge in edges
-        ]
-
     def _resolve_transport_modes(
         self,
         region_type: RegionType,
@@ -362,11 +1006,7 @@ class RoutingService:
         return tuple(sorted(filtered))
 
     def _default_modes(self, region_type: RegionType) -> set[str]:
-        if region_type is RegionType.CAMPUS:
-            return {TransportMode.WALK.value, TransportMode.BIKE.value}
-        if region_type is RegionType.SCENIC:
-            return {TransportMode.WALK.value, TransportMode.ELECTRIC_CART.value}
-        return {TransportMode.WALK.value}
+        return default_transport_modes(region_type)
 
     def _normalise_modes(self, modes: Iterable[TransportMode | str]) -> tuple[str, ...]:
         return tuple(self._normalise_mode(mode) for mode in modes)
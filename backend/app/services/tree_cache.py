@@ -0,0 +1,212 @@
+"""Memory-bounded LRU cache of shortest-path trees for hot origins."""
+
+from __future__ import annotations
+
+from collections import Counter, OrderedDict
+from dataclasses import asdict, dataclass, replace
+from typing import Callable, Sequence
+
+import numpy as np
+
+from app.algorithms import ShortestPathTree, WeightStrategy
+from app.core.config import settings
+from app.services.graph_store import CompiledRegionGraph, CongestionPatch
+
+TreeKey = tuple[int, int, int, WeightStrategy, tuple[str, ...]]
+
+# 记录起点请求次数的上限，超过后清空重新计数
+_MAX_TRACKED_ORIGINS = 4096
+
+
+@dataclass(slots=True)
+class TreeCacheStats:
+    """Counters describing how effective the tree cache is."""
+
+    hits: int = 0
+    misses: int = 0
+    stores: int = 0
+    evictions: int = 0
+    entries: int = 0
+    bytes: int = 0
+
+    @property
+    def hit_ratio(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def as_dict(self) -> dict[str, float]:
+        return {**asdict(self), "hit_ratio": self.hit_ratio}
+
+
+class ShortestPathTreeCache:
+    """Share one-to-all search results between facility lookups and route queries.
+
+    Trees are keyed by region, graph version, origin node, strategy and mode set
+    and evicted least-recently-used once their arrays exceed ``max_bytes``.
+    :meth:`is_hot` counts requests per origin so that point-to-point queries only
+    pay for a full tree once an origin has been asked for ``hot_threshold`` times.
+    """
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024, *, hot_threshold: int = 3) -> None:
+        self._max_bytes = max(0, max_bytes)
+        self._hot_threshold = max(1, hot_threshold)
+        self._trees: OrderedDict[TreeKey, ShortestPathTree] = OrderedDict()
+        self._bytes = 0
+        self._versions: dict[int, int] = {}
+        self._requests: Counter[TreeKey] = Counter()
+        self._stats = TreeCacheStats()
+
+    @property
+    def enabled(self) -> bool:
+        return self._max_bytes > 0
+
+    def __len__(self) -> int:
+        return len(self._trees)
+
+    def get(
+        self,
+        graph: CompiledRegionGraph,
+        origin_node_id: int,
+        strategy: WeightStrategy,
+        modes: Sequence[str],
+    ) -> ShortestPathTree | None:
+        """Return the cached tree, or ``None`` on a miss."""
+
+        if not self.enabled:
+            return None
+        self._observe_version(graph)
+        key = self._key(graph, origin_node_id, strategy, modes)
+        tree = self._trees.get(key)
+        if tree is None:
+            self._stats.misses += 1
+            return None
+        self._trees.move_to_end(key)
+        self._stats.hits += 1
+        return tree
+
+    def put(
+        self,
+        graph: CompiledRegionGraph,
+        origin_node_id: int,
+        strategy: WeightStrategy,
+        modes: Sequence[str],
+        tree: ShortestPathTree,
+    ) -> None:
+        """Store a tree; trees larger than the whole budget are not cached."""
+
+        if not self.enabled or tree.nbytes > self._max_bytes:
+            return
+        self._observe_version(graph)
+        key = self._key(graph, origin_node_id, strategy, modes)
+        previous = self._trees.pop(key, None)
+        if previous is not None:
+            self._bytes -= previous.nbytes
+        self._trees[key] = tree
+        self._bytes += tree.nbytes
+        self._stats.stores += 1
+        while self._bytes > self._max_bytes:
+            _, evicted = self._trees.popitem(last=False)
+            self._bytes -= evicted.nbytes
+            self._stats.evictions += 1
+
+    def is_hot(
+        self,
+        graph: CompiledRegionGraph,
+        origin_node_id: int,
+        strategy: WeightStrategy,
+        modes: Sequence[str],
+    ) -> bool:
+        """Count a request from this origin and report whether a full tree is worth building."""
+
+        if not self.enabled:
+            return False
+        if len(self._requests) >= _MAX_TRACKED_ORIGINS:
+            self._requests.clear()
+        key = self._key(graph, origin_node_id, strategy, modes)
+        self._requests[key] += 1
+        return self._requests[key] >= self._hot_threshold
+
+    def invalidate(self, region_id: int | None = None) -> None:
+        """Drop cached trees of one region (or all regions)."""
+
+        self._drop(lambda key: region_id is None or key[0] == region_id)
+
+    def carry_over(self, patch: CongestionPatch) -> int:
+        """Move trees a congestion patch cannot affect to the patched version.
+
+        Returns how many trees were dropped. A tree is dropped when one of its
+        edges changed, or when it was grown by time and some edge became faster.
+        Kept trees are re-pointed at the patched graph, whose times agree with
+        theirs on every tree edge.
+        """
+
+        previous, current = patch.previous, patch.current
+        if current.version == previous.version:
+            return 0
+        self._versions[patch.region_id] = max(
+            self._versions.get(patch.region_id, 0), current.version
+        )
+        dropped = 0
+        for key in [
+            key for key in self._trees if key[0] == patch.region_id and key[1] <= previous.version
+        ]:
+            tree = self._trees.pop(key)
+            stale = key[1] < previous.version or (patch.faster and key[3] is WeightStrategy.TIME)
+            if stale or np.isin(tree.via_edge, patch.changed_edges).any():
+                self._bytes -= tree.nbytes
+                dropped += 1
+            else:
+                self._trees[(key[0], current.version) + key[2:]] = replace(
+                    tree, graph=current.compact
+                )
+        for key in [
+            key
+            for key in self._requests
+            if key[0] == patch.region_id and key[1] <= previous.version
+        ]:
+            count = self._requests.pop(key)
+            if key[1] == previous.version:
+                self._requests[(key[0], current.version) + key[2:]] += count
+        return dropped
+
+    def stats(self) -> TreeCacheStats:
+        """Return a snapshot of the cache counters."""
+
+        return TreeCacheStats(
+            **{**asdict(self._stats), "entries": len(self._trees), "bytes": self._bytes}
+        )
+
+    def _observe_version(self, graph: CompiledRegionGraph) -> None:
+        known = self._versions.get(graph.region_id)
+        if known is None or graph.version > known:
+            self._versions[graph.region_id] = graph.version
+            if known is not None:
+                # 区域图版本更新后旧的最短路树全部失效
+                self._drop(lambda key: key[0] == graph.region_id and key[1] < graph.version)
+
+    def _drop(self, predicate: Callable[[TreeKey], bool]) -> None:
+        for key in [key for key in self._trees if predicate(key)]:
+            self._bytes -= self._trees.pop(key).nbytes
+        for key in [key for key in self._requests if predicate(key)]:
+            del self._requests[key]
+
+    @staticmethod
+    def _key(
+        graph: CompiledRegionGraph,
+        origin_node_id: int,
+        strategy: WeightStrategy,
+        modes: Sequence[str],
+    ) -> TreeKey:
+        return (graph.region_id, graph.version, origin_node_id, strategy, tuple(sorted(modes)))
+
+
+tree_cache = ShortestPathTreeCache(
+    settings.routing_tree_cache_bytes,
+    hot_threshold=settings.routing_tree_hot_threshold,
+)
+
+
+def get_tree_cache() -> ShortestPathTreeCache:
+    """Return the application-wide shortest-path tree cache."""
+
+    return tree_cache
@@ -0,0 +1,229 @@
+"""Compare integer node ids with the former string ids on a synthetic region graph.
+
+The string variant reproduces how region graphs used to be compiled: every
+``start_node_id``/``end_node_id`` was converted with ``str()`` before building
+the :class:`CompactGraph`, and route results were parsed back with ``int()``.
+The integer variant uses the ids as they come from the database, like
+:func:`compile_region_graph` does now. Searches themselves only see dense
+indices either way, so besides end-to-end queries the id boundary (building
+the path and handing node ids back) is timed on its own.
+"""
+
+from __future__ import annotations
+
+import argparse
+from pathlib import Path
+import random
+import sys
+import time
+from typing import Callable
+
+Route = tuple[list[int], list[tuple[int, int]]]
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+PROJECT_ROOT = SCRIPT_DIR.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from app.algorithms import CompactGraph, Edge, PathResult, compact_shortest_path  # noqa: E402
+from app.models.enums import TransportMode  # noqa: E402
+from app.models.graph import GraphEdge, GraphNode  # noqa: E402
+
+
+def synthetic_region(size: int, seed: int) -> tuple[list[GraphNode], list[GraphEdge]]:
+    """A ``size`` x ``size`` grid with database-like integer ids."""
+
+    rng = random.Random(seed)
+    first_id = 100_000
+    nodes = [
+        GraphNode(
+            id=first_id + row * size + col,
+            region_id=1,
+            name=f"node-{row}-{col}",
+            latitude=30.0 + row * 0.0005,
+            longitude=120.0 + col * 0.0005,
+        )
+        for row in range(size)
+        for col in range(size)
+    ]
+    edges: list[GraphEdge] = []
+    for row in range(size):
+        for col in range(size):
+            here = first_id + row * size + col
+            right = here + 1 if col + 1 < size else None
+            below = here + size if row + 1 < size else None
+            for neighbour in (right, below):
+                if neighbour is None:
+                    continue
+                for start, end in ((here, neighbour), (neighbour, here)):
+                    edges.append(
+                        GraphEdge(
+                            id=len(edges) + 1,
+                            region_id=1,
+                            start_node_id=start,
+                            end_node_id=end,
+                            distance=rng.uniform(40.0, 120.0),
+                            ideal_speed=rng.uniform(1.0, 3.0),
+                            congestion=1.0,
+                            transport_modes=[TransportMode.WALK, TransportMode.BIKE],
+                        )
+                    )
+    return nodes, edges
+
+
+def compile_with_string_ids(nodes: list[GraphNode], edges: list[GraphEdge]) -> CompactGraph:
+    algorithm_edges = [
+        Edge(
+            source=str(edge.start_node_id),
+            target=str(edge.end_node_id),
+            distance=edge.distance,
+            ideal_speed=edge.ideal_speed,
+            congestion=edge.congestion,
+            transport_modes=tuple(mode.value for mode in edge.transport_modes),
+        )
+        for edge in edges
+    ]
+    return CompactGraph.from_edges(
+        algorithm_edges,
+        nodes=(str(node.id) for node in nodes),
+        coordinates={str(node.id): (node.latitude, node.longitude) for node in nodes},
+    )
+
+
+def compile_with_int_ids(nodes: list[GraphNode], edges: list[GraphEdge]) -> CompactGraph:
+    algorithm_edges = [
+        Edge(
+            source=edge.start_node_id,
+            target=edge.end_node_id,
+            distance=edge.distance,
+            ideal_speed=edge.ideal_speed,
+            congestion=edge.congestion,
+            transport_modes=tuple(mode.value for mode in edge.transport_modes),
+        )
+        for edge in edges
+    ]
+    return CompactGraph.from_edges(
+        algorithm_edges,
+        nodes=(node.id for node in nodes),
+        coordinates={node.id: (node.latitude, node.longitude) for node in nodes},
+    )
+
+
+def route_with_string_ids(graph: CompactGraph, start: int, end: int) -> Route:
+    result = compact_shortest_path(graph, str(start), str(end))
+    return _parse(result)
+
+
+def route_with_int_ids(graph: CompactGraph, start: int, end: int) -> Route:
+    result = compact_shortest_path(graph, start, end)
+    return list(result.nodes), [(segment.source, segment.target) for segment in result.segments]
+
+
+def materialise_with_string_ids(graph: CompactGraph, chain: list[int]) -> Route:
+    return _parse(graph.build_path(chain, graph.mode_mask(None)))
+
+
+def materialise_with_int_ids(graph: CompactGraph, chain: list[int]) -> Route:
+    result = graph.build_path(chain, graph.mode_mask(None))
+    return list(result.nodes), [(segment.source, segment.target) for segment in result.segments]
+
+
+def edge_chain(graph: CompactGraph, nodes: list[int]) -> list[int]:
+    """CSR edges along consecutive ``nodes`` of a route."""
+
+    chain = []
+    for source, target in zip(nodes, nodes[1:]):
+        position, goal = graph.index[source], graph.index[target]
+        edges = range(graph.offsets[position], graph.offsets[position + 1])
+        chain.append(next(edge for edge in edges if graph.targets[edge] == goal))
+    return chain
+
+
+def _parse(result: PathResult) -> Route:
+    nodes = [int(node_id) for node_id in result.nodes]
+    segments = [(int(segment.source), int(segment.target)) for segment in result.segments]
+    return nodes, segments
+
+
+def node_id_bytes(graph: CompactGraph) -> int:
+    """Bytes held by ``node_ids`` including the id objects themselves."""
+
+    node_ids = graph.node_ids
+    if not isinstance(node_ids, tuple):
+        return sys.getsizeof(node_ids)
+    return sys.getsizeof(node_ids) + sum(sys.getsizeof(node_id) for node_id in node_ids)
+
+
+def best_of(repeats: int, func: Callable[[], object]) -> float:
+    timings = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark integer against string node ids")
+    parser.add_argument("--size", type=int, default=150, help="Grid side length (nodes = size^2)")
+    parser.add_argument("--queries", type=int, default=200, help="Random point-to-point queries")
+    parser.add_argument(
+        "--repeats", type=int, default=3, help="Runs per measurement (the best counts)"
+    )
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    nodes, edges = synthetic_region(args.size, args.seed)
+    rng = random.Random(args.seed)
+    pairs = [(rng.choice(nodes).id, rng.choice(nodes).id) for _ in range(args.queries)]
+    print(f"{len(nodes)} nodes, {len(edges)} edges, {len(pairs)} queries (best of {args.repeats})")
+
+    string_graph = compile_with_string_ids(nodes, edges)
+    int_graph = compile_with_int_ids(nodes, edges)
+    for pair in pairs[:10]:
+        assert route_with_string_ids(string_graph, *pair) == route_with_int_ids(int_graph, *pair)
+    routes = [route_with_int_ids(int_graph, *pair) for pair in pairs if pair[0] != pair[1]]
+    chains = [edge_chain(int_graph, nodes) for nodes, _ in routes]
+
+    repeats = args.repeats
+    rows = [
+        (
+            "compile",
+            best_of(repeats, lambda: compile_with_string_ids(nodes, edges)),
+            best_of(repeats, lambda: compile_with_int_ids(nodes, edges)),
+        ),
+        (
+            "paths",
+            best_of(
+                repeats,
+                lambda: [materialise_with_string_ids(string_graph, chain) for chain in chains],
+            ),
+            best_of(
+                repeats, lambda: [materialise_with_int_ids(int_graph, chain) for chain in chains]
+            ),
+        ),
+        (
+            "queries",
+            best_of(
+                repeats, lambda: [route_with_string_ids(string_graph, *pair) for pair in pairs]
+            ),
+            best_of(repeats, lambda: [route_with_int_ids(int_graph, *pair) for pair in pairs]),
+        ),
+    ]
+    print(f"{'':<10}{'str ids':>12}{'int ids':>12}{'speed-up':>10}")
+    for name, string_seconds, int_seconds in rows:
+        speed_up = string_seconds / int_seconds
+        print(
+            f"{name:<10}{string_seconds * 1e3:>10.1f}ms"
+            f"{int_seconds * 1e3:>10.1f}ms{speed_up:>9.2f}x"
+        )
+    string_bytes, int_bytes = node_id_bytes(string_graph), node_id_bytes(int_graph)
+    ratio = string_bytes / int_bytes
+    print(
+        f"{'node ids':<10}{string_bytes / 1024:>10.0f}KB"
+        f"{int_bytes / 1024:>10.0f}KB{ratio:>9.2f}x"
+    )
+
+
+if __name__ == "__main__":
+    main()
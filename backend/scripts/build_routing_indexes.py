@@ -0,0 +1,191 @@
+"""Precompute routing indexes for every region graph.
+
+Region graphs and facilities only change when ``scripts/init_db.py`` imports
+new map data, so the expensive preprocessing is done offline here. The API
+loads the resulting files lazily and falls back to plain search (or rebuilds
+facility partitions) when they are missing or stale. Each compiled graph is
+also written as a binary snapshot that workers memory-map on cold start
+instead of loading the region from the database.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+from pathlib import Path
+import sys
+import time
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+PROJECT_ROOT = SCRIPT_DIR.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from app.algorithms import WeightStrategy, build_graph_voronoi  # noqa: E402
+from app.algorithms.contraction import build_contraction_hierarchy  # noqa: E402
+from app.algorithms.landmarks import LandmarkSelection, build_landmark_table  # noqa: E402
+from app.core.config import settings  # noqa: E402
+from app.core.db import get_session_maker  # noqa: E402
+from app.models.enums import FacilityCategory  # noqa: E402
+from app.repositories import FacilityRepository, GraphRepository, RegionRepository  # noqa: E402
+from app.services.facility_index import facility_index_path  # noqa: E402
+from app.services.graph_snapshot import snapshot_path, write_graph_snapshot  # noqa: E402
+from app.services.graph_store import compile_region_graph, hierarchy_path, landmark_path  # noqa: E402
+from app.services.routing import default_transport_modes  # noqa: E402
+
+DEFAULT_CONTRACTION_DIR = PROJECT_ROOT / "indexes" / "contraction"
+DEFAULT_LANDMARK_DIR = PROJECT_ROOT / "indexes" / "landmarks"
+DEFAULT_FACILITY_DIR = PROJECT_ROOT / "indexes" / "facilities"
+DEFAULT_SNAPSHOT_DIR = PROJECT_ROOT / "indexes" / "graphs"
+
+
+async def build_routing_indexes(
+    contraction_dir: Path,
+    landmark_dir: Path,
+    facility_dir: Path,
+    snapshot_dir: Path,
+    region_ids: list[int] | None = None,
+    *,
+    landmark_count: int = settings.routing_landmark_count,
+    selection: LandmarkSelection = LandmarkSelection.AVOID,
+) -> None:
+    maker = get_session_maker()
+    async with maker() as session:
+        region_repository = RegionRepository(session)
+        graph_repository = GraphRepository(session)
+        facility_repository = FacilityRepository(session)
+        regions = await region_repository.list_regions()
+
+        for region in regions:
+            if region_ids and region.id not in region_ids:
+                continue
+            signature = await graph_repository.graph_signature(region.id)
+            nodes = await graph_repository.list_nodes_by_region(region.id)
+            edges = await graph_repository.list_edges_by_region(region.id)
+            if not edges:
+                print(f"[routing-index] Region {region.id} has no edges; skipping.")
+                continue
+
+            graph = compile_region_graph(region.id, 0, nodes, edges)
+            path = snapshot_path(snapshot_dir, region.id)
+            size = write_graph_snapshot(graph, path, signature=signature)
+            print(
+                f"[routing-index] Region {region.id}: graph snapshot of "
+                f"{len(graph.compact)} nodes, {graph.compact.edge_count} edges, "
+                f"{size / 1024:.0f} KiB -> {path}"
+            )
+            modes = tuple(sorted(default_transport_modes(region.type)))
+            facility_nodes: dict[FacilityCategory, set[int]] = {}
+            for facility, node in await facility_repository.list_facilities_with_nodes(region.id):
+                facility_nodes.setdefault(facility.category, set()).add(node.id)
+            for strategy in WeightStrategy:
+                started = time.perf_counter()
+                hierarchy = build_contraction_hierarchy(
+                    graph.compact, strategy=strategy, allowed_modes=modes
+                )
+                path = hierarchy_path(contraction_dir, region.id, strategy, modes)
+                hierarchy.save(path)
+                print(
+                    f"[routing-index] Region {region.id} ({strategy.value}): "
+                    f"{len(graph.compact)} nodes, {hierarchy.shortcut_count} shortcuts, "
+                    f"{time.perf_counter() - started:.1f}s -> {path}"
+                )
+
+                for category, sources in sorted(facility_nodes.items()):
+                    started = time.perf_counter()
+                    partition = build_graph_voronoi(
+                        graph.compact, sorted(sources), strategy=strategy, allowed_modes=modes
+                    )
+                    path = facility_index_path(facility_dir, region.id, category, strategy, modes)
+                    partition.save(path)
+                    print(
+                        f"[routing-index] Region {region.id} ({strategy.value}): "
+                        f"nearest {category.value} from {len(sources)} facilities, "
+                        f"{time.perf_counter() - started:.1f}s -> {path}"
+                    )
+
+                if landmark_count <= 0:
+                    continue
+                started = time.perf_counter()
+                table = build_landmark_table(
+                    graph.compact, landmark_count, strategy=strategy, selection=selection
+                )
+                path = landmark_path(landmark_dir, region.id, strategy)
+                table.save(path)
+                print(
+                    f"[routing-index] Region {region.id} ({strategy.value}): "
+                    f"{len(table.landmarks)} landmarks, {table.nbytes / 1024:.0f} KiB, "
+                    f"{time.perf_counter() - started:.1f}s -> {path}"
+                )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=(
+            "Build graph snapshots, contraction hierarchies, ALT landmark tables and "
+            "nearest-facility partitions for region routing graphs."
+        )
+    )
+    parser.add_argument(
+        "--contraction-dir",
+        type=Path,
+        default=DEFAULT_CONTRACTION_DIR,
+        help="Output directory for contraction hierarchies (defaults to indexes/contraction).",
+    )
+    parser.add_argument(
+        "--landmark-dir",
+        type=Path,
+        default=DEFAULT_LANDMARK_DIR,
+        help="Output directory for ALT landmark tables (defaults to indexes/landmarks).",
+    )
+    parser.add_argument(
+        "--facility-dir",
+        type=Path,
+        default=DEFAULT_FACILITY_DIR,
+        help="Output directory for nearest-facility partitions (defaults to indexes/facilities).",
+    )
+    parser.add_argument(
+        "--snapshot-dir",
+        type=Path,
+        default=DEFAULT_SNAPSHOT_DIR,
+        help="Output directory for memory-mapped graph snapshots (defaults to indexes/graphs).",
+    )
+    parser.add_argument(
+        "--landmarks",
+        type=int,
+        default=settings.routing_landmark_count,
+        help=(
+            "Number of landmarks per region; 0 skips the tables "
+            "(defaults to ROUTING_LANDMARK_COUNT)."
+        ),
+    )
+    parser.add_argument(
+        "--landmark-selection",
+        choices=[item.value for item in LandmarkSelection],
+        default=LandmarkSelection.AVOID.value,
+        help="Landmark placement strategy.",
+    )
+    parser.add_argument(
+        "--region",
+        type=int,
+        action="append",
+        dest="regions",
+        help="Restrict to a region id (may be repeated).",
+    )
+    args = parser.parse_args()
+
+    asyncio.run(
+        build_routing_indexes(
+            args.contraction_dir,
+            args.landmark_dir,
+            args.facility_dir,
+            args.snapshot_dir,
+            args.regions,
+            landmark_count=args.landmarks,
+            selection=LandmarkSelection(args.landmark_selection),
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
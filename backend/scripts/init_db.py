@@ -13,7 +13,7 @@ from pathlib import Path
 import sys
 from typing import Any, Callable, Iterable, Sequence
 
-from sqlalchemy import delete, func, select, text, update  # type: ignore[import-untyped]
+from sqlalchemy import delete, func, inspect, select, text, update  # type: ignore[import-untyped]
 from sqlalchemy.ext.asyncio import AsyncSession  # type: ignore[import-untyped]
 
 from app.core.db import get_session_maker, init_db_async
@@ -27,6 +27,7 @@ from app.models.enums import (
 from app.models.graph import GraphEdge, GraphNode
 from app.models.locations import Building, Facility, Region
 from app.models.users import User
+from app.services.graph_snapshot import remove_graph_snapshots
 
 SCRIPT_DIR = Path(__file__).resolve().parent
 PROJECT_ROOT = SCRIPT_DIR.parent
@@ -165,6 +166,7 @@ def _prepare_graph_edge_records(records: list[dict[str, Any]]) -> Iterable[dict[
             "ideal_speed": float(record.get("ideal_speed", 0.0)),
             "congestion": float(record.get("congestion", 0.0)),
             "transport_modes": modes,
+            "congestion_profile": record.get("congestion_profile"),
         }
 
 
@@ -214,6 +216,7 @@ async def import_generated_map_data(
     await _bulk_insert_models(session, Facility, _prepare_facility_records(facilities))
     await _bulk_insert_models(session, GraphNode, _prepare_graph_node_records(graph_nodes), chunk_size=2000)
     await _bulk_insert_models(session, GraphEdge, _prepare_graph_edge_records(graph_edges), chunk_size=4000)
+    _remove_graph_snapshots()
 
     print(
         "[init-db] Map data import complete",
@@ -224,6 +227,8 @@ async def import_generated_map_data(
         f"graph_edges={len(graph_edges)}",
     )
     return True
+
+
 async def _ensure_user_schema(session: AsyncSession) -> None:
     """Add newly required user columns when initializing existing databases."""
 
@@ -268,14 +273,51 @@ async def _ensure_user_schema(session: AsyncSession) -> None:
     )
     await session.commit()
 
+
+def _table_columns(connection: Any, table: str) -> set[str] | None:
+    inspector = inspect(connection)
+    if not inspector.has_table(table):
+        return None
+    return {column["name"] for column in inspector.get_columns(table)}
+
+
+async def _ensure_graph_schema(session: AsyncSession) -> None:
+    """Add newly introduced graph edge columns when initializing existing databases.
+
+    Columns are read through the SQLAlchemy inspector, so the check is
+    idempotent on every configured backend, not only SQLite.
+    """
+
+    columns = await session.run_sync(
+        lambda sync_session: _table_columns(sync_session.connection(), "graph_edges")
+    )
+    if columns is None:
+        return
+
+    if "congestion_profile" not in columns:
+        print("[init-db] Adding missing 'congestion_profile' column to graph_edges table...")
+        await session.execute(text("ALTER TABLE graph_edges ADD COLUMN congestion_profile JSON"))
+        await session.commit()
+
+
 def ensure_directories() -> None:
     """Create directories that the application expects to exist."""
 
     storage_root = PROJECT_ROOT / "storage"
     indexes_root = PROJECT_ROOT / "indexes"
     tiles_root = indexes_root / "map_tiles"
-
-    for path in (storage_root, indexes_root, tiles_root):
+    contraction_root = indexes_root / "contraction"
+    landmark_root = indexes_root / "landmarks"
+    snapshot_root = indexes_root / "graphs"
+
+    for path in (
+        storage_root,
+        indexes_root,
+        tiles_root,
+        contraction_root,
+        landmark_root,
+        snapshot_root,
+    ):
         path.mkdir(parents=True, exist_ok=True)
 
     for filename in (indexes_root / "spatial.idx", indexes_root / "fulltext.idx"):
@@ -287,6 +329,19 @@ async def _clear_existing_data(session: AsyncSession, models: Sequence[type]) ->
     for model in models:
         await session.execute(delete(model))
     await session.commit()
+    if GraphNode in models or GraphEdge in models:
+        _remove_graph_snapshots()
+
+
+def _remove_graph_snapshots() -> None:
+    """Delete region graph snapshots; they describe rows that no longer exist."""
+
+    removed = remove_graph_snapshots(PROJECT_ROOT / "indexes" / "graphs")
+    if removed:
+        print(
+            f"[init-db] Removed {removed} stale graph snapshots; "
+            "rerun scripts/build_routing_indexes.py."
+        )
 
 
 async def initialize_database(keep_existing: bool, dataset_dir: Path | None = None) -> None:
@@ -299,6 +354,7 @@ async def initialize_database(keep_existing: bool, dataset_dir: Path | None = No
     maker = get_session_maker()
     async with maker() as session:
         await _ensure_user_schema(session)
+        await _ensure_graph_schema(session)
         await import_generated_map_data(
             session,
             dataset_dir or GENERATED_DATA_DIR,
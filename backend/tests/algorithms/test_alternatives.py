@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+import pytest
+
+from app.algorithms import (
+    CompactGraph,
+    Edge,
+    WeightStrategy,
+    alternative_paths,
+    compact_shortest_path,
+)
+from tests.networks import grid_network, grid_node
+
+
+def _cost(path, strategy: WeightStrategy) -> float:
+    return path.total_distance if strategy is WeightStrategy.DISTANCE else path.total_time
+
+
+@pytest.mark.parametrize("strategy", [WeightStrategy.DISTANCE, WeightStrategy.TIME])
+def test_alternatives_are_loopless_diverse_and_bounded(strategy: WeightStrategy) -> None:
+    graph = CompactGraph.from_edges(grid_network(10, 3))
+    source, target = grid_node(0, 0, 10), grid_node(9, 9, 10)
+    optimal = compact_shortest_path(graph, source, target, strategy=strategy)
+
+    paths = alternative_paths(
+        graph, source, target, 3, strategy=strategy, max_overlap=0.5, max_stretch=1.5
+    )
+
+    assert len(paths) == 3
+    assert _cost(paths[0], strategy) == pytest.approx(_cost(optimal, strategy))
+    costs = [_cost(path, strategy) for path in paths]
+    assert costs == sorted(costs)
+    assert costs[-1] <= 1.5 * costs[0] + 1e-9
+    for path in paths:
+        assert path.nodes[0] == source and path.nodes[-1] == target
+        assert len(set(path.nodes)) == len(path.nodes)
+        # 各段首尾相接
+        assert all(a.target == b.source for a, b in zip(path.segments, path.segments[1:]))
+    for index, path in enumerate(paths):
+        pairs = {(segment.source, segment.target) for segment in path.segments}
+        for earlier in paths[:index]:
+            shared = sum(
+                segment.distance if strategy is WeightStrategy.DISTANCE else segment.time
+                for segment in earlier.segments
+                if (segment.source, segment.target) in pairs
+            )
+            assert shared <= 0.5 * _cost(path, strategy) + 1e-9
+
+
+def test_alternatives_share_two_searches() -> None:
+    graph = CompactGraph.from_edges(grid_network(12, 8))
+
+    paths = alternative_paths(
+        graph, grid_node(0, 0, 12), grid_node(11, 11, 12), 3, strategy=WeightStrategy.DISTANCE
+    )
+
+    # 无论返回几条路线，都只做一次前向和一次后向搜索
+    assert paths[0].expanded_nodes <= 2 * len(graph)
+    assert len({path.expanded_nodes for path in paths}) == 1
+
+
+def test_alternatives_edge_cases() -> None:
+    graph = CompactGraph.from_edges(
+        [
+            Edge("a", "b", distance=10.0, ideal_speed=1.0, congestion=1.0),
+            Edge("b", "c", distance=10.0, ideal_speed=1.0, congestion=1.0),
+        ],
+        nodes=["z"],
+    )
+
+    # 只有一条可行路径时只返回它
+    assert [path.nodes for path in alternative_paths(graph, "a", "c", 3)] == [["a", "b", "c"]]
+    assert alternative_paths(graph, "a", "a")[0].nodes == ["a"]
+    with pytest.raises(ValueError):
+        alternative_paths(graph, "c", "a")
+    with pytest.raises(ValueError):
+        alternative_paths(graph, "a", "z")
+    with pytest.raises(ValueError):
+        alternative_paths(graph, "a", "c", 0)
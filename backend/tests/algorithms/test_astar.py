@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+import pytest
+
+from app.algorithms.astar import astar_shortest_path, geo_heuristic
+from app.algorithms.compact_graph import CompactGraph, compact_shortest_path
+from app.algorithms.geo import haversine_meters
+from app.algorithms.shortest_path import Edge, WeightStrategy
+from tests.networks import grid_coordinates, grid_node
+
+
+def _grid(size: int) -> tuple[list[Edge], dict[int, tuple[float, float]]]:
+    """Bidirectional grid around West Lake with ~100 m spacing."""
+
+    coordinates = grid_coordinates(size, origin=(30.24, 120.14), spacing=(0.0009, 0.00104))
+    edges: list[Edge] = []
+    for row in range(size):
+        for col in range(size):
+            for d_row, d_col in ((0, 1), (1, 0)):
+                n_row, n_col = row + d_row, col + d_col
+                if n_row >= size or n_col >= size:
+                    continue
+                a, b = grid_node(row, col, size), grid_node(n_row, n_col, size)
+                detour = 1.0 + 0.01 * ((row + col) % 5)
+                length = haversine_meters(*coordinates[a], *coordinates[b]) * detour
+                speed = 1.4 if (row + col) % 3 else 4.0
+                for source, target in ((a, b), (b, a)):
+                    edges.append(
+                        Edge(
+                            source,
+                            target,
+                            distance=length,
+                            ideal_speed=speed,
+                            congestion=0.9,
+                            transport_modes=("walk",),
+                        )
+                    )
+    return edges, coordinates
+
+
+@pytest.mark.parametrize("strategy", [WeightStrategy.DISTANCE, WeightStrategy.TIME])
+def test_astar_matches_dijkstra_and_expands_fewer_nodes(strategy: WeightStrategy) -> None:
+    edges, coordinates = _grid(15)
+    graph = CompactGraph.from_edges(edges, coordinates=coordinates)
+
+    source, target = grid_node(0, 0, 15), grid_node(14, 14, 15)
+
+    reference = compact_shortest_path(graph, source, target, strategy=strategy)
+    result = astar_shortest_path(graph, source, target, strategy=strategy)
+
+    assert result.total_distance == pytest.approx(reference.total_distance)
+    assert result.total_time == pytest.approx(reference.total_time)
+    assert result.nodes[0] == source and result.nodes[-1] == target
+
+    near = astar_shortest_path(graph, source, grid_node(2, 3, 15), strategy=strategy)
+    near_reference = compact_shortest_path(graph, source, grid_node(2, 3, 15), strategy=strategy)
+    assert near.total_time == pytest.approx(near_reference.total_time)
+    assert near.expanded_nodes < near_reference.expanded_nodes
+
+
+def test_geo_heuristic_is_a_lower_bound() -> None:
+    edges, coordinates = _grid(6)
+    graph = CompactGraph.from_edges(edges, coordinates=coordinates)
+    goal = grid_node(5, 5, 6)
+    target = graph.index[goal]
+
+    bound = geo_heuristic(graph, target, WeightStrategy.DISTANCE)
+    for node in (grid_node(0, 0, 6), grid_node(3, 1, 6), grid_node(5, 4, 6)):
+        exact = compact_shortest_path(graph, node, goal, strategy=WeightStrategy.DISTANCE)
+        assert bound[graph.index[node]] <= exact.total_distance + 1e-9
+    assert bound[target] == 0.0
+
+
+def test_geo_heuristic_falls_back_without_coordinates() -> None:
+    edges, _ = _grid(3)
+    graph = CompactGraph.from_edges(edges)
+
+    assert graph.geo_bounds == (0.0, 0.0)
+    assert set(geo_heuristic(graph, 0, WeightStrategy.TIME)) == {0.0}
+    result = astar_shortest_path(graph, 0, grid_node(2, 2, 3), strategy=WeightStrategy.TIME)
+    assert result.nodes[-1] == grid_node(2, 2, 3)
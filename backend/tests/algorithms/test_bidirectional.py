@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+import random
+
+import pytest
+
+from app.algorithms.bidirectional import bidirectional_shortest_path
+from app.algorithms.compact_graph import CompactGraph, compact_shortest_path
+from app.algorithms.shortest_path import Edge, WeightStrategy
+
+
+def _random_graph(seed: int, size: int = 60) -> list[Edge]:
+    rng = random.Random(seed)
+    modes = (("walk",), ("walk", "bike"), ("bike",), ("electric_cart", "walk"))
+    edges: list[Edge] = []
+    for node in range(size):
+        for neighbour in rng.sample(range(size), 3):
+            if neighbour == node:
+                continue
+            edges.append(
+                Edge(
+                    str(node),
+                    str(neighbour),
+                    distance=rng.uniform(10.0, 200.0),
+                    ideal_speed=rng.uniform(1.0, 5.0),
+                    congestion=rng.uniform(0.3, 1.0),
+                    transport_modes=rng.choice(modes),
+                )
+            )
+    return edges
+
+
+@pytest.mark.parametrize("seed", range(5))
+@pytest.mark.parametrize("strategy", [WeightStrategy.DISTANCE, WeightStrategy.TIME])
+@pytest.mark.parametrize("modes", [None, ("walk",), ("bike",)])
+def test_bidirectional_matches_dijkstra(
+    seed: int, strategy: WeightStrategy, modes: tuple[str, ...] | None
+) -> None:
+    graph = CompactGraph.from_edges(_random_graph(seed))
+    rng = random.Random(seed + 100)
+
+    for _ in range(10):
+        start, goal = (str(node) for node in rng.sample(range(60), 2))
+        try:
+            expected = compact_shortest_path(
+                graph, start, goal, allowed_modes=modes, strategy=strategy
+            )
+        except ValueError:
+            with pytest.raises(ValueError):
+                bidirectional_shortest_path(
+                    graph, start, goal, allowed_modes=modes, strategy=strategy
+                )
+            continue
+
+        result = bidirectional_shortest_path(
+            graph, start, goal, allowed_modes=modes, strategy=strategy
+        )
+        expected_cost = (
+            expected.total_distance if strategy is WeightStrategy.DISTANCE else expected.total_time
+        )
+        result_cost = (
+            result.total_distance if strategy is WeightStrategy.DISTANCE else result.total_time
+        )
+        assert result_cost == pytest.approx(expected_cost)
+        assert result.nodes[0] == start and result.nodes[-1] == goal
+        assert all(a.target == b.source for a, b in zip(result.segments, result.segments[1:]))
+
+
+def test_bidirectional_settles_fewer_nodes_on_a_line() -> None:
+    edges = []
+    for node in range(200):
+        edges.append(Edge(str(node), str(node + 1), distance=1.0, ideal_speed=1.0, congestion=1.0))
+        edges.append(Edge(str(node + 1), str(node), distance=1.0, ideal_speed=1.0, congestion=1.0))
+        edges.append(Edge(str(node), f"spur-{node}", distance=0.5, ideal_speed=1.0, congestion=1.0))
+    graph = CompactGraph.from_edges(edges)
+
+    forward = compact_shortest_path(graph, "0", "40")
+    both = bidirectional_shortest_path(graph, "0", "40")
+
+    assert both.nodes == forward.nodes
+    assert both.expanded_nodes < forward.expanded_nodes
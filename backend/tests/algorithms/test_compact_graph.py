@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+from array import array
+
+import pytest
+
+from app.algorithms.compact_graph import CompactGraph, compact_shortest_path
+from app.algorithms.shortest_path import Edge, WeightStrategy, shortest_path
+
+
+EDGES = [
+    Edge(
+        "A", "B", distance=100.0, ideal_speed=1.4, congestion=1.0, transport_modes=("walk", "bike")
+    ),
+    Edge("B", "C", distance=120.0, ideal_speed=1.4, congestion=1.0, transport_modes=("walk",)),
+    Edge(
+        "C",
+        "D",
+        distance=80.0,
+        ideal_speed=1.4,
+        congestion=1.0,
+        transport_modes=("walk", "electric_cart"),
+    ),
+    Edge(
+        "B",
+        "D",
+        distance=200.0,
+        ideal_speed=4.0,
+        congestion=0.5,
+        transport_modes=("bike", "electric_cart"),
+    ),
+    Edge("A", "D", distance=500.0, ideal_speed=1.4, congestion=1.0, transport_modes=("walk",)),
+]
+
+
+def test_from_edges_builds_csr_buffers() -> None:
+    graph = CompactGraph.from_edges(EDGES, nodes=["Z"])
+
+    assert graph.node_ids == ("Z", "A", "B", "C", "D")
+    assert len(graph) == 5
+    assert graph.edge_count == len(EDGES)
+    assert list(graph.offsets) == [0, 0, 2, 4, 5, 5]
+    assert graph.mode_names == ("walk", "bike", "electric_cart")
+    assert graph.mode_mask(("bike",)) == 0b010
+    assert graph.mode_mask(None) == 0b111
+
+    views = graph.as_numpy()
+    assert views["targets"].tolist() == [graph.index[node] for node in ("B", "D", "C", "D", "D")]
+    assert views["distances"].sum() == pytest.approx(1000.0)
+    assert graph.nbytes == sum(view.nbytes for view in views.values())
+
+
+@pytest.mark.parametrize(
+    "modes, strategy",
+    [
+        (("walk",), WeightStrategy.DISTANCE),
+        (("bike", "electric_cart"), WeightStrategy.TIME),
+        (None, WeightStrategy.TIME),
+    ],
+)
+def test_compact_shortest_path_matches_reference(
+    modes: tuple[str, ...] | None, strategy: WeightStrategy
+) -> None:
+    graph = CompactGraph.from_edges(EDGES)
+
+    expected = shortest_path(EDGES, start="A", goal="D", allowed_modes=modes, strategy=strategy)
+    result = compact_shortest_path(
+        graph, start="A", goal="D", allowed_modes=modes, strategy=strategy
+    )
+
+    assert result.nodes == expected.nodes
+    assert result.total_distance == pytest.approx(expected.total_distance)
+    assert result.total_time == pytest.approx(expected.total_time)
+    assert [segment.transport_mode for segment in result.segments] == [
+        segment.transport_mode for segment in expected.segments
+    ]
+
+
+def test_compact_shortest_path_raises_without_route() -> None:
+    graph = CompactGraph.from_edges(EDGES, nodes=["Z"])
+
+    with pytest.raises(ValueError):
+        compact_shortest_path(graph, start="A", goal="D", allowed_modes=("electric_cart",))
+    with pytest.raises(ValueError):
+        compact_shortest_path(graph, start="A", goal="Z")
+    with pytest.raises(ValueError):
+        compact_shortest_path(graph, start="A", goal="missing")
+
+
+def test_integer_node_ids_are_packed_and_returned_as_ints() -> None:
+    names = {"A": 10, "B": 20, "C": 30, "D": 2**40}
+    edges = [
+        Edge(
+            names[edge.source],
+            names[edge.target],
+            edge.distance,
+            edge.ideal_speed,
+            edge.congestion,
+            edge.transport_modes,
+        )
+        for edge in EDGES
+    ]
+    graph = CompactGraph.from_edges(edges, nodes=[7])
+    reference = CompactGraph.from_edges(EDGES, nodes=["Z"])
+
+    assert isinstance(graph.node_ids, array)
+    assert list(graph.node_ids) == [7, 10, 20, 30, 2**40]
+    assert graph.fingerprint != reference.fingerprint
+    result = compact_shortest_path(graph, 10, 2**40)
+    expected = compact_shortest_path(reference, "A", "D")
+    assert result.nodes == [names[node] for node in expected.nodes]
+    assert all(type(node) is int for node in result.nodes)
+    assert result.total_time == pytest.approx(expected.total_time)
+    # 混合类型（或超出 64 位）的 ID 仍按元组保存
+    assert CompactGraph.from_edges(EDGES[:1], nodes=[1]).node_ids == (1, "A", "B")
+    assert CompactGraph.from_edges(edges[:1], nodes=[2**70]).node_ids == (2**70, 10, 20)
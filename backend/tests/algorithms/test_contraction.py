@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+import random
+from pathlib import Path
+
+import pytest
+
+from app.algorithms.compact_graph import CompactGraph, compact_shortest_path
+from app.algorithms.contraction import (
+    ContractionHierarchy,
+    build_contraction_hierarchy,
+    contraction_shortest_path,
+)
+from app.algorithms.shortest_path import Edge, WeightStrategy
+from tests.networks import grid_network
+
+
+def _road_network(seed: int, size: int = 8) -> list[Edge]:
+    """Grid with mostly two-way streets, a few one-way ones and mixed modes."""
+
+    return grid_network(
+        size,
+        seed,
+        distance=(20.0, 120.0),
+        modes=(("walk",), ("walk", "bike"), ("bike",)),
+        congestion=(1.0, 0.8),
+        two_way=0.85,
+    )
+
+
+def _cost(result, strategy: WeightStrategy) -> float:
+    return result.total_distance if strategy is WeightStrategy.DISTANCE else result.total_time
+
+
+@pytest.mark.parametrize("seed", range(3))
+@pytest.mark.parametrize("strategy", [WeightStrategy.DISTANCE, WeightStrategy.TIME])
+@pytest.mark.parametrize("modes", [None, ("walk",)])
+def test_contraction_queries_match_dijkstra(
+    seed: int, strategy: WeightStrategy, modes: tuple[str, ...] | None
+) -> None:
+    graph = CompactGraph.from_edges(_road_network(seed))
+    hierarchy = build_contraction_hierarchy(graph, strategy=strategy, allowed_modes=modes)
+    rng = random.Random(seed)
+
+    for _ in range(25):
+        start, goal = rng.sample(graph.node_ids, 2)
+        try:
+            expected = compact_shortest_path(
+                graph, start, goal, allowed_modes=modes, strategy=strategy
+            )
+        except ValueError:
+            with pytest.raises(ValueError):
+                contraction_shortest_path(
+                    graph, start, goal, hierarchy=hierarchy, allowed_modes=modes, strategy=strategy
+                )
+            continue
+        result = contraction_shortest_path(
+            graph, start, goal, hierarchy=hierarchy, allowed_modes=modes, strategy=strategy
+        )
+        assert _cost(result, strategy) == pytest.approx(_cost(expected, strategy))
+        assert result.nodes[0] == start and result.nodes[-1] == goal
+        assert all(a.target == b.source for a, b in zip(result.segments, result.segments[1:]))
+
+
+def test_hierarchy_round_trips_through_disk(tmp_path: Path) -> None:
+    graph = CompactGraph.from_edges(_road_network(7))
+    hierarchy = build_contraction_hierarchy(graph, strategy=WeightStrategy.DISTANCE)
+    path = tmp_path / "nested" / "region_1.npz"
+
+    hierarchy.save(path)
+    loaded = ContractionHierarchy.load(path)
+
+    assert loaded.matches(graph, WeightStrategy.DISTANCE, graph.mode_mask(None))
+    assert list(loaded.rank) == list(hierarchy.rank)
+    assert loaded.shortcut_count == hierarchy.shortcut_count
+    start, goal = graph.node_ids[0], graph.node_ids[-1]
+    assert contraction_shortest_path(
+        graph, start, goal, hierarchy=loaded, strategy=WeightStrategy.DISTANCE
+    ).total_distance == pytest.approx(
+        compact_shortest_path(graph, start, goal, strategy=WeightStrategy.DISTANCE).total_distance
+    )
+
+
+def test_mismatched_hierarchy_falls_back_to_dijkstra() -> None:
+    graph = CompactGraph.from_edges(_road_network(1))
+    other = CompactGraph.from_edges(_road_network(2))
+    hierarchy = build_contraction_hierarchy(other, strategy=WeightStrategy.TIME)
+
+    assert not hierarchy.matches(graph, WeightStrategy.TIME, graph.mode_mask(None))
+    start, goal = graph.node_ids[0], graph.node_ids[-1]
+    result = contraction_shortest_path(graph, start, goal, hierarchy=hierarchy)
+    expected = compact_shortest_path(graph, start, goal)
+    assert result.total_time == pytest.approx(expected.total_time)
+    assert result.expanded_nodes == expected.expanded_nodes
@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+import math
+import random
+
+import numpy as np
+import pytest
+
+from app.algorithms import (
+    CompactGraph,
+    Edge,
+    WeightStrategy,
+    build_shortest_path_tree,
+    compute_isochrone,
+)
+from app.algorithms.hull import _covers, concave_hull, convex_hull
+from tests.networks import grid_coordinates, grid_network, grid_node
+
+
+def _area(ring: list[tuple[float, float]]) -> float:
+    return 0.5 * sum(x1 * y2 - x2 * y1 for (x1, y1), (x2, y2) in zip(ring, ring[1:] + ring[:1]))
+
+
+def _grid(size: int, spacing: float = 0.001) -> tuple[list[Edge], dict[int, tuple[float, float]]]:
+    edges = grid_network(size, distance=(100.0, 100.0), speed=(1.0, 1.0))
+    return edges, grid_coordinates(size, spacing=(spacing, spacing))
+
+
+def test_convex_hull_drops_interior_points() -> None:
+    points = [(0.0, 0.0), (2.0, 0.0), (2.0, 2.0), (0.0, 2.0), (1.0, 1.0), (1.0, 0.0)]
+
+    hull = convex_hull(points)
+
+    assert set(hull) == {(0.0, 0.0), (2.0, 0.0), (2.0, 2.0), (0.0, 2.0)}
+    assert _area(hull) == pytest.approx(4.0)
+
+
+def test_concave_hull_follows_a_notch_and_covers_every_point() -> None:
+    rng = random.Random(5)
+    # C 形点云：右侧中部缺口应被凹包保留
+    points = [(rng.uniform(0, 10), rng.uniform(0, 10)) for _ in range(600)]
+    points = [(x, y) for x, y in points if not (x > 4 and 3 < y < 7)]
+
+    hull = concave_hull(points, 5)
+
+    assert _area(hull) > 0  # 逆时针
+    assert _area(hull) < 0.85 * _area(convex_hull(points))
+    assert _covers(np.asarray(hull), np.asarray(points))
+
+
+def test_hulls_of_degenerate_inputs() -> None:
+    assert concave_hull([(0.0, 0.0), (1.0, 1.0)]) == [(0.0, 0.0), (1.0, 1.0)]
+    assert len(concave_hull([(0.0, 0.0), (1.0, 0.0), (2.0, 0.0)])) < 3
+
+
+def test_isochrone_bands_match_tree_costs() -> None:
+    edges, coordinates = _grid(9)
+    graph = CompactGraph.from_edges(edges, coordinates=coordinates)
+    center = grid_node(4, 4, 9)
+    full = build_shortest_path_tree(graph, center, strategy=WeightStrategy.TIME)
+
+    isochrone = compute_isochrone(graph, center, [300, 150], strategy=WeightStrategy.TIME)
+
+    assert isochrone.budgets == (150.0, 300.0)
+    assert isochrone.polygons == ()
+    expected = {graph.node_ids[node] for node in np.flatnonzero(full.costs <= 300)}
+    assert set(isochrone.node_ids) == expected
+    assert list(isochrone.costs) == sorted(isochrone.costs)
+    for node_id, cost, band in zip(isochrone.node_ids, isochrone.costs, isochrone.bands):
+        assert cost == pytest.approx(full.cost_to(node_id))
+        assert band == (0 if cost <= 150 else 1)
+    # 曼哈顿半径 3 内共 1 + 4 * (1 + 2 + 3) 个节点，半径 1 内 5 个
+    assert len(isochrone.node_ids) == 25
+    assert int((isochrone.bands == 0).sum()) == 5
+    # 有界搜索不会展开全部节点
+    assert isochrone.expanded_nodes < full.expanded_nodes
+
+
+def test_isochrone_polygons_are_nested_and_closed() -> None:
+    edges, coordinates = _grid(9)
+    graph = CompactGraph.from_edges(edges, coordinates=coordinates)
+
+    isochrone = compute_isochrone(graph, grid_node(4, 4, 9), [100, 200, 400], include_polygons=True)
+
+    small, medium, large = isochrone.polygons
+    assert small is not None and medium is not None and large is not None
+    for ring in (small, medium, large):
+        assert ring[0] == ring[-1]
+    # 经纬度顺序为 (经度, 纬度)
+    assert all(
+        119.99 < longitude < 120.01 and 29.99 < latitude < 30.01 for longitude, latitude in large
+    )
+    assert abs(_area(small[:-1])) < abs(_area(medium[:-1])) < abs(_area(large[:-1]))
+    assert _covers(np.asarray(large[:-1]), np.asarray(medium[:-1]))
+
+
+def test_isochrone_rejects_bad_input() -> None:
+    edges, coordinates = _grid(3)
+    graph = CompactGraph.from_edges(edges, coordinates=coordinates)
+
+    with pytest.raises(ValueError):
+        compute_isochrone(graph, 0, [0, 10])
+    with pytest.raises(ValueError):
+        compute_isochrone(graph, -1, [10])
+    assert math.isclose(compute_isochrone(graph, 0, [1]).costs[0], 0.0)
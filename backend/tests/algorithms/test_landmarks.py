@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+import random
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from app.algorithms.compact_graph import CompactGraph, compact_shortest_path, shortest_path_tree
+from app.algorithms.landmarks import (
+    LandmarkSelection,
+    LandmarkTable,
+    alt_shortest_path,
+    build_landmark_table,
+)
+from app.algorithms.shortest_path import Edge, WeightStrategy
+from tests.networks import MIXED_MODES, grid_network
+
+
+def _road_network(seed: int, size: int = 12) -> list[Edge]:
+    """Grid with random lengths, some one-way streets and a bike-only layer."""
+
+    return grid_network(size, seed, distance=(20.0, 120.0), modes=MIXED_MODES, two_way=0.9)
+
+
+@pytest.mark.parametrize("selection", list(LandmarkSelection))
+def test_landmark_bounds_are_admissible(selection: LandmarkSelection) -> None:
+    graph = CompactGraph.from_edges(_road_network(3))
+    table = build_landmark_table(graph, 4, strategy=WeightStrategy.DISTANCE, selection=selection)
+
+    assert len(set(table.landmarks.tolist())) == 4
+    assert table.from_landmark.shape == (4, len(graph))
+    assert table.nbytes == table.landmarks.nbytes + 2 * 4 * len(graph) * 8
+
+    for target in (0, len(graph) // 2, len(graph) - 1):
+        exact, _ = shortest_path_tree(graph, target, strategy=WeightStrategy.DISTANCE, reverse=True)
+        bound = table.lower_bounds(target)
+        assert bound[target] == 0.0
+        assert np.all(bound <= np.asarray(exact) + 1e-9)
+
+
+@pytest.mark.parametrize("strategy", [WeightStrategy.DISTANCE, WeightStrategy.TIME])
+@pytest.mark.parametrize("modes", [None, ("walk",)])
+def test_alt_matches_dijkstra_with_fewer_expansions(
+    strategy: WeightStrategy, modes: tuple[str, ...] | None
+) -> None:
+    graph = CompactGraph.from_edges(_road_network(5))
+    table = build_landmark_table(graph, 6, strategy=strategy)
+    rng = random.Random(11)
+    plain = guided = 0
+
+    for _ in range(30):
+        start, goal = rng.sample(graph.node_ids, 2)
+        try:
+            expected = compact_shortest_path(
+                graph, start, goal, allowed_modes=modes, strategy=strategy
+            )
+        except ValueError:
+            with pytest.raises(ValueError):
+                alt_shortest_path(
+                    graph, start, goal, table=table, allowed_modes=modes, strategy=strategy
+                )
+            continue
+        result = alt_shortest_path(
+            graph, start, goal, table=table, allowed_modes=modes, strategy=strategy
+        )
+        assert result.total_distance == pytest.approx(expected.total_distance)
+        assert result.total_time == pytest.approx(expected.total_time)
+        plain += expected.expanded_nodes
+        guided += result.expanded_nodes
+
+    assert guided < plain
+
+
+def test_table_round_trips_and_rejects_other_graphs(tmp_path: Path) -> None:
+    graph = CompactGraph.from_edges(_road_network(1))
+    table = build_landmark_table(graph, 3, strategy=WeightStrategy.TIME, allowed_modes=("walk",))
+    path = tmp_path / "region_1_time.npz"
+    table.save(path)
+    loaded = LandmarkTable.load(path)
+
+    np.testing.assert_array_equal(loaded.from_landmark, table.from_landmark)
+    assert loaded.matches(graph, WeightStrategy.TIME, graph.mode_mask("walk"))
+    # walk-only tables are not valid lower bounds once bike edges are allowed
+    assert not loaded.matches(graph, WeightStrategy.TIME, graph.mode_mask(None))
+    assert not loaded.matches(graph, WeightStrategy.DISTANCE, graph.mode_mask("walk"))
+    other = CompactGraph.from_edges(_road_network(2))
+    assert not loaded.matches(other, WeightStrategy.TIME, graph.mode_mask("walk"))
+
+    start, goal = graph.node_ids[0], graph.node_ids[-1]
+    fallback = alt_shortest_path(graph, start, goal, table=loaded, strategy=WeightStrategy.TIME)
+    assert fallback.total_time == pytest.approx(
+        compact_shortest_path(graph, start, goal).total_time
+    )
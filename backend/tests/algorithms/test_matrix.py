@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+import random
+
+import numpy as np
+import pytest
+
+from app.algorithms.compact_graph import CompactGraph, compact_shortest_path
+from app.algorithms.matrix import distance_matrix, shortest_paths_from
+from app.algorithms.shortest_path import Edge, WeightStrategy
+from tests.networks import grid_network, grid_node
+
+
+def _road_network(seed: int, size: int = 9) -> list[Edge]:
+    return grid_network(
+        size,
+        seed,
+        distance=(20.0, 120.0),
+        modes=(("walk", "bike"),) * 3 + (("bike",),),
+        congestion=(1.0, 0.7),
+        two_way=0.9,
+    )
+
+
+@pytest.mark.parametrize("strategy", [WeightStrategy.DISTANCE, WeightStrategy.TIME])
+@pytest.mark.parametrize("modes", [None, ("walk",)])
+def test_matrix_matches_pairwise_dijkstra(
+    strategy: WeightStrategy, modes: tuple[str, ...] | None
+) -> None:
+    graph = CompactGraph.from_edges(_road_network(4))
+    rng = random.Random(2)
+    sources = rng.sample(graph.node_ids, 5)
+    targets = rng.sample(graph.node_ids, 6) + [sources[0]]
+
+    matrix = distance_matrix(graph, sources, targets, strategy=strategy, allowed_modes=modes)
+
+    assert matrix.costs.shape == (5, 7)
+    for row, start in enumerate(sources):
+        for column, goal in enumerate(targets):
+            try:
+                expected = compact_shortest_path(
+                    graph, start, goal, allowed_modes=modes, strategy=strategy
+                )
+            except ValueError:
+                assert np.isinf(matrix.costs[row, column])
+                with pytest.raises(ValueError):
+                    matrix.path(row, column)
+                continue
+            cost = (
+                expected.total_distance
+                if strategy is WeightStrategy.DISTANCE
+                else expected.total_time
+            )
+            assert matrix.costs[row, column] == pytest.approx(cost)
+            path = matrix.path(row, column)
+            assert path.nodes[0] == start and path.nodes[-1] == goal
+            assert path.total_distance == pytest.approx(matrix.distances[row, column])
+            assert path.total_time == pytest.approx(matrix.times[row, column])
+
+
+def test_matrix_stops_once_targets_are_settled() -> None:
+    graph = CompactGraph.from_edges(_road_network(1))
+    source = [grid_node(0, 0, 9)]
+    near = distance_matrix(
+        graph, source, [grid_node(0, 1, 9), grid_node(1, 0, 9)], strategy=WeightStrategy.DISTANCE
+    )
+    full = distance_matrix(graph, source, [grid_node(8, 8, 9)], strategy=WeightStrategy.DISTANCE)
+
+    assert near.expanded_nodes < full.expanded_nodes <= len(graph)
+
+
+def test_matrix_handles_duplicates_and_unknown_nodes() -> None:
+    graph = CompactGraph.from_edges(_road_network(3))
+    origin, target = grid_node(0, 0, 9), grid_node(2, 2, 9)
+    matrix = distance_matrix(graph, [origin, -1, origin], [origin, -1, target])
+
+    assert matrix.costs[0, 0] == 0.0
+    assert np.isinf(matrix.costs[0, 1])
+    assert np.isinf(matrix.costs[1]).all()
+    with pytest.raises(ValueError):
+        matrix.path(1, 1)
+    np.testing.assert_array_equal(matrix.costs[0], matrix.costs[2])
+    assert matrix.path_between(origin, target).nodes[-1] == target
+
+
+def test_shortest_paths_from_shares_one_search() -> None:
+    graph = CompactGraph.from_edges(_road_network(6))
+    rng = random.Random(5)
+    source = graph.node_ids[0]
+    targets = rng.sample(graph.node_ids, 8) + [-1]
+
+    paths = shortest_paths_from(graph, source, targets, strategy=WeightStrategy.DISTANCE)
+
+    assert paths[-1] is None
+    expanded = {path.expanded_nodes for path in paths if path is not None}
+    assert len(expanded) == 1
+    for target, path in zip(targets[:-1], paths):
+        expected = compact_shortest_path(graph, source, target, strategy=WeightStrategy.DISTANCE)
+        assert path.nodes[-1] == target
+        assert path.total_distance == pytest.approx(expected.total_distance)
@@ -0,0 +1,168 @@
+from __future__ import annotations
+
+import pytest
+
+from app.algorithms import (
+    CompactGraph,
+    Edge,
+    WeightStrategy,
+    compact_shortest_path,
+    multimodal_shortest_path,
+)
+from tests.networks import grid_coordinates, grid_network, grid_node
+
+FACTORS = {"walk": 1.0, "bike": 2.5, "electric_cart": 4.0}
+PENALTIES = {("walk", "bike"): 60.0, ("bike", "walk"): 60.0, ("walk", "electric_cart"): 120.0}
+
+
+MODE_CHOICES = (
+    ("walk",),
+    ("walk", "bike"),
+    ("walk", "electric_cart"),
+    ("bike", "electric_cart"),
+    ("walk", "bike"),
+)
+
+
+def _network(size: int, seed: int) -> CompactGraph:
+    edges = grid_network(size, seed, distance=(50.0, 400.0), speed=(1.0, 2.0), modes=MODE_CHOICES)
+    return CompactGraph.from_edges(
+        edges, coordinates=grid_coordinates(size, spacing=(0.002, 0.002))
+    )
+
+
+def _ride_then_walk() -> CompactGraph:
+    return CompactGraph.from_edges(
+        [
+            Edge(
+                "A",
+                "B",
+                distance=1000.0,
+                ideal_speed=1.0,
+                congestion=1.0,
+                transport_modes=("walk", "bike"),
+            ),
+            Edge(
+                "B", "C", distance=100.0, ideal_speed=1.0, congestion=1.0, transport_modes=("walk",)
+            ),
+        ]
+    )
+
+
+def test_picks_fastest_mode_per_segment_and_pays_transfer() -> None:
+    result = multimodal_shortest_path(
+        _ride_then_walk(), "A", "C", speed_factors=FACTORS, transfer_penalties=PENALTIES
+    )
+
+    assert [segment.transport_mode for segment in result.segments] == ["bike", "walk"]
+    # 骑行 400 秒，下车停车 60 秒后步行 100 秒
+    assert [segment.time for segment in result.segments] == pytest.approx([400.0, 160.0])
+    assert result.total_time == pytest.approx(560.0)
+    assert result.total_distance == pytest.approx(1100.0)
+
+
+def test_expensive_transfer_keeps_a_single_mode() -> None:
+    penalties = {("bike", "walk"): 1000.0}
+
+    result = multimodal_shortest_path(
+        _ride_then_walk(), "A", "C", speed_factors=FACTORS, transfer_penalties=penalties
+    )
+
+    assert [segment.transport_mode for segment in result.segments] == ["walk", "walk"]
+    assert result.total_time == pytest.approx(1100.0)
+
+
+def test_switches_mode_on_the_way_when_the_edge_requires_it() -> None:
+    graph = CompactGraph.from_edges(
+        [
+            Edge(
+                "A", "B", distance=100.0, ideal_speed=1.0, congestion=1.0, transport_modes=("walk",)
+            ),
+            Edge(
+                "B",
+                "C",
+                distance=2000.0,
+                ideal_speed=1.0,
+                congestion=1.0,
+                transport_modes=("electric_cart",),
+            ),
+        ]
+    )
+
+    result = multimodal_shortest_path(
+        graph, "A", "C", speed_factors=FACTORS, transfer_penalties=PENALTIES
+    )
+
+    assert [segment.transport_mode for segment in result.segments] == ["walk", "electric_cart"]
+    assert result.segments[1].time == pytest.approx(120.0 + 500.0)
+
+
+def test_allowed_modes_restrict_the_states() -> None:
+    result = multimodal_shortest_path(
+        _ride_then_walk(),
+        "A",
+        "C",
+        allowed_modes=["walk"],
+        speed_factors=FACTORS,
+        transfer_penalties=PENALTIES,
+    )
+
+    assert {segment.transport_mode for segment in result.segments} == {"walk"}
+    with pytest.raises(ValueError):
+        multimodal_shortest_path(_ride_then_walk(), "A", "C", allowed_modes=["bike"])
+
+
+@pytest.mark.parametrize("strategy", [WeightStrategy.TIME, WeightStrategy.DISTANCE])
+def test_without_speed_factors_matches_single_mode_search(strategy: WeightStrategy) -> None:
+    graph = _network(8, 5)
+    source, target = grid_node(0, 0, 8), grid_node(7, 6, 8)
+
+    single = compact_shortest_path(graph, source, target, strategy=strategy)
+    multimodal = multimodal_shortest_path(graph, source, target, strategy=strategy)
+
+    assert multimodal.total_time == pytest.approx(single.total_time)
+    assert multimodal.total_distance == pytest.approx(single.total_distance)
+
+
+@pytest.mark.parametrize("seed", [2, 7, 21])
+def test_goal_directed_search_matches_dijkstra(seed: int) -> None:
+    graph = _network(9, seed)
+    source, target = grid_node(0, 0, 9), grid_node(8, 8, 9)
+    options = {"speed_factors": FACTORS, "transfer_penalties": PENALTIES}
+
+    plain = multimodal_shortest_path(graph, source, target, goal_directed=False, **options)
+    directed = multimodal_shortest_path(graph, source, target, **options)
+
+    assert directed.total_time == pytest.approx(plain.total_time)
+    assert directed.expanded_nodes <= plain.expanded_nodes
+    assert sum(segment.time for segment in directed.segments) == pytest.approx(directed.total_time)
+    # 逐段选择交通方式不会比只用步行更慢
+    walking = compact_shortest_path(graph, source, target, allowed_modes=["walk"])
+    assert directed.total_time <= walking.total_time + 1e-9
+
+
+def test_distance_strategy_uses_fastest_modes_along_a_shortest_path() -> None:
+    graph = _network(7, 3)
+    source, target = grid_node(0, 0, 7), grid_node(6, 6, 7)
+
+    shortest = compact_shortest_path(graph, source, target, strategy=WeightStrategy.DISTANCE)
+    result = multimodal_shortest_path(
+        graph,
+        source,
+        target,
+        strategy=WeightStrategy.DISTANCE,
+        speed_factors=FACTORS,
+        transfer_penalties=PENALTIES,
+    )
+
+    assert result.total_distance == pytest.approx(shortest.total_distance)
+    assert result.total_time <= shortest.total_time + 1e-9
+
+
+def test_rejects_invalid_options() -> None:
+    with pytest.raises(ValueError):
+        multimodal_shortest_path(_ride_then_walk(), "A", "C", speed_factors={"bike": 0.0})
+    with pytest.raises(ValueError):
+        multimodal_shortest_path(
+            _ride_then_walk(), "A", "C", transfer_penalties={("walk", "bike"): -1.0}
+        )
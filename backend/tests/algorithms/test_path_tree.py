@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+import random
+
+import numpy as np
+import pytest
+
+from app.algorithms import (
+    CompactGraph,
+    Edge,
+    ShortestPathTree,
+    WeightStrategy,
+    build_shortest_path_tree,
+    compact_shortest_path,
+    nearest_targets_tree,
+)
+from tests.networks import MIXED_MODES, grid_coordinates, grid_network, grid_node
+
+
+def _grid(size: int, seed: int) -> list[Edge]:
+    return grid_network(size, seed, modes=MIXED_MODES, congestion=(1.0, 0.8), directed=True)
+
+
+@pytest.mark.parametrize("strategy", [WeightStrategy.DISTANCE, WeightStrategy.TIME])
+def test_tree_paths_match_point_to_point_search(strategy: WeightStrategy) -> None:
+    graph = CompactGraph.from_edges(_grid(7, 1))
+    source = grid_node(0, 0, 7)
+    tree = build_shortest_path_tree(graph, source, strategy=strategy, allowed_modes=("walk",))
+
+    for target in random.Random(2).sample(graph.node_ids, 12):
+        try:
+            expected = compact_shortest_path(
+                graph, source, target, strategy=strategy, allowed_modes=("walk",)
+            )
+        except ValueError:
+            assert not np.isfinite(tree.cost_to(target))
+            continue
+        path = tree.path(target)
+        assert path.total_distance == pytest.approx(expected.total_distance)
+        assert path.total_time == pytest.approx(expected.total_time)
+        position = graph.index[target]
+        assert tree.distances[position] == pytest.approx(path.total_distance)
+        assert [graph.node_ids[node] for node in tree.node_path(position)] == path.nodes
+
+    assert tree.path(source).nodes == [source]
+    assert tree.nbytes == 28 * len(graph)
+
+
+def test_bounded_tree_stops_at_max_cost() -> None:
+    graph = CompactGraph.from_edges(_grid(7, 3))
+    center = grid_node(3, 3, 7)
+    full = build_shortest_path_tree(graph, center, strategy=WeightStrategy.DISTANCE)
+    bounded = build_shortest_path_tree(
+        graph, center, strategy=WeightStrategy.DISTANCE, max_cost=60.0
+    )
+
+    inside = full.costs <= 60.0
+    assert np.array_equal(np.isfinite(bounded.costs), inside)
+    assert np.allclose(bounded.costs[inside], full.costs[inside])
+    assert bounded.expanded_nodes < full.expanded_nodes
+    with pytest.raises(ValueError):
+        bounded.path(graph.node_ids[int(np.argmax(full.costs))])
+
+
+@pytest.mark.parametrize("strategy", [WeightStrategy.DISTANCE, WeightStrategy.TIME])
+def test_nearest_targets_tree_stops_after_limit(strategy: WeightStrategy) -> None:
+    graph = CompactGraph.from_edges(_grid(9, 5))
+    center = grid_node(4, 4, 9)
+    full = build_shortest_path_tree(graph, center, strategy=strategy)
+    targets = random.Random(6).sample(graph.node_ids, 20)
+    radius = 150.0
+
+    tree = nearest_targets_tree(graph, center, targets, 3, strategy=strategy, max_distance=radius)
+
+    def nearest(candidate: ShortestPathTree) -> list[int]:
+        hits = [
+            target
+            for target in targets
+            if np.isfinite(candidate.cost_to(target))
+            and candidate.distances[graph.index[target]] <= radius
+        ]
+        return sorted(hits, key=lambda target: (candidate.cost_to(target), target))[:3]
+
+    assert nearest(tree) == nearest(full)
+    for target in nearest(tree):
+        assert tree.cost_to(target) == pytest.approx(full.cost_to(target))
+        assert tree.path(target).nodes == full.path(target).nodes
+    assert tree.expanded_nodes < full.expanded_nodes
+
+
+def test_nearest_targets_tree_skips_targets_beyond_straight_line_radius() -> None:
+    coordinates = grid_coordinates(7, origin=(0.0, 0.0))
+    graph = CompactGraph.from_edges(_grid(7, 2), coordinates=coordinates)
+    source, neighbour, corner = grid_node(0, 0, 7), grid_node(0, 1, 7), grid_node(6, 6, 7)
+
+    # 直线距离已超出半径的目标不会触发任何搜索
+    far = nearest_targets_tree(
+        graph,
+        source,
+        [corner, grid_node(5, 6, 7)],
+        2,
+        strategy=WeightStrategy.TIME,
+        max_distance=50.0,
+    )
+    assert far.expanded_nodes == 0
+    assert list(far.reached()) == [graph.index[source]]
+
+    # 目标在半径内时只搜索到找到它为止
+    near = nearest_targets_tree(
+        graph, source, [neighbour, corner], 1, strategy=WeightStrategy.TIME, max_distance=1000.0
+    )
+    full = build_shortest_path_tree(graph, source, strategy=WeightStrategy.TIME)
+    assert near.cost_to(neighbour) == pytest.approx(full.cost_to(neighbour))
+    assert not np.isfinite(near.cost_to(corner))
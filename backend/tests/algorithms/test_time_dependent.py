@@ -0,0 +1,198 @@
+from __future__ import annotations
+
+import random
+
+import pytest
+
+from app.algorithms import (
+    BUCKET_SECONDS,
+    PROFILE_BUCKETS,
+    CompactGraph,
+    Edge,
+    WeightStrategy,
+    compact_shortest_path,
+    profile_travel_time,
+    time_dependent_shortest_path,
+)
+from tests.networks import grid_coordinates, grid_network, grid_node
+
+HOUR = 3600.0
+
+
+def _rush_hour(jammed: float, start: float = 9.0, end: float = 11.0) -> tuple[float, ...]:
+    """Free flow all day except ``jammed`` between ``start`` and ``end`` o'clock."""
+
+    return tuple(
+        jammed if start * 4 <= bucket < end * 4 else 1.0 for bucket in range(PROFILE_BUCKETS)
+    )
+
+
+def _grid(size: int, seed: int) -> list[Edge]:
+    return grid_network(
+        size, seed, distance=(200.0, 2000.0), congestion=(0.5, 0.5), directed=True, profiled=0.5
+    )
+
+
+def test_profile_travel_time_integrates_speed_across_buckets() -> None:
+    profile = _rush_hour(0.25)
+
+    assert profile_travel_time(900.0, 2.0, profile, 12 * HOUR) == pytest.approx(450.0)
+    assert profile_travel_time(900.0, 2.0, profile, 10 * HOUR) == pytest.approx(1800.0)
+    # 10:55 出发：前 5 分钟以 0.5 m/s 走 150 m，11:00 后以 2 m/s 走完剩余 750 m
+    assert profile_travel_time(900.0, 2.0, profile, 10 * HOUR + 55 * 60) == pytest.approx(
+        300.0 + 375.0
+    )
+    # 跨过午夜时回到当天第一个时段
+    assert profile_travel_time(900.0, 2.0, profile, 34 * HOUR) == pytest.approx(1800.0)
+    assert profile_travel_time(0.0, 2.0, profile, 10 * HOUR) == 0.0
+
+
+def test_profile_travel_time_is_fifo() -> None:
+    rng = random.Random(5)
+    profile = tuple(rng.uniform(0.05, 1.0) for _ in range(PROFILE_BUCKETS))
+
+    departures = [step * 37.0 for step in range(int(2 * 86400 / 37))]
+    arrivals = [
+        departure + profile_travel_time(5000.0, 3.0, profile, departure) for departure in departures
+    ]
+
+    assert all(later >= earlier - 1e-9 for earlier, later in zip(arrivals, arrivals[1:]))
+
+
+def test_edge_travel_time_at() -> None:
+    static = Edge("a", "b", distance=900.0, ideal_speed=2.0, congestion=0.5)
+    profiled = Edge(
+        "a",
+        "b",
+        distance=900.0,
+        ideal_speed=2.0,
+        congestion=0.5,
+        congestion_profile=_rush_hour(0.25),
+    )
+
+    assert static.travel_time_at(10 * HOUR) == static.travel_time == pytest.approx(900.0)
+    assert profiled.travel_time == pytest.approx(900.0)
+    assert profiled.travel_time_at(10 * HOUR) == pytest.approx(1800.0)
+    assert profiled.travel_time_at(15 * HOUR) == pytest.approx(450.0)
+    with pytest.raises(ValueError):
+        Edge(
+            "a", "b", distance=1.0, ideal_speed=1.0, congestion=1.0, congestion_profile=(1.0,) * 24
+        )
+    with pytest.raises(ValueError):
+        Edge(
+            "a",
+            "b",
+            distance=1.0,
+            ideal_speed=1.0,
+            congestion=1.0,
+            congestion_profile=(0.0,) * PROFILE_BUCKETS,
+        )
+
+
+def test_compact_graph_keeps_profiles_per_csr_edge() -> None:
+    edges = [
+        Edge(
+            "b",
+            "c",
+            distance=100.0,
+            ideal_speed=1.0,
+            congestion=1.0,
+            congestion_profile=_rush_hour(0.5),
+        ),
+        Edge("a", "b", distance=100.0, ideal_speed=2.0, congestion=1.0),
+        Edge(
+            "a",
+            "c",
+            distance=300.0,
+            ideal_speed=4.0,
+            congestion=1.0,
+            congestion_profile=_rush_hour(0.2),
+        ),
+    ]
+    graph = CompactGraph.from_edges(edges, nodes=["a", "b", "c"])
+    profiles = graph.profiles
+
+    assert profiles is not None and len(profiles) == 2
+    assert profiles.nbytes == 4 * 3 + 392 * 2
+    assert profiles.max_speed == pytest.approx(4.0)
+    for slot in range(graph.edge_count):
+        source = graph.node_ids[graph.edge_source(slot)]
+        target = graph.node_ids[graph.targets[slot]]
+        edge = next(edge for edge in edges if (edge.source, edge.target) == (source, target))
+        for departure in (3 * HOUR, 10 * HOUR):
+            assert profiles.travel_time(
+                slot, graph.distances[slot], departure, graph.times[slot]
+            ) == pytest.approx(edge.travel_time_at(departure))
+
+    assert CompactGraph.from_edges(edges[1:2]).profiles is None
+
+
+def test_route_avoids_jammed_edge_only_at_rush_hour() -> None:
+    graph = CompactGraph.from_edges(
+        [
+            Edge(
+                "a",
+                "c",
+                distance=1000.0,
+                ideal_speed=2.0,
+                congestion=1.0,
+                congestion_profile=_rush_hour(0.1),
+            ),
+            Edge("a", "b", distance=800.0, ideal_speed=2.0, congestion=1.0),
+            Edge("b", "c", distance=800.0, ideal_speed=2.0, congestion=1.0),
+        ]
+    )
+
+    morning = time_dependent_shortest_path(graph, "a", "c", 10 * HOUR)
+    evening = time_dependent_shortest_path(graph, "a", "c", 16 * HOUR)
+    # 按距离选路时路径不变，只有时间随出发时刻变化
+    by_distance = time_dependent_shortest_path(
+        graph, "a", "c", 10 * HOUR, strategy=WeightStrategy.DISTANCE
+    )
+
+    assert morning.nodes == ["a", "b", "c"]
+    assert morning.total_time == pytest.approx(800.0)
+    assert evening.nodes == ["a", "c"]
+    assert evening.total_time == pytest.approx(500.0)
+    assert by_distance.nodes == ["a", "c"]
+    # 11:00 前以 0.2 m/s 走 720 m，之后以 2 m/s 走完剩余 280 m（系数按 float32 存储）
+    assert by_distance.total_time == pytest.approx(3600.0 + 140.0, rel=1e-6)
+    with pytest.raises(ValueError):
+        time_dependent_shortest_path(graph, "c", "a", 10 * HOUR)
+
+
+@pytest.mark.parametrize("departure", [0.0, 8.5 * HOUR, 17.25 * HOUR, 23.9 * HOUR])
+def test_goal_directed_search_matches_dijkstra(departure: float) -> None:
+    size = 9
+    edges = _grid(size, 13)
+    lookup = {(edge.source, edge.target): edge for edge in edges}
+    graph = CompactGraph.from_edges(edges, coordinates=grid_coordinates(size))
+    source, target = grid_node(0, 0, size), grid_node(8, 7, size)
+
+    plain = time_dependent_shortest_path(graph, source, target, departure, goal_directed=False)
+    directed = time_dependent_shortest_path(graph, source, target, departure)
+
+    assert directed.total_time == pytest.approx(plain.total_time)
+    assert directed.expanded_nodes <= plain.expanded_nodes
+    # 逐段按到达时刻重新计算，与报告的分段时间一致
+    clock = departure
+    for segment in directed.segments:
+        duration = lookup[(segment.source, segment.target)].travel_time_at(clock)
+        assert segment.time == pytest.approx(duration)
+        clock += duration
+    assert directed.total_time == pytest.approx(clock - departure)
+
+
+def test_without_profiles_matches_static_search() -> None:
+    edges = [
+        Edge(edge.source, edge.target, edge.distance, edge.ideal_speed, edge.congestion)
+        for edge in _grid(6, 2)
+    ]
+    graph = CompactGraph.from_edges(edges, coordinates=grid_coordinates(6))
+    source, target = grid_node(0, 0, 6), grid_node(5, 5, 6)
+
+    static = compact_shortest_path(graph, source, target)
+    dynamic = time_dependent_shortest_path(graph, source, target, 10 * HOUR + BUCKET_SECONDS / 3)
+
+    assert dynamic.total_time == pytest.approx(static.total_time)
+    assert dynamic.total_distance == pytest.approx(static.total_distance)
@@ -1,13 +1,24 @@
 from __future__ import annotations
 
+import itertools
+import math
+import random
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import resource_tracker
+
+import numpy as np
 import pytest
 
 from app.algorithms import (
+    CompactGraph,
     Edge,
     TourComputationError,
+    TourSolver,
     WeightStrategy,
     compute_tour,
 )
+from app.algorithms.tsp import _held_karp, _local_search, _nearest_neighbour_tour, _tour_cost
+from tests.networks import grid_node
 
 
 BASIC_EDGES = [
@@ -72,3 +83,156 @@ def test_compute_tour_raises_when_unreachable() -> None:
             start="A",
             targets=["C"],
         )
+
+
+def test_compute_tour_honours_exhausted_time_budget() -> None:
+    result = compute_tour(BASIC_EDGES, start="A", targets=["C", "B", "D"], time_budget=0.0)
+
+    assert result.route[0] == "A" and result.route[-1] == "A"
+    assert set(result.route[1:-1]) == {"B", "C", "D"}
+    assert result.total_distance == pytest.approx(
+        sum(leg.path.total_distance for leg in result.legs)
+    )
+
+
+def test_compute_tour_follows_one_way_ring_direction() -> None:
+    # Clockwise ring A->B->C->D->E->A is cheap; going against it needs long detours.
+    ring = ["A", "B", "C", "D", "E"]
+    edges = []
+    for origin, destination in zip(ring, ring[1:] + ring[:1]):
+        edges.append(
+            Edge(
+                origin,
+                destination,
+                distance=1.0,
+                ideal_speed=1.0,
+                congestion=1.0,
+                transport_modes=("walk",),
+            )
+        )
+        edges.append(
+            Edge(
+                destination,
+                origin,
+                distance=10.0,
+                ideal_speed=1.0,
+                congestion=1.0,
+                transport_modes=("walk",),
+            )
+        )
+
+    result = compute_tour(
+        edges, start="A", targets=["D", "B", "E", "C"], strategy=WeightStrategy.DISTANCE
+    )
+
+    assert result.route == ["A", "B", "C", "D", "E", "A"]
+    assert result.total_distance == pytest.approx(5.0)
+
+
+def test_local_search_reaches_optimum_on_small_asymmetric_instances() -> None:
+    rng = random.Random(3)
+    for _ in range(50):
+        size = rng.randint(3, 7)
+        points = [(rng.random(), rng.random()) for _ in range(size)]
+        costs = [
+            [
+                0.0 if a == b else math.dist(points[a], points[b]) * (1.0 + (0.5 if a < b else 0.0))
+                for b in range(size)
+            ]
+            for a in range(size)
+        ]
+        initial = _nearest_neighbour_tour(costs)
+        tour = _local_search(
+            list(initial), costs, max_iterations=50, deadline=math.inf, neighbour_count=size
+        )
+
+        assert tour[0] == tour[-1] == 0
+        assert sorted(tour[:-1]) == list(range(size))
+        best = min(
+            _tour_cost([0, *order, 0], costs) for order in itertools.permutations(range(1, size))
+        )
+        assert _tour_cost(tour, costs) <= _tour_cost(initial, costs) + 1e-9
+        assert _tour_cost(tour, costs) <= best * 1.1
+
+
+def test_held_karp_matches_brute_force_on_asymmetric_costs() -> None:
+    rng = random.Random(8)
+    for size in range(2, 9):
+        costs = [
+            [0.0 if a == b else rng.uniform(1.0, 50.0) for b in range(size)] for a in range(size)
+        ]
+        tour = _held_karp(np.asarray(costs))
+
+        assert tour[0] == tour[-1] == 0
+        assert sorted(tour[:-1]) == list(range(size))
+        best = min(
+            _tour_cost([0, *order, 0], costs) for order in itertools.permutations(range(1, size))
+        )
+        assert _tour_cost(tour, costs) == pytest.approx(best)
+
+
+def test_compute_tour_selects_solver_by_threshold() -> None:
+    exact = compute_tour(BASIC_EDGES, start="A", targets=["C", "B", "D"])
+    heuristic = compute_tour(BASIC_EDGES, start="A", targets=["C", "B", "D"], exact_threshold=2)
+
+    assert exact.solver is TourSolver.HELD_KARP
+    assert heuristic.solver is TourSolver.LOCAL_SEARCH
+    assert exact.solver_seconds >= 0.0 and heuristic.solver_seconds >= 0.0
+    assert exact.total_distance == pytest.approx(4.0)
+    assert heuristic.total_distance >= exact.total_distance - 1e-9
+
+
+def _asymmetric_grid(size: int) -> list[Edge]:
+    rng = random.Random(size)
+    edges: list[Edge] = []
+    for row in range(size):
+        for col in range(size):
+            for d_row, d_col in ((0, 1), (1, 0)):
+                if row + d_row >= size or col + d_col >= size:
+                    continue
+                a, b = grid_node(row, col, size), grid_node(row + d_row, col + d_col, size)
+                length = rng.uniform(20.0, 100.0)
+                for source, target, distance in (
+                    (a, b, length),
+                    (b, a, length * rng.uniform(1.0, 1.5)),
+                ):
+                    edges.append(
+                        Edge(
+                            source,
+                            target,
+                            distance=distance,
+                            ideal_speed=1.4,
+                            congestion=1.0,
+                            transport_modes=("walk",),
+                        )
+                    )
+    return edges
+
+
+def test_multi_start_never_loses_to_single_start() -> None:
+    graph = CompactGraph.from_edges(_asymmetric_grid(12))
+    stops = random.Random(4).sample(graph.node_ids, 21)
+
+    single = compute_tour(graph, stops[0], stops[1:])
+    multi = compute_tour(graph, stops[0], stops[1:], starts=6, seed=3)
+
+    assert single.solver is TourSolver.LOCAL_SEARCH
+    assert multi.solver is TourSolver.MULTI_START
+    assert sorted(multi.route[1:-1]) == sorted(stops[1:])
+    assert multi.total_time <= single.total_time + 1e-9
+
+
+def test_multi_start_runs_on_process_pool_with_shared_matrix() -> None:
+    graph = CompactGraph.from_edges(_asymmetric_grid(10))
+    stops = random.Random(9).sample(graph.node_ids, 16)
+    sequential = compute_tour(graph, stops[0], stops[1:], starts=4, seed=1)
+
+    resource_tracker.ensure_running()
+    with ProcessPoolExecutor(max_workers=2) as executor:
+        parallel = compute_tour(
+            graph, stops[0], stops[1:], starts=4, seed=1, executor=executor, time_budget=5.0
+        )
+
+    assert parallel.solver is TourSolver.MULTI_START
+    assert parallel.route[0] == parallel.route[-1] == stops[0]
+    assert parallel.total_time == pytest.approx(sequential.total_time)
@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from app.algorithms import (
+    CompactGraph,
+    Edge,
+    GraphVoronoi,
+    WeightStrategy,
+    build_graph_voronoi,
+    compact_shortest_path,
+)
+from tests.networks import MIXED_MODES, grid_network, grid_node
+
+
+def _grid(size: int, seed: int) -> list[Edge]:
+    return grid_network(
+        size, seed, modes=MIXED_MODES, congestion=(1.0, 0.8), two_way=0.9, directed=True
+    )
+
+
+@pytest.mark.parametrize("strategy", [WeightStrategy.DISTANCE, WeightStrategy.TIME])
+def test_voronoi_matches_nearest_source_by_brute_force(strategy: WeightStrategy) -> None:
+    graph = CompactGraph.from_edges(_grid(7, 4))
+    sources = [grid_node(0, 0, 7), grid_node(3, 5, 7), grid_node(6, 2, 7), -1]
+
+    voronoi = build_graph_voronoi(graph, sources, strategy=strategy, allowed_modes=("walk",))
+
+    assert [graph.node_ids[node] for node in voronoi.sources] == sorted(
+        sources[:3], key=graph.index.get
+    )
+    for node_id in graph.node_ids:
+        node = graph.index[node_id]
+        best = np.inf
+        for source in sources[:3]:
+            try:
+                path = compact_shortest_path(
+                    graph, node_id, source, strategy=strategy, allowed_modes=("walk",)
+                )
+            except ValueError:
+                continue
+            cost = path.total_distance if strategy is WeightStrategy.DISTANCE else path.total_time
+            best = min(best, cost)
+        assert voronoi.costs[node] == pytest.approx(best)
+        if not np.isfinite(best):
+            assert voronoi.nearest(node) is None
+            assert voronoi.node_path(graph, node) == []
+            continue
+        # 沿下一跳走到的终点就是最近的设施，且累计的距离与时间与路径一致
+        hops = voronoi.node_path(graph, node)
+        assert hops[0] == node and hops[-1] == voronoi.nearest(node)
+        walked = sum(graph.distances[int(voronoi.next_edge[hop])] for hop in hops[:-1])
+        assert voronoi.distances[node] == pytest.approx(walked)
+
+
+def test_voronoi_roundtrip_and_staleness(tmp_path: Path) -> None:
+    graph = CompactGraph.from_edges(_grid(5, 2))
+    corners = [grid_node(0, 0, 5), grid_node(4, 4, 5)]
+    voronoi = build_graph_voronoi(graph, corners, strategy=WeightStrategy.TIME)
+    mask = graph.mode_mask(None)
+
+    path = tmp_path / "voronoi.npz"
+    voronoi.save(path)
+    loaded = GraphVoronoi.load(path)
+
+    assert loaded.matches(graph, WeightStrategy.TIME, mask, corners[::-1])
+    assert np.array_equal(loaded.owner, voronoi.owner)
+    assert np.array_equal(loaded.next_edge, voronoi.next_edge)
+    assert loaded.nbytes == voronoi.nbytes == 32 * len(graph) + 4 * 2
+    # 设施集合、策略、交通方式或图结构变化都会使分区失效
+    assert not loaded.matches(graph, WeightStrategy.TIME, mask, corners[:1])
+    assert not loaded.matches(graph, WeightStrategy.DISTANCE, mask, corners)
+    assert not loaded.matches(graph, WeightStrategy.TIME, graph.mode_mask("walk"), corners)
+    other = CompactGraph.from_edges(_grid(5, 3))
+    assert not loaded.matches(other, WeightStrategy.TIME, mask, corners)
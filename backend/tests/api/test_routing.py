@@ -9,14 +9,22 @@ from fastapi import FastAPI
 from httpx import AsyncClient
 
 from app.api import deps
-from app.algorithms import WeightStrategy
+from app.algorithms import CompactGraph, Edge, TourSolver, WeightStrategy, compute_isochrone
+from app.algorithms.matrix import distance_matrix
+from app.models.users import User
 from app.services import (
+    DistanceMatrixPlan,
+    ExecutorSaturatedError,
+    IsochronePlan,
+    LiveCongestionIngestor,
     NodeValidationError,
+    RegionGraphStore,
     RegionNotFoundError,
     RouteNode,
     RouteNotFoundError,
     RoutePlan,
     RouteSegment,
+    TourPlan,
 )
 
 
@@ -34,6 +42,103 @@ class FakeRoutingService:
             raise RuntimeError("No plan configured for FakeRoutingService")
         return self._plan
 
+    async def compute_routes_batch(self, **kwargs: Any) -> list[RoutePlan | Exception]:
+        self.received_kwargs = kwargs
+        if self._error is not None:
+            raise self._error
+        outcomes: list[RoutePlan | Exception] = []
+        for query in kwargs["queries"]:
+            if query.end_node_id == 404:
+                outcomes.append(RouteNotFoundError("no path"))
+            elif query.end_node_id == 400:
+                outcomes.append(NodeValidationError("bad node"))
+            else:
+                outcomes.append(self._plan)
+        return outcomes
+
+    async def compute_alternative_routes(self, **kwargs: Any) -> list[RoutePlan]:
+        self.received_kwargs = kwargs
+        if self._error is not None:
+            raise self._error
+        if self._plan is None:
+            raise RuntimeError("No plan configured for FakeRoutingService")
+        return [self._plan] * kwargs["k"]
+
+    async def compute_tour_plan(self, **kwargs: Any) -> TourPlan:
+        self.received_kwargs = kwargs
+        if self._error is not None:
+            raise self._error
+        if self._plan is None:
+            raise RuntimeError("No plan configured for FakeRoutingService")
+        return TourPlan(
+            region_id=self._plan.region_id,
+            strategy=self._plan.strategy,
+            total_distance=self._plan.total_distance * 2,
+            total_time=self._plan.total_time * 2,
+            allowed_modes=self._plan.allowed_modes,
+            route=[1, 2, 1],
+            legs=[self._plan, self._plan],
+            solver=TourSolver.HELD_KARP,
+            solver_seconds=0.002,
+        )
+
+    async def compute_distance_matrix(self, **kwargs: Any) -> DistanceMatrixPlan:
+        self.received_kwargs = kwargs
+        if self._error is not None:
+            raise self._error
+        graph = CompactGraph.from_edges(
+            [
+                Edge(
+                    1, 2, distance=120.0, ideal_speed=1.2, congestion=1.0, transport_modes=("walk",)
+                )
+            ],
+            nodes=[3],
+        )
+        sources = kwargs["source_node_ids"]
+        targets = kwargs["target_node_ids"] or sources
+        return DistanceMatrixPlan(
+            region_id=kwargs["region_id"],
+            strategy=WeightStrategy(kwargs["strategy"]),
+            allowed_modes=("walk",),
+            source_ids=list(sources),
+            target_ids=list(targets),
+            matrix=distance_matrix(
+                graph, list(sources), list(targets), strategy=kwargs["strategy"]
+            ),
+        )
+
+    async def compute_isochrone(self, **kwargs: Any) -> IsochronePlan:
+        self.received_kwargs = kwargs
+        if self._error is not None:
+            raise self._error
+        graph = CompactGraph.from_edges(
+            [
+                Edge(
+                    1, 2, distance=120.0, ideal_speed=1.0, congestion=1.0, transport_modes=("walk",)
+                ),
+                Edge(
+                    2, 3, distance=120.0, ideal_speed=1.0, congestion=1.0, transport_modes=("walk",)
+                ),
+                Edge(
+                    1, 3, distance=300.0, ideal_speed=1.0, congestion=1.0, transport_modes=("walk",)
+                ),
+            ],
+            coordinates={1: (30.0, 120.0), 2: (30.0, 120.001), 3: (30.001, 120.001)},
+        )
+        return IsochronePlan(
+            region_id=kwargs["region_id"],
+            origin_node_id=kwargs["origin_node_id"],
+            strategy=WeightStrategy(kwargs["strategy"]),
+            allowed_modes=("walk",),
+            isochrone=compute_isochrone(
+                graph,
+                kwargs["origin_node_id"],
+                kwargs["budgets"],
+                strategy=kwargs["strategy"],
+                include_polygons=kwargs["include_polygons"],
+            ),
+        )
+
 
 @pytest.fixture()
 def route_plan() -> RoutePlan:
@@ -52,11 +157,14 @@ def route_plan() -> RoutePlan:
         allowed_modes=("walk", "electric_cart"),
         nodes=nodes,
         segments=segments,
+        expanded_nodes=5,
     )
 
 
 @pytest.mark.asyncio
-async def test_compute_route_success(app: FastAPI, async_client: AsyncClient, route_plan: RoutePlan) -> None:
+async def test_compute_route_success(
+    app: FastAPI, async_client: AsyncClient, route_plan: RoutePlan
+) -> None:
     service = FakeRoutingService(plan=route_plan)
     app.dependency_overrides[deps.get_routing_service] = lambda: service
 
@@ -79,6 +187,7 @@ async def test_compute_route_success(app: FastAPI, async_client: AsyncClient, ro
         assert sorted(payload["allowed_transport_modes"]) == ["electric_cart", "walk"]
         assert payload["nodes"][0]["name"] == "入口"
         assert payload["segments"][0]["transport_mode"] == "walk"
+        assert payload["expanded_nodes"] == 5
 
         recorded = service.received_kwargs
         assert recorded is not None
@@ -87,6 +196,20 @@ async def test_compute_route_success(app: FastAPI, async_client: AsyncClient, ro
         assert recorded["end_node_id"] == 2
         assert recorded["strategy"] == WeightStrategy.DISTANCE.value
         assert recorded["transport_modes"] == ["walk"]
+        assert recorded["departure_time"] is None
+        assert payload["departure_time"] is None
+
+        timed = await async_client.get(
+            "/api/v1/routing/routes",
+            params={
+                "region_id": 7,
+                "start_node_id": 1,
+                "end_node_id": 2,
+                "departure_time": "2026-05-01T10:30:00",
+            },
+        )
+        assert timed.status_code == 200
+        assert service.received_kwargs["departure_time"].hour == 10
     finally:
         app.dependency_overrides.pop(deps.get_routing_service, None)
 
@@ -98,6 +221,7 @@ async def test_compute_route_success(app: FastAPI, async_client: AsyncClient, ro
         (RegionNotFoundError("missing"), 404),
         (NodeValidationError("bad nodes"), 400),
         (RouteNotFoundError("no path"), 404),
+        (ExecutorSaturatedError("busy"), 503),
     ],
 )
 async def test_compute_route_errors(
@@ -116,5 +240,314 @@ async def test_compute_route_errors(
         )
 
         assert response.status_code == expected_status
+        if expected_status == 503:
+            assert response.headers["retry-after"] == "1"
+    finally:
+        app.dependency_overrides.pop(deps.get_routing_service, None)
+
+
+@pytest.mark.asyncio
+async def test_compute_distance_matrix_success(app: FastAPI, async_client: AsyncClient) -> None:
+    service = FakeRoutingService()
+    app.dependency_overrides[deps.get_routing_service] = lambda: service
+
+    try:
+        response = await async_client.post(
+            "/api/v1/routing/matrix",
+            json={
+                "region_id": 7,
+                "sources": [1, 3],
+                "targets": [2],
+                "strategy": "distance",
+                "include_paths": True,
+            },
+        )
+
+        assert response.status_code == 200
+        payload = response.json()
+        assert payload["strategy"] == "distance"
+        assert payload["costs"] == [[120.0], [None]]
+        assert payload["times"] == [[100.0], [None]]
+        assert payload["paths"] == [[[1, 2]], [None]]
+        assert service.received_kwargs["target_node_ids"] == [2]
+    finally:
+        app.dependency_overrides.pop(deps.get_routing_service, None)
+
+
+@pytest.mark.asyncio
+async def test_compute_distance_matrix_validation(app: FastAPI, async_client: AsyncClient) -> None:
+    service = FakeRoutingService(error=NodeValidationError("bad nodes"))
+    app.dependency_overrides[deps.get_routing_service] = lambda: service
+
+    try:
+        empty = await async_client.post(
+            "/api/v1/routing/matrix", json={"region_id": 7, "sources": []}
+        )
+        assert empty.status_code == 422
+
+        invalid = await async_client.post(
+            "/api/v1/routing/matrix", json={"region_id": 7, "sources": [1, 2]}
+        )
+        assert invalid.status_code == 400
+    finally:
+        app.dependency_overrides.pop(deps.get_routing_service, None)
+
+
+@pytest.mark.asyncio
+async def test_compute_tour_plan_success(
+    app: FastAPI, async_client: AsyncClient, route_plan: RoutePlan
+) -> None:
+    service = FakeRoutingService(plan=route_plan)
+    app.dependency_overrides[deps.get_routing_service] = lambda: service
+
+    try:
+        response = await async_client.post(
+            "/api/v1/routing/tours",
+            json={
+                "region_id": 7,
+                "start_node_id": 1,
+                "target_node_ids": [2],
+                "time_budget_ms": 200,
+            },
+        )
+
+        assert response.status_code == 200
+        payload = response.json()
+        assert payload["route"] == [1, 2, 1]
+        assert payload["solver"] == "held_karp"
+        assert payload["total_distance"] == 240.0
+        assert len(payload["legs"]) == 2
+        assert payload["legs"][0]["segments"][0]["transport_mode"] == "walk"
+        assert payload["legs"][0]["expanded_nodes"] == 5
+        assert service.received_kwargs["time_budget"] == pytest.approx(0.2)
+
+        too_many = await async_client.post(
+            "/api/v1/routing/tours",
+            json={"region_id": 7, "start_node_id": 1, "target_node_ids": list(range(2, 40))},
+        )
+        assert too_many.status_code == 422
+    finally:
+        app.dependency_overrides.pop(deps.get_routing_service, None)
+
+
+@pytest.mark.asyncio
+async def test_compute_tour_plan_unreachable(app: FastAPI, async_client: AsyncClient) -> None:
+    service = FakeRoutingService(error=RouteNotFoundError("no tour"))
+    app.dependency_overrides[deps.get_routing_service] = lambda: service
+
+    try:
+        response = await async_client.post(
+            "/api/v1/routing/tours",
+            json={"region_id": 7, "start_node_id": 1, "target_node_ids": [2, 3]},
+        )
+        assert response.status_code == 404
+    finally:
+        app.dependency_overrides.pop(deps.get_routing_service, None)
+
+
+@pytest.mark.asyncio
+async def test_compute_routes_batch_reports_each_item(
+    app: FastAPI, async_client: AsyncClient, route_plan: RoutePlan
+) -> None:
+    service = FakeRoutingService(plan=route_plan)
+    app.dependency_overrides[deps.get_routing_service] = lambda: service
+
+    try:
+        response = await async_client.post(
+            "/api/v1/routing/routes:batch",
+            json={
+                "region_id": 7,
+                "queries": [
+                    {"start_node_id": 1, "end_node_id": 2, "strategy": "distance"},
+                    {"start_node_id": 1, "end_node_id": 404},
+                    {"start_node_id": 1, "end_node_id": 400, "transport_modes": ["walk"]},
+                ],
+            },
+        )
+
+        assert response.status_code == 200
+        results = response.json()["results"]
+        assert [item["status"] for item in results] == [200, 404, 400]
+        assert results[0]["route"]["total_distance"] == route_plan.total_distance
+        assert results[1]["route"] is None and results[1]["error"] == "no path"
+        queries = service.received_kwargs["queries"]
+        assert queries[0].strategy is WeightStrategy.DISTANCE
+        assert queries[2].transport_modes == ["walk"]
+
+        empty = await async_client.post(
+            "/api/v1/routing/routes:batch", json={"region_id": 7, "queries": []}
+        )
+        assert empty.status_code == 422
+    finally:
+        app.dependency_overrides.pop(deps.get_routing_service, None)
+
+
+@pytest.mark.asyncio
+async def test_compute_isochrone_returns_bands_in_minutes(
+    app: FastAPI, async_client: AsyncClient
+) -> None:
+    service = FakeRoutingService()
+    app.dependency_overrides[deps.get_routing_service] = lambda: service
+
+    try:
+        response = await async_client.get(
+            "/api/v1/routing/isochrones",
+            params=[
+                ("region_id", 7),
+                ("origin_node_id", 1),
+                ("budgets", 2),
+                ("budgets", 5),
+                ("include_polygons", True),
+            ],
+        )
+
+        assert response.status_code == 200
+        payload = response.json()
+        # 分钟预算按秒传给服务层，返回时再换算回分钟
+        assert service.received_kwargs["budgets"] == [120.0, 300.0]
+        assert payload["unit"] == "minutes"
+        assert [(node["node_id"], node["cost"], node["band"]) for node in payload["nodes"]] == [
+            (1, 0.0, 0),
+            (2, 2.0, 0),
+            (3, 4.0, 1),
+        ]
+        first, second = payload["bands"]
+        assert (first["budget"], first["node_count"], first["polygon"]) == (2.0, 2, None)
+        assert second["node_count"] == 3
+        ring = second["polygon"]["coordinates"][0]
+        assert second["polygon"]["type"] == "Polygon"
+        assert ring[0] == ring[-1] and len(ring) == 4
+        assert [120.0, 30.0] in ring
+    finally:
+        app.dependency_overrides.pop(deps.get_routing_service, None)
+
+
+@pytest.mark.asyncio
+async def test_compute_isochrone_validation(app: FastAPI, async_client: AsyncClient) -> None:
+    service = FakeRoutingService(error=RouteNotFoundError("not connected"))
+    app.dependency_overrides[deps.get_routing_service] = lambda: service
+
+    try:
+        missing = await async_client.get(
+            "/api/v1/routing/isochrones", params={"region_id": 7, "origin_node_id": 1}
+        )
+        assert missing.status_code == 422
+
+        negative = await async_client.get(
+            "/api/v1/routing/isochrones",
+            params={"region_id": 7, "origin_node_id": 1, "budgets": -5},
+        )
+        assert negative.status_code == 400
+        assert service.received_kwargs is None
+
+        unreachable = await async_client.get(
+            "/api/v1/routing/isochrones", params={"region_id": 7, "origin_node_id": 1, "budgets": 5}
+        )
+        assert unreachable.status_code == 404
+    finally:
+        app.dependency_overrides.pop(deps.get_routing_service, None)
+
+
+@pytest.mark.asyncio
+async def test_compute_alternative_routes(
+    app: FastAPI, async_client: AsyncClient, route_plan: RoutePlan
+) -> None:
+    service = FakeRoutingService(plan=route_plan)
+    app.dependency_overrides[deps.get_routing_service] = lambda: service
+
+    try:
+        response = await async_client.get(
+            "/api/v1/routing/routes/alternatives",
+            params={
+                "region_id": 7,
+                "start_node_id": 1,
+                "end_node_id": 2,
+                "k": 2,
+                "max_overlap": 0.5,
+            },
+        )
+        assert response.status_code == 200
+        payload = response.json()
+        assert payload["region_id"] == 7
+        assert len(payload["routes"]) == 2
+        assert payload["routes"][0]["nodes"][0]["name"] == "入口"
+        assert service.received_kwargs is not None
+        assert service.received_kwargs["k"] == 2
+        assert service.received_kwargs["max_overlap"] == pytest.approx(0.5)
+
+        too_many = await async_client.get(
+            "/api/v1/routing/routes/alternatives",
+            params={"region_id": 7, "start_node_id": 1, "end_node_id": 2, "k": 6},
+        )
+        assert too_many.status_code == 422
+
+        service._error = RouteNotFoundError("no path")
+        unreachable = await async_client.get(
+            "/api/v1/routing/routes/alternatives",
+            params={"region_id": 7, "start_node_id": 1, "end_node_id": 2},
+        )
+        assert unreachable.status_code == 404
     finally:
         app.dependency_overrides.pop(deps.get_routing_service, None)
+
+
+@pytest.mark.asyncio
+async def test_update_congestion(app: FastAPI, async_client: AsyncClient) -> None:
+    ingestor = LiveCongestionIngestor(RegionGraphStore())
+    app.dependency_overrides[deps.get_congestion_ingestor] = lambda: ingestor
+    app.dependency_overrides[deps.get_current_user] = lambda: _user(is_superuser=True)
+
+    try:
+        response = await async_client.post(
+            "/api/v1/routing/congestion",
+            json={
+                "region_id": 7,
+                "updates": [{"edge_id": 1, "congestion": 0.4}, {"edge_id": 2, "congestion": 0.9}],
+            },
+        )
+        assert response.status_code == 200
+        payload = response.json()
+        # 区域图尚未载入：更新被保留，载入时生效
+        assert payload["loaded"] is False
+        assert payload["version"] == 0
+        assert payload["applied"] == 0
+        assert ingestor.stats().updates == 2
+
+        invalid = await async_client.post(
+            "/api/v1/routing/congestion",
+            json={"region_id": 7, "updates": [{"edge_id": 1, "congestion": 0}]},
+        )
+        assert invalid.status_code == 422
+    finally:
+        app.dependency_overrides.pop(deps.get_congestion_ingestor, None)
+        app.dependency_overrides.pop(deps.get_current_user, None)
+
+
+@pytest.mark.asyncio
+async def test_update_congestion_requires_superuser(
+    app: FastAPI, async_client: AsyncClient
+) -> None:
+    ingestor = LiveCongestionIngestor(RegionGraphStore())
+    app.dependency_overrides[deps.get_congestion_ingestor] = lambda: ingestor
+    body = {"region_id": 7, "updates": [{"edge_id": 1, "congestion": 0.4}]}
+
+    try:
+        anonymous = await async_client.post("/api/v1/routing/congestion", json=body)
+        assert anonymous.status_code == 401
+
+        app.dependency_overrides[deps.get_current_user] = lambda: _user(is_superuser=False)
+        forbidden = await async_client.post("/api/v1/routing/congestion", json=body)
+        assert forbidden.status_code == 403
+        assert ingestor.stats().updates == 0
+    finally:
+        app.dependency_overrides.pop(deps.get_congestion_ingestor, None)
+        app.dependency_overrides.pop(deps.get_current_user, None)
+
+
+def _user(*, is_superuser: bool) -> User:
+    return User(
+        email="feed@example.com",
+        username="feed",
+        hashed_password="x" * 60,
+        is_superuser=is_superuser,
+    )
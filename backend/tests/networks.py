@@ -0,0 +1,92 @@
+"""Synthetic road networks shared by the routing tests.
+
+Nodes are integer ids (``grid_node``) like the database ids the services use,
+so the graphs compile to the packed ``array("q")`` node id fast path.
+"""
+
+from __future__ import annotations
+
+import random
+from collections.abc import Sequence
+
+from app.algorithms import Edge
+from app.algorithms.congestion import PROFILE_BUCKETS
+
+# 约五分之一的路段只允许自行车通行
+MIXED_MODES: tuple[tuple[str, ...], ...] = (("walk", "bike"),) * 4 + (("bike",),)
+
+
+def grid_node(row: int, col: int, size: int) -> int:
+    """Id of the node at ``(row, col)`` of a ``size`` x ``size`` grid."""
+
+    return row * size + col
+
+
+def grid_coordinates(
+    size: int,
+    *,
+    origin: tuple[float, float] = (30.0, 120.0),
+    spacing: tuple[float, float] = (0.001, 0.001),
+) -> dict[int, tuple[float, float]]:
+    """Latitude/longitude of every grid node, ``spacing`` degrees apart."""
+
+    return {
+        grid_node(row, col, size): (origin[0] + row * spacing[0], origin[1] + col * spacing[1])
+        for row in range(size)
+        for col in range(size)
+    }
+
+
+def grid_network(
+    size: int,
+    seed: int = 0,
+    *,
+    distance: tuple[float, float] = (10.0, 80.0),
+    speed: tuple[float, float] = (1.0, 4.0),
+    modes: Sequence[tuple[str, ...]] = (("walk",),),
+    congestion: tuple[float, float] = (1.0, 1.0),
+    two_way: float = 1.0,
+    directed: bool = False,
+    profiled: float = 0.0,
+) -> list[Edge]:
+    """Random grid street network.
+
+    Every street gets a length drawn from ``distance``, a speed from ``speed``
+    and transport modes chosen from ``modes``; the forward edge has congestion
+    ``congestion[0]`` and, with probability ``two_way``, a reverse edge with
+    ``congestion[1]`` is added. Both directions share length and speed unless
+    ``directed`` draws them per edge. A ``profiled`` share of the edges carries
+    a random time-of-day congestion profile.
+    """
+
+    rng = random.Random(seed)
+    edges: list[Edge] = []
+    for row in range(size):
+        for col in range(size):
+            for d_row, d_col in ((0, 1), (1, 0)):
+                if row + d_row >= size or col + d_col >= size:
+                    continue
+                a, b = grid_node(row, col, size), grid_node(row + d_row, col + d_col, size)
+                allowed = rng.choice(modes)
+                directions = [(a, b, congestion[0])]
+                if two_way >= 1.0 or rng.random() < two_way:
+                    directions.append((b, a, congestion[1]))
+                length, velocity = rng.uniform(*distance), rng.uniform(*speed)
+                for index, (source, target, factor) in enumerate(directions):
+                    if directed and index:
+                        length, velocity = rng.uniform(*distance), rng.uniform(*speed)
+                    profile = None
+                    if profiled and rng.random() < profiled:
+                        profile = tuple(rng.uniform(0.1, 1.0) for _ in range(PROFILE_BUCKETS))
+                    edges.append(
+                        Edge(
+                            source,
+                            target,
+                            distance=length,
+                            ideal_speed=velocity,
+                            congestion=factor,
+                            transport_modes=allowed,
+                            congestion_profile=profile,
+                        )
+                    )
+    return edges
@@ -0,0 +1,67 @@
+"""Tests for the bounded compute executor."""
+
+from __future__ import annotations
+
+import asyncio
+import operator
+import threading
+
+import pytest
+
+from app.services import ComputeExecutor, ExecutorKind, ExecutorSaturatedError
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("kind", [ExecutorKind.INLINE, ExecutorKind.THREAD, ExecutorKind.PROCESS])
+async def test_run_returns_result_for_each_kind(kind: ExecutorKind) -> None:
+    executor = ComputeExecutor(kind, max_workers=1, max_queue=0)
+    try:
+        assert await executor.run(operator.add, 2, 3) == 5
+        with pytest.raises(ZeroDivisionError):
+            await executor.run(operator.truediv, 1, 0)
+    finally:
+        executor.shutdown()
+
+    stats = executor.stats()
+    assert (stats.submitted, stats.completed, stats.failed, stats.in_flight) == (2, 1, 1, 0)
+
+
+@pytest.mark.asyncio
+async def test_thread_executor_keeps_event_loop_responsive() -> None:
+    executor = ComputeExecutor(ExecutorKind.THREAD, max_workers=1)
+    release = threading.Event()
+    try:
+        blocked = asyncio.create_task(executor.run(release.wait, 5.0))
+        await asyncio.sleep(0.01)
+        # 工作线程阻塞期间，事件循环仍可处理其他协程
+        assert await asyncio.wait_for(asyncio.sleep(0, result="ok"), timeout=1.0) == "ok"
+        release.set()
+        assert await blocked is True
+    finally:
+        release.set()
+        executor.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_saturated_executor_rejects_new_work() -> None:
+    executor = ComputeExecutor(ExecutorKind.THREAD, max_workers=1, max_queue=1)
+    release = threading.Event()
+    try:
+        running = [asyncio.create_task(executor.run(release.wait, 5.0)) for _ in range(2)]
+        await asyncio.sleep(0.01)
+        assert executor.saturated
+
+        with pytest.raises(ExecutorSaturatedError):
+            await executor.run(operator.add, 1, 1)
+
+        release.set()
+        assert await asyncio.gather(*running) == [True, True]
+        assert await executor.run(operator.add, 1, 1) == 2
+    finally:
+        release.set()
+        executor.shutdown()
+
+    stats = executor.stats()
+    assert stats.rejected == 1
+    assert stats.peak_in_flight == 2
+    assert stats.completed == 3
@@ -0,0 +1,84 @@
+"""Tests for the nearest-facility partition store."""
+
+from __future__ import annotations
+
+from array import array
+from pathlib import Path
+
+from app.algorithms import CompactGraph, Edge, GraphVoronoi, WeightStrategy, build_graph_voronoi
+from app.models.enums import FacilityCategory
+from app.services import FacilityIndexStore
+from app.services.graph_store import CompiledRegionGraph
+
+COMPACT = CompactGraph.from_edges(
+    [Edge(node, node + 1, distance=10.0, ideal_speed=1.0, congestion=1.0) for node in range(1, 10)]
+)
+
+
+def _graph(version: int = 0, compact: CompactGraph = COMPACT) -> CompiledRegionGraph:
+    return CompiledRegionGraph(
+        region_id=1, version=version, nodes={}, edges=(), algorithm_edges=(), compact=compact
+    )
+
+
+def _build(
+    facility_node_ids: list[int], strategy: WeightStrategy = WeightStrategy.TIME
+) -> GraphVoronoi:
+    sources = list(facility_node_ids)
+    return build_graph_voronoi(COMPACT, sources, strategy=strategy, allowed_modes=("walk",))
+
+
+def test_partitions_are_reused_until_facilities_change() -> None:
+    store = FacilityIndexStore()
+    restroom = FacilityCategory.RESTROOM
+    assert store.get(_graph(), restroom, WeightStrategy.TIME, ("walk",), [4, 8]) is None
+
+    store.put(_graph(), restroom, ("walk",), _build([4, 8]))
+
+    assert store.get(_graph(), restroom, WeightStrategy.TIME, ("walk",), [8, 4]) is not None
+    assert store.get(_graph(), restroom, WeightStrategy.DISTANCE, ("walk",), [4, 8]) is None
+    assert (
+        store.get(_graph(), FacilityCategory.RESTAURANT, WeightStrategy.TIME, ("walk",), [4, 8])
+        is None
+    )
+    # 新增设施后旧分区失效并被丢弃
+    assert store.get(_graph(), restroom, WeightStrategy.TIME, ("walk",), [4, 8, 9]) is None
+    stats = store.stats()
+    assert (stats.hits, stats.stale, stats.entries) == (1, 1, 0)
+
+
+def test_version_bump_keeps_only_partitions_matching_the_new_graph() -> None:
+    store = FacilityIndexStore()
+    store.put(_graph(), FacilityCategory.RESTROOM, ("walk",), _build([4]))
+    store.put(_graph(), FacilityCategory.SHOP, ("walk",), _build([6], WeightStrategy.DISTANCE))
+
+    # 只有边耗时变化（实时拥挤度）：按距离的分区移到新版本，按时间的分区被丢弃
+    slower = _graph(1, COMPACT.with_times(array("d", [20.0] * COMPACT.edge_count)))
+    shop = store.get(slower, FacilityCategory.SHOP, WeightStrategy.DISTANCE, ("walk",), [6])
+    restroom = store.get(slower, FacilityCategory.RESTROOM, WeightStrategy.TIME, ("walk",), [4])
+
+    assert shop is not None and restroom is None
+    assert (store.stats().hits, store.stats().entries) == (1, 1)
+    # 路径耗时按新图的边耗时计算
+    origin = COMPACT.index[2]
+    assert shop.times[origin] == 40.0
+    assert shop.path_time(slower.compact, origin) == 80.0
+
+    store.invalidate(1)
+    assert store.stats().entries == 0
+
+
+def test_partitions_are_persisted_and_reloaded(tmp_path: Path) -> None:
+    FacilityIndexStore(tmp_path).put(_graph(), FacilityCategory.RESTROOM, ("walk",), _build([4, 8]))
+
+    store = FacilityIndexStore(tmp_path)
+    loaded = store.get(_graph(3), FacilityCategory.RESTROOM, WeightStrategy.TIME, ("walk",), [4, 8])
+
+    assert loaded is not None
+    assert loaded.nearest(COMPACT.index[2]) == COMPACT.index[4]
+    assert store.stats().loads == 1
+    # 磁盘上的分区与当前设施不一致时不会被使用
+    fresh = FacilityIndexStore(tmp_path)
+    assert (
+        fresh.get(_graph(), FacilityCategory.RESTROOM, WeightStrategy.TIME, ("walk",), [4]) is None
+    )
@@ -4,11 +4,16 @@ from __future__ import annotations
 
 import pytest
 
-from app.algorithms import WeightStrategy
+from app.algorithms import ShortestPathTree, WeightStrategy
 from app.models.enums import FacilityCategory, RegionType, TransportMode
 from app.models.graph import GraphEdge, GraphNode
 from app.models.locations import Facility, Region
-from app.services import FacilityService, NodeValidationError, RegionNotFoundError
+from app.services import (
+    FacilityIndexStore,
+    FacilityService,
+    NodeValidationError,
+    RegionNotFoundError,
+)
 
 
 class FakeGraphRepository:
@@ -22,6 +27,9 @@ class FakeGraphRepository:
     async def get_nodes(self, node_ids: list[int]) -> list[GraphNode]:
         return [self._nodes[node_id] for node_id in node_ids if node_id in self._nodes]
 
+    async def list_nodes_by_region(self, region_id: int) -> list[GraphNode]:
+        return [node for node in self._nodes.values() if node.region_id == region_id]
+
     async def list_edges_by_region(self, region_id: int) -> list[GraphEdge]:
         return [edge for edge in self._edges if edge.region_id == region_id]
 
@@ -47,12 +55,13 @@ class FakeFacilityRepository:
         facilities = self._mapping.get(region_id, [])
         if categories:
             allowed = set(categories)
-            return [(facility, node) for facility, node in facilities if facility.category in allowed]
+            return [
+                (facility, node) for facility, node in facilities if facility.category in allowed
+            ]
         return list(facilities)
 
 
-@pytest.fixture()
-def facility_service() -> FacilityService:
+def _build_facility_service(facility_index: FacilityIndexStore | None = None) -> FacilityService:
     region = Region(
         id=1,
         name="测试景区",
@@ -63,8 +72,12 @@ def facility_service() -> FacilityService:
 
     nodes = {
         1: GraphNode(id=1, region_id=1, name="入口", latitude=0.0, longitude=0.0),
-        2: GraphNode(id=2, region_id=1, name="餐厅节点", latitude=0.0, longitude=1.0, facility_id=101),
-        3: GraphNode(id=3, region_id=1, name="洗手间节点", latitude=0.5, longitude=1.2, facility_id=102),
+        2: GraphNode(
+            id=2, region_id=1, name="餐厅节点", latitude=0.0, longitude=1.0, facility_id=101
+        ),
+        3: GraphNode(
+            id=3, region_id=1, name="洗手间节点", latitude=0.5, longitude=1.2, facility_id=102
+        ),
     }
     edges = [
         GraphEdge(
@@ -120,9 +133,15 @@ def facility_service() -> FacilityService:
         FakeFacilityRepository(facilities),
         FakeGraphRepository(nodes, edges),
         FakeRegionRepository({1: region}),
+        facility_index=facility_index,
     )
 
 
+@pytest.fixture()
+def facility_service() -> FacilityService:
+    return _build_facility_service()
+
+
 @pytest.mark.asyncio
 async def test_find_nearby_facilities_orders_by_distance(facility_service: FacilityService) -> None:
     results = await facility_service.find_nearby_facilities(
@@ -138,6 +157,27 @@ async def test_find_nearby_facilities_orders_by_distance(facility_service: Facil
     assert results[0].strategy is WeightStrategy.DISTANCE
 
 
+@pytest.mark.asyncio
+async def test_find_nearby_facilities_builds_paths_only_for_returned_items(
+    facility_service: FacilityService,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    traced: list[int] = []
+    node_path = ShortestPathTree.node_path
+
+    def tracking_node_path(tree: ShortestPathTree, position: int) -> list[int]:
+        traced.append(position)
+        return node_path(tree, position)
+
+    monkeypatch.setattr(ShortestPathTree, "node_path", tracking_node_path)
+
+    results = await facility_service.find_nearby_facilities(region_id=1, origin_node_id=1, limit=1)
+
+    assert [item.facility_id for item in results] == [101]
+    assert results[0].node_sequence == (1, 2)
+    assert len(traced) == 1
+
+
 @pytest.mark.asyncio
 async def test_find_nearby_facilities_filters_by_radius(facility_service: FacilityService) -> None:
     results = await facility_service.find_nearby_facilities(
@@ -151,7 +191,9 @@ async def test_find_nearby_facilities_filters_by_radius(facility_service: Facili
 
 
 @pytest.mark.asyncio
-async def test_find_nearby_facilities_filters_by_category(facility_service: FacilityService) -> None:
+async def test_find_nearby_facilities_filters_by_category(
+    facility_service: FacilityService,
+) -> None:
     results = await facility_service.find_nearby_facilities(
         region_id=1,
         origin_node_id=1,
@@ -162,12 +204,61 @@ async def test_find_nearby_facilities_filters_by_category(facility_service: Faci
 
 
 @pytest.mark.asyncio
-async def test_find_nearby_facilities_raises_for_unknown_region(facility_service: FacilityService) -> None:
+async def test_find_nearby_facilities_raises_for_unknown_region(
+    facility_service: FacilityService,
+) -> None:
     with pytest.raises(RegionNotFoundError):
         await facility_service.find_nearby_facilities(region_id=99, origin_node_id=1)
 
 
 @pytest.mark.asyncio
-async def test_find_nearby_facilities_requires_origin_in_region(facility_service: FacilityService) -> None:
+async def test_find_nearby_facilities_requires_origin_in_region(
+    facility_service: FacilityService,
+) -> None:
     with pytest.raises(NodeValidationError):
         await facility_service.find_nearby_facilities(region_id=1, origin_node_id=999)
+
+
+@pytest.mark.asyncio
+async def test_nearest_facility_is_answered_from_partitions() -> None:
+    store = FacilityIndexStore()
+    indexed = _build_facility_service(store)
+    searched = _build_facility_service()
+
+    for strategy in (WeightStrategy.DISTANCE, WeightStrategy.TIME):
+        for categories in (None, [FacilityCategory.RESTROOM]):
+            expected = await searched.find_nearby_facilities(
+                region_id=1, origin_node_id=1, limit=1, strategy=strategy, categories=categories
+            )
+            result = await indexed.find_nearby_facilities(
+                region_id=1, origin_node_id=1, limit=1, strategy=strategy, categories=categories
+            )
+            assert result == expected
+
+    # 每个 (类别, 策略) 只构建一次分区，之后的查询直接命中
+    assert store.stats().stores == 4
+    await indexed.find_nearby_facilities(region_id=1, origin_node_id=2, limit=1)
+    assert store.stats().stores == 4
+    assert store.stats().hits >= 2
+
+    # 最近设施超出半径时没有结果
+    distant = await indexed.find_nearby_facilities(
+        region_id=1, origin_node_id=1, limit=1, radius_meters=50.0
+    )
+    assert distant == []
+    at_facility = await indexed.find_nearby_facilities(region_id=1, origin_node_id=3, limit=1)
+    assert [item.facility_id for item in at_facility] == [102]
+    assert at_facility[0].node_sequence == (3,)
+
+
+@pytest.mark.asyncio
+async def test_limited_search_matches_unlimited_ranking(facility_service: FacilityService) -> None:
+    for strategy in (WeightStrategy.DISTANCE, WeightStrategy.TIME):
+        everything = await facility_service.find_nearby_facilities(
+            region_id=1, origin_node_id=1, radius_meters=None, limit=0, strategy=strategy
+        )
+        for limit in (1, 2, 3):
+            limited = await facility_service.find_nearby_facilities(
+                region_id=1, origin_node_id=1, radius_meters=None, limit=limit, strategy=strategy
+            )
+            assert limited == everything[:limit]
@@ -0,0 +1,259 @@
+"""Tests for memory-mapped region graph snapshots."""
+
+from __future__ import annotations
+
+import pickle
+from pathlib import Path
+
+import pytest
+from sqlalchemy import delete
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlmodel import SQLModel
+
+from app.algorithms import compact_shortest_path, time_dependent_shortest_path
+from app.models.enums import RegionType, TransportMode
+from app.models.graph import GraphEdge, GraphNode
+from app.models.locations import Region
+from app.repositories import GraphRepository
+from app.services import RegionGraphStore
+from app.services.graph_snapshot import (
+    SNAPSHOT_FORMAT_VERSION,
+    load_graph_snapshot,
+    snapshot_path,
+    write_graph_snapshot,
+)
+from app.services.graph_store import compile_region_graph
+
+
+class FakeGraphSource:
+    def __init__(
+        self, nodes: list[GraphNode], edges: list[GraphEdge], signature: str = "v1"
+    ) -> None:
+        self._nodes = nodes
+        self._edges = edges
+        self.signature = signature
+        self.loads = 0
+
+    async def graph_signature(self, region_id: int) -> str:
+        return self.signature
+
+    async def list_nodes_by_region(self, region_id: int) -> list[GraphNode]:
+        self.loads += 1
+        return [node for node in self._nodes if node.region_id == region_id]
+
+    async def list_edges_by_region(self, region_id: int) -> list[GraphEdge]:
+        return [edge for edge in self._edges if edge.region_id == region_id]
+
+
+def _edge(edge_id: int, start: int, end: int, distance: float, **extra: object) -> GraphEdge:
+    return GraphEdge(
+        id=edge_id,
+        region_id=1,
+        start_node_id=start,
+        end_node_id=end,
+        distance=distance,
+        ideal_speed=1.0,
+        congestion=1.0,
+        transport_modes=[TransportMode.WALK, TransportMode.BIKE],
+        **extra,
+    )
+
+
+NODES = [
+    GraphNode(id=30, region_id=1, name="校门", latitude=0.0, longitude=0.0, building_id=7),
+    GraphNode(id=10, region_id=1, name="图书馆", latitude=0.0, longitude=0.001, facility_id=4),
+    GraphNode(id=20, region_id=1, name=None, latitude=0.001, longitude=0.001, is_virtual=True),
+    GraphNode(id=40, region_id=1, name="孤立点", latitude=0.002, longitude=0.0),
+]
+EDGES = [
+    _edge(5, 30, 10, 100.0),
+    _edge(3, 10, 20, 100.0, congestion_profile=[0.5] * 96),
+    _edge(9, 30, 20, 500.0),
+    _edge(1, 20, 30, 150.0),
+]
+
+
+@pytest.fixture()
+def snapshot(tmp_path: Path) -> Path:
+    graph = compile_region_graph(1, 0, NODES, EDGES)
+    path = snapshot_path(tmp_path, 1)
+    assert write_graph_snapshot(graph, path, signature="v1") == path.stat().st_size
+    return path
+
+
+def test_snapshot_round_trip_matches_compiled_graph(snapshot: Path) -> None:
+    graph = compile_region_graph(1, 0, NODES, EDGES)
+    loaded = load_graph_snapshot(snapshot)
+
+    assert loaded.region_id == 1
+    assert loaded.signature == "v1"
+    assert loaded.fingerprint == graph.compact.fingerprint
+    for name, view in graph.compact.as_numpy().items():
+        assert loaded.compact.as_numpy()[name].tolist() == pytest.approx(view.tolist(), nan_ok=True)
+    assert list(loaded.compact.node_ids) == list(graph.compact.node_ids)
+    assert dict(loaded.compact.index) == dict(graph.compact.index)
+    assert dict(loaded.edge_slots) == dict(graph.edge_slots)
+    assert loaded.free_flow_times.tolist() == graph.free_flow_times.tolist()
+    assert list(loaded.compact.reverse.edges) == list(graph.compact.reverse.edges)
+    # 指纹由快照给出，与按内容重新计算的结果一致
+    del loaded.compact.__dict__["fingerprint"]
+    assert loaded.compact.fingerprint == graph.compact.fingerprint
+
+    assert sorted(loaded.nodes) == [10, 20, 30, 40]
+    for node in NODES:
+        restored = loaded.nodes[node.id]
+        for field in (
+            "id",
+            "region_id",
+            "name",
+            "latitude",
+            "longitude",
+            "building_id",
+            "facility_id",
+            "is_virtual",
+        ):
+            assert getattr(restored, field) == getattr(node, field)
+    assert loaded.nodes.get(99) is None
+    assert loaded.nodes.get("30") is None
+
+    expected = compact_shortest_path(graph.compact, 30, 20)
+    result = compact_shortest_path(loaded.compact, 30, 20)
+    assert result.nodes == expected.nodes == [30, 10, 20]
+    assert result.total_time == pytest.approx(expected.total_time)
+    timed = time_dependent_shortest_path(loaded.compact, 30, 20, departure=8 * 3600.0)
+    assert timed.total_time == pytest.approx(
+        time_dependent_shortest_path(graph.compact, 30, 20, departure=8 * 3600.0).total_time
+    )
+
+
+def test_loaded_graph_survives_pickling(snapshot: Path) -> None:
+    loaded = load_graph_snapshot(snapshot)
+    loaded.compact.profiles.travel_time(0, 100.0, 0.0, 100.0)
+
+    copy = pickle.loads(pickle.dumps(loaded.compact))
+
+    assert copy.fingerprint == loaded.fingerprint
+    assert compact_shortest_path(copy, 30, 20).nodes == [30, 10, 20]
+    assert list(copy.reverse.sources) == list(loaded.compact.reverse.sources)
+
+
+def test_rejects_foreign_or_outdated_files(snapshot: Path, tmp_path: Path) -> None:
+    data = bytearray(snapshot.read_bytes())
+    other = tmp_path / "other.graph"
+
+    other.write_bytes(b"NOTGRAPH" + bytes(data[8:]))
+    with pytest.raises(ValueError):
+        load_graph_snapshot(other)
+
+    data[8:12] = (SNAPSHOT_FORMAT_VERSION + 1).to_bytes(4, "little")
+    other.write_bytes(bytes(data))
+    with pytest.raises(ValueError):
+        load_graph_snapshot(other)
+
+
+@pytest.mark.asyncio
+async def test_store_prefers_snapshot_and_drops_it_on_invalidate(snapshot: Path) -> None:
+    source = FakeGraphSource(NODES, EDGES)
+    store = RegionGraphStore(snapshot_dir=snapshot.parent)
+
+    graph = await store.get(1, source)
+
+    assert source.loads == 0
+    assert store.stats().snapshot_loads == 1
+    assert not graph.is_empty
+    assert graph.nodes[30].name == "校门"
+
+    store.invalidate(1)
+    assert not snapshot.exists()
+    rebuilt = await store.get(1, source)
+    assert source.loads == 1
+    assert rebuilt.compact.fingerprint == graph.compact.fingerprint
+
+
+@pytest.mark.asyncio
+async def test_store_ignores_snapshot_with_another_signature(snapshot: Path) -> None:
+    source = FakeGraphSource(NODES, EDGES, signature="v2")
+    store = RegionGraphStore(snapshot_dir=snapshot.parent)
+
+    await store.get(1, source)
+
+    assert source.loads == 1
+    assert store.stats().snapshot_loads == 0
+
+
+@pytest.mark.asyncio
+async def test_live_congestion_applies_to_snapshot_graphs(snapshot: Path) -> None:
+    source = FakeGraphSource(NODES, EDGES)
+    store = RegionGraphStore(snapshot_dir=snapshot.parent)
+    store.apply_congestion(1, {5: 0.5})
+
+    graph = await store.get(1, source)
+    patch = store.apply_congestion(1, {9: 0.25, 404: 0.5})
+
+    assert source.loads == 0
+    compiled = compile_region_graph(1, 0, NODES, EDGES, congestion={5: 0.5})
+    slot = compiled.edge_slots[5]
+    assert graph.compact.times[slot] == pytest.approx(200.0)
+    assert patch is not None and patch.ignored == (404,)
+    assert patch.current.compact.times[graph.edge_slots[9]] == pytest.approx(2000.0)
+    assert patch.node_pairs() == {(30, 20)}
+
+
+@pytest.mark.asyncio
+async def test_reimported_edges_are_served_instead_of_the_old_snapshot(tmp_path: Path) -> None:
+    engine = create_async_engine("sqlite+aiosqlite://")
+    async with engine.begin() as connection:
+        await connection.run_sync(SQLModel.metadata.create_all)
+    maker = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+    async def import_edges(session: AsyncSession, distance: float) -> None:
+        # 与 scripts/init_db.py 一样直接写入数据库，不经过 upsert_edges 的失效逻辑
+        await session.execute(delete(GraphEdge))
+        session.add_all(
+            [
+                GraphEdge(
+                    id=1,
+                    region_id=1,
+                    start_node_id=30,
+                    end_node_id=10,
+                    distance=distance,
+                    ideal_speed=1.0,
+                    congestion=1.0,
+                    transport_modes=[TransportMode.WALK],
+                )
+            ]
+        )
+        await session.commit()
+
+    try:
+        async with maker() as session:
+            session.add(
+                Region(id=1, name="测试校园", type=RegionType.CAMPUS, popularity=50, rating=4.0)
+            )
+            session.add_all([node.model_copy() for node in NODES])
+            await session.commit()
+            await import_edges(session, 100.0)
+            repository = GraphRepository(session)
+
+            compiled = compile_region_graph(
+                1,
+                0,
+                await repository.list_nodes_by_region(1),
+                await repository.list_edges_by_region(1),
+            )
+            path = snapshot_path(tmp_path, 1)
+            write_graph_snapshot(compiled, path, signature=await repository.graph_signature(1))
+
+            store = RegionGraphStore(snapshot_dir=tmp_path)
+            graph = await store.get(1, repository)
+            assert store.stats().snapshot_loads == 1
+            assert compact_shortest_path(graph.compact, 30, 10).total_time == pytest.approx(100.0)
+
+            await import_edges(session, 250.0)
+            restarted = RegionGraphStore(snapshot_dir=tmp_path)
+            graph = await restarted.get(1, repository)
+            assert restarted.stats().snapshot_loads == 0
+            assert compact_shortest_path(graph.compact, 30, 10).total_time == pytest.approx(250.0)
+    finally:
+        await engine.dispose()
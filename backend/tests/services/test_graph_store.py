@@ -0,0 +1,158 @@
+"""Tests for the shared region graph store."""
+
+from __future__ import annotations
+
+import asyncio
+from pathlib import Path
+
+import pytest
+
+from app.algorithms import WeightStrategy, build_landmark_table
+from app.models.enums import RegionType, TransportMode
+from app.models.graph import GraphEdge, GraphNode
+from app.models.locations import Region
+from app.services import ComputeExecutor, ExecutorKind, RegionGraphStore, RoutingService
+from app.services.graph_store import landmark_path
+
+
+class CountingGraphRepository:
+    def __init__(self, nodes: dict[int, GraphNode], edges: list[GraphEdge]) -> None:
+        self._nodes = nodes
+        self._edges = edges
+        self.edge_loads = 0
+
+    async def get_node(self, node_id: int) -> GraphNode | None:
+        return self._nodes.get(node_id)
+
+    async def get_nodes(self, node_ids: list[int]) -> list[GraphNode]:
+        return [self._nodes[node_id] for node_id in node_ids if node_id in self._nodes]
+
+    async def list_nodes_by_region(self, region_id: int) -> list[GraphNode]:
+        return [node for node in self._nodes.values() if node.region_id == region_id]
+
+    async def list_edges_by_region(self, region_id: int) -> list[GraphEdge]:
+        self.edge_loads += 1
+        return [edge for edge in self._edges if edge.region_id == region_id]
+
+
+class FakeRegionRepository:
+    def __init__(self, regions: dict[int, Region]) -> None:
+        self._regions = regions
+
+    async def get_region(self, region_id: int) -> Region | None:
+        return self._regions.get(region_id)
+
+
+def _edge(edge_id: int, start: int, end: int, distance: float) -> GraphEdge:
+    return GraphEdge(
+        id=edge_id,
+        region_id=1,
+        start_node_id=start,
+        end_node_id=end,
+        distance=distance,
+        ideal_speed=1.0,
+        congestion=1.0,
+        transport_modes=[TransportMode.WALK],
+    )
+
+
+@pytest.fixture()
+def repositories() -> tuple[CountingGraphRepository, FakeRegionRepository]:
+    region = Region(id=1, name="测试校园", type=RegionType.CAMPUS, popularity=50, rating=4.0)
+    nodes = {
+        1: GraphNode(id=1, region_id=1, name="校门", latitude=0.0, longitude=0.0),
+        2: GraphNode(id=2, region_id=1, name="图书馆", latitude=0.0, longitude=0.001),
+        3: GraphNode(id=3, region_id=1, name="食堂", latitude=0.001, longitude=0.001),
+    }
+    edges = [_edge(1, 1, 2, 100.0), _edge(2, 2, 3, 100.0), _edge(3, 1, 3, 500.0)]
+    return CountingGraphRepository(nodes, edges), FakeRegionRepository({1: region})
+
+
+@pytest.mark.asyncio
+async def test_store_loads_region_once_across_services(
+    repositories: tuple[CountingGraphRepository, FakeRegionRepository],
+) -> None:
+    graph_repo, region_repo = repositories
+    store = RegionGraphStore()
+
+    for _ in range(3):
+        service = RoutingService(graph_repo, region_repo, store)
+        plan = await service.compute_route(region_id=1, start_node_id=1, end_node_id=3)
+        assert [node.id for node in plan.nodes] == [1, 2, 3]
+
+    stats = store.stats()
+    assert graph_repo.edge_loads == 1
+    assert stats.misses == 1
+    assert stats.builds == 1
+    assert stats.hits >= 2
+    assert stats.build_seconds >= 0.0
+
+
+@pytest.mark.asyncio
+async def test_invalidate_bumps_version_and_rebuilds(
+    repositories: tuple[CountingGraphRepository, FakeRegionRepository],
+) -> None:
+    graph_repo, region_repo = repositories
+    store = RegionGraphStore()
+    service = RoutingService(graph_repo, region_repo, store)
+
+    first = await store.get(1, graph_repo)
+    assert first.version == 0
+    assert store.peek(1) is first
+
+    graph_repo._edges = [edge for edge in graph_repo._edges if edge.id != 2]
+    store.invalidate(1)
+    assert store.peek(1) is None
+    assert store.version(1) == 1
+
+    plan = await service.compute_route(region_id=1, start_node_id=1, end_node_id=3)
+    assert [node.id for node in plan.nodes] == [1, 3]
+    assert store.peek(1).version == 1
+    assert graph_repo.edge_loads == 2
+    assert store.stats().invalidations == 1
+
+
+@pytest.mark.asyncio
+async def test_landmark_tables_are_cached_loaded_and_dropped_on_invalidate(
+    repositories: tuple[CountingGraphRepository, FakeRegionRepository],
+    tmp_path: Path,
+) -> None:
+    graph_repo, _ = repositories
+    graph = await RegionGraphStore().get(1, graph_repo)
+
+    built = RegionGraphStore(landmark_count=2)
+    compiled = await built.get(1, graph_repo)
+    table = await built.landmarks(compiled, WeightStrategy.DISTANCE)
+    assert table is not None and len(table.landmarks) == 2
+    assert await built.landmarks(compiled, "distance") is table
+    built.invalidate(1)
+    assert await built.landmarks(compiled, WeightStrategy.DISTANCE) is not table
+
+    stored = build_landmark_table(graph.compact, 1, strategy=WeightStrategy.TIME)
+    stored.save(landmark_path(tmp_path, 1, WeightStrategy.TIME))
+    loading = RegionGraphStore(landmark_dir=tmp_path, landmark_count=0)
+    compiled = await loading.get(1, graph_repo)
+    loaded = await loading.landmarks(compiled, WeightStrategy.TIME)
+    assert loaded is not None and list(loaded.landmarks) == list(stored.landmarks)
+    assert await loading.landmarks(compiled, WeightStrategy.DISTANCE) is None
+
+
+@pytest.mark.asyncio
+async def test_landmark_selection_runs_once_on_the_compute_executor(
+    repositories: tuple[CountingGraphRepository, FakeRegionRepository],
+) -> None:
+    graph_repo, _ = repositories
+    store = RegionGraphStore(landmark_count=2)
+    compiled = await store.get(1, graph_repo)
+    executor = ComputeExecutor(ExecutorKind.THREAD, max_workers=2)
+    try:
+        tables = await asyncio.gather(
+            *(store.landmarks(compiled, WeightStrategy.TIME, executor) for _ in range(3))
+        )
+    finally:
+        executor.shutdown()
+
+    assert tables[0] is not None
+    assert all(table is tables[0] for table in tables)
+    # 并发请求等待同一次构建，选点在线程池中执行而不占用事件循环
+    assert executor.stats().submitted == executor.stats().completed == 1
@@ -0,0 +1,318 @@
+"""Tests for live congestion ingestion."""
+
+from __future__ import annotations
+
+from collections.abc import AsyncIterator
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlmodel import SQLModel
+
+from app.algorithms import SearchAlgorithm, WeightStrategy, build_contraction_hierarchy
+from app.models.enums import RegionType, TransportMode
+from app.models.graph import GraphEdge, GraphNode
+from app.models.locations import Region
+from app.repositories import GraphRepository
+from app.services import (
+    CongestionDelta,
+    LiveCongestionIngestor,
+    RegionGraphStore,
+    RouteCache,
+    RoutePlan,
+    RoutingService,
+    ShortestPathTreeCache,
+    region_graph_store,
+)
+from tests.networks import grid_coordinates, grid_network, grid_node
+
+
+class FakeGraphRepository:
+    def __init__(self, nodes: dict[int, GraphNode], edges: list[GraphEdge]) -> None:
+        self._nodes = nodes
+        self._edges = edges
+
+    async def get_node(self, node_id: int) -> GraphNode | None:
+        return self._nodes.get(node_id)
+
+    async def get_nodes(self, node_ids: list[int]) -> list[GraphNode]:
+        return [self._nodes[node_id] for node_id in node_ids if node_id in self._nodes]
+
+    async def list_nodes_by_region(self, region_id: int) -> list[GraphNode]:
+        return [node for node in self._nodes.values() if node.region_id == region_id]
+
+    async def list_edges_by_region(self, region_id: int) -> list[GraphEdge]:
+        return [edge for edge in self._edges if edge.region_id == region_id]
+
+
+class FakeRegionRepository:
+    def __init__(self, regions: dict[int, Region]) -> None:
+        self._regions = regions
+
+    async def get_region(self, region_id: int) -> Region | None:
+        return self._regions.get(region_id)
+
+
+def _edge(edge_id: int, start: int, end: int, distance: float) -> GraphEdge:
+    return GraphEdge(
+        id=edge_id,
+        region_id=1,
+        start_node_id=start,
+        end_node_id=end,
+        distance=distance,
+        ideal_speed=1.0,
+        congestion=0.5,
+        transport_modes=[TransportMode.WALK],
+    )
+
+
+@pytest.fixture()
+def repositories() -> tuple[FakeGraphRepository, FakeRegionRepository]:
+    region = Region(id=1, name="测试景区", type=RegionType.SCENIC, popularity=50, rating=4.0)
+    nodes = {
+        node_id: GraphNode(
+            id=node_id, region_id=1, name=f"节点{node_id}", latitude=0.0, longitude=node_id * 0.001
+        )
+        for node_id in (1, 2, 3, 4)
+    }
+    edges = [
+        _edge(1, 1, 2, 100.0),
+        _edge(2, 2, 3, 100.0),
+        _edge(3, 1, 3, 500.0),
+        _edge(4, 3, 4, 100.0),
+        _edge(5, 1, 4, 1000.0),
+    ]
+    return FakeGraphRepository(nodes, edges), FakeRegionRepository({1: region})
+
+
+def _time_of(store: RegionGraphStore, start: int, end: int) -> float:
+    graph = store.peek(1)
+    assert graph is not None
+    compact = graph.compact
+    source = compact.index[start]
+    for slot in range(compact.offsets[source], compact.offsets[source + 1]):
+        if compact.node_ids[compact.targets[slot]] == end:
+            return compact.times[slot]
+    raise AssertionError("edge not found")
+
+
+@pytest.mark.asyncio
+async def test_updates_patch_a_copy_and_keep_unaffected_caches(
+    repositories: tuple[FakeGraphRepository, FakeRegionRepository],
+) -> None:
+    graph_repo, region_repo = repositories
+    store = RegionGraphStore()
+    routes = RouteCache()
+    trees = ShortestPathTreeCache()
+    service = RoutingService(graph_repo, region_repo, store, route_cache=routes, tree_cache=trees)
+    ingestor = LiveCongestionIngestor(store, routes, trees)
+
+    await service.compute_route(region_id=1, start_node_id=1, end_node_id=3)
+    await service.compute_route(
+        region_id=1, start_node_id=1, end_node_id=3, strategy=WeightStrategy.DISTANCE
+    )
+    await service.compute_reachable_nodes(
+        region_id=1, origin_node_id=1, strategy=WeightStrategy.TIME
+    )
+    before = store.peek(1)
+    assert before is not None and len(routes) == 2 and len(trees) == 1
+
+    # 变慢的路段不在任何缓存路线或树上：全部保留并迁移到新版本
+    result = ingestor.apply(1, {5: 0.25, 99: 0.5, 3: 1.5})
+    assert (
+        result.version,
+        result.applied,
+        result.routes_invalidated,
+        result.trees_invalidated,
+    ) == (1, 1, 0, 0)
+    assert sorted(result.ignored_edge_ids) == [3, 99]
+    assert store.version(1) == 1
+    assert _time_of(store, 1, 4) == pytest.approx(4000.0)
+    assert before.compact.times[before.edge_slots[5]] == pytest.approx(2000.0)
+    await service.compute_route(region_id=1, start_node_id=1, end_node_id=3)
+    assert routes.stats().hits == 1
+    await service.compute_reachable_nodes(
+        region_id=1, origin_node_id=1, strategy=WeightStrategy.TIME
+    )
+    assert trees.stats().hits == 1
+
+    # 路线用到的路段变化：两种策略的路线和树都失效
+    result = ingestor.apply(1, {1: 0.25})
+    assert (result.routes_invalidated, result.trees_invalidated) == (2, 1)
+    assert len(routes) == 0 and len(trees) == 0
+    plan = await service.compute_route(region_id=1, start_node_id=1, end_node_id=3)
+    assert [node.id for node in plan.nodes] == [1, 2, 3]
+    assert plan.total_time == pytest.approx(400.0 + 200.0)
+    await service.compute_route(
+        region_id=1, start_node_id=1, end_node_id=3, strategy=WeightStrategy.DISTANCE
+    )
+
+    # 路线外的路段变快：按时间的路线可能不再最优，按距离的保留
+    result = ingestor.apply(1, {5: 1.0})
+    assert result.routes_invalidated == 1
+    assert [key[4] for key in routes._entries] == [WeightStrategy.DISTANCE]
+
+    # 系数未变时不产生新版本
+    assert ingestor.apply(1, {5: 1.0}).version == store.version(1) == 3
+    stats = ingestor.stats()
+    assert (stats.batches, stats.applied, stats.rejected) == (4, 3, 1)
+
+
+def _grid_repositories(size: int) -> tuple[FakeGraphRepository, FakeRegionRepository]:
+    region = Region(id=1, name="测试校园", type=RegionType.CAMPUS, popularity=50, rating=4.0)
+    nodes = {
+        node_id: GraphNode(id=node_id, region_id=1, latitude=latitude, longitude=longitude)
+        for node_id, (latitude, longitude) in grid_coordinates(size).items()
+    }
+    edges = [
+        GraphEdge(
+            id=edge_id,
+            region_id=1,
+            start_node_id=edge.source,
+            end_node_id=edge.target,
+            distance=edge.distance,
+            ideal_speed=edge.ideal_speed,
+            congestion=edge.congestion,
+            transport_modes=[TransportMode.WALK],
+        )
+        for edge_id, edge in enumerate(grid_network(size, 4, distance=(80.0, 120.0)), start=1)
+    ]
+    return FakeGraphRepository(nodes, edges), FakeRegionRepository({1: region})
+
+
+@pytest.mark.asyncio
+async def test_indexes_kept_across_updates_still_speed_up_queries() -> None:
+    graph_repo, region_repo = _grid_repositories(12)
+    store = RegionGraphStore(landmark_count=4)
+    service = RoutingService(graph_repo, region_repo, store)
+    graph = await store.get(1, graph_repo)
+    hierarchy = build_contraction_hierarchy(
+        graph.compact, strategy=WeightStrategy.DISTANCE, allowed_modes=("walk",)
+    )
+    store.install_hierarchy(graph, ("walk",), hierarchy)
+    await store.landmarks(graph, WeightStrategy.TIME)
+
+    # 只有路段变慢：按距离的层次和按时间的地标表都继续可用
+    patch = store.apply_congestion(1, {1: 0.1, 2: 0.2})
+    assert patch is not None and not patch.faster
+    end = grid_node(11, 10, 12)
+
+    async def route(strategy: WeightStrategy, algorithm: SearchAlgorithm) -> RoutePlan:
+        return await service.compute_route(
+            region_id=1,
+            start_node_id=0,
+            end_node_id=end,
+            strategy=strategy,
+            transport_modes=["walk"],
+            algorithm=algorithm,
+        )
+
+    for strategy, algorithm in (
+        (WeightStrategy.DISTANCE, SearchAlgorithm.CONTRACTION_HIERARCHY),
+        (WeightStrategy.TIME, SearchAlgorithm.ALT),
+    ):
+        plain = await route(strategy, SearchAlgorithm.DIJKSTRA)
+        indexed = await route(strategy, algorithm)
+        assert indexed.algorithm is algorithm
+        assert indexed.expanded_nodes < plain.expanded_nodes
+        assert indexed.total_distance == pytest.approx(plain.total_distance)
+        assert indexed.total_time == pytest.approx(plain.total_time)
+
+    # 与当前图不符的索引不会被使用，路线如实报告回退后的算法
+    outdated = build_contraction_hierarchy(
+        graph.compact, strategy=WeightStrategy.TIME, allowed_modes=("walk",)
+    )
+    store.install_hierarchy(patch.current, ("walk",), outdated)
+    fallback = await route(WeightStrategy.TIME, SearchAlgorithm.CONTRACTION_HIERARCHY)
+    assert fallback.algorithm is SearchAlgorithm.DIJKSTRA
+
+    # 有路段变快后旧的按时间地标表不再沿用，按距离的层次仍然保留
+    kept = await store.landmarks(patch.current, WeightStrategy.TIME)
+    faster = store.apply_congestion(1, {1: 1.0})
+    assert faster is not None and faster.faster
+    assert await store.landmarks(faster.current, WeightStrategy.TIME) is not kept
+    modes = ("walk",)
+    assert store.hierarchy(faster.current, WeightStrategy.DISTANCE, modes) is hierarchy
+
+
+@pytest.mark.asyncio
+async def test_updates_before_load_apply_when_the_region_is_built(
+    repositories: tuple[FakeGraphRepository, FakeRegionRepository],
+) -> None:
+    graph_repo, _ = repositories
+    store = RegionGraphStore()
+    ingestor = LiveCongestionIngestor(store)
+
+    result = ingestor.apply(1, {2: 0.25})
+    assert not result.loaded and result.applied == 0
+
+    await store.get(1, graph_repo)
+    assert _time_of(store, 2, 3) == pytest.approx(400.0)
+    # 数据库变更触发失效后，以数据库中的拥挤度为准
+    store.invalidate(1)
+    await store.get(1, graph_repo)
+    assert _time_of(store, 2, 3) == pytest.approx(200.0)
+
+
+@pytest.mark.asyncio
+async def test_upserted_congestion_replaces_live_overrides() -> None:
+    engine = create_async_engine("sqlite+aiosqlite://")
+    async with engine.begin() as connection:
+        await connection.run_sync(SQLModel.metadata.create_all)
+    maker = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    region_id = 901  # 全局图缓存由 upsert_edges 失效，使用测试专用的区域
+    try:
+        async with maker() as session:
+            session.add(
+                Region(
+                    id=region_id, name="实时测试", type=RegionType.SCENIC, popularity=1, rating=1.0
+                )
+            )
+            for node_id in (1, 2):
+                session.add(
+                    GraphNode(
+                        id=node_id, region_id=region_id, latitude=0.0, longitude=node_id * 0.001
+                    )
+                )
+            await session.commit()
+            repository = GraphRepository(session)
+            edge = _edge(1, 1, 2, 100.0)
+            edge.region_id = region_id
+            await repository.upsert_edges([edge])
+
+            region_graph_store.apply_congestion(region_id, {1: 0.25})
+            graph = await region_graph_store.get(region_id, repository)
+            assert graph.compact.times[0] == pytest.approx(400.0)
+
+            edge.congestion = 1.0
+            await repository.upsert_edges([edge])
+            graph = await region_graph_store.get(region_id, repository)
+            assert graph.compact.times[0] == pytest.approx(100.0)
+    finally:
+        region_graph_store.invalidate(region_id)
+        await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_consume_coalesces_a_stream_into_batches(
+    repositories: tuple[FakeGraphRepository, FakeRegionRepository],
+) -> None:
+    graph_repo, _ = repositories
+    store = RegionGraphStore()
+    await store.get(1, graph_repo)
+    ingestor = LiveCongestionIngestor(store)
+
+    async def feed() -> AsyncIterator[CongestionDelta]:
+        for step in range(2500):
+            yield CongestionDelta(
+                region_id=1, edge_id=step % 5 + 1, congestion=0.2 + (step % 7) / 10
+            )
+
+    received = await ingestor.consume(feed(), batch_size=1000, max_delay=60.0)
+
+    assert received == 2500
+    assert ingestor.stats().batches == 3
+    # 每条边以流中最后一次出现的系数为准
+    last = {step % 5 + 1: 0.2 + (step % 7) / 10 for step in range(2500)}
+    assert _time_of(store, 1, 2) == pytest.approx(100.0 / last[1])
+    assert _time_of(store, 1, 4) == pytest.approx(1000.0 / last[5])
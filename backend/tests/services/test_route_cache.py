@@ -0,0 +1,110 @@
+"""Tests for the route plan cache."""
+
+from __future__ import annotations
+
+import json
+from typing import Any
+
+import pytest
+
+from app.algorithms import SearchAlgorithm, WeightStrategy
+from app.algorithms.compact_graph import CompactGraph
+from app.algorithms.shortest_path import Edge
+from app.services import RouteCache, RouteNode, RoutePlan, RouteSegment
+from app.services.graph_store import CompiledRegionGraph
+
+
+class FakeSharedCache:
+    def __init__(self) -> None:
+        self.data: dict[str, str] = {}
+
+    async def get(self, key: str) -> Any | None:
+        value = self.data.get(key)
+        return json.loads(value) if value is not None else None
+
+    async def set(self, key: str, value: Any, ttl: int | None = None) -> None:
+        self.data[key] = json.dumps(value)
+
+
+def _graph(region_id: int = 1, version: int = 0) -> CompiledRegionGraph:
+    compact = CompactGraph.from_edges([Edge(1, 2, distance=10.0, ideal_speed=1.0, congestion=1.0)])
+    return CompiledRegionGraph(
+        region_id=region_id,
+        version=version,
+        nodes={},
+        edges=(),
+        algorithm_edges=(),
+        compact=compact,
+    )
+
+
+def _plan(region_id: int = 1) -> RoutePlan:
+    return RoutePlan(
+        region_id=region_id,
+        strategy=WeightStrategy.DISTANCE,
+        total_distance=10.0,
+        total_time=10.0,
+        allowed_modes=("walk",),
+        nodes=[RouteNode(1, "A", 0.0, 0.0), RouteNode(2, None, 0.0, 1.0)],
+        segments=[RouteSegment(1, 2, "walk", 10.0, 10.0)],
+        expanded_nodes=2,
+        algorithm=SearchAlgorithm.DIJKSTRA,
+    )
+
+
+@pytest.mark.asyncio
+async def test_lru_evicts_least_recently_used() -> None:
+    cache = RouteCache(max_entries=2)
+    graph = _graph()
+    for end in (2, 3):
+        await cache.put(graph, 1, end, WeightStrategy.TIME, ("walk",), _plan())
+    assert await cache.get(graph, 1, 2, WeightStrategy.TIME, ("walk",)) is not None
+
+    await cache.put(graph, 1, 4, WeightStrategy.TIME, ("walk",), _plan())
+
+    assert await cache.get(graph, 1, 3, WeightStrategy.TIME, ("walk",)) is None
+    assert await cache.get(graph, 1, 2, WeightStrategy.TIME, ("walk",)) is not None
+    assert await cache.get(graph, 1, 2, WeightStrategy.DISTANCE, ("walk",)) is None
+    stats = cache.stats()
+    assert (stats.hits, stats.misses, stats.evictions, stats.size) == (2, 2, 1, 2)
+    assert stats.as_dict()["hit_ratio"] == pytest.approx(0.5)
+
+
+@pytest.mark.asyncio
+async def test_newer_graph_version_drops_old_entries() -> None:
+    cache = RouteCache()
+    await cache.put(_graph(1, 0), 1, 2, WeightStrategy.TIME, ("walk", "bike"), _plan())
+    await cache.put(_graph(2, 0), 1, 2, WeightStrategy.TIME, ("walk",), _plan(2))
+
+    assert await cache.get(_graph(1, 0), 1, 2, WeightStrategy.TIME, ("bike", "walk")) is not None
+    assert await cache.get(_graph(1, 1), 1, 2, WeightStrategy.TIME, ("bike", "walk")) is None
+    assert len(cache) == 1
+
+    cache.invalidate(2)
+    assert len(cache) == 0
+
+
+@pytest.mark.asyncio
+async def test_shared_backend_serves_other_workers() -> None:
+    shared = FakeSharedCache()
+    writer = RouteCache(shared=shared)
+    reader = RouteCache(shared=shared)
+    plan = _plan()
+
+    await writer.put(_graph(version=0), 1, 2, WeightStrategy.DISTANCE, ("walk",), plan)
+    # 另一个 worker 的版本号不同，但图内容一致
+    restored = await reader.get(_graph(version=5), 1, 2, WeightStrategy.DISTANCE, ("walk",))
+
+    assert restored == plan
+    assert restored.algorithm is SearchAlgorithm.DIJKSTRA
+    assert reader.stats().shared_hits == 1
+    assert await reader.get(_graph(version=5), 1, 2, WeightStrategy.DISTANCE, ("walk",)) is restored
+
+
+@pytest.mark.asyncio
+async def test_disabled_cache_stores_nothing() -> None:
+    cache = RouteCache(max_entries=0)
+    await cache.put(_graph(), 1, 2, WeightStrategy.TIME, ("walk",), _plan())
+
+    assert await cache.get(_graph(), 1, 2, WeightStrategy.TIME, ("walk",)) is None
+    assert cache.stats().misses == 0
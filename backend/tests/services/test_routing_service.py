@@ -2,16 +2,27 @@
 
 from __future__ import annotations
 
+from datetime import datetime
+
 import pytest
 
+from app.algorithms import SearchAlgorithm, TourSolver, WeightStrategy
+from app.algorithms.contraction import build_contraction_hierarchy
+from app.core.config import settings
 from app.models.enums import RegionType, TransportMode
 from app.models.graph import GraphEdge, GraphNode
 from app.models.locations import Region
 from app.services import (
+    ComputeExecutor,
+    ExecutorKind,
     NodeValidationError,
     RegionNotFoundError,
+    RegionGraphStore,
+    RouteCache,
     RouteNotFoundError,
+    RouteQuery,
     RoutingService,
+    ShortestPathTreeCache,
 )
 
 
@@ -26,6 +37,9 @@ class FakeGraphRepository:
     async def get_nodes(self, node_ids: list[int]) -> list[GraphNode]:
         return [self._nodes[node_id] for node_id in node_ids if node_id in self._nodes]
 
+    async def list_nodes_by_region(self, region_id: int) -> list[GraphNode]:
+        return [node for node in self._nodes.values() if node.region_id == region_id]
+
     async def list_edges_by_region(self, region_id: int) -> list[GraphEdge]:
         return [edge for edge in self._edges if edge.region_id == region_id]
 
@@ -92,10 +106,69 @@ async def test_compute_route_returns_path(sample_graph: tuple[FakeGraphRepositor
     assert [node.id for node in plan.nodes] == [1, 2, 3]
     assert [segment.transport_mode for segment in plan.segments] == ["walk", "walk"]
     assert set(plan.allowed_modes) == {"walk", "electric_cart"}
+    assert plan.expanded_nodes >= 2
 
 
 @pytest.mark.asyncio
-async def test_compute_route_filters_transport_modes(sample_graph: tuple[FakeGraphRepository, FakeRegionRepository]) -> None:
+@pytest.mark.parametrize(
+    "algorithm",
+    [
+        SearchAlgorithm.DIJKSTRA,
+        SearchAlgorithm.ASTAR,
+        SearchAlgorithm.BIDIRECTIONAL,
+        SearchAlgorithm.ALT,
+    ],
+)
+async def test_compute_route_supports_each_algorithm(
+    sample_graph: tuple[FakeGraphRepository, FakeRegionRepository],
+    algorithm: SearchAlgorithm,
+) -> None:
+    graph_repo, region_repo = sample_graph
+    service = RoutingService(graph_repo, region_repo)
+
+    plan = await service.compute_route(
+        region_id=1, start_node_id=1, end_node_id=3, algorithm=algorithm
+    )
+
+    assert [node.id for node in plan.nodes] == [1, 2, 3]
+    assert plan.algorithm is algorithm
+
+
+@pytest.mark.asyncio
+async def test_compute_route_uses_contraction_hierarchy_when_available(
+    sample_graph: tuple[FakeGraphRepository, FakeRegionRepository],
+) -> None:
+    graph_repo, region_repo = sample_graph
+    store = RegionGraphStore()
+    service = RoutingService(graph_repo, region_repo, store)
+
+    fallback = await service.compute_route(
+        region_id=1, start_node_id=1, end_node_id=3, algorithm=SearchAlgorithm.CONTRACTION_HIERARCHY
+    )
+    assert fallback.algorithm is SearchAlgorithm.DIJKSTRA
+
+    graph = await store.get(1, graph_repo)
+    modes = ("electric_cart", "walk")
+    store.install_hierarchy(
+        graph,
+        modes,
+        build_contraction_hierarchy(
+            graph.compact, strategy=WeightStrategy.TIME, allowed_modes=modes
+        ),
+    )
+    plan = await service.compute_route(
+        region_id=1, start_node_id=1, end_node_id=3, algorithm=SearchAlgorithm.CONTRACTION_HIERARCHY
+    )
+
+    assert plan.algorithm is SearchAlgorithm.CONTRACTION_HIERARCHY
+    assert [node.id for node in plan.nodes] == [1, 2, 3]
+    assert plan.total_distance == pytest.approx(fallback.total_distance)
+
+
+@pytest.mark.asyncio
+async def test_compute_route_filters_transport_modes(
+    sample_graph: tuple[FakeGraphRepository, FakeRegionRepository],
+) -> None:
     graph_repo, region_repo = sample_graph
     service = RoutingService(graph_repo, region_repo)
 
@@ -106,11 +179,16 @@ async def test_compute_route_filters_transport_modes(sample_graph: tuple[FakeGra
         transport_modes=["electric_cart"],
     )
 
-    assert [segment.transport_mode for segment in plan.segments] == ["electric_cart", "electric_cart"]
+    assert [segment.transport_mode for segment in plan.segments] == [
+        "electric_cart",
+        "electric_cart",
+    ]
 
 
 @pytest.mark.asyncio
-async def test_compute_route_rejects_invalid_modes(sample_graph: tuple[FakeGraphRepository, FakeRegionRepository]) -> None:
+async def test_compute_route_rejects_invalid_modes(
+    sample_graph: tuple[FakeGraphRepository, FakeRegionRepository],
+) -> None:
     graph_repo, region_repo = sample_graph
     service = RoutingService(graph_repo, region_repo)
 
@@ -124,7 +202,9 @@ async def test_compute_route_rejects_invalid_modes(sample_graph: tuple[FakeGraph
 
 
 @pytest.mark.asyncio
-async def test_compute_route_region_not_found(sample_graph: tuple[FakeGraphRepository, FakeRegionRepository]) -> None:
+async def test_compute_route_region_not_found(
+    sample_graph: tuple[FakeGraphRepository, FakeRegionRepository],
+) -> None:
     graph_repo, region_repo = sample_graph
     service = RoutingService(graph_repo, region_repo)
 
@@ -133,7 +213,9 @@ async def test_compute_route_region_not_found(sample_graph: tuple[FakeGraphRepos
 
 
 @pytest.mark.asyncio
-async def test_compute_route_missing_nodes(sample_graph: tuple[FakeGraphRepository, FakeRegionRepository]) -> None:
+async def test_compute_route_missing_nodes(
+    sample_graph: tuple[FakeGraphRepository, FakeRegionRepository],
+) -> None:
     graph_repo, region_repo = sample_graph
     service = RoutingService(graph_repo, region_repo)
 
@@ -142,7 +224,9 @@ async def test_compute_route_missing_nodes(sample_graph: tuple[FakeGraphReposito
 
 
 @pytest.mark.asyncio
-async def test_compute_route_no_path_raises(sample_graph: tuple[FakeGraphRepository, FakeRegionRepository]) -> None:
+async def test_compute_route_no_path_raises(
+    sample_graph: tuple[FakeGraphRepository, FakeRegionRepository],
+) -> None:
     graph_repo, region_repo = sample_graph
     service = RoutingService(graph_repo, region_repo)
 
@@ -151,3 +235,364 @@ async def test_compute_route_no_path_raises(sample_graph: tuple[FakeGraphReposit
 
     with pytest.raises(RouteNotFoundError):
         await service.compute_route(region_id=1, start_node_id=1, end_node_id=3)
+
+
+@pytest.mark.asyncio
+async def test_compute_distance_matrix_covers_all_pairs(
+    sample_graph: tuple[FakeGraphRepository, FakeRegionRepository],
+) -> None:
+    graph_repo, region_repo = sample_graph
+    service = RoutingService(graph_repo, region_repo)
+
+    plan = await service.compute_distance_matrix(
+        region_id=1,
+        source_node_ids=[1, 2],
+        target_node_ids=[2, 3, 1],
+        strategy=WeightStrategy.DISTANCE,
+    )
+
+    assert plan.source_ids == [1, 2] and plan.target_ids == [2, 3, 1]
+    assert plan.matrix.costs.tolist() == [[100.0, 250.0, 0.0], [0.0, 150.0, float("inf")]]
+    assert plan.matrix.times[0, 1] == pytest.approx(200.0)
+    assert plan.path_node_ids(0, 1) == [1, 2, 3]
+    assert plan.path_node_ids(1, 2) is None
+
+    square = await service.compute_distance_matrix(region_id=1, source_node_ids=[3, 1])
+    assert square.target_ids == [3, 1]
+
+    with pytest.raises(NodeValidationError):
+        await service.compute_distance_matrix(region_id=1, source_node_ids=[1, 99])
+
+
+@pytest.mark.asyncio
+async def test_compute_tour_plan_returns_round_trip_legs(
+    sample_graph: tuple[FakeGraphRepository, FakeRegionRepository],
+) -> None:
+    graph_repo, region_repo = sample_graph
+    graph_repo._edges.append(
+        GraphEdge(
+            id=3,
+            region_id=1,
+            start_node_id=3,
+            end_node_id=1,
+            distance=300.0,
+            ideal_speed=1.0,
+            congestion=1.0,
+            transport_modes=[TransportMode.WALK],
+        )
+    )
+    service = RoutingService(graph_repo, region_repo)
+
+    plan = await service.compute_tour_plan(
+        region_id=1, start_node_id=1, target_node_ids=[3, 2, 1, 3], strategy=WeightStrategy.DISTANCE
+    )
+
+    assert plan.route == [1, 2, 3, 1]
+    assert plan.solver is TourSolver.HELD_KARP
+    assert plan.total_distance == pytest.approx(550.0)
+    assert [leg.nodes[0].id for leg in plan.legs] == [1, 2, 3]
+    assert [leg.nodes[-1].id for leg in plan.legs] == [2, 3, 1]
+    assert sum(leg.total_time for leg in plan.legs) == pytest.approx(plan.total_time)
+
+    with pytest.raises(RouteNotFoundError):
+        await service.compute_tour_plan(
+            region_id=1, start_node_id=1, target_node_ids=[2], transport_modes=["electric_cart"]
+        )
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("kind", [ExecutorKind.THREAD, ExecutorKind.PROCESS])
+async def test_searches_run_on_compute_executor(
+    sample_graph: tuple[FakeGraphRepository, FakeRegionRepository],
+    kind: ExecutorKind,
+) -> None:
+    graph_repo, region_repo = sample_graph
+    executor = ComputeExecutor(kind, max_workers=1)
+    service = RoutingService(graph_repo, region_repo, compute_executor=executor)
+
+    try:
+        plan = await service.compute_route(region_id=1, start_node_id=1, end_node_id=3)
+        reachable = await service.compute_reachable_nodes(
+            region_id=1, origin_node_id=1, max_distance=200.0
+        )
+    finally:
+        executor.shutdown()
+
+    assert [node.id for node in plan.nodes] == [1, 2, 3]
+    assert list(reachable) == [1, 2]
+    assert (reachable.distance(2), reachable.path(2)) == (100.0, [1, 2])
+    assert reachable.time(2) == pytest.approx(100.0 / 60)
+    assert 3 not in reachable
+    with pytest.raises(KeyError):
+        reachable.path(3)
+    assert executor.stats().completed == 2
+
+
+@pytest.mark.asyncio
+async def test_compute_routes_batch_groups_by_source(
+    sample_graph: tuple[FakeGraphRepository, FakeRegionRepository],
+) -> None:
+    graph_repo, region_repo = sample_graph
+    executor = ComputeExecutor(ExecutorKind.INLINE)
+    service = RoutingService(graph_repo, region_repo, compute_executor=executor)
+
+    results = await service.compute_routes_batch(
+        region_id=1,
+        queries=[
+            RouteQuery(1, 3),
+            RouteQuery(1, 2),
+            RouteQuery(3, 1),
+            RouteQuery(1, 999),
+            RouteQuery(1, 3, strategy=WeightStrategy.DISTANCE, transport_modes=["electric_cart"]),
+            RouteQuery(2, 3, transport_modes=["bike"]),
+        ],
+    )
+
+    assert [node.id for node in results[0].nodes] == [1, 2, 3]
+    assert [node.id for node in results[1].nodes] == [1, 2]
+    assert results[0].expanded_nodes == results[1].expanded_nodes
+    assert isinstance(results[2], RouteNotFoundError)
+    assert isinstance(results[3], NodeValidationError)
+    assert results[4].strategy is WeightStrategy.DISTANCE
+    assert {segment.transport_mode for segment in results[4].segments} == {"electric_cart"}
+    assert isinstance(results[5], NodeValidationError)
+    # 起点 1 的两组（不同策略/交通方式）与起点 3 合并为一次执行器调用
+    assert executor.stats().submitted == 1
+
+    with pytest.raises(RegionNotFoundError):
+        await service.compute_routes_batch(region_id=99, queries=[RouteQuery(1, 3)])
+
+
+@pytest.mark.asyncio
+async def test_compute_route_reuses_cached_plan(
+    sample_graph: tuple[FakeGraphRepository, FakeRegionRepository],
+) -> None:
+    graph_repo, region_repo = sample_graph
+    store = RegionGraphStore()
+    executor = ComputeExecutor(ExecutorKind.INLINE)
+    service = RoutingService(
+        graph_repo, region_repo, store, compute_executor=executor, route_cache=RouteCache()
+    )
+
+    first = await service.compute_route(
+        region_id=1, start_node_id=1, end_node_id=3, transport_modes=["walk"]
+    )
+    second = await service.compute_route(
+        region_id=1, start_node_id=1, end_node_id=3, transport_modes=["WALK"]
+    )
+    assert not first.cached and first.expanded_nodes > 0
+    assert second.cached and second.expanded_nodes == 0
+    assert second.algorithm is first.algorithm
+    assert second.nodes == first.nodes
+    assert executor.stats().submitted == 1
+
+    store.invalidate(1)
+    third = await service.compute_route(
+        region_id=1, start_node_id=1, end_node_id=3, transport_modes=["walk"]
+    )
+    assert not third.cached
+    assert executor.stats().submitted == 2
+
+
+@pytest.mark.asyncio
+async def test_reachable_nodes_tree_serves_later_routes(
+    sample_graph: tuple[FakeGraphRepository, FakeRegionRepository],
+) -> None:
+    graph_repo, region_repo = sample_graph
+    executor = ComputeExecutor(ExecutorKind.INLINE)
+    trees = ShortestPathTreeCache(hot_threshold=2)
+    service = RoutingService(graph_repo, region_repo, compute_executor=executor, tree_cache=trees)
+
+    reachable = await service.compute_reachable_nodes(
+        region_id=1, origin_node_id=1, strategy=WeightStrategy.TIME
+    )
+    assert reachable.path(3) == [1, 2, 3]
+    assert reachable.time(3) == pytest.approx(200.0 / 60)
+
+    plan = await service.compute_route(region_id=1, start_node_id=1, end_node_id=3)
+    assert [node.id for node in plan.nodes] == [1, 2, 3]
+    assert plan.algorithm is SearchAlgorithm.DIJKSTRA
+    assert plan.total_time == pytest.approx(200.0)
+    # 路线直接沿缓存的树回溯，没有再次提交搜索
+    assert executor.stats().submitted == 1
+    assert trees.stats().hits == 1
+
+    with pytest.raises(RouteNotFoundError):
+        await service.compute_route(region_id=1, start_node_id=3, end_node_id=1)
+    with pytest.raises(RouteNotFoundError):
+        await service.compute_route(region_id=1, start_node_id=3, end_node_id=1)
+    # 第二次请求同一起点时该起点变热，改为构建整棵树
+    assert len(trees) == 2
+
+
+@pytest.mark.asyncio
+async def test_compute_isochrone_bands_and_polygons(
+    sample_graph: tuple[FakeGraphRepository, FakeRegionRepository],
+) -> None:
+    graph_repo, region_repo = sample_graph
+    trees = ShortestPathTreeCache()
+    service = RoutingService(graph_repo, region_repo, tree_cache=trees)
+
+    plan = await service.compute_isochrone(
+        region_id=1, origin_node_id=1, budgets=[250.0, 150.0], include_polygons=True
+    )
+
+    assert plan.node_ids == [1, 2, 3]
+    assert plan.isochrone.budgets == (150.0, 250.0)
+    assert plan.isochrone.bands.tolist() == [0, 0, 1]
+    assert plan.isochrone.costs.tolist() == pytest.approx([0.0, 100.0, 200.0])
+    # 第一档只有两个节点，无法构成多边形
+    assert plan.isochrone.polygons[0] is None
+    assert sorted(plan.isochrone.polygons[1][:-1]) == [(0.0, 0.0), (1.0, 0.0), (1.0, 1.0)]
+
+    bounded = await service.compute_isochrone(region_id=1, origin_node_id=1, budgets=[150.0])
+    assert bounded.node_ids == [1, 2]
+
+    # 起点已有缓存的完整最短路树时直接复用
+    await service.compute_reachable_nodes(
+        region_id=1, origin_node_id=1, strategy=WeightStrategy.TIME
+    )
+    reused = await service.compute_isochrone(region_id=1, origin_node_id=1, budgets=[150.0])
+    assert reused.node_ids == [1, 2]
+    assert trees.stats().hits == 1
+
+    with pytest.raises(NodeValidationError):
+        await service.compute_isochrone(region_id=1, origin_node_id=1, budgets=[0.0])
+    with pytest.raises(NodeValidationError):
+        await service.compute_isochrone(region_id=1, origin_node_id=999, budgets=[10.0])
+    with pytest.raises(RegionNotFoundError):
+        await service.compute_isochrone(region_id=99, origin_node_id=1, budgets=[10.0])
+
+
+@pytest.mark.asyncio
+async def test_compute_nearest_nodes_stops_at_limit(
+    sample_graph: tuple[FakeGraphRepository, FakeRegionRepository],
+) -> None:
+    graph_repo, region_repo = sample_graph
+    trees = ShortestPathTreeCache()
+    service = RoutingService(graph_repo, region_repo, tree_cache=trees)
+
+    nearest = await service.compute_nearest_nodes(
+        region_id=1, origin_node_id=1, target_node_ids=[2, 3], limit=1
+    )
+    assert 2 in nearest and 3 not in nearest
+    assert nearest.path(2) == [1, 2]
+    # 提前结束的部分树不会写入缓存
+    assert len(trees) == 0
+
+    outside = await service.compute_nearest_nodes(
+        region_id=1, origin_node_id=1, target_node_ids=[3], limit=1, max_distance=200.0
+    )
+    assert 3 not in outside
+
+    await service.compute_reachable_nodes(region_id=1, origin_node_id=1)
+    cached = await service.compute_nearest_nodes(
+        region_id=1, origin_node_id=1, target_node_ids=[2], limit=1
+    )
+    assert list(cached) == [1, 2, 3]
+    assert trees.stats().hits == 1
+
+
+@pytest.mark.asyncio
+async def test_compute_alternative_routes_returns_distinct_plans(
+    sample_graph: tuple[FakeGraphRepository, FakeRegionRepository],
+) -> None:
+    graph_repo, region_repo = sample_graph
+    graph_repo._edges.append(
+        GraphEdge(
+            id=3,
+            region_id=1,
+            start_node_id=1,
+            end_node_id=3,
+            distance=300.0,
+            ideal_speed=1.0,
+            congestion=1.0,
+            transport_modes=[TransportMode.WALK],
+        )
+    )
+    service = RoutingService(graph_repo, region_repo)
+
+    plans = await service.compute_alternative_routes(
+        region_id=1, start_node_id=1, end_node_id=3, strategy=WeightStrategy.DISTANCE
+    )
+
+    assert [[node.id for node in plan.nodes] for plan in plans] == [[1, 2, 3], [1, 3]]
+    assert [plan.total_distance for plan in plans] == pytest.approx([250.0, 300.0])
+    single = await service.compute_alternative_routes(
+        region_id=1, start_node_id=1, end_node_id=3, strategy=WeightStrategy.DISTANCE, k=1
+    )
+    assert len(single) == 1
+
+    with pytest.raises(NodeValidationError):
+        await service.compute_alternative_routes(
+            region_id=1, start_node_id=1, end_node_id=3, max_overlap=1.5
+        )
+    with pytest.raises(RouteNotFoundError):
+        await service.compute_alternative_routes(region_id=1, start_node_id=3, end_node_id=1)
+
+
+@pytest.mark.asyncio
+async def test_compute_route_follows_congestion_at_departure(
+    sample_graph: tuple[FakeGraphRepository, FakeRegionRepository],
+) -> None:
+    graph_repo, region_repo = sample_graph
+    # 直达路段 10:00-11:00 严重拥堵，其余时段畅通
+    rush_hour = [0.05 if 40 <= bucket < 44 else 1.0 for bucket in range(96)]
+    graph_repo._edges.append(
+        GraphEdge(
+            id=3,
+            region_id=1,
+            start_node_id=1,
+            end_node_id=3,
+            distance=150.0,
+            ideal_speed=1.0,
+            congestion=1.0,
+            transport_modes=[TransportMode.WALK],
+            congestion_profile=rush_hour,
+        )
+    )
+    cache = RouteCache()
+    service = RoutingService(graph_repo, region_repo, route_cache=cache)
+
+    jammed = await service.compute_route(
+        region_id=1, start_node_id=1, end_node_id=3, departure_time=datetime(2026, 5, 1, 10, 15)
+    )
+    clear = await service.compute_route(
+        region_id=1, start_node_id=1, end_node_id=3, departure_time=datetime(2026, 5, 1, 16, 0)
+    )
+    static = await service.compute_route(region_id=1, start_node_id=1, end_node_id=3)
+
+    assert [node.id for node in jammed.nodes] == [1, 2, 3]
+    assert jammed.total_time == pytest.approx(200.0)
+    assert jammed.departure_time == datetime(2026, 5, 1, 10, 15)
+    assert [node.id for node in clear.nodes] == [1, 3]
+    assert clear.total_time == pytest.approx(150.0)
+    assert static.departure_time is None
+    # 时间依赖路线不写入缓存
+    assert cache.stats().size == 1
+
+
+@pytest.mark.asyncio
+async def test_compute_multimodal_route_switches_mode_per_segment(
+    sample_graph: tuple[FakeGraphRepository, FakeRegionRepository],
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    graph_repo, region_repo = sample_graph
+    graph_repo._edges[0].transport_modes = [TransportMode.WALK]
+    monkeypatch.setattr(settings, "routing_mode_speed_factors", {"walk": 1.0, "electric_cart": 2.0})
+    monkeypatch.setattr(settings, "routing_mode_transfer_penalties", {"walk>electric_cart": 30.0})
+    cache = RouteCache()
+    service = RoutingService(graph_repo, region_repo, route_cache=cache)
+
+    plan = await service.compute_route(
+        region_id=1, start_node_id=1, end_node_id=3, algorithm=SearchAlgorithm.MULTIMODAL
+    )
+    single = await service.compute_route(region_id=1, start_node_id=1, end_node_id=3)
+
+    assert plan.algorithm is SearchAlgorithm.MULTIMODAL
+    assert [segment.transport_mode for segment in plan.segments] == ["walk", "electric_cart"]
+    # 步行 100 秒，换乘 30 秒后乘电瓶车 50 秒
+    assert plan.total_time == pytest.approx(180.0)
+    assert single.total_time == pytest.approx(200.0)
+    # 多交通方式路线不写入缓存
+    assert cache.stats().size == 1
@@ -0,0 +1,57 @@
+"""Tests for the shortest-path tree cache."""
+
+from __future__ import annotations
+
+from app.algorithms import CompactGraph, Edge, WeightStrategy, build_shortest_path_tree
+from app.services import ShortestPathTreeCache
+from app.services.graph_store import CompiledRegionGraph
+
+COMPACT = CompactGraph.from_edges(
+    [Edge(node, node + 1, distance=10.0, ideal_speed=1.0, congestion=1.0) for node in range(1, 10)]
+)
+TREE_BYTES = build_shortest_path_tree(COMPACT, 1).nbytes
+
+
+def _graph(version: int = 0) -> CompiledRegionGraph:
+    return CompiledRegionGraph(
+        region_id=1, version=version, nodes={}, edges=(), algorithm_edges=(), compact=COMPACT
+    )
+
+
+def _put(cache: ShortestPathTreeCache, origin: int, version: int = 0) -> None:
+    tree = build_shortest_path_tree(COMPACT, origin)
+    cache.put(_graph(version), origin, WeightStrategy.TIME, ("walk",), tree)
+
+
+def test_evicts_least_recently_used_tree_by_bytes() -> None:
+    cache = ShortestPathTreeCache(max_bytes=2 * TREE_BYTES)
+    _put(cache, 1)
+    _put(cache, 2)
+    assert cache.get(_graph(), 1, WeightStrategy.TIME, ("walk",)) is not None
+
+    _put(cache, 3)
+
+    assert cache.get(_graph(), 2, WeightStrategy.TIME, ("walk",)) is None
+    assert cache.get(_graph(), 1, WeightStrategy.TIME, ("walk",)) is not None
+    assert cache.get(_graph(), 1, WeightStrategy.DISTANCE, ("walk",)) is None
+    stats = cache.stats()
+    assert (stats.entries, stats.bytes, stats.evictions) == (2, 2 * TREE_BYTES, 1)
+
+
+def test_version_bump_drops_trees_and_request_counts() -> None:
+    cache = ShortestPathTreeCache(hot_threshold=2)
+    assert not cache.is_hot(_graph(), 5, WeightStrategy.TIME, ("walk",))
+    assert cache.is_hot(_graph(), 5, WeightStrategy.TIME, ("walk",))
+    _put(cache, 5)
+
+    assert cache.get(_graph(1), 5, WeightStrategy.TIME, ("walk",)) is None
+    assert len(cache) == 0
+    assert not cache.is_hot(_graph(1), 5, WeightStrategy.TIME, ("walk",))
+
+
+def test_oversized_trees_are_not_cached() -> None:
+    cache = ShortestPathTreeCache(max_bytes=TREE_BYTES - 1)
+    _put(cache, 1)
+
+    assert len(cache) == 0
+    assert cache.stats().stores == 0